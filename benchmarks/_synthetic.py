@@ -0,0 +1,50 @@
+"""Synthetic cache data for benchmarks (not shipped with the package)."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CODES: tuple[str, ...] = ("PLN", "USD", "EUR", "GBP")
+
+
+def extra_codes(n: int) -> tuple[str, ...]:
+    """Return `n` currency codes: the supported four first, then made-up ones."""
+    codes = list(DEFAULT_CODES)
+    i = 0
+    while len(codes) < n:
+        codes.append(f"X{i // 26:01d}{chr(65 + i % 26)}")
+        i += 1
+    return tuple(codes[:n])
+
+
+def eur_walk(codes: tuple[str, ...], years: float, seed: int = 7) -> pd.DataFrame:
+    """Wide business-day frame: index=date, columns=codes, values=CODE per 1 EUR."""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(end=date(2026, 2, 6), periods=int(years * 261))
+    steps = rng.normal(0.0, 0.006, size=(len(days), len(codes)))
+    levels = np.exp(np.cumsum(steps, axis=0)) * rng.uniform(0.5, 5.0, size=len(codes))
+    wide = pd.DataFrame(levels, index=days.date, columns=list(codes))
+    if "EUR" in wide.columns:
+        wide["EUR"] = 1.0
+    return wide
+
+
+def long_cache(codes: tuple[str, ...] = DEFAULT_CODES, years: float = 5.0) -> pd.DataFrame:
+    """Long cache frame (date, base, quote, rate=BASE per 1 QUOTE) for all directed pairs."""
+    wide = eur_walk(codes, years)
+    values = wide.to_numpy()
+    n_days, n = values.shape
+    cube = values[:, :, None] / values[:, None, :]  # [day, base, quote]
+    b_idx, q_idx = np.nonzero(~np.eye(n, dtype=bool))
+    codes_arr = np.asarray(codes, dtype=object)
+    return pd.DataFrame(
+        {
+            "date": np.repeat(np.asarray(wide.index, dtype=object), len(b_idx)),
+            "base": np.tile(codes_arr[b_idx], n_days),
+            "quote": np.tile(codes_arr[q_idx], n_days),
+            "rate": cube[:, b_idx, q_idx].reshape(-1),
+        }
+    )
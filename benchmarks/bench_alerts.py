@@ -0,0 +1,80 @@
+"""Watchlist alerts: scoring the pairs that changed vs. checking the rules.
+
+Usage: python benchmarks/bench_alerts.py [--currencies 30] [--years 10] [--rules 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from _synthetic import extra_codes, long_cache
+
+from fxpower.analytics.ranker import split_pair_series
+from fxpower.app.alerts import ALERT_METRICS, AlertEngine, AlertRule
+
+
+def _rules(codes: tuple[str, ...], n: int, seed: int = 0) -> list[AlertRule]:
+    rng = np.random.default_rng(seed)
+    rules = []
+    for i in range(n):
+        base, quote = rng.choice(codes, size=2, replace=False)
+        rules.append(
+            AlertRule(
+                name=f"rule-{i}",
+                metric=str(rng.choice(ALERT_METRICS)),
+                base=str(base),
+                # every tenth rule watches all pairs of its base
+                quote=None if i % 10 == 0 else str(quote),
+                threshold=float(rng.normal(0.0, 0.5)),
+                direction="above" if i % 2 else "below",
+                hysteresis=0.05,
+            )
+        )
+    return rules
+
+
+def _timed(label: str, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    print(f"{label:>28}: {(time.perf_counter() - t0) * 1e3:9.1f} ms")
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=float, default=10.0)
+    parser.add_argument("--rules", type=int, default=5_000)
+    args = parser.parse_args()
+
+    codes = extra_codes(args.currencies)
+    cache = long_cache(codes, years=args.years)
+    series = split_pair_series(cache)
+    engine = AlertEngine(_rules(codes, args.rules))
+    print(f"{len(cache):,} rows, {len(series)} pairs, {args.rules:,} rules")
+
+    changed = _timed("changed pairs (cold)", lambda: engine.changed_pairs(series))
+    scores = _timed(f"score {len(changed)} pairs", lambda: engine.metrics(series, changed))
+    firings = _timed("check rules (first: compile)", lambda: engine.check(scores))
+    _timed("check rules", lambda: engine.check(scores))
+    checks = sum(len(engine.rules_for(p)) for p in changed)
+    print(f"{'':>28}  {checks:,} (rule, pair) checks, {len(firings)} fired on the first")
+
+    # mark every pair as evaluated (what `evaluate` does after scoring), then add
+    # a new day to one pair: only that pair is scored and only its rules run
+    for p, s in series.items():
+        engine.state.watermarks[f"{p[0]}/{p[1]}"] = (str(s.index[-1]), float(s.iloc[-1]))
+    pair = changed[0]
+    s = series[pair]
+    series[pair] = pd.concat(
+        [s, pd.Series([s.iloc[-1] * 1.01], index=[s.index[-1] + timedelta(1)])]
+    )
+    _timed("evaluate after 1 new row", lambda: engine.evaluate(series))
+
+
+if __name__ == "__main__":
+    main()
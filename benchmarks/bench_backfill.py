@@ -0,0 +1,141 @@
+"""Pipelined, chunked backfill vs. one request followed by decode, cross rates and write.
+
+A local HTTP server stands in for Frankfurter: it answers any date range with a
+synthetic EUR series after `--latency-ms` plus the transfer time at `--mbps`.
+Each variant runs in a fresh subprocess so wall time, peak RSS and the peak of
+Arrow's memory pool are comparable.
+
+Usage: python benchmarks/bench_backfill.py [--years 25] [--chunk-days 365] [--workers 1,2,4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from fxpower.app.backfill import BackfillConfig, run_backfill
+from fxpower.app.fetch import FetchPolicy, update_cache_arrow
+from fxpower.providers.frankfurter import (
+    FrankfurterConfig,
+    decode_eur_table,
+    fetch_eur_payload,
+    fetch_eur_table,
+)
+
+SYMBOLS = ["USD", "PLN", "GBP"]
+
+
+def _server(first: date, days: int, latency_s: float, mbps: float) -> ThreadingHTTPServer:
+    levels = np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.004, (days, 3)), axis=0))
+    levels *= [1.1, 4.3, 0.85]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            a, b = (
+                date.fromisoformat(s)
+                for s in re.search(r"/([\d-]+)\.\.([\d-]+)", self.path).groups()
+            )
+            lo, hi = max((a - first).days, 0), min((b - first).days + 1, days)
+            rates = {
+                (first + timedelta(days=i)).isoformat(): dict(zip(SYMBOLS, levels[i], strict=True))
+                for i in range(lo, hi)
+                if (first + timedelta(days=i)).weekday() < 5
+            }
+            body = json.dumps({"base": "EUR", "rates": rates}).encode()
+            time.sleep(latency_s + len(body) / (mbps * 1e6 / 8))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _run(variant: str, args: argparse.Namespace) -> None:
+    end = date(2024, 12, 31)
+    start = end - timedelta(days=int(365 * args.years))
+    server = _server(start, (end - start).days + 1, args.latency_ms / 1e3, args.mbps)
+    cfg = FrankfurterConfig(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.parquet"
+        t0 = time.perf_counter()
+        if variant == "single":
+            policy = FetchPolicy(lookback_days=(end - start).days)
+            table, _ = update_cache_arrow(
+                path, lambda s, e: fetch_eur_table(s, e, SYMBOLS, cfg), today=end, policy=policy
+            )
+            rows = table.num_rows
+        else:
+            config = BackfillConfig(
+                chunk_days=args.chunk_days, memory_mb=args.memory_mb, download_workers=int(variant)
+            )
+            rows = run_backfill(
+                path,
+                lambda s, e: fetch_eur_payload(s, e, SYMBOLS, cfg),
+                decode_eur_table,
+                start,
+                end,
+                config,
+            ).rows
+        elapsed = time.perf_counter() - t0
+    server.shutdown()
+
+    # ru_maxrss is KiB on Linux
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    arrow_mib = pa.default_memory_pool().max_memory() / 2**20
+    label = "single request" if variant == "single" else f"pipeline, {variant} workers"
+    print(
+        f"{label:>20}: {elapsed:6.2f} s | peak RSS {peak_mib:6.1f} MiB"
+        f" | Arrow pool peak {arrow_mib:6.1f} MiB | {rows:,} rows"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=float, default=25.0)
+    parser.add_argument("--chunk-days", type=int, default=365)
+    parser.add_argument("--memory-mb", type=float, default=64.0)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--mbps", type=float, default=4.0, help="Simulated bandwidth (Mbit/s).")
+    parser.add_argument("--variant")
+    args = parser.parse_args()
+
+    if args.variant:
+        _run(args.variant, args)
+        return
+
+    print(
+        f"{args.years:g} years, {args.chunk_days}-day chunks, latency {args.latency_ms:g} ms,"
+        f" {args.mbps:g} Mbit/s"
+    )
+    for variant in ["single", *args.workers.split(",")]:
+        cmd = [sys.executable, __file__, "--variant", variant]
+        cmd += ["--years", str(args.years), "--chunk-days", str(args.chunk_days)]
+        cmd += ["--memory-mb", str(args.memory_mb), "--latency-ms", str(args.latency_ms)]
+        cmd += ["--mbps", str(args.mbps)]
+        subprocess.run(cmd, check=True)
+
+
+if __name__ == "__main__":
+    main()
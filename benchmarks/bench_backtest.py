@@ -0,0 +1,36 @@
+"""Backtest wall time on a synthetic universe.
+
+Usage: python benchmarks/bench_backtest.py [--currencies 30] [--years 25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from _synthetic import extra_codes, long_cache
+
+from fxpower.analytics.backtest import run_backtest
+from fxpower.instrumentation.profiler import Profiler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=float, default=25.0)
+    args = parser.parse_args()
+
+    cache = long_cache(codes=extra_codes(args.currencies), years=args.years)
+    print(f"cache rows: {len(cache):,}")
+
+    profiler = Profiler()
+    t0 = time.perf_counter()
+    with profiler.activate():
+        result = run_backtest(cache)
+    print(f"run_backtest: {time.perf_counter() - t0:.2f} s")
+    print(profiler.format_table())
+    print(result.summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Per-pair scoring on the serial, thread and process executor backends.
+
+Usage: python benchmarks/bench_executor.py [--years 40] [--workers 1,2,4] [--repeat 3]
+
+Scores every base's targets with `rank_targets` on each backend and worker
+count, checks that the output matches the serial run, and prints wall time and
+speed-up. Scaling needs as many free cores as workers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import pandas as pd
+from _synthetic import long_cache
+
+from fxpower.analytics.executor import ExecutorConfig, ShardExecutor
+from fxpower.analytics.ranker import rank_targets
+from fxpower.domain.models import SUPPORTED_CURRENCIES
+
+
+def _run(cache: pd.DataFrame, executor: ShardExecutor | None) -> list[pd.DataFrame]:
+    return [rank_targets(cache, base, executor=executor) for base in SUPPORTED_CURRENCIES]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=float, default=40.0)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cache = long_cache(years=args.years)
+    print(f"{len(cache):,} rows, {args.years:g} years, {os.cpu_count()} CPU(s)")
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        expected = _run(cache, None)
+    serial_s = (time.perf_counter() - t0) / args.repeat
+    print(f"{'serial':>10} workers=1: {serial_s * 1000:8.1f} ms")
+
+    for backend in ("threads", "processes"):
+        for workers in (int(w) for w in args.workers.split(",")):
+            with ShardExecutor(ExecutorConfig(backend, workers)) as executor:
+                _run(cache, executor)  # start the pool outside the timing
+                t0 = time.perf_counter()
+                for _ in range(args.repeat):
+                    got = _run(cache, executor)
+                elapsed = (time.perf_counter() - t0) / args.repeat
+            for a, b in zip(expected, got, strict=True):
+                pd.testing.assert_frame_equal(a, b)
+            print(
+                f"{backend:>10} workers={workers}: {elapsed * 1000:8.1f} ms"
+                f"  ({serial_s / elapsed:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
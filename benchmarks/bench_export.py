@@ -0,0 +1,87 @@
+"""Streaming export vs. loading the whole cache into pandas first.
+
+The cache is written once; each variant then runs in a fresh subprocess so its
+peak RSS growth is comparable.
+
+Usage: python benchmarks/bench_export.py [--currencies 30] [--years 25] [--format csv]
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow as pa
+from _synthetic import extra_codes, long_cache
+
+from fxpower.app.export import EXPORT_FORMATS, export_rates
+from fxpower.storage.cache import CACHE_SCHEMA, read_cache, write_cache_table
+
+
+def _prepare(tmp: Path, currencies: int, years: float) -> None:
+    cache = long_cache(extra_codes(currencies), years=years)
+    table = pa.Table.from_pandas(cache, preserve_index=False).cast(CACHE_SCHEMA)
+    write_cache_table(table, tmp / "cache.parquet")
+    print(f"{len(cache):,} rows, {currencies} currencies, {years:g} years")
+
+
+def _run(variant: str, tmp: Path, fmt: str, batch_rows: int) -> None:
+    cache = tmp / "cache.parquet"
+    out = tmp / f"out.{fmt}"
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    if variant == "stream":
+        rows = export_rates(cache, out, fmt, batch_rows=batch_rows).rows
+    else:
+        df = read_cache(cache)
+        rows = len(df)
+        if fmt == "csv":
+            df.to_csv(out, index=False)
+        elif fmt == "jsonl":
+            df.to_json(out, orient="records", lines=True, date_format="iso")
+        else:
+            df.to_parquet(out)
+    elapsed = time.perf_counter() - t0
+    # ru_maxrss is KiB on Linux
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    growth_mib = peak_mib - rss_before / 1024
+    size_mb = out.stat().st_size / 1e6
+    print(
+        f"{variant:>7}: {elapsed:6.2f} s | peak RSS {peak_mib:7.1f} MiB"
+        f" (growth {growth_mib:6.1f}) | {rows:,} rows, {size_mb:.1f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=float, default=25.0)
+    parser.add_argument("--format", dest="fmt", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--batch-rows", type=int, default=65_536)
+    parser.add_argument("--variant", choices=("prepare", "stream", "pandas"))
+    parser.add_argument("--workdir", type=Path)
+    args = parser.parse_args()
+
+    if args.variant == "prepare":
+        _prepare(args.workdir, args.currencies, args.years)
+        return
+    if args.variant:
+        _run(args.variant, args.workdir, args.fmt, args.batch_rows)
+        return
+
+    # every step in its own process: Linux keeps the peak RSS across exec
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant in ("prepare", "stream", "pandas"):
+            cmd = [sys.executable, __file__, "--variant", variant, "--workdir", tmp]
+            cmd += ["--currencies", str(args.currencies), "--years", str(args.years)]
+            cmd += ["--format", args.fmt, "--batch-rows", str(args.batch_rows)]
+            subprocess.run(cmd, check=True)
+
+
+if __name__ == "__main__":
+    main()
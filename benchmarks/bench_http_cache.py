@@ -0,0 +1,109 @@
+"""Provider fetch time with and without the on-disk response cache.
+
+A local HTTP server stands in for Frankfurter: it serves a synthetic EUR time
+series with an ETag, answers matching If-None-Match with 304, and waits
+`--latency-ms` before every response to mimic a remote API.
+
+Usage: python benchmarks/bench_http_cache.py [--currencies 30] [--years 5] [--latency-ms 150]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+from _synthetic import extra_codes
+
+from fxpower.providers.frankfurter import FrankfurterConfig, fetch_eur_table
+from fxpower.providers.http_cache import ResponseCacheConfig
+
+
+def _payload(codes: list[str], years: float) -> bytes:
+    rng = np.random.default_rng(0)
+    days = [date(2020, 1, 1) + timedelta(days=i) for i in range(int(365 * years))]
+    levels = np.exp(np.cumsum(rng.normal(0.0, 0.004, (len(days), len(codes))), axis=0))
+    rates = {
+        d.isoformat(): dict(zip(codes, map(float, row), strict=True))
+        for d, row in zip(days, levels, strict=True)
+    }
+    return json.dumps({"base": "EUR", "rates": rates}).encode()
+
+
+def _server(body: bytes, latency_s: float) -> ThreadingHTTPServer:
+    etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            time.sleep(latency_s)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=float, default=5.0)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codes = sorted(extra_codes(args.currencies))
+    body = _payload(codes, args.years)
+    server = _server(body, args.latency_ms / 1e3)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    old = (date(2020, 1, 1), date(2024, 12, 31))
+    recent = (date.today() - timedelta(days=30), date.today())
+    print(
+        f"payload {len(body) / 1e6:.1f} MB, {len(codes)} currencies, {args.years:g} years,"
+        f" latency {args.latency_ms:g} ms"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def cfg(mode: str) -> FrankfurterConfig:
+            cache = ResponseCacheConfig(directory=Path(tmp), mode=mode)
+            return FrankfurterConfig(base_url=base_url, cache=cache)
+
+        def timed(label: str, mode: str, dates: tuple[date, date]) -> None:
+            fetch_eur_table(*dates, codes, cfg=cfg(mode))  # populates the cache for "use"
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                fetch_eur_table(*dates, codes, cfg=cfg(mode))
+            ms = (time.perf_counter() - t0) / args.repeat * 1e3
+            print(f"{label:>24}: {ms:8.1f} ms")
+
+        timed("off (network)", "off", old)
+        timed("use, immutable range", "use", old)
+        timed("use, revalidated (304)", "use", recent)
+        timed("replay", "replay", old)
+        stored = sum(p.stat().st_size for p in Path(tmp).glob("*/*.gz"))
+        print(f"{'on disk (gzip)':>24}: {stored / 1e6:8.2f} MB for 2 responses")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
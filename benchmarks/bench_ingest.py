@@ -0,0 +1,96 @@
+"""pandas vs. Arrow ingest path: JSON payload -> cross rates -> merge -> Parquet write.
+
+Inputs are prepared once; each path then runs in a fresh subprocess so its peak
+RSS growth is comparable.
+
+Usage: python benchmarks/bench_ingest.py [--years 5] [--fetch-days 1] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from _synthetic import eur_walk, long_cache
+
+from fxpower.app.fetch import update_cache_arrow, update_cache_from_eur_source
+from fxpower.providers.frankfurter import _eur_payload_to_df, _eur_payload_to_table
+from fxpower.storage.cache import write_cache
+
+TODAY = date(2026, 2, 6)  # last day of the synthetic walk
+
+
+def _prepare(tmp: Path, years: float, fetch_days: int) -> None:
+    full = long_cache(years=max(years, fetch_days / 261 + 1))
+    days = sorted(set(full["date"]))
+    first_new = days[-fetch_days]
+    seed = full[(full["date"] < first_new) & (full["date"] >= days[-int(years * 261)])]
+    write_cache(seed, tmp / "seed.parquet")
+
+    wide = eur_walk(("PLN", "USD", "EUR", "GBP"), years=fetch_days / 261 + 1).tail(fetch_days)
+    rates = {
+        d.isoformat(): {q: float(wide.at[d, q]) for q in ("USD", "PLN", "GBP")} for d in wide.index
+    }
+    (tmp / "payload.json").write_text(json.dumps({"base": "EUR", "rates": rates}))
+
+
+def _run(variant: str, tmp: Path, repeat: int) -> None:
+    body = (tmp / "payload.json").read_bytes()
+    path = tmp / f"{variant}.parquet"
+
+    def fetch(start: date, end: date):
+        payload = json.loads(body)
+        return (
+            _eur_payload_to_df(payload) if variant == "pandas" else _eur_payload_to_table(payload)
+        )
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        shutil.copyfile(tmp / "seed.parquet", path)
+        t0 = time.perf_counter()
+        if variant == "pandas":
+            rows = len(update_cache_from_eur_source(path, fetch, today=TODAY))
+        else:
+            rows = update_cache_arrow(path, fetch, today=TODAY)[0].num_rows
+        best = min(best, time.perf_counter() - t0)
+    # ru_maxrss is KiB on Linux
+    growth_mib = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+    print(
+        f"{variant:>7}: {best * 1000:8.1f} ms | peak RSS growth {growth_mib:6.1f} MiB"
+        f" | {rows:,} rows"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=float, default=5.0)
+    parser.add_argument("--fetch-days", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--variant", choices=("pandas", "arrow"))
+    parser.add_argument("--workdir", type=Path)
+    args = parser.parse_args()
+
+    if args.variant:
+        _run(args.variant, args.workdir, args.repeat)
+        return
+
+    print(f"cache {args.years:g}y, fetching {args.fetch_days} day(s)")
+    with tempfile.TemporaryDirectory() as tmp:
+        _prepare(Path(tmp), args.years, args.fetch_days)
+        for variant in ("pandas", "arrow"):
+            cmd = [sys.executable, __file__, "--variant", variant, "--workdir", tmp]
+            subprocess.run([*cmd, "--repeat", str(args.repeat)], check=True)
+
+
+if __name__ == "__main__":
+    main()
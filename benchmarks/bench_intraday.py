@@ -0,0 +1,84 @@
+"""Intraday ingest throughput: quote files -> daily bars, in rows per second.
+
+Quotes are written once as Parquet and CSV; each format is then resampled in a
+fresh subprocess so peak RSS reflects the chunk size, not the file size.
+
+Usage: python benchmarks/bench_intraday.py [--rows 5000000] [--chunk-rows 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from fxpower.providers.intraday import IntradayConfig, resample_files
+
+PAIRS = (("PLN", "USD"), ("PLN", "EUR"), ("PLN", "GBP"), ("USD", "EUR"))
+
+
+def _prepare(tmp: Path, rows: int, days: int) -> None:
+    rng = np.random.default_rng(3)
+    seconds = np.sort(rng.integers(0, 86_400 * days, rows))
+    pair = rng.integers(0, len(PAIRS), rows)
+    levels = np.array([3.9, 4.3, 5.0, 0.92])[pair]
+    table = pa.table(
+        {
+            "timestamp": pa.array(
+                (np.datetime64("2025-01-01", "s") + seconds).astype("datetime64[ms]")
+            ),
+            "base": pa.array([PAIRS[i][0] for i in range(len(PAIRS))]).take(pair),
+            "quote": pa.array([PAIRS[i][1] for i in range(len(PAIRS))]).take(pair),
+            "rate": levels * np.exp(np.cumsum(rng.normal(0.0, 2e-5, rows))),
+        }
+    )
+    pq.write_table(table, tmp / "ticks.parquet")
+    pacsv.write_csv(table, tmp / "ticks.csv")
+
+
+def _run(path: Path, chunk_rows: int) -> None:
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    bars, rows = resample_files([path], IntradayConfig(chunk_rows=chunk_rows))
+    elapsed = time.perf_counter() - t0
+    # ru_maxrss is KiB on Linux
+    growth_mib = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+    size_mib = path.stat().st_size / 2**20
+    print(
+        f"{path.suffix[1:]:>8}: {rows / elapsed / 1e6:6.2f} M rows/s | {elapsed:6.2f} s"
+        f" | file {size_mib:7.1f} MiB | peak RSS growth {growth_mib:6.1f} MiB"
+        f" | {len(bars):,} bars"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--file", type=Path)
+    args = parser.parse_args()
+
+    if args.file:
+        _run(args.file, args.chunk_rows)
+        return
+
+    print(f"{args.rows:,} quotes over {args.days} days, chunks of {args.chunk_rows:,}")
+    with tempfile.TemporaryDirectory() as tmp:
+        _prepare(Path(tmp), args.rows, args.days)
+        for name in ("ticks.parquet", "ticks.csv"):
+            cmd = [sys.executable, __file__, "--file", str(Path(tmp) / name)]
+            subprocess.run([*cmd, "--chunk-rows", str(args.chunk_rows)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Report and scan on a large cache: full in-memory load vs. out-of-core per-pair arrays.
+
+Each variant runs in a fresh subprocess so peak RSS is comparable. Memory is
+reported above the interpreter's baseline after imports, next to the
+`--memory-mb` ceiling the out-of-core variants run under.
+
+Usage: python benchmarks/bench_outofcore.py [--currencies 30] [--years 25] [--memory-mb 256]
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _synthetic import extra_codes, long_cache
+
+from fxpower.analytics.scan import ScanConfig, scan_universe
+from fxpower.domain.models import Currency
+from fxpower.reporting.report import render_report_html
+from fxpower.storage.cache import read_cache, read_rates, write_cache
+from fxpower.storage.outofcore import OutOfCoreConfig, read_pair_series
+
+VARIANTS = ("report", "report-ooc", "report+scan", "report+scan-ooc", "scan", "scan-ooc")
+
+
+def _peak_mib() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(variant: str, path: Path, memory_mb: float) -> None:
+    baseline = _peak_mib()
+    config = OutOfCoreConfig(memory_mb=memory_mb)
+    scan = ScanConfig(top=20) if "scan" in variant else None
+    t0 = time.perf_counter()
+    if variant.startswith("scan"):
+        cache = (
+            read_pair_series(path, config=config) if variant.endswith("ooc") else read_cache(path)
+        )
+        scan_universe(cache, scan)
+    elif variant.endswith("ooc"):
+        pairs = read_pair_series(path, () if scan else ("PLN",), config)
+        base = {k: s for k, s in pairs.items() if k[0] == "PLN"}
+        universe = pairs if scan else None
+        render_report_html(base, Currency.PLN, scan=scan, universe=universe, chart_points=2_000)
+    else:
+        universe = read_cache(path) if scan else None
+        render_report_html(read_rates(path, base="PLN"), Currency.PLN, scan=scan, universe=universe)
+    elapsed = time.perf_counter() - t0
+    peak = _peak_mib()
+    print(
+        f"{variant:>16}: {elapsed:6.2f} s | peak RSS {peak:7.1f} MiB | +{peak - baseline:7.1f} MiB"
+    )
+
+
+def _write(path: Path, currencies: int, years: float) -> None:
+    cache = long_cache(extra_codes(currencies), years=years)
+    write_cache(cache, path)
+    print(
+        f"{len(cache):,} rows, {currencies} currencies, {years:g} years, "
+        f"{path.stat().st_size / 2**20:.1f} MiB on disk"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=float, default=25.0)
+    parser.add_argument("--memory-mb", type=float, default=256.0)
+    parser.add_argument("--variant", choices=("write", *VARIANTS))
+    parser.add_argument("--path", type=Path)
+    args = parser.parse_args()
+
+    if args.variant == "write":
+        _write(args.path, args.currencies, args.years)
+        return
+    if args.variant:
+        _run(args.variant, args.path, args.memory_mb)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.parquet"
+        # every step runs in its own process: a child inherits its parent's peak RSS
+        for variant in ("write", *VARIANTS):
+            cmd = [sys.executable, __file__, "--variant", variant, "--path", str(path)]
+            cmd += ["--currencies", str(args.currencies), "--years", str(args.years)]
+            subprocess.run(cmd + ["--memory-mb", str(args.memory_mb)], check=True)
+            if variant == "write":
+                print(f"out-of-core ceiling: {args.memory_mb:g} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Global scan: batched scoring of every pair, then top-k selection vs. a full sort.
+
+Selection is also timed on larger synthetic score tables, since with a real
+universe scoring dominates and the sort is already cheap.
+
+Usage: python benchmarks/bench_scan.py [--currencies 30] [--years 5] [--top 20] [--rows 1e5,1e6]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from _synthetic import extra_codes, long_cache
+
+from fxpower.analytics.ranker import split_pair_series
+from fxpower.analytics.scan import SCAN_CRITERIA, ScanConfig, score_pairs, top_pairs
+
+
+def _timed(label: str, fn, repeat: int = 1):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:>32}: {best * 1e3:9.2f} ms")
+    return out
+
+
+def _full_sort(scores: pd.DataFrame, config: ScanConfig) -> pd.DataFrame:
+    column, descending = SCAN_CRITERIA[config.by]
+    ranked = scores.dropna(subset=[column]).sort_values(
+        by=[column, "base", "target"], ascending=[not descending, True, True], kind="mergesort"
+    )
+    return ranked.head(config.top).reset_index(drop=True)
+
+
+def _synthetic_scores(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    codes = np.asarray(extra_codes(64))
+    return pd.DataFrame(
+        {
+            "base": codes[rng.integers(0, len(codes), n)],
+            "target": [f"T{i:07d}" for i in range(n)],
+            **{column: rng.random(n) for column, _ in SCAN_CRITERIA.values()},
+        }
+    )
+
+
+def _compare(scores: pd.DataFrame, config: ScanConfig) -> None:
+    top = _timed(f"top_pairs (k={config.top})", lambda: top_pairs(scores, config), repeat=5)
+    full = _timed("full sort", lambda: _full_sort(scores, config), repeat=5)
+    assert top.drop(columns="rank").equals(full)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=float, default=5.0)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--by", default="overall", choices=list(SCAN_CRITERIA))
+    parser.add_argument("--rows", default="1e5,1e6", help="Synthetic score table sizes.")
+    args = parser.parse_args()
+    config = ScanConfig(top=args.top, by=args.by)
+
+    cache = long_cache(extra_codes(args.currencies), years=args.years)
+    series = split_pair_series(cache)
+    print(f"{len(cache):,} rows, {len(series)} pairs")
+    scores = _timed(f"score {len(series)} pairs (batched)", lambda: score_pairs(series))
+    _compare(scores, config)
+
+    for n in (int(float(r)) for r in args.rows.split(",")):
+        print(f"\n{n:,} synthetic scores")
+        _compare(_synthetic_scores(n), config)
+
+
+if __name__ == "__main__":
+    main()
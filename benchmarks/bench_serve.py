@@ -0,0 +1,73 @@
+"""Latency/throughput of `fxpower serve` vs. a cold read+rank per request.
+
+Usage: python benchmarks/bench_serve.py [--clients 8] [--seconds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from _synthetic import long_cache
+
+from fxpower.analytics.ranker import rank_targets
+from fxpower.app.serve import FxServer, ServeConfig
+from fxpower.domain.models import Currency
+from fxpower.storage.cache import read_cache, write_cache
+
+
+def _load(url: str, seconds: float, latencies: list[float]) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            resp.read()
+        latencies.append(time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--years", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = Path(tmp) / "cache.parquet"
+        write_cache(long_cache(years=args.years), cache_file)
+
+        t0 = time.perf_counter()
+        rank_targets(read_cache(cache_file), base=Currency.PLN)
+        cold_ms = (time.perf_counter() - t0) * 1000.0
+
+        srv = FxServer(cache_file, ServeConfig(port=0))
+        thread = threading.Thread(target=srv.serve_forever, daemon=True)
+        thread.start()
+        host, port = srv.address
+        url = f"http://{host}:{port}/rankings/PLN"
+        _load(url, 0.2, [])  # warm the memo
+
+        per_client: list[list[float]] = [[] for _ in range(args.clients)]
+        workers = [
+            threading.Thread(target=_load, args=(url, args.seconds, lat)) for lat in per_client
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        srv.shutdown()
+
+    lat = sorted(x for chunk in per_client for x in chunk)
+    q = statistics.quantiles(lat, n=100)
+    print(f"cold read_cache+rank_targets: {cold_ms:.1f} ms")
+    print(f"serve /rankings/PLN: {len(lat) / args.seconds:.0f} req/s with {args.clients} clients")
+    print(f"latency p50={q[49] * 1000:.2f} ms p95={q[94] * 1000:.2f} ms p99={q[98] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Parquet vs. SQLite cache backends: full scan, pair scan, single-day append.
+
+Usage: python benchmarks/bench_storage.py [--currencies 12] [--years 10] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+from _synthetic import extra_codes, long_cache
+
+from fxpower.storage.cache import merge_into_cache, read_cache, read_rates, write_cache
+
+
+def _best_ms(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=12)
+    parser.add_argument("--years", type=float, default=10.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codes = extra_codes(args.currencies)
+    full = long_cache(codes, years=args.years)
+    last_day = max(full["date"])
+    history = full[full["date"] < last_day].reset_index(drop=True)
+    new_day = full[full["date"] == last_day].reset_index(drop=True)
+    print(f"{len(full):,} rows, {len(codes)} currencies, {args.years:g} years")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in (".parquet", ".sqlite"):
+            path = Path(tmp) / f"cache{suffix}"
+            write_cache(history, path)
+            existing = read_cache(path)
+
+            def append(path: Path = path, existing: pd.DataFrame = existing) -> None:
+                merge_into_cache(existing, new_day, path)
+
+            append_ms = _best_ms(append, args.repeat)
+            full_ms = _best_ms(lambda path=path: read_cache(path), args.repeat)
+            base_ms = _best_ms(lambda path=path: read_rates(path, base="PLN"), args.repeat)
+            pair_ms = _best_ms(
+                lambda path=path: read_rates(path, base="PLN", quote="USD"), args.repeat
+            )
+            size_mb = path.stat().st_size / 1e6
+            print(
+                f"{suffix[1:]:>8}: full scan {full_ms:8.1f} ms | base scan {base_ms:7.1f} ms"
+                f" | pair scan {pair_ms:7.1f} ms | 1-day append {append_ms:7.1f} ms"
+                f" | {size_mb:.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
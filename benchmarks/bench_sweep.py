@@ -0,0 +1,41 @@
+"""Parameter sweep wall time: memoized intermediates vs. independent backtests.
+
+Usage: python benchmarks/bench_sweep.py [--currencies 10] [--years 10] [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from _synthetic import extra_codes, long_cache
+
+from fxpower.analytics.backtest import BacktestConfig, run_backtest
+from fxpower.analytics.sweep import SweepConfig, SweepGrid, run_sweep
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=10)
+    parser.add_argument("--years", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    cache = long_cache(codes=extra_codes(args.currencies), years=args.years)
+    grid = SweepGrid()
+    print(f"cache rows: {len(cache):,}, grid points: {grid.size}")
+
+    t0 = time.perf_counter()
+    for defaults in grid.window_sets()[:3]:
+        run_backtest(cache, config=BacktestConfig(horizons=(20,)), defaults=defaults)
+    naive = (time.perf_counter() - t0) / 3 * grid.size
+    print(f"independent backtests (extrapolated): {naive:.1f} s")
+
+    for workers in sorted({1, args.workers}):
+        t0 = time.perf_counter()
+        run_sweep(cache, grid=grid, config=SweepConfig(workers=workers))
+        print(f"run_sweep workers={workers}: {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
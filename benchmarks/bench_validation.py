@@ -0,0 +1,72 @@
+"""Ingest validation overhead relative to the local part of a fetch (merge + write).
+
+A daily update validates one new day against its history window; a backfill
+validates every day at once. Network time is not included, so the ratio is an
+upper bound of the overhead on a real fetch.
+
+Usage: python benchmarks/bench_validation.py [--currencies 30] [--years 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from _synthetic import extra_codes, long_cache
+
+from fxpower.app.validation import ValidationPolicy, recent_history, validate_rates
+from fxpower.storage.cache import CACHE_SCHEMA, merge_tables, write_cache_table
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def _case(label: str, existing: pa.Table, incoming: pa.Table, path: Path) -> None:
+    policy = ValidationPolicy()
+    start = pc.min(incoming["date"]).as_py()
+
+    def validate() -> None:
+        validate_rates(incoming, recent_history(existing, start, policy.history_days), policy)
+
+    def merge_and_write() -> None:
+        write_cache_table(merge_tables(existing, incoming), path)
+
+    t_validate = _timed(validate)
+    t_fetch = _timed(merge_and_write)
+    print(
+        f"{label:>8}: {incoming.num_rows:>9,} new rows | validate {t_validate * 1e3:8.1f} ms"
+        f" | merge + write {t_fetch * 1e3:8.1f} ms | overhead {t_validate / t_fetch:6.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--currencies", type=int, default=30)
+    parser.add_argument("--years", type=float, default=5.0)
+    args = parser.parse_args()
+
+    cache = long_cache(extra_codes(args.currencies), years=args.years)
+    table = pa.Table.from_pandas(cache, preserve_index=False).cast(CACHE_SCHEMA)
+    last = pc.max(table["date"])
+    print(f"{table.num_rows:,} rows, {args.currencies} currencies, {args.years:g} years")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.parquet"
+        daily_old = table.filter(pc.less(table["date"], last))
+        daily_new = table.filter(pc.equal(table["date"], last))
+        write_cache_table(daily_old, path)
+        _case("daily", daily_old, daily_new, path)
+
+        path.unlink()
+        _case("backfill", CACHE_SCHEMA.empty_table(), table, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import TypeVar
+
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+from fxpower.analytics.horizons import SCORING_HORIZON_YEARS
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import (
+    DEFAULT_WEIGHTS,
+    ScoreWeights,
+    score_overall_array,
+    score_risk_array,
+    score_trend_array,
+    score_value_array,
+)
+from fxpower.instrumentation.profiler import stage
+
+T = TypeVar("T")
+
+SIGNALS: tuple[str, ...] = ("value_score", "trend_score", "risk_score", "overall_score")
+
+
+@dataclass(frozen=True, slots=True)
+class BacktestConfig:
+    horizons: tuple[int, ...] = (5, 20, 60)  # forward return horizons, in observations
+    signal: str = "overall_score"
+    # observations for percentile/z-score; None => the trailing 5 calendar years, as rank_targets
+    value_window: int | None = None
+    min_history: int = 252  # observations before a day's score is used
+    top_fraction: float = 0.10  # "high score" bucket for hit rates
+
+    def __post_init__(self) -> None:
+        if not self.horizons or min(self.horizons) < 1:
+            raise ValueError("horizons must be one or more integers >= 1")
+        if self.signal not in SIGNALS:
+            raise ValueError(f"Unknown signal '{self.signal}'. Supported: {', '.join(SIGNALS)}")
+        if self.value_window is not None and self.value_window < 1:
+            raise ValueError("value_window must be >= 1")
+        if self.min_history < 1:
+            raise ValueError("min_history must be >= 1")
+        if not 0.0 < self.top_fraction <= 1.0:
+            raise ValueError("top_fraction must be in (0, 1]")
+
+
+@dataclass(frozen=True, slots=True)
+class BacktestResult:
+    summary: pd.DataFrame  # one row per horizon
+    deciles: pd.DataFrame  # index=decile (1=lowest score), columns=horizon
+
+
+def pair_panel(cache: pd.DataFrame) -> pd.DataFrame:
+    """Wide rate panel: index=date (sorted), columns=MultiIndex (base, quote)."""
+    df = cache.loc[:, ["date", "base", "quote", "rate"]].copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df["base"] = df["base"].astype(str)
+    df["quote"] = df["quote"].astype(str)
+    panel = df.pivot(index="date", columns=["base", "quote"], values="rate")
+    return panel.sort_index().sort_index(axis=1).astype("float64")
+
+
+def pair_series_panel(pairs: Mapping[tuple[str, str], pd.Series]) -> pd.DataFrame:
+    """`pair_panel` from per-pair series (as from `split_pair_series`) instead of the long cache."""
+    if not pairs:
+        return pd.DataFrame()
+    columns = pd.MultiIndex.from_tuples(list(pairs), names=["base", "quote"])
+    panel = pd.concat(list(pairs.values()), axis=1, keys=columns)
+    panel.index = pd.DatetimeIndex(pd.to_datetime(panel.index), name="date")
+    return panel.sort_index().sort_index(axis=1).astype("float64")
+
+
+class _TrailingYears(BaseIndexer):
+    """Rolling window over the dates after `years` calendar years before each row's date."""
+
+    def __init__(self, dates: pd.Index, years: int) -> None:
+        super().__init__()
+        index = pd.DatetimeIndex(dates)
+        self.starts = np.searchsorted(index, index - pd.DateOffset(years=years), "right")
+
+    def get_window_bounds(
+        self,
+        num_values: int = 0,
+        min_periods: int | None = None,
+        center: bool | None = None,
+        closed: str | None = None,
+        step: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        end = np.arange(1, num_values + 1, dtype="int64")
+        return self.starts[:num_values].astype("int64"), end
+
+
+class PanelIntermediates:
+    """Memoized building blocks of score panels over one rate panel.
+
+    Returns, rolling SMAs, rolling volatilities, value statistics and forward
+    returns are computed once per window and reused by every caller (e.g. each
+    grid point of a parameter sweep).
+    """
+
+    def __init__(self, panel: pd.DataFrame) -> None:
+        self.panel = panel
+        self._memo: dict[tuple[object, ...], object] = {}
+
+    def _cached(self, key: tuple[object, ...], build: Callable[[], T]) -> T:
+        if key not in self._memo:
+            self._memo[key] = build()
+        return self._memo[key]
+
+    def log_returns(self) -> pd.DataFrame:
+        x = self.panel
+        return self._cached(("log_returns",), lambda: np.log(x / x.shift(1)))
+
+    def momentum(self, window: int) -> pd.DataFrame:
+        x = self.panel
+        return self._cached(("momentum", window), lambda: x / x.shift(window) - 1.0)
+
+    def sma_diff(self, window: int) -> pd.DataFrame:
+        x = self.panel
+
+        def build() -> pd.DataFrame:
+            return x / x.rolling(window=window, min_periods=window).mean() - 1.0
+
+        return self._cached(("sma_diff", window), build)
+
+    def volatility(self, window: int, annualization_factor: int) -> pd.DataFrame:
+        def build() -> pd.DataFrame:
+            r = self.log_returns()
+            sigma = r.rolling(window=window, min_periods=window).std(ddof=0)
+            return sigma * math.sqrt(annualization_factor)
+
+        return self._cached(("volatility", window, annualization_factor), build)
+
+    def value_stats(
+        self, value_window: int | None, min_history: int
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """(percentile, z-score) of each day's rate within its history up to that day.
+
+        The default history is the trailing `SCORING_HORIZON_YEARS` calendar years,
+        the window `rank_targets` scores value on; `value_window` uses that many
+        observations instead.
+        """
+
+        def build() -> tuple[pd.DataFrame, pd.DataFrame]:
+            x = self.panel
+            if value_window is None:
+                window = _TrailingYears(x.index, SCORING_HORIZON_YEARS)
+                hist = x.rolling(window, min_periods=min_history)
+            else:
+                hist = x.rolling(window=value_window, min_periods=min(min_history, value_window))
+            # "percent of values <= today" == max-rank / count
+            pctl = hist.rank(method="max", pct=True)
+            mu = hist.mean()
+            sigma = hist.std(ddof=0)
+            z = ((x - mu) / sigma).where(sigma > 0.0, 0.0).where(mu.notna() & x.notna())
+            return pctl, z
+
+        return self._cached(("value_stats", value_window, min_history), build)
+
+    def forward_returns(self, horizon: int) -> pd.DataFrame:
+        return self._cached(("forward", horizon), lambda: forward_returns(self.panel, horizon))
+
+    def forward_ranks(self, horizon: int, base: str) -> np.ndarray:
+        def build() -> np.ndarray:
+            return row_ranks(self.forward_returns(horizon)[base].to_numpy())
+
+        return self._cached(("forward_ranks", horizon, base), build)
+
+
+def score_panel(
+    panel: pd.DataFrame,
+    defaults: MetricDefaults | None = None,
+    value_window: int | None = None,
+    min_history: int = 1,
+    weights: ScoreWeights | None = None,
+    intermediates: PanelIntermediates | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Per-day metrics and scores for every pair, using only data up to each day.
+
+    Each column is computed like `rank_targets` would on the series truncated at
+    that day, but with rolling/expanding kernels over the whole panel at once.
+    """
+    defaults = defaults or MetricDefaults()
+    weights = weights or DEFAULT_WEIGHTS
+    if weights.risk_drawdown:
+        raise ValueError("The backtest scores risk from volatility only; use risk_drawdown=0")
+    inter = intermediates or PanelIntermediates(panel)
+
+    pctl, z = inter.value_stats(value_window, min_history)
+    mom = inter.momentum(defaults.mom_window)
+    sma_diff = inter.sma_diff(defaults.sma_window)
+    vol = inter.volatility(defaults.vol_window, defaults.annualization_factor)
+
+    def wrap(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=panel.index, columns=panel.columns)
+
+    value = wrap(score_value_array(pctl.to_numpy(), z.to_numpy(), weights))
+    trend = wrap(score_trend_array(mom.to_numpy(), sma_diff.to_numpy(), weights))
+    risk = wrap(score_risk_array(vol.to_numpy()))
+    overall = wrap(
+        score_overall_array(value.to_numpy(), trend.to_numpy(), risk.to_numpy(), weights)
+    )
+
+    return {
+        "percentile": pctl,
+        "zscore": z,
+        "value_score": value,
+        "mom": mom,
+        "sma_diff": sma_diff,
+        "trend_score": trend,
+        "vol": vol,
+        "risk_score": risk,
+        "overall_score": overall,
+    }
+
+
+def forward_returns(panel: pd.DataFrame, horizon: int) -> pd.DataFrame:
+    """Return from holding the quote for `horizon` observations, in base terms."""
+    return panel.shift(-horizon) / panel - 1.0
+
+
+def row_ranks(a: np.ndarray) -> np.ndarray:
+    """Ordinal ranks along axis 1; rows containing NaN become all-NaN."""
+    ranks = np.argsort(np.argsort(a, axis=1), axis=1).astype("float64")
+    ranks[np.isnan(a).any(axis=1)] = np.nan
+    return ranks
+
+
+def rowwise_pearson(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    da = a - a.mean(axis=1, keepdims=True)
+    db = b - b.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (da * db).sum(axis=1) / np.sqrt((da * da).sum(axis=1) * (db * db).sum(axis=1))
+
+
+def _decile_means(score: np.ndarray, fwd: np.ndarray) -> np.ndarray:
+    # quantile edges use selection, not a full sort
+    edges = np.quantile(score, np.linspace(0.1, 0.9, 9))
+    decile = np.searchsorted(edges, score, side="right")
+    sums = np.bincount(decile, weights=fwd, minlength=10)
+    counts = np.bincount(decile, minlength=10)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def run_backtest(
+    cache: pd.DataFrame,
+    config: BacktestConfig | None = None,
+    defaults: MetricDefaults | None = None,
+    weights: ScoreWeights | None = None,
+) -> BacktestResult:
+    """Evaluate whether high-signal days preceded favourable moves.
+
+    Forward return > 0 means the target appreciated against the base, i.e. buying
+    it on that day was favourable. Rank IC is computed per base across its targets
+    for each date, then averaged over all (base, date) cross-sections.
+    """
+    config = config or BacktestConfig()
+
+    with stage("backtest_scores", rows_in=len(cache)) as rec:
+        panel = pair_panel(cache)
+        inter = PanelIntermediates(panel)
+        scores = score_panel(
+            panel,
+            defaults=defaults,
+            value_window=config.value_window,
+            min_history=config.min_history,
+            weights=weights,
+            intermediates=inter,
+        )
+        rec.rows_out = int(panel.size)
+
+    signal = scores[config.signal]
+    if config.signal == "risk_score":
+        signal = -signal  # lower risk is the "good" direction
+
+    with stage("backtest_eval", rows_in=int(panel.size)):
+        return evaluate_signal(signal, inter, config.horizons, config.top_fraction)
+
+
+def evaluate_signal(
+    signal: pd.DataFrame,
+    intermediates: PanelIntermediates,
+    horizons: tuple[int, ...],
+    top_fraction: float = 0.10,
+) -> BacktestResult:
+    """Hit rates, rank IC and decile returns of `signal` (aligned with the panel)."""
+    panel = intermediates.panel
+
+    # per-base cross sections (>= 3 targets) for rank IC; signal ranks are horizon-free
+    bases = [b for b in panel.columns.get_level_values(0).unique() if signal[b].shape[1] >= 3]
+    signal_ranks = {b: row_ranks(signal[b].to_numpy()) for b in bases}
+    s_flat = signal.to_numpy().ravel()
+
+    summary_rows: list[dict[str, object]] = []
+    deciles: dict[int, np.ndarray] = {}
+
+    for h in horizons:
+        f_flat = intermediates.forward_returns(h).to_numpy().ravel()
+        ok = ~(np.isnan(s_flat) | np.isnan(f_flat))
+        s_ok, f_ok = s_flat[ok], f_flat[ok]
+
+        if s_ok.size == 0:
+            summary_rows.append({"horizon": h, "n_obs": 0})
+            continue
+
+        cutoff = np.quantile(s_ok, 1.0 - top_fraction)
+        top = s_ok >= cutoff
+
+        ics = np.concatenate(
+            [rowwise_pearson(signal_ranks[b], intermediates.forward_ranks(h, b)) for b in bases]
+            or [np.array([], dtype="float64")]
+        )
+        ics = ics[np.isfinite(ics)]
+        ic_mean = float(ics.mean()) if ics.size else float("nan")
+        ic_std = float(ics.std(ddof=1)) if ics.size > 1 else float("nan")
+        ic_t = (
+            ic_mean / ic_std * math.sqrt(ics.size)
+            if ics.size > 1 and ic_std > 0.0
+            else float("nan")
+        )
+
+        summary_rows.append(
+            {
+                "horizon": h,
+                "n_obs": int(s_ok.size),
+                "hit_rate_top": float((f_ok[top] > 0.0).mean()),
+                "hit_rate_all": float((f_ok > 0.0).mean()),
+                "mean_fwd_top": float(f_ok[top].mean()),
+                "mean_fwd_all": float(f_ok.mean()),
+                "rank_ic": ic_mean,
+                "rank_ic_t": ic_t,
+            }
+        )
+        deciles[h] = _decile_means(s_ok, f_ok)
+
+    summary = pd.DataFrame(summary_rows)
+    decile_df = pd.DataFrame(deciles, index=pd.RangeIndex(1, 11, name="decile"))
+    return BacktestResult(summary=summary, deciles=decile_df)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from fxpower.analytics.backtest import pair_panel
+
+
+@dataclass(frozen=True, slots=True)
+class RollingCorrelation:
+    """Rolling covariance/correlation of log returns between a base's targets.
+
+    `cov[t, i, j]` and `corr[t, i, j]` cover the `window` returns ending at
+    `dates[t]`; entries are NaN until a pair has `window` common observations.
+    """
+
+    base: str
+    window: int
+    dates: tuple[date, ...]
+    targets: tuple[str, ...]
+    cov: np.ndarray  # [day, target, target]
+    corr: np.ndarray  # [day, target, target]
+
+    def at(self, index: int = -1) -> pd.DataFrame:
+        """Correlation matrix on one day (default: the latest) as a labelled frame."""
+        return pd.DataFrame(self.corr[index], index=self.targets, columns=self.targets)
+
+
+def base_log_returns(cache: pd.DataFrame, base: str) -> pd.DataFrame:
+    """Daily log returns of BASE per 1 target; index=date, columns=target codes."""
+    rows = cache[cache["base"].astype(str) == base]
+    if rows.empty:
+        return pd.DataFrame()
+    return panel_log_returns(pair_panel(rows), base)
+
+
+def panel_log_returns(panel: pd.DataFrame, base: str) -> pd.DataFrame:
+    """`base_log_returns` from a `pair_panel` that may hold other bases as well."""
+    if panel.empty or base not in panel.columns.get_level_values(0):
+        return pd.DataFrame()
+    # days on which only other bases have rates are not days of this base
+    rates = panel[base].dropna(how="all")
+    return np.log(rates / rates.shift(1)).iloc[1:]
+
+
+def rolling_moments(returns: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Rolling (population) covariance and correlation for every day and pair at once.
+
+    Prefix sums of x, x*x' and the pairwise-valid counts give every window's
+    moments as one difference of two prefix entries, so the cost is
+    O(days * targets^2) regardless of `window`. Returns are centred on their
+    full-sample mean first to keep the sum-of-products differences well conditioned.
+    """
+    if window < 2:
+        raise ValueError("window must be >= 2")
+    x = np.asarray(returns, dtype="float64")
+    valid = ~np.isnan(x)
+    x = np.where(valid, x - np.nanmean(np.where(valid, x, np.nan), axis=0), 0.0)
+
+    def windowed(a: np.ndarray) -> np.ndarray:
+        c = np.cumsum(a, axis=0)
+        out = np.full_like(a, np.nan)
+        if len(a) < window:
+            return out
+        out[window - 1] = c[window - 1]
+        out[window:] = c[window:] - c[:-window]
+        return out
+
+    sum_ij = windowed(x[:, :, None] * x[:, None, :])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if valid.all():
+            # common case: every target observed every day, so one count for all pairs
+            mean = windowed(x) / window
+            cov = sum_ij / window - mean[:, :, None] * mean[:, None, :]
+            var = np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0.0)
+            corr = cov / np.sqrt(var[:, :, None] * var[:, None, :])
+        else:
+            # pairwise-complete moments: only days where both i and j are observed
+            v = valid.astype("float64")
+            count = windowed(v[:, :, None] * v[:, None, :])
+            mean_i = windowed(x[:, :, None] * v[:, None, :]) / count
+            var_i = windowed((x * x)[:, :, None] * v[:, None, :]) / count - mean_i * mean_i
+            var_i = np.maximum(var_i, 0.0)
+            cov = sum_ij / count - mean_i * np.swapaxes(mean_i, 1, 2)
+            corr = cov / np.sqrt(var_i * np.swapaxes(var_i, 1, 2))
+            short = count < window
+            cov[short] = np.nan
+            corr[short] = np.nan
+
+    return cov, np.clip(corr, -1.0, 1.0)
+
+
+def rolling_correlation(cache: pd.DataFrame, base: str, window: int = 90) -> RollingCorrelation:
+    """Rolling covariance and correlation matrices of the base's targets' log returns."""
+    return returns_correlation(base_log_returns(cache, base), base, window)
+
+
+def returns_correlation(returns: pd.DataFrame, base: str, window: int = 90) -> RollingCorrelation:
+    """`rolling_correlation` of precomputed `base_log_returns` (or `panel_log_returns`)."""
+    targets = tuple(str(c) for c in returns.columns)
+    if returns.empty:
+        empty = np.empty((0, len(targets), len(targets)))
+        return RollingCorrelation(base, window, (), targets, empty, empty)
+
+    cov, corr = rolling_moments(returns.to_numpy(), window)
+    dates = tuple(pd.Timestamp(d).date() for d in returns.index)
+    return RollingCorrelation(base, window, dates, targets, cov, corr)
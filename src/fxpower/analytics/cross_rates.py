@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from fxpower.domain.models import SUPPORTED_CURRENCIES, Currency
+from fxpower.instrumentation.profiler import stage
 
 
 @dataclass(frozen=True, slots=True)
@@ -33,55 +37,85 @@ def generate_cross_rates_from_eur_series(
     Output columns: date, base, quote, rate
     Where rate = BASE per 1 QUOTE (e.g. PLN per USD).
     """
-    contract = contract or EurSeriesContract()
+    with stage("cross_rates", rows_in=len(eur_series)) as rec:
+        out = _cross_rates(eur_series, contract or EurSeriesContract())
+        rec.rows_out = len(out)
+        return out
 
+
+def _cross_rates(eur_series: pd.DataFrame, contract: EurSeriesContract) -> pd.DataFrame:
     if eur_series.empty:
         return pd.DataFrame(columns=["date", "base", "quote", "rate"])
 
-    df = eur_series.copy()
-    df[contract.date_col] = pd.to_datetime(df[contract.date_col]).dt.date
-    df[contract.quote_col] = df[contract.quote_col].astype("string").str.upper()
-    df[contract.rate_col] = pd.to_numeric(df[contract.rate_col], errors="raise").astype("float64")
-
-    # Pivot to wide: date -> currency -> (currency per 1 EUR)
-    wide = df.pivot(index=contract.date_col, columns=contract.quote_col, values=contract.rate_col)
-
-    # Ensure EUR column exists with value 1.0 (1 EUR = 1 EUR)
-    wide[Currency.EUR.value] = 1.0
-
-    # Ensure we only use supported currencies and all required columns exist
-    for c in SUPPORTED_CURRENCIES:
-        if c.value not in wide.columns:
-            raise ValueError(f"Missing EUR-based rate for currency: {c.value}")
-
-    wide = wide[[c.value for c in SUPPORTED_CURRENCIES]].sort_index()
-
-    rows: list[dict[str, object]] = []
-    currencies = list(SUPPORTED_CURRENCIES)
-
-    for day, series in wide.iterrows():
-        # series[currency] = currency per 1 EUR
-        for base in currencies:
-            for quote in currencies:
-                if base == quote:
-                    continue
-                base_per_eur = float(series[base.value])
-                quote_per_eur = float(series[quote.value])
-                base_per_quote = base_per_eur / quote_per_eur
-                rows.append(
-                    {
-                        "date": day,
-                        "base": base.value,
-                        "quote": quote.value,
-                        "rate": base_per_quote,
-                    }
-                )
-
-    out = pd.DataFrame(rows)
-    out["date"] = pd.to_datetime(out["date"]).dt.date
+    eur = pa.table(
+        {
+            "date": pa.array(pd.to_datetime(eur_series[contract.date_col]).dt.date, pa.date32()),
+            "quote": pa.array(eur_series[contract.quote_col].astype(str), pa.string()),
+            "rate": pa.array(
+                pd.to_numeric(eur_series[contract.rate_col], errors="raise"), pa.float64()
+            ),
+        }
+    )
+    out = _cross_rates_table(eur).to_pandas()
     out["base"] = out["base"].astype("string")
     out["quote"] = out["quote"].astype("string")
-    out["rate"] = out["rate"].astype("float64")
-
-    out = out.sort_values(by=["date", "base", "quote"], kind="mergesort").reset_index(drop=True)
     return out
+
+
+CROSS_RATES_SCHEMA = pa.schema(
+    [
+        ("date", pa.date32()),
+        ("base", pa.string()),
+        ("quote", pa.string()),
+        ("rate", pa.float64()),
+    ]
+)
+
+
+def cross_rates_table(eur: pa.Table) -> pa.Table:
+    """Arrow counterpart of `generate_cross_rates_from_eur_series`.
+
+    `eur` has columns date (date32), quote (string), rate (QUOTE per 1 EUR).
+    Output follows the cache schema, sorted by date, base, quote.
+    """
+    with stage("cross_rates", rows_in=eur.num_rows) as rec:
+        out = _cross_rates_table(eur)
+        rec.rows_out = out.num_rows
+        return out
+
+
+def _cross_rates_table(eur: pa.Table) -> pa.Table:
+    # sorted codes => rows come out ordered by (date, base, quote) with no sort step
+    codes = sorted(c.value for c in SUPPORTED_CURRENCIES)
+    if eur.num_rows == 0:
+        return CROSS_RATES_SCHEMA.empty_table()
+
+    days, day_idx = np.unique(eur["date"].cast(pa.date32()).to_numpy(), return_inverse=True)
+    code_idx = pc.index_in(pc.utf8_upper(eur["quote"]), value_set=pa.array(codes))
+    known = pc.is_valid(code_idx).to_numpy(zero_copy_only=False)
+    rates = eur["rate"].cast(pa.float64()).to_numpy()
+
+    # wide[day, code] = code per 1 EUR
+    wide = np.full((len(days), len(codes)), np.nan)
+    wide[day_idx[known], code_idx.to_numpy(zero_copy_only=False)[known].astype(np.intp)] = rates[
+        known
+    ]
+    wide[:, codes.index(Currency.EUR.value)] = 1.0  # 1 EUR = 1 EUR
+
+    for j, code in enumerate(codes):
+        if np.isnan(wide[:, j]).all():
+            raise ValueError(f"Missing EUR-based rate for currency: {code}")
+
+    # rate = BASE per 1 QUOTE = (BASE per EUR) / (QUOTE per EUR)
+    b, q = np.nonzero(~np.eye(len(codes), dtype=bool))
+    n_days = len(days)
+    code_arr = pa.array(codes)
+    return pa.table(
+        [
+            pa.array(np.repeat(days, len(b)), pa.date32()),
+            code_arr.take(pa.array(np.tile(b, n_days))),
+            code_arr.take(pa.array(np.tile(q, n_days))),
+            pa.array((wide[:, b] / wide[:, q]).reshape(-1)),
+        ],
+        schema=CROSS_RATES_SCHEMA,
+    )
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import warnings
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from fxpower.analytics.horizons import VALUE_HORIZONS_YEARS
+from fxpower.domain.models import Currency
+
+# dd_max_1y, dd_max_3y, ... (dd_max_5y can feed risk_score)
+DRAWDOWN_HORIZON_COLUMNS: tuple[str, ...] = tuple(f"dd_max_{y}y" for y in VALUE_HORIZONS_YEARS)
+
+DRAWDOWN_COLUMNS: tuple[str, ...] = (
+    "dd_current",
+    *DRAWDOWN_HORIZON_COLUMNS,
+    "days_since_peak",
+    "recovery_median_days",
+)
+
+
+def series_panel(series: Mapping[Currency | str, pd.Series]) -> pd.DataFrame:
+    """Align date-indexed rate series into one [date, target] frame.
+
+    Dates a series has no rate for stay NaN (nothing is filled in), so each
+    column holds exactly its own observations.
+    """
+    cols = {(t.value if isinstance(t, Currency) else str(t)): s for t, s in series.items()}
+    panel = pd.concat(cols, axis=1, sort=True).astype("float64")
+    panel.index = pd.to_datetime(panel.index)
+    return panel
+
+
+def drawdown_stats(rates: np.ndarray, dates: np.ndarray) -> dict[str, np.ndarray]:
+    """Drawdown metrics of every column of a [day, pair] rate matrix.
+
+    A drawdown is the rate's fall from its running peak, i.e. the loss of a
+    holder of the target currency measured in base terms. Everything comes from
+    cumulative maxima along the day axis, so the cost is linear in history length
+    (one extra pass per horizon for the windowed maxima). Each pair's horizons
+    end at its own last observation, and NaN rows (other pairs' dates) are
+    skipped, so a column's metrics do not depend on the other columns.
+    """
+    x = np.asarray(rates, dtype="float64")
+    n, k = x.shape
+    cols = np.arange(k)
+    valid = ~np.isnan(x)
+    days = dates.astype("datetime64[D]").astype("int64")
+
+    peak = np.fmax.accumulate(x, axis=0)
+    at_peak = valid & (x >= peak)
+    peak_idx = np.maximum.accumulate(np.where(at_peak, np.arange(n)[:, None], 0), axis=0)
+    last = n - 1 - np.argmax(valid[::-1], axis=0)
+
+    out: dict[str, np.ndarray] = {
+        "dd_current": x[last, cols] / peak[last, cols] - 1.0,
+    }
+    as_of = pd.DatetimeIndex(dates[last])
+    rows = np.arange(n)[:, None]
+    for y in VALUE_HORIZONS_YEARS:
+        cutoff = (as_of - pd.DateOffset(years=y)).to_numpy(dtype="datetime64[ns]")
+        window = np.where(rows >= np.searchsorted(dates, cutoff, "right"), x, np.nan)
+        with np.errstate(invalid="ignore"):
+            dd = window / np.fmax.accumulate(window, axis=0) - 1.0
+        out[f"dd_max_{y}y"] = np.fmin.reduce(dd, axis=0)
+
+    out["days_since_peak"] = (days[last] - days[peak_idx[last, cols]]).astype("float64")
+
+    # a recovery: the previous observation was below its peak and this one is back at it
+    state = pd.DataFrame(np.where(valid, at_peak, np.nan)).ffill().to_numpy()
+    recovered = at_peak[1:] & (state[:-1] == 0.0)
+    duration = days[1:, None] - days[peak_idx[:-1]]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # pairs that never recovered
+        out["recovery_median_days"] = np.nanmedian(np.where(recovered, duration, np.nan), axis=0)
+
+    empty = ~valid.any(axis=0)
+    for values in out.values():
+        values[empty] = np.nan
+    return out
+
+
+def drawdown_table(series: Mapping[Currency | str, pd.Series]) -> pd.DataFrame:
+    """Drawdown metrics for all pairs in one pass; index=target code, columns=DRAWDOWN_COLUMNS."""
+    series = {t: s for t, s in series.items() if not s.empty}
+    if not series:
+        return pd.DataFrame(columns=list(DRAWDOWN_COLUMNS))
+    panel = series_panel(series)
+    stats = drawdown_stats(panel.to_numpy(), panel.index.to_numpy(dtype="datetime64[ns]"))
+    return pd.DataFrame(stats, index=panel.columns).loc[:, list(DRAWDOWN_COLUMNS)]
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import itertools
+import threading
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BACKENDS: tuple[str, ...] = ("serial", "threads", "processes")
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutorConfig:
+    backend: str = "serial"
+    workers: int = 1
+
+    def __post_init__(self) -> None:
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{self.backend}'. Supported: {', '.join(BACKENDS)}")
+        if self.workers < 1:
+            raise ValueError("workers must be >= 1")
+
+
+@dataclass(frozen=True, slots=True)
+class SharedArraysHandle:
+    """Picklable reference to a set of named arrays (shared memory or in-process)."""
+
+    token: str
+    shm_name: str | None  # None => arrays live in this process
+    layout: tuple[tuple[str, str, tuple[int, ...], int], ...]  # name, dtype, shape, offset
+
+
+_LOCAL_ARRAYS: dict[str, dict[str, np.ndarray]] = {}
+# per-process attachments, so every task of a worker maps the block only once
+_ATTACHED: dict[str, tuple[shared_memory.SharedMemory, dict[str, np.ndarray]]] = {}
+_TOKENS = itertools.count()
+_LOCK = threading.Lock()
+
+
+class SharedArrays:
+    """Named numpy arrays handed to workers without pickling them per task.
+
+    With `shared=True` the arrays are copied once into one shared-memory block
+    and workers map it read-only; otherwise tasks in this process read the
+    arrays directly. Use as a context manager: the block is released on exit.
+    """
+
+    def __init__(self, arrays: Mapping[str, np.ndarray], shared: bool) -> None:
+        token = f"{id(self)}-{next(_TOKENS)}"
+        arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+        self._shm: shared_memory.SharedMemory | None = None
+        if not shared:
+            with _LOCK:
+                _LOCAL_ARRAYS[token] = arrays
+            self.handle = SharedArraysHandle(token, None, ())
+            return
+
+        layout = []
+        offset = 0
+        for name, a in arrays.items():
+            offset = -(-offset // 64) * 64  # 64-byte aligned
+            layout.append((name, a.dtype.str, a.shape, offset))
+            offset += a.nbytes
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (_, _, _, start), a in zip(layout, arrays.values(), strict=True):
+            self._shm.buf[start : start + a.nbytes] = a.tobytes()
+        self.handle = SharedArraysHandle(token, self._shm.name, tuple(layout))
+
+    def __enter__(self) -> SharedArraysHandle:
+        return self.handle
+
+    def __exit__(self, *exc: object) -> None:
+        with _LOCK:
+            _LOCAL_ARRAYS.pop(self.handle.token, None)
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+
+
+def attach(handle: SharedArraysHandle) -> dict[str, np.ndarray]:
+    """Arrays behind `handle`, as read-only views (mapped once per process)."""
+    if handle.shm_name is None:
+        return _LOCAL_ARRAYS[handle.token]
+    with _LOCK:
+        found = _ATTACHED.get(handle.shm_name)
+        if found is None:
+            _detach_all()  # blocks of earlier calls are gone; drop their mappings
+            shm = shared_memory.SharedMemory(name=handle.shm_name)
+            arrays = {}
+            for name, dtype, shape, offset in handle.layout:
+                a = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+                a.flags.writeable = False
+                arrays[name] = a
+            found = _ATTACHED[handle.shm_name] = (shm, arrays)
+        return found[1]
+
+
+def _detach_all() -> None:
+    """Close every mapping in `_ATTACHED` (caller holds `_LOCK`)."""
+    while _ATTACHED:
+        _, (shm, arrays) = _ATTACHED.popitem()
+        arrays.clear()
+        try:
+            shm.close()
+        except BufferError:
+            pass  # a caller still holds a view; the mapping goes with its last reference
+
+
+class ShardExecutor:
+    """Run independent per-pair (or per-base) tasks on the configured backend.
+
+    `map` always returns results in input order, so output is identical across
+    backends. Pools are created lazily and shut down by `close()` / the context
+    manager.
+    """
+
+    def __init__(self, config: ExecutorConfig | None = None) -> None:
+        self.config = config or ExecutorConfig()
+        self._pool: Executor | None = None
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.config.backend == "processes" and self.config.workers > 1
+
+    def _executor(self) -> Executor | None:
+        if self.config.backend == "serial" or self.config.workers == 1:
+            return None
+        if self._pool is None:
+            pool_cls = ProcessPoolExecutor if self.uses_processes else ThreadPoolExecutor
+            self._pool = pool_cls(max_workers=self.config.workers)
+        return self._pool
+
+    def map(self, fn: Callable[..., R], *iterables: Iterable[object]) -> list[R]:
+        pool = self._executor()
+        if pool is None:
+            return [fn(*args) for args in zip(*iterables, strict=True)]
+        args = [list(it) for it in iterables]
+        n = len(args[0]) if args else 0
+        # a few tasks per worker keeps them busy without per-item IPC overhead
+        chunksize = max(1, n // (self.config.workers * 4)) if self.uses_processes else 1
+        return list(pool.map(fn, *args, chunksize=chunksize))
+
+    def share(self, arrays: Mapping[str, np.ndarray]) -> SharedArrays:
+        return SharedArrays(arrays, shared=self.uses_processes)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> ShardExecutor:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def shard_bounds(lengths: Sequence[int]) -> list[tuple[int, int]]:
+    """(start, stop) of each shard in the concatenation of arrays with `lengths`."""
+    stops = np.cumsum(lengths)
+    return [(int(stop - n), int(stop)) for n, stop in zip(lengths, stops, strict=True)]
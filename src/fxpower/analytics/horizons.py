@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+VALUE_HORIZONS_YEARS: tuple[int, ...] = (1, 3, 5, 10)
+SCORING_HORIZON_YEARS = 5  # horizon feeding value_score
+
+
+@dataclass(frozen=True, slots=True)
+class HorizonValue:
+    years: int
+    percentile: float
+    zscore: float
+    n_obs: int  # observations inside the window (fewer than the horizon if history is short)
+
+
+def window_starts(dates: np.ndarray, horizons: tuple[int, ...]) -> dict[int, int]:
+    """First index inside each `years` lookback ending at the last date (binary search)."""
+    as_of = pd.Timestamp(dates[-1])
+    return {
+        y: int(np.searchsorted(dates, np.datetime64(as_of - pd.DateOffset(years=y)), "right"))
+        for y in horizons
+    }
+
+
+def value_by_horizon(
+    series: pd.Series,
+    value: float,
+    horizons: tuple[int, ...] = VALUE_HORIZONS_YEARS,
+) -> dict[int, HorizonValue]:
+    """Percentile and z-score of `value` within each trailing calendar-year window.
+
+    `series` is date-indexed and sorted. One argsort and one pair of prefix sums
+    serve every horizon: window mean/std come from cumulative sums, and each
+    horizon's sorted view is the global sort order filtered to its window, so the
+    percentile is a binary search rather than a rescan.
+    """
+    s = pd.to_numeric(series, errors="coerce").astype("float64").dropna()
+    if s.empty:
+        nan = float("nan")
+        return {y: HorizonValue(y, nan, nan, 0) for y in horizons}
+
+    x = s.to_numpy()
+    dates = pd.to_datetime(pd.Index(s.index)).to_numpy(dtype="datetime64[ns]")
+    n = len(x)
+
+    # shift by the last value to limit cancellation in sum-of-squares
+    ref = x[-1]
+    y = x - ref
+    c1 = np.concatenate(([0.0], np.cumsum(y)))
+    c2 = np.concatenate(([0.0], np.cumsum(y * y)))
+
+    order = np.argsort(x, kind="stable")
+    starts = window_starts(dates, horizons)
+
+    out: dict[int, HorizonValue] = {}
+    for years in horizons:
+        i0 = starts[years]
+        m = n - i0
+        s1 = (c1[n] - c1[i0]) / m
+        var = max((c2[n] - c2[i0]) / m - s1 * s1, 0.0)
+        mu = ref + s1
+        sigma = float(np.sqrt(var))
+        # relative tolerance: prefix-sum variance of a constant window is ~0, not exactly 0
+        z = 0.0 if sigma <= 1e-12 * max(abs(mu), 1.0) else (value - mu) / sigma
+
+        view = x[order[order >= i0]]
+        pctl = np.searchsorted(view, value, side="right") / m
+        out[years] = HorizonValue(years, float(pctl), float(z), int(m))
+    return out
@@ -1,19 +1,33 @@
 from __future__ import annotations
 
+import itertools
+from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import date
 
+import numpy as np
 import pandas as pd
 
+from fxpower.analytics.drawdown import DRAWDOWN_COLUMNS, drawdown_table
+from fxpower.analytics.executor import (
+    ShardExecutor,
+    SharedArraysHandle,
+    attach,
+    shard_bounds,
+)
+from fxpower.analytics.horizons import (
+    SCORING_HORIZON_YEARS,
+    VALUE_HORIZONS_YEARS,
+    value_by_horizon,
+)
 from fxpower.analytics.metrics import (
     MetricDefaults,
     momentum,
-    percentile_rank,
     sma,
     volatility,
-    zscore,
 )
 from fxpower.domain.models import Currency, targets_for_base
+from fxpower.instrumentation.profiler import stage
 
 
 @dataclass(frozen=True, slots=True)
@@ -22,9 +36,15 @@ class Scores:
     as_of: date
     rate_today: float
 
-    # value vs history
+    # value vs history (trailing calendar-year windows; 5y feeds value_score)
+    percentile_1y: float
+    zscore_1y: float
+    percentile_3y: float
+    zscore_3y: float
     percentile_5y: float
     zscore_5y: float
+    percentile_10y: float
+    zscore_10y: float
     value_score: float
 
     # trend
@@ -32,55 +52,125 @@ class Scores:
     sma_200_diff: float
     trend_score: float
 
-    # risk
+    # risk (drawdowns: fall of the rate from its running peak, per trailing window)
     vol_90d: float
+    dd_current: float
+    dd_max_1y: float
+    dd_max_3y: float
+    dd_max_5y: float
+    dd_max_10y: float
+    days_since_peak: float
+    recovery_median_days: float
     risk_score: float
 
     # final
     overall_score: float
 
 
-def _clamp(x: float, lo: float = 0.0, hi: float = 1.0) -> float:
-    return max(lo, min(hi, x))
+@dataclass(frozen=True, slots=True)
+class ScoreWeights:
+    """Blend weights of the score components; each pair of sub-weights sums to 1."""
+
+    value_percentile: float = 0.6  # rest goes to the z-score component
+    trend_momentum: float = 0.6  # rest goes to the SMA-distance component
+    overall_value: float = 0.55
+    overall_trend: float = 0.25
+    overall_risk: float = 0.20
+    risk_drawdown: float = 0.0  # share of the risk score from the 5y max drawdown; rest is vol
+
+    def __post_init__(self) -> None:
+        for name in ("value_percentile", "trend_momentum", "risk_drawdown"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be within [0, 1]")
+        total = self.overall_value + self.overall_trend + self.overall_risk
+        if abs(total - 1.0) > 1e-9:
+            raise ValueError(f"Overall weights must sum to 1, got {total:.6f}")
+
+
+DEFAULT_WEIGHTS = ScoreWeights()
 
+ArrayLike = float | np.ndarray
 
-def _score_value(pctl: float, z: float) -> float:
+
+def score_value_array(
+    pctl: ArrayLike, z: ArrayLike, weights: ScoreWeights = DEFAULT_WEIGHTS
+) -> ArrayLike:
+    """Value score for scalars or aligned arrays; NaN inputs give NaN."""
     # Lower percentile => cheaper => higher score
-    if pd.isna(pctl) or pd.isna(z):
-        return float("nan")
-    cheapness = 1.0 - pctl  # 0..1
-    z_component = _clamp((-z) / 3.0, 0.0, 1.0)  # z=-3 => ~1
-    return 0.6 * cheapness + 0.4 * z_component
+    cheapness = 1.0 - np.asarray(pctl, dtype="float64")  # 0..1
+    z_component = np.clip(-np.asarray(z, dtype="float64") / 3.0, 0.0, 1.0)  # z=-3 => ~1
+    w = weights.value_percentile
+    return w * cheapness + (1.0 - w) * z_component
 
 
-def _score_trend(mom: float, sma_diff: float) -> float:
+def score_trend_array(
+    mom: ArrayLike, sma_diff: ArrayLike, weights: ScoreWeights = DEFAULT_WEIGHTS
+) -> ArrayLike:
     # TrendScore: prefer not strongly negative momentum and not far below SMA.
     # Map to [0,1] with gentle clipping.
-    if pd.isna(mom) or pd.isna(sma_diff):
-        return float("nan")
 
     # momentum: -20%..+20% -> 0..1
-    mom_component = _clamp((mom + 0.20) / 0.40, 0.0, 1.0)
+    mom_component = np.clip((np.asarray(mom, dtype="float64") + 0.20) / 0.40, 0.0, 1.0)
 
     # sma_diff: -10%..+10% -> 0..1
-    sma_component = _clamp((sma_diff + 0.10) / 0.20, 0.0, 1.0)
+    sma_component = np.clip((np.asarray(sma_diff, dtype="float64") + 0.10) / 0.20, 0.0, 1.0)
 
-    return 0.6 * mom_component + 0.4 * sma_component
+    w = weights.trend_momentum
+    return w * mom_component + (1.0 - w) * sma_component
 
 
-def _score_risk(vol: float) -> float:
+def score_risk_array(
+    vol: ArrayLike,
+    max_drawdown: ArrayLike | None = None,
+    weights: ScoreWeights = DEFAULT_WEIGHTS,
+) -> ArrayLike:
     # RiskScore: higher volatility => higher risk score.
     # Map typical FX vols (~0.05..0.25) into 0..1.
-    if pd.isna(vol):
-        return float("nan")
-    return _clamp((vol - 0.05) / (0.25 - 0.05), 0.0, 1.0)
+    vol_component = np.clip((np.asarray(vol, dtype="float64") - 0.05) / (0.25 - 0.05), 0.0, 1.0)
+    w = weights.risk_drawdown
+    if w == 0.0:
+        return vol_component
+    if max_drawdown is None:
+        raise ValueError("max_drawdown is required when risk_drawdown > 0")
+
+    # deeper drawdown => riskier: 0%..-30% -> 0..1
+    dd_component = np.clip(-np.asarray(max_drawdown, dtype="float64") / 0.30, 0.0, 1.0)
+    return (1.0 - w) * vol_component + w * dd_component
+
+
+def score_overall_array(
+    value_score: ArrayLike,
+    trend_score: ArrayLike,
+    risk_score: ArrayLike,
+    weights: ScoreWeights = DEFAULT_WEIGHTS,
+) -> ArrayLike:
+    # risk: lower is better => use (1 - risk_score)
+    return (
+        weights.overall_value * np.asarray(value_score, dtype="float64")
+        + weights.overall_trend * np.asarray(trend_score, dtype="float64")
+        + weights.overall_risk * (1.0 - np.asarray(risk_score, dtype="float64"))
+    )
 
 
-def _score_overall(value_score: float, trend_score: float, risk_score: float) -> float:
-    if pd.isna(value_score) or pd.isna(trend_score) or pd.isna(risk_score):
-        return float("nan")
-    # risk: lower is better => use (1 - risk_score)
-    return 0.55 * value_score + 0.25 * trend_score + 0.20 * (1.0 - risk_score)
+def _score_value(pctl: float, z: float, weights: ScoreWeights = DEFAULT_WEIGHTS) -> float:
+    return float(score_value_array(pctl, z, weights))
+
+
+def _score_trend(mom: float, sma_diff: float, weights: ScoreWeights = DEFAULT_WEIGHTS) -> float:
+    return float(score_trend_array(mom, sma_diff, weights))
+
+
+def _score_risk(vol: float, max_drawdown: float, weights: ScoreWeights = DEFAULT_WEIGHTS) -> float:
+    return float(score_risk_array(vol, max_drawdown, weights))
+
+
+def _score_overall(
+    value_score: float,
+    trend_score: float,
+    risk_score: float,
+    weights: ScoreWeights = DEFAULT_WEIGHTS,
+) -> float:
+    return float(score_overall_array(value_score, trend_score, risk_score, weights))
 
 
 def _series_for_pair(cache: pd.DataFrame, base: Currency, quote: Currency) -> pd.Series:
@@ -94,87 +184,213 @@ def _series_for_pair(cache: pd.DataFrame, base: Currency, quote: Currency) -> pd
     return s
 
 
+def split_pair_series(cache: pd.DataFrame) -> dict[tuple[str, str], pd.Series]:
+    """Split a long cache into per-pair rate series in a single groupby pass.
+
+    Keys are (base, quote) codes; each series is date-indexed and sorted by date.
+    """
+    if cache.empty:
+        return {}
+    df = cache.loc[:, ["date", "base", "quote", "rate"]].copy()
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df = df.sort_values(by=["base", "quote", "date"], kind="mergesort")
+
+    out: dict[tuple[str, str], pd.Series] = {}
+    for (base, quote), g in df.groupby(["base", "quote"], sort=False):
+        s = pd.Series(g["rate"].astype("float64").to_numpy(), index=g["date"].to_list())
+        s.name = f"{base}/{quote}"
+        out[(str(base), str(quote))] = s
+    return out
+
+
+# the long cache frame, or its per-pair series (`split_pair_series` / `read_pair_series`)
+CacheInput = pd.DataFrame | Mapping[tuple[str, str], pd.Series]
+
+
+def as_pair_series(cache: CacheInput) -> Mapping[tuple[str, str], pd.Series]:
+    """`split_pair_series(cache)`, or `cache` itself when it already is per-pair series."""
+    return split_pair_series(cache) if isinstance(cache, pd.DataFrame) else cache
+
+
+def cache_rows(cache: CacheInput) -> int:
+    """Rate rows in either form of `CacheInput`."""
+    if isinstance(cache, pd.DataFrame):
+        return len(cache)
+    return sum(len(s) for s in cache.values())
+
+
 def rank_targets(
     cache: pd.DataFrame,
     base: Currency,
     defaults: MetricDefaults | None = None,
+    weights: ScoreWeights | None = None,
+    executor: ShardExecutor | None = None,
 ) -> pd.DataFrame:
     """Return per-target metrics and scores as a dataframe."""
-    defaults = defaults or MetricDefaults()
-    targets = targets_for_base(base)
-
-    rows: list[dict[str, object]] = []
-    for t in targets:
-        s = _series_for_pair(cache, base=base, quote=t)
-        if s.empty:
-            continue
-
-        as_of = s.index[-1]
-        today_rate = float(s.iloc[-1])
+    with stage("ranking", rows_in=len(cache)) as rec:
+        series = {t: _series_for_pair(cache, base=base, quote=t) for t in targets_for_base(base)}
+        out = score_pair_series(series, defaults=defaults, weights=weights, executor=executor)
+        rec.rows_out = len(out)
+        return out
 
-        pctl = percentile_rank(s, today_rate)
-        z = zscore(s, today_rate)
-        value_score = _score_value(pctl, z)
 
-        mom = momentum(s, window=defaults.mom_window)
+# percentile_1y, zscore_1y, percentile_3y, ... (percentile_5y/zscore_5y feed value_score)
+HORIZON_COLUMNS: tuple[str, ...] = tuple(
+    col for y in VALUE_HORIZONS_YEARS for col in (f"percentile_{y}y", f"zscore_{y}y")
+)
 
-        sma_series = sma(s, window=defaults.sma_window)
-        sma_last = (
-            float(sma_series.dropna().iloc[-1]) if not sma_series.dropna().empty else float("nan")
-        )
-        sma_diff = (
-            (today_rate / sma_last - 1.0)
-            if (not pd.isna(sma_last) and sma_last != 0.0)
-            else float("nan")
-        )
+SCORE_COLUMNS: tuple[str, ...] = (
+    "target",
+    "as_of",
+    "rate_today",
+    *HORIZON_COLUMNS,
+    "value_score",
+    "mom_60d",
+    "sma_200_diff",
+    "trend_score",
+    "vol_90d",
+    *DRAWDOWN_COLUMNS,
+    "risk_score",
+    "overall_score",
+)
 
-        trend_score = _score_trend(mom, sma_diff)
 
-        vol = volatility(
-            s, window=defaults.vol_window, annualization_factor=defaults.annualization_factor
-        )
-        risk_score = _score_risk(vol)
-
-        overall = _score_overall(value_score, trend_score, risk_score)
-
-        rows.append(
-            {
-                "target": t.value,
-                "as_of": as_of,
-                "rate_today": today_rate,
-                "percentile_5y": pctl,
-                "zscore_5y": z,
-                "value_score": value_score,
-                "mom_60d": mom,
-                "sma_200_diff": sma_diff,
-                "trend_score": trend_score,
-                "vol_90d": vol,
-                "risk_score": risk_score,
-                "overall_score": overall,
-            }
+def score_pair_series(
+    series: Mapping[Currency | str, pd.Series],
+    defaults: MetricDefaults | None = None,
+    weights: ScoreWeights | None = None,
+    executor: ShardExecutor | None = None,
+) -> pd.DataFrame:
+    """Score targets from pre-split series (BASE per 1 target, date-indexed, sorted).
+
+    Same output as `rank_targets`; lets callers that already hold per-pair series
+    skip re-filtering the long cache. Each pair is scored independently, so with
+    an `executor` every pair is its own task (process workers read the rates
+    from shared memory) and the output is the same on every backend. Targets
+    may also be plain codes, for currencies outside `Currency`.
+    """
+    defaults = defaults or MetricDefaults()
+    weights = weights or DEFAULT_WEIGHTS
+    series = {t: s for t, s in series.items() if not s.empty}
+    targets = list(series)
+    if not targets:
+        # e.g. a warm report rerun with no stale pairs: nothing to hand to workers
+        return pd.DataFrame()
+
+    # every pair's drawdowns in one vectorized pass; rows do not depend on the batch
+    table = drawdown_table(series)
+    drawdowns = [table.loc[str(t)].to_dict() for t in targets]
+
+    if executor is None:
+        rows = [
+            _score_row(t, s, dd, defaults, weights)
+            for (t, s), dd in zip(series.items(), drawdowns, strict=True)
+        ]
+    elif not executor.uses_processes:
+        rows = executor.map(
+            _score_row,
+            targets,
+            series.values(),
+            drawdowns,
+            itertools.repeat(defaults, len(targets)),
+            itertools.repeat(weights, len(targets)),
         )
+    else:
+        arrays = {
+            "dates": np.concatenate(
+                [
+                    pd.to_datetime(pd.Index(s.index)).to_numpy("datetime64[ns]")
+                    for s in series.values()
+                ]
+            ),
+            "rates": np.concatenate([s.to_numpy("float64") for s in series.values()]),
+        }
+        with executor.share(arrays) as handle:
+            rows = executor.map(
+                _score_shard,
+                itertools.repeat(handle, len(targets)),
+                targets,
+                shard_bounds([len(s) for s in series.values()]),
+                drawdowns,
+                itertools.repeat(defaults, len(targets)),
+                itertools.repeat(weights, len(targets)),
+            )
 
     out = pd.DataFrame(rows)
     if out.empty:
         return out
 
     # Stable column order
-    cols = [
-        "target",
-        "as_of",
-        "rate_today",
-        "percentile_5y",
-        "zscore_5y",
-        "value_score",
-        "mom_60d",
-        "sma_200_diff",
-        "trend_score",
-        "vol_90d",
-        "risk_score",
-        "overall_score",
-    ]
-    out = out.loc[:, cols]
-    return out
+    return out.loc[:, list(SCORE_COLUMNS)]
+
+
+def _score_shard(
+    handle: SharedArraysHandle,
+    target: Currency | str,
+    bounds: tuple[int, int],
+    drawdown: Mapping[str, float],
+    defaults: MetricDefaults,
+    weights: ScoreWeights,
+) -> dict[str, object]:
+    """`_score_row` for one pair whose rates sit in shared memory (runs in a worker)."""
+    arrays = attach(handle)
+    start, stop = bounds
+    dates = pd.DatetimeIndex(arrays["dates"][start:stop]).date
+    s = pd.Series(arrays["rates"][start:stop], index=list(dates))
+    return _score_row(target, s, drawdown, defaults, weights)
+
+
+def _score_row(
+    target: Currency | str,
+    s: pd.Series,
+    drawdown: Mapping[str, float],
+    defaults: MetricDefaults,
+    weights: ScoreWeights,
+) -> dict[str, object]:
+    """One score row; `drawdown` is the pair's `drawdown_table` row."""
+    as_of = s.index[-1]
+    today_rate = float(s.iloc[-1])
+
+    by_horizon = value_by_horizon(s, today_rate)
+    scoring = by_horizon[SCORING_HORIZON_YEARS]
+    value_score = _score_value(scoring.percentile, scoring.zscore, weights)
+
+    mom = momentum(s, window=defaults.mom_window)
+
+    sma_series = sma(s, window=defaults.sma_window)
+    sma_last = (
+        float(sma_series.dropna().iloc[-1]) if not sma_series.dropna().empty else float("nan")
+    )
+    sma_diff = (
+        (today_rate / sma_last - 1.0)
+        if (not pd.isna(sma_last) and sma_last != 0.0)
+        else float("nan")
+    )
+
+    trend_score = _score_trend(mom, sma_diff, weights)
+
+    vol = volatility(
+        s, window=defaults.vol_window, annualization_factor=defaults.annualization_factor
+    )
+    risk_score = _score_risk(vol, float(drawdown["dd_max_5y"]), weights)
+
+    overall = _score_overall(value_score, trend_score, risk_score, weights)
+
+    return {
+        "target": str(target),
+        "as_of": as_of,
+        "rate_today": today_rate,
+        **{f"percentile_{y}y": h.percentile for y, h in by_horizon.items()},
+        **{f"zscore_{y}y": h.zscore for y, h in by_horizon.items()},
+        "value_score": value_score,
+        "mom_60d": mom,
+        "sma_200_diff": sma_diff,
+        "trend_score": trend_score,
+        "vol_90d": vol,
+        **{c: float(drawdown[c]) for c in DRAWDOWN_COLUMNS},
+        "risk_score": risk_score,
+        "overall_score": overall,
+    }
 
 
 def build_rankings(scores_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from fxpower.analytics.executor import ShardExecutor
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import (
+    CacheInput,
+    ScoreWeights,
+    as_pair_series,
+    cache_rows,
+    score_pair_series,
+)
+from fxpower.instrumentation.profiler import stage
+
+# criterion -> (score column, True if higher is better); same order as `build_rankings`
+SCAN_CRITERIA: dict[str, tuple[str, bool]] = {
+    "value": ("value_score", True),
+    "trend": ("trend_score", True),
+    "risk": ("risk_score", False),  # lowest risk first
+    "overall": ("overall_score", True),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ScanConfig:
+    top: int = 20
+    by: str = "overall"  # a SCAN_CRITERIA key
+
+    def __post_init__(self) -> None:
+        if self.top < 1:
+            raise ValueError("top must be >= 1")
+        if self.by not in SCAN_CRITERIA:
+            raise ValueError(
+                f"Unknown scan criterion '{self.by}'. Supported: {', '.join(SCAN_CRITERIA)}"
+            )
+
+
+def scan_columns(config: ScanConfig) -> list[str]:
+    """Columns to show for a `top_pairs` result: rank, pair, the criterion and context."""
+    column = SCAN_CRITERIA[config.by][0]
+    columns = ["rank", "base", "target", "as_of", column, "rate_today", "percentile_5y"]
+    return columns + (["overall_score"] if column != "overall_score" else [])
+
+
+def score_pairs(
+    series: Mapping[tuple[str, str], pd.Series],
+    defaults: MetricDefaults | None = None,
+    weights: ScoreWeights | None = None,
+    executor: ShardExecutor | None = None,
+) -> pd.DataFrame:
+    """`score_pair_series` over pairs of any base in one batch.
+
+    Keys are (base, quote) codes; the output has a leading `base` column and
+    `target` holds the quote, one row per non-empty series.
+    """
+    labelled = {f"{b}/{q}": s for (b, q), s in series.items()}
+    out = score_pair_series(labelled, defaults=defaults, weights=weights, executor=executor)
+    if out.empty:
+        return out
+    codes = out["target"].str.split("/", n=1, expand=True)
+    out["target"] = codes[1]
+    out.insert(0, "base", codes[0])
+    return out
+
+
+def top_pairs(scores: pd.DataFrame, config: ScanConfig | None = None) -> pd.DataFrame:
+    """The best `config.top` rows of a `score_pairs` table by one criterion.
+
+    Finds the k-th best score with `np.partition` (linear time) and sorts only
+    the rows at least that good, instead of sorting the whole universe. The result equals
+    a stable full sort by (score, base, target) cut at `top`; pairs whose score
+    is NaN are left out.
+    """
+    config = config or ScanConfig()
+    column, descending = SCAN_CRITERIA[config.by]
+    with stage("scan_select", rows_in=len(scores)) as rec:
+        if scores.empty:
+            rec.rows_out = 0
+            return scores
+        key = scores[column].to_numpy("float64")
+        key = -key if descending else key.copy()
+        valid = np.flatnonzero(~np.isnan(key))
+        k = min(config.top, len(valid))
+        if k == 0:
+            rec.rows_out = 0
+            return scores.iloc[:0]
+
+        # everything tied with the k-th best is a candidate, so ties break on the codes
+        kth = np.partition(key[valid], k - 1)[k - 1]
+        candidates = valid[key[valid] <= kth]
+        picked = scores.iloc[candidates]
+        order = np.lexsort(
+            (picked["target"].to_numpy(str), picked["base"].to_numpy(str), key[candidates])
+        )[:k]
+        out = picked.iloc[order].reset_index(drop=True)
+        out.insert(0, "rank", np.arange(1, k + 1))
+        rec.rows_out = k
+        return out
+
+
+def scan_universe(
+    cache: CacheInput,
+    config: ScanConfig | None = None,
+    defaults: MetricDefaults | None = None,
+    weights: ScoreWeights | None = None,
+    executor: ShardExecutor | None = None,
+) -> pd.DataFrame:
+    """Score every pair in the cache (or its per-pair series) and return the global top."""
+    with stage("scan_scores", rows_in=cache_rows(cache)) as rec:
+        scores = score_pairs(
+            as_pair_series(cache), defaults=defaults, weights=weights, executor=executor
+        )
+        rec.rows_out = len(scores)
+    return top_pairs(scores, config)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from fxpower.analytics.horizons import SCORING_HORIZON_YEARS, window_starts
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import (
+    DEFAULT_WEIGHTS,
+    ScoreWeights,
+    score_overall_array,
+    score_risk_array,
+    score_trend_array,
+    score_value_array,
+)
+from fxpower.domain.models import Currency
+
+DEFAULT_SHIFTS: tuple[float, ...] = tuple(np.round(np.linspace(-0.05, 0.05, 21), 4))
+
+SCENARIO_COLUMNS: tuple[str, ...] = (
+    "target",
+    "shift",
+    "rate",
+    "percentile",
+    "zscore",
+    "value_score",
+    "mom",
+    "sma_diff",
+    "trend_score",
+    "vol",
+    "dd_max_5y",
+    "risk_score",
+    "overall_score",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PairScenario:
+    """Precomputed state for re-scoring one pair with today's rate replaced.
+
+    Everything except today's observation is reduced once to a sorted array and
+    a few sums, so each hypothetical rate costs one binary search plus O(1)
+    arithmetic; at shift 0 the results equal `rank_targets`.
+    """
+
+    target: str
+    rate_today: float
+    ref: float  # centring constant for the moment sums
+    # value: trailing scoring-horizon window without today's observation
+    sorted_others: np.ndarray
+    others_sum: float
+    others_sumsq: float
+    # trend
+    mom_prev: float  # rate `mom_window` observations ago (NaN if history is too short)
+    sma_others_sum: float  # sum of the previous sma_window - 1 rates (NaN if too short)
+    sma_window: int
+    # risk: previous vol_window - 1 log returns and yesterday's rate
+    vol_prev_sum: float
+    vol_prev_sumsq: float
+    vol_window: int
+    rate_yesterday: float
+    annualization_factor: int
+    # drawdown of the scoring-horizon window without today's observation
+    others_peak: float
+    others_max_drawdown: float
+    weights: ScoreWeights
+
+    def evaluate(self, rates: Sequence[float] | np.ndarray) -> pd.DataFrame:
+        """Metrics and scores if today's rate were each of `rates` (one vectorized call)."""
+        r = np.asarray(rates, dtype="float64")
+
+        m = len(self.sorted_others) + 1
+        pctl = (np.searchsorted(self.sorted_others, r, side="right") + 1) / m
+        y = r - self.ref
+        mean = (self.others_sum + y) / m
+        var = np.maximum((self.others_sumsq + y * y) / m - mean * mean, 0.0)
+        sigma = np.sqrt(var)
+        mu = self.ref + mean
+        flat = sigma <= 1e-12 * np.maximum(np.abs(mu), 1.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = np.where(flat, 0.0, (r - mu) / np.where(flat, 1.0, sigma))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mom = r / self.mom_prev - 1.0
+            sma = (self.sma_others_sum + r) / self.sma_window
+            sma_diff = np.where(sma != 0.0, r / sma - 1.0, np.nan)
+
+            ret = np.log(r / self.rate_yesterday)
+            n = self.vol_window
+            rmean = (self.vol_prev_sum + ret) / n
+            rvar = np.maximum((self.vol_prev_sumsq + ret * ret) / n - rmean * rmean, 0.0)
+            vol = np.sqrt(rvar) * math.sqrt(self.annualization_factor)
+
+        dd_today = r / np.fmax(self.others_peak, r) - 1.0
+        max_dd = np.fmin(self.others_max_drawdown, dd_today)
+
+        value = score_value_array(pctl, z, self.weights)
+        trend = score_trend_array(mom, sma_diff, self.weights)
+        risk = score_risk_array(vol, max_dd, self.weights)
+        overall = score_overall_array(value, trend, risk, self.weights)
+
+        return pd.DataFrame(
+            {
+                "target": self.target,
+                "shift": r / self.rate_today - 1.0,
+                "rate": r,
+                "percentile": pctl,
+                "zscore": z,
+                "value_score": value,
+                "mom": mom,
+                "sma_diff": sma_diff,
+                "trend_score": trend,
+                "vol": vol,
+                "dd_max_5y": max_dd,
+                "risk_score": risk,
+                "overall_score": overall,
+            }
+        )
+
+    def evaluate_shifts(self, shifts: Sequence[float] | np.ndarray) -> pd.DataFrame:
+        """Same as `evaluate` for relative moves of today's rate (0.01 = +1%)."""
+        return self.evaluate(self.rate_today * (1.0 + np.asarray(shifts, dtype="float64")))
+
+
+def build_pair_scenario(
+    target: Currency | str,
+    series: pd.Series,
+    defaults: MetricDefaults | None = None,
+    weights: ScoreWeights | None = None,
+) -> PairScenario:
+    """Reduce a date-indexed, sorted rate series to a `PairScenario`."""
+    defaults = defaults or MetricDefaults()
+    weights = weights or DEFAULT_WEIGHTS
+    s = pd.to_numeric(series, errors="coerce").astype("float64").dropna()
+    if s.empty:
+        raise ValueError(f"No history for target {target}")
+
+    x = s.to_numpy()
+    ref = float(x[-1])
+    dates = pd.to_datetime(pd.Index(s.index)).to_numpy(dtype="datetime64[ns]")
+    i0 = window_starts(dates, (SCORING_HORIZON_YEARS,))[SCORING_HORIZON_YEARS]
+    others = x[i0:-1]
+    y = others - ref
+
+    nan = float("nan")
+    w_mom = defaults.mom_window
+    mom_prev = float(x[-(w_mom + 1)]) if len(x) > w_mom else nan
+    w_sma = defaults.sma_window
+    sma_others_sum = float(x[-w_sma:-1].sum()) if len(x) >= w_sma else nan
+
+    w_vol = defaults.vol_window
+    returns = np.log(x[1:] / x[:-1])
+    if len(returns) >= w_vol:
+        prev = returns[-w_vol:-1]
+        vol_sum, vol_sumsq = float(prev.sum()), float((prev * prev).sum())
+    else:
+        vol_sum = vol_sumsq = nan
+    rate_yesterday = float(x[-2]) if len(x) >= 2 else nan
+    if len(others):
+        running_peak = np.maximum.accumulate(others)
+        others_peak = float(running_peak[-1])
+        others_max_drawdown = float((others / running_peak - 1.0).min())
+    else:
+        others_peak = others_max_drawdown = nan
+
+    return PairScenario(
+        target=target.value if isinstance(target, Currency) else str(target),
+        rate_today=ref,
+        ref=ref,
+        sorted_others=np.sort(others),
+        others_sum=float(y.sum()),
+        others_sumsq=float((y * y).sum()),
+        mom_prev=mom_prev,
+        sma_others_sum=sma_others_sum,
+        sma_window=w_sma,
+        vol_prev_sum=vol_sum,
+        vol_prev_sumsq=vol_sumsq,
+        vol_window=w_vol,
+        rate_yesterday=rate_yesterday,
+        annualization_factor=defaults.annualization_factor,
+        others_peak=others_peak,
+        others_max_drawdown=others_max_drawdown,
+        weights=weights,
+    )
+
+
+def sensitivity_table(
+    series: Mapping[Currency, pd.Series],
+    shifts: Sequence[float] = DEFAULT_SHIFTS,
+    defaults: MetricDefaults | None = None,
+    weights: ScoreWeights | None = None,
+) -> pd.DataFrame:
+    """Scores of every target for each relative move of today's rate (long format)."""
+    frames = [
+        build_pair_scenario(t, s, defaults, weights).evaluate_shifts(shifts)
+        for t, s in series.items()
+        if not s.empty
+    ]
+    if not frames:
+        return pd.DataFrame(columns=list(SCENARIO_COLUMNS))
+    return pd.concat(frames, ignore_index=True).loc[:, list(SCENARIO_COLUMNS)]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from fxpower.analytics.backtest import pair_panel
+from fxpower.analytics.metrics import MetricDefaults
+
+STRENGTH_COLUMNS: tuple[str, ...] = (
+    "currency",
+    "as_of",
+    "strength_index",
+    "strength_mom",
+    "strength_1y",
+    "strength_sma_diff",
+    "rank",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RateCube:
+    dates: tuple[date, ...]
+    codes: tuple[str, ...]
+    rates: np.ndarray  # [day, base, quote] = BASE per 1 QUOTE; NaN where unknown
+
+
+@dataclass(frozen=True, slots=True)
+class StrengthResult:
+    codes: tuple[str, ...]
+    index: pd.DataFrame  # index=date, columns=codes; 100 on the first day
+    table: pd.DataFrame  # latest day, one row per currency, strongest first
+
+
+def rate_cube(cache: pd.DataFrame) -> RateCube:
+    """Day x base x quote cube of the long cache.
+
+    Pairs missing from the cache are filled by triangulating through the
+    best-covered base (rate[b, q] = rate[a, q] / rate[a, b]), so a cache holding
+    only one base's rows still yields the full cube.
+    """
+    return panel_rate_cube(pair_panel(cache))
+
+
+def panel_rate_cube(panel: pd.DataFrame) -> RateCube:
+    """`rate_cube` of a `pair_panel` (or `pair_series_panel`)."""
+    codes = tuple(
+        sorted(set(panel.columns.get_level_values(0)) | set(panel.columns.get_level_values(1)))
+    )
+    n = len(codes)
+    full = pd.MultiIndex.from_product([codes, codes])
+    rates = panel.reindex(columns=full).to_numpy().reshape(len(panel), n, n)
+
+    if np.isnan(rates[:, ~np.eye(n, dtype=bool)]).any():
+        anchor = int(np.argmax((~np.isnan(rates)).sum(axis=(0, 2))))
+        per_code = rates[:, anchor, :].copy()  # anchor per 1 code
+        per_code[:, anchor] = 1.0
+        implied = per_code[:, None, :] / per_code[:, :, None]
+        rates = np.where(np.isnan(rates), implied, rates)
+
+    rates[:, np.arange(n), np.arange(n)] = np.nan
+    dates = tuple(pd.Timestamp(d).date() for d in panel.index)
+    return RateCube(dates, codes, rates)
+
+
+def strength_returns(cube: RateCube) -> np.ndarray:
+    """Daily log return of each currency against the average of all others: [day-1, code]."""
+    # rate[b, c] = BASE b per 1 c: it rises when c strengthens against b
+    dlog = np.diff(np.log(cube.rates), axis=0)
+    with np.errstate(invalid="ignore"):
+        counts = (~np.isnan(dlog)).sum(axis=1)
+        total = np.nansum(dlog, axis=1)
+    return np.where(counts > 0, total / np.maximum(counts, 1), np.nan)
+
+
+def currency_strength(
+    cache: pd.DataFrame,
+    defaults: MetricDefaults | None = None,
+    year_window: int = 252,
+) -> StrengthResult:
+    """Strength of every currency against all others, from one pass over the cube.
+
+    The strength index compounds each currency's average daily log return versus
+    the rest of the universe (100 on the first day). Momentum uses the ranker's
+    momentum window and the SMA distance its SMA window.
+    """
+    if cache.empty:
+        return panel_strength(pd.DataFrame(), defaults, year_window)
+    return panel_strength(pair_panel(cache), defaults, year_window)
+
+
+def panel_strength(
+    panel: pd.DataFrame,
+    defaults: MetricDefaults | None = None,
+    year_window: int = 252,
+) -> StrengthResult:
+    """`currency_strength` of a `pair_panel` (or `pair_series_panel`)."""
+    defaults = defaults or MetricDefaults()
+    if panel.empty:
+        empty = pd.DataFrame(columns=list(STRENGTH_COLUMNS))
+        return StrengthResult((), pd.DataFrame(), empty)
+
+    cube = panel_rate_cube(panel)
+    r = np.nan_to_num(strength_returns(cube), nan=0.0)
+    log_index = np.vstack([np.zeros((1, len(cube.codes))), np.cumsum(r, axis=0)])
+    index = pd.DataFrame(
+        100.0 * np.exp(log_index), index=pd.Index(cube.dates, name="date"), columns=cube.codes
+    )
+
+    def change(window: int) -> np.ndarray:
+        if len(index) <= window:
+            return np.full(len(cube.codes), np.nan)
+        return np.exp(log_index[-1] - log_index[-1 - window]) - 1.0
+
+    last = index.iloc[-1].to_numpy()
+    w = defaults.sma_window
+    sma_last = index.iloc[-w:].mean().to_numpy() if len(index) >= w else np.nan
+    table = pd.DataFrame(
+        {
+            "currency": cube.codes,
+            "as_of": cube.dates[-1],
+            "strength_index": last,
+            "strength_mom": change(defaults.mom_window),
+            "strength_1y": change(year_window),
+            "strength_sma_diff": last / sma_last - 1.0,
+        }
+    )
+    table = table.sort_values(
+        by=["strength_mom", "currency"],
+        ascending=[False, True],
+        kind="mergesort",
+        na_position="last",
+    ).reset_index(drop=True)
+    table["rank"] = np.arange(1, len(table) + 1)
+    return StrengthResult(cube.codes, index, table.loc[:, list(STRENGTH_COLUMNS)])
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from fxpower.analytics.backtest import (
+    SIGNALS,
+    PanelIntermediates,
+    evaluate_signal,
+    pair_panel,
+    row_ranks,
+    rowwise_pearson,
+    score_panel,
+)
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import DEFAULT_WEIGHTS, ScoreWeights
+from fxpower.instrumentation.profiler import stage
+
+
+@dataclass(frozen=True, slots=True)
+class SweepGrid:
+    vol_windows: tuple[int, ...] = (60, 90, 120)
+    mom_windows: tuple[int, ...] = (20, 60, 120)
+    sma_windows: tuple[int, ...] = (100, 200)
+    weights: tuple[ScoreWeights, ...] = (DEFAULT_WEIGHTS,)
+
+    def __post_init__(self) -> None:
+        for name in ("vol_windows", "mom_windows", "sma_windows"):
+            windows = getattr(self, name)
+            if not windows or min(windows) < 1:
+                raise ValueError(f"{name} must be one or more integers >= 1")
+        if not self.weights:
+            raise ValueError("weights must not be empty")
+
+    def window_sets(self) -> list[MetricDefaults]:
+        return [
+            MetricDefaults(vol_window=v, mom_window=m, sma_window=s)
+            for v, m, s in itertools.product(self.vol_windows, self.mom_windows, self.sma_windows)
+        ]
+
+    @property
+    def size(self) -> int:
+        return len(self.window_sets()) * len(self.weights)
+
+
+@dataclass(frozen=True, slots=True)
+class SweepConfig:
+    horizons: tuple[int, ...] = (20,)
+    signal: str = "overall_score"
+    value_window: int | None = None
+    min_history: int = 252
+    top_fraction: float = 0.10
+    workers: int = 1  # 1 => evaluate in-process
+
+    def __post_init__(self) -> None:
+        if not self.horizons or min(self.horizons) < 1:
+            raise ValueError("horizons must be one or more integers >= 1")
+        if self.signal not in SIGNALS:
+            raise ValueError(f"Unknown signal '{self.signal}'. Supported: {', '.join(SIGNALS)}")
+        if self.value_window is not None and self.value_window < 1:
+            raise ValueError("value_window must be >= 1")
+        if self.min_history < 1:
+            raise ValueError("min_history must be >= 1")
+        if not 0.0 < self.top_fraction <= 1.0:
+            raise ValueError("top_fraction must be in (0, 1]")
+        if self.workers < 1:
+            raise ValueError("workers must be >= 1")
+
+
+def _score_stability(signal: pd.DataFrame) -> tuple[float, float]:
+    """(mean absolute day-over-day score change, mean rank correlation between days)."""
+    values = signal.to_numpy()
+    turnover = float(np.nanmean(np.abs(np.diff(values, axis=0)))) if len(values) > 1 else np.nan
+
+    bases = signal.columns.get_level_values(0).unique()
+    corrs = []
+    for b in bases:
+        ranks = row_ranks(signal[b].to_numpy())
+        if ranks.shape[1] >= 3 and len(ranks) > 1:
+            corrs.append(rowwise_pearson(ranks[:-1], ranks[1:]))
+    flat = np.concatenate(corrs) if corrs else np.array([], dtype="float64")
+    flat = flat[np.isfinite(flat)]
+    return turnover, float(flat.mean()) if flat.size else float("nan")
+
+
+def _evaluate_windows(
+    inter: PanelIntermediates,
+    defaults: MetricDefaults,
+    weights_list: tuple[ScoreWeights, ...],
+    config: SweepConfig,
+) -> list[dict[str, object]]:
+    rows: list[dict[str, object]] = []
+    for weights in weights_list:
+        scores = score_panel(
+            inter.panel,
+            defaults=defaults,
+            value_window=config.value_window,
+            min_history=config.min_history,
+            weights=weights,
+            intermediates=inter,
+        )
+        signal = scores[config.signal]
+        if config.signal == "risk_score":
+            signal = -signal
+
+        result = evaluate_signal(signal, inter, config.horizons, config.top_fraction)
+        turnover, rank_stability = _score_stability(signal)
+
+        row: dict[str, object] = {
+            "vol_window": defaults.vol_window,
+            "mom_window": defaults.mom_window,
+            "sma_window": defaults.sma_window,
+            **asdict(weights),
+        }
+        for rec in result.summary.to_dict(orient="records"):
+            h = rec["horizon"]
+            row[f"rank_ic_{h}"] = rec.get("rank_ic", float("nan"))
+            row[f"hit_rate_top_{h}"] = rec.get("hit_rate_top", float("nan"))
+        row["score_turnover"] = turnover
+        row["rank_stability"] = rank_stability
+        rows.append(row)
+    return rows
+
+
+# Per-process intermediates: built once per worker, shared by all its tasks.
+_WORKER_INTER: PanelIntermediates | None = None
+
+
+def _init_worker(panel: pd.DataFrame) -> None:
+    global _WORKER_INTER
+    _WORKER_INTER = PanelIntermediates(panel)
+
+
+def _evaluate_in_worker(
+    defaults: MetricDefaults,
+    weights_list: tuple[ScoreWeights, ...],
+    config: SweepConfig,
+) -> list[dict[str, object]]:
+    assert _WORKER_INTER is not None, "worker not initialized"
+    return _evaluate_windows(_WORKER_INTER, defaults, weights_list, config)
+
+
+def run_sweep(
+    cache: pd.DataFrame,
+    grid: SweepGrid | None = None,
+    config: SweepConfig | None = None,
+) -> pd.DataFrame:
+    """Evaluate every (windows, weights) grid point; one row per point.
+
+    Grid points sharing a window set run in the same task, so rolling statistics
+    are computed once per window and only the cheap blending is repeated.
+    Rows are sorted by rank IC of the first horizon (best first).
+    """
+    grid = grid or SweepGrid()
+    config = config or SweepConfig()
+
+    with stage("sweep", rows_in=len(cache)) as rec:
+        panel = pair_panel(cache)
+        window_sets = grid.window_sets()
+
+        if config.workers <= 1:
+            inter = PanelIntermediates(panel)
+            chunks = [_evaluate_windows(inter, d, grid.weights, config) for d in window_sets]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=config.workers,
+                initializer=_init_worker,
+                initargs=(panel,),
+            ) as pool:
+                chunks = list(
+                    pool.map(
+                        _evaluate_in_worker,
+                        window_sets,
+                        itertools.repeat(grid.weights),
+                        itertools.repeat(config),
+                    )
+                )
+
+        out = pd.DataFrame([row for chunk in chunks for row in chunk])
+        rec.rows_out = len(out)
+
+    sort_col = f"rank_ic_{config.horizons[0]}"
+    return out.sort_values(by=sort_col, ascending=False, kind="mergesort").reset_index(drop=True)
@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import json
+import sys
+import tomllib
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import (
+    SCORE_COLUMNS,
+    ScoreWeights,
+    score_pair_series,
+    split_pair_series,
+)
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage.atomic import atomic_write, ensure_parent_dir
+from fxpower.storage.cache import read_rates
+
+ALERT_METRICS: tuple[str, ...] = tuple(c for c in SCORE_COLUMNS if c not in ("target", "as_of"))
+DIRECTIONS: tuple[str, ...] = ("above", "below")
+
+PairCodes = tuple[str, str]
+
+
+def _code(value: str) -> str:
+    code = value.strip().upper()
+    if len(code) != 3 or not code.isalpha():
+        raise ValueError(f"Invalid currency code '{value}'")
+    return code
+
+
+def parse_pair(value: str) -> PairCodes:
+    """'pln/usd' -> ('PLN', 'USD')."""
+    base, sep, quote = value.partition("/")
+    if not sep:
+        raise ValueError(f"Invalid pair '{value}', expected BASE/QUOTE")
+    return _code(base), _code(quote)
+
+
+@dataclass(frozen=True, slots=True)
+class AlertRule:
+    """Fire when `metric` of a pair goes `direction` of `threshold`.
+
+    `quote=None` watches every pair of `base`. After firing, a rule stays quiet
+    for that pair until the metric is back on the other side of the threshold by
+    more than `hysteresis` (so a value hovering at the threshold fires once).
+    """
+
+    name: str
+    metric: str
+    base: str
+    threshold: float
+    direction: str = "below"
+    quote: str | None = None
+    hysteresis: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.name:
+            raise ValueError("Alert rule needs a name")
+        if self.metric not in ALERT_METRICS:
+            raise ValueError(
+                f"Unknown metric '{self.metric}' in rule '{self.name}'. "
+                f"Supported: {', '.join(ALERT_METRICS)}"
+            )
+        if self.direction not in DIRECTIONS:
+            raise ValueError(
+                f"Unknown direction '{self.direction}' in rule '{self.name}'; use above or below"
+            )
+        if not np.isfinite(self.threshold):
+            raise ValueError(f"threshold of rule '{self.name}' must be finite")
+        if not self.hysteresis >= 0:
+            raise ValueError(f"hysteresis of rule '{self.name}' must be >= 0")
+        if self.quote is not None and self.quote == self.base:
+            raise ValueError(f"Rule '{self.name}' watches a pair with base == quote")
+
+
+def load_rules(path: Path) -> list[AlertRule]:
+    """Watchlist rules from a TOML file of `[[rule]]` tables.
+
+    Each table has `metric`, `threshold`, optional `direction` ("below") and
+    `hysteresis` (0), and either `pair = "PLN/USD"` or `base = "PLN"` (all
+    pairs of that base). `name` defaults to a description of the rule.
+    """
+    try:
+        doc = tomllib.loads(path.read_text())
+    except (OSError, tomllib.TOMLDecodeError) as exc:
+        raise ValueError(f"Cannot read alert rules from {path}: {exc}") from exc
+
+    rules: list[AlertRule] = []
+    for i, entry in enumerate(doc.get("rule", []), start=1):
+        entry = dict(entry)
+        pair = entry.pop("pair", None)
+        base = entry.pop("base", None)
+        if (pair is None) == (base is None):
+            raise ValueError(f"Rule #{i} in {path} needs exactly one of 'pair' or 'base'")
+        if pair is not None:
+            entry["base"], entry["quote"] = parse_pair(str(pair))
+        else:
+            entry["base"] = _code(str(base))
+        if "metric" not in entry or "threshold" not in entry:
+            raise ValueError(f"Rule #{i} in {path} needs 'metric' and 'threshold'")
+        entry["threshold"] = float(entry["threshold"])
+        entry["hysteresis"] = float(entry.get("hysteresis", 0.0))
+        if "name" not in entry:
+            target = entry["quote"] if entry.get("quote") else "*"
+            direction = entry.get("direction", "below")
+            entry["name"] = (
+                f"{entry['base']}/{target} {entry['metric']} {direction} {entry['threshold']:g}"
+            )
+        try:
+            rules.append(AlertRule(**entry))
+        except TypeError as exc:
+            raise ValueError(f"Rule #{i} in {path}: {exc}") from exc
+
+    names = [r.name for r in rules]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate alert rule names: {', '.join(duplicates)}")
+    return rules
+
+
+@dataclass(frozen=True, slots=True)
+class AlertFiring:
+    rule: str
+    base: str
+    quote: str
+    metric: str
+    direction: str
+    threshold: float
+    value: float
+    as_of: date
+    fired_at: datetime
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "rule": self.rule,
+            "pair": f"{self.base}/{self.quote}",
+            "metric": self.metric,
+            "direction": self.direction,
+            "threshold": self.threshold,
+            "value": self.value,
+            "as_of": self.as_of.isoformat(),
+            "fired_at": self.fired_at.isoformat(),
+        }
+
+
+@dataclass(slots=True)
+class AlertState:
+    """What survives between runs: per-pair watermarks and the rules that are not armed.
+
+    A watermark is the last (date, rate) of a pair when it was last evaluated;
+    a pair is only re-evaluated when its watermark moves. `fired` holds
+    "rule|BASE/QUOTE" keys of rules waiting to re-arm.
+    """
+
+    watermarks: dict[str, tuple[str, float]] = field(default_factory=dict)
+    fired: set[str] = field(default_factory=set)
+
+    @classmethod
+    def load(cls, path: Path) -> AlertState:
+        if not path.exists():
+            return cls()
+        try:
+            doc = json.loads(path.read_text())
+        except (OSError, ValueError) as exc:
+            raise ValueError(f"Cannot read alert state from {path}: {exc}") from exc
+        return cls(
+            watermarks={k: (str(d), float(r)) for k, (d, r) in doc.get("watermarks", {}).items()},
+            fired=set(doc.get("fired", [])),
+        )
+
+    def save(self, path: Path) -> None:
+        ensure_parent_dir(path)
+        doc = {
+            "watermarks": {k: list(v) for k, v in sorted(self.watermarks.items())},
+            "fired": sorted(self.fired),
+        }
+        atomic_write(path, lambda tmp: tmp.write_text(json.dumps(doc, indent=1) + "\n"))
+
+
+def _pair_key(pair: PairCodes) -> str:
+    return f"{pair[0]}/{pair[1]}"
+
+
+def _watermark(s: pd.Series) -> tuple[str, float]:
+    return str(s.index[-1]), float(s.iloc[-1])
+
+
+class AlertEngine:
+    """Evaluates a watchlist against per-pair rate series, incrementally.
+
+    Rules are compiled once into flat numpy arrays over every (rule, pair)
+    combination, so a check is a handful of vectorized comparisons however
+    many rules there are; scoring the pairs that changed is the only
+    per-pair work.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[AlertRule],
+        state: AlertState | None = None,
+        defaults: MetricDefaults | None = None,
+        weights: ScoreWeights | None = None,
+    ) -> None:
+        self.rules = tuple(rules)
+        self.state = state or AlertState()
+        self.defaults = defaults
+        self.weights = weights
+
+        metric_col = {m: i for i, m in enumerate(ALERT_METRICS)}
+        self._metric = np.array([metric_col[r.metric] for r in self.rules], dtype=np.int64)
+        self._threshold = np.array([r.threshold for r in self.rules], dtype="float64")
+        # +1: fire above the threshold, -1: fire below it
+        self._sign = np.array([1.0 if r.direction == "above" else -1.0 for r in self.rules])
+        self._hysteresis = np.array([r.hysteresis for r in self.rules], dtype="float64")
+        self._by_pair: dict[PairCodes, list[int]] = {}
+        self._by_base: dict[str, list[int]] = {}
+        for i, r in enumerate(self.rules):
+            if r.quote is None:
+                self._by_base.setdefault(r.base, []).append(i)
+            else:
+                self._by_pair.setdefault((r.base, r.quote), []).append(i)
+
+        self._pairs: list[PairCodes] = []
+        self._pair_index: dict[PairCodes, int] = {}
+        self._combo_rule = np.empty(0, dtype=np.int64)
+        self._combo_pair = np.empty(0, dtype=np.int64)
+        self._armed = np.empty(0, dtype=bool)
+
+    @property
+    def bases(self) -> list[str]:
+        """Bases with at least one rule, in rule order."""
+        return list(dict.fromkeys(r.base for r in self.rules))
+
+    def rules_for(self, pair: PairCodes) -> list[int]:
+        return self._by_pair.get(pair, []) + self._by_base.get(pair[0], [])
+
+    def watched(self, pairs: Iterable[PairCodes]) -> list[PairCodes]:
+        return [p for p in pairs if p in self._by_pair or p[0] in self._by_base]
+
+    def changed_pairs(self, series: Mapping[PairCodes, pd.Series]) -> list[PairCodes]:
+        """Watched pairs whose last row differs from the stored watermark."""
+        return [
+            p
+            for p in self.watched(series)
+            if not series[p].empty
+            and self.state.watermarks.get(_pair_key(p)) != _watermark(series[p])
+        ]
+
+    def _compile(self, pairs: Iterable[PairCodes]) -> None:
+        new = [p for p in pairs if p not in self._pair_index]
+        if not new:
+            return
+        rule_idx: list[int] = []
+        pair_idx: list[int] = []
+        armed: list[bool] = []
+        for p in new:
+            self._pair_index[p] = len(self._pairs)
+            self._pairs.append(p)
+            key = _pair_key(p)
+            for i in self.rules_for(p):
+                rule_idx.append(i)
+                pair_idx.append(self._pair_index[p])
+                armed.append(f"{self.rules[i].name}|{key}" not in self.state.fired)
+        self._combo_rule = np.concatenate([self._combo_rule, np.array(rule_idx, dtype=np.int64)])
+        self._combo_pair = np.concatenate([self._combo_pair, np.array(pair_idx, dtype=np.int64)])
+        self._armed = np.concatenate([self._armed, np.array(armed, dtype=bool)])
+
+    def metrics(
+        self, series: Mapping[PairCodes, pd.Series], pairs: Sequence[PairCodes]
+    ) -> pd.DataFrame:
+        """Score table of `pairs` (index=(base, quote), columns=ALERT_METRICS plus as_of)."""
+        frames = []
+        by_base: dict[str, dict[str, pd.Series]] = {}
+        for b, q in pairs:
+            by_base.setdefault(b, {})[q] = series[(b, q)]
+        for b, quotes in by_base.items():
+            scores = score_pair_series(quotes, defaults=self.defaults, weights=self.weights)
+            if not scores.empty:
+                scores.insert(0, "base", b)
+                frames.append(scores)
+        if not frames:
+            return pd.DataFrame(columns=["as_of", *ALERT_METRICS])
+        out = pd.concat(frames, ignore_index=True).rename(columns={"target": "quote"})
+        return out.set_index(["base", "quote"]).loc[:, ["as_of", *ALERT_METRICS]]
+
+    def check(self, scores: pd.DataFrame, now: datetime | None = None) -> list[AlertFiring]:
+        """Evaluate every rule that watches a pair in `scores` (see `metrics`).
+
+        Updates the armed state; returns the firings in rule order per pair.
+        """
+        if scores.empty or not self.rules:
+            return []
+        self._compile(scores.index)
+        now = now or datetime.now(UTC)
+
+        values = np.full((len(self._pairs), len(ALERT_METRICS)), np.nan)
+        rows = np.array([self._pair_index[p] for p in scores.index], dtype=np.int64)
+        values[rows] = scores.loc[:, list(ALERT_METRICS)].to_numpy("float64")
+        as_of = dict(zip(rows.tolist(), scores["as_of"], strict=True))
+
+        combos = np.flatnonzero(np.isin(self._combo_pair, rows))
+        r = self._combo_rule[combos]
+        v = values[self._combo_pair[combos], self._metric[r]]
+        # > 0 past the threshold in the rule's direction; NaN compares False both ways
+        beyond = self._sign[r] * (v - self._threshold[r])
+        armed = self._armed[combos]
+        fire = armed & (beyond > 0)
+        rearm = ~armed & (beyond < -self._hysteresis[r])
+        self._armed[combos[fire]] = False
+        self._armed[combos[rearm]] = True
+
+        firings = []
+        for c in combos[rearm]:
+            rule, pair = self.rules[self._combo_rule[c]], self._pairs[self._combo_pair[c]]
+            self.state.fired.discard(f"{rule.name}|{_pair_key(pair)}")
+        for c, value in zip(combos[fire], v[fire], strict=True):
+            rule, p = self.rules[self._combo_rule[c]], int(self._combo_pair[c])
+            base, quote = self._pairs[p]
+            self.state.fired.add(f"{rule.name}|{base}/{quote}")
+            firings.append(
+                AlertFiring(
+                    rule=rule.name,
+                    base=base,
+                    quote=quote,
+                    metric=rule.metric,
+                    direction=rule.direction,
+                    threshold=rule.threshold,
+                    value=float(value),
+                    as_of=as_of[p],
+                    fired_at=now,
+                )
+            )
+        return firings
+
+    def evaluate(
+        self, series: Mapping[PairCodes, pd.Series], now: datetime | None = None
+    ) -> list[AlertFiring]:
+        """Score the watched pairs that received new data and check their rules."""
+        with stage("alerts", rows_in=len(self.rules)) as rec:
+            changed = self.changed_pairs(series)
+            firings = self.check(self.metrics(series, changed), now)
+            for p in changed:
+                self.state.watermarks[_pair_key(p)] = _watermark(series[p])
+            rec.rows_out = len(firings)
+        return firings
+
+
+def evaluate_cache(
+    engine: AlertEngine, cache: pd.DataFrame, now: datetime | None = None
+) -> list[AlertFiring]:
+    """`engine.evaluate` over the rows of a long cache frame that belong to watched bases."""
+    watched = cache[cache["base"].isin(engine.bases)]
+    return engine.evaluate(split_pair_series(watched), now)
+
+
+def evaluate_cache_file(
+    engine: AlertEngine, cache_path: Path, now: datetime | None = None
+) -> list[AlertFiring]:
+    """Like `evaluate_cache`, reading only the watched bases from the cache file."""
+    frames = [read_rates(cache_path, base=b) for b in engine.bases]
+    frames = [f for f in frames if not f.empty]
+    series = split_pair_series(pd.concat(frames, ignore_index=True)) if frames else {}
+    return engine.evaluate(series, now)
+
+
+@dataclass(slots=True)
+class Watchlist:
+    """Rules plus where their state lives and where firings go (None: stdout)."""
+
+    engine: AlertEngine
+    state_path: Path
+    sink: Path | None = None
+
+    @classmethod
+    def load(cls, rules_path: Path, sink: Path | None, state_path: Path | None = None) -> Watchlist:
+        """Rules from `rules_path`; state defaults to `<rules>.state.json` beside them."""
+        state_path = state_path or rules_path.with_suffix(".state.json")
+        return cls(
+            AlertEngine(load_rules(rules_path), AlertState.load(state_path)), state_path, sink
+        )
+
+    def record(self, firings: Sequence[AlertFiring]) -> int:
+        """Write `firings` to the sink and persist the state; returns how many fired."""
+        n = write_firings(firings, self.sink)
+        self.engine.state.save(self.state_path)
+        return n
+
+
+def write_firings(firings: Iterable[AlertFiring], sink: Path | None) -> int:
+    """Append firings as JSON lines to `sink` (None: stdout); returns how many."""
+    lines = [json.dumps(f.to_dict()) + "\n" for f in firings]
+    if not lines:
+        return 0
+    if sink is None:
+        sys.stdout.write("".join(lines))
+        sys.stdout.flush()
+    else:
+        ensure_parent_dir(sink)
+        with sink.open("a", encoding="utf-8") as f:
+            f.write("".join(lines))
+    return len(lines)
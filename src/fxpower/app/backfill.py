@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import queue
+import shutil
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from fxpower.analytics.cross_rates import CROSS_RATES_SCHEMA, cross_rates_table
+from fxpower.app.export import RateFilter, iter_rate_batches
+from fxpower.app.validation import IngestValidator
+from fxpower.domain.models import SUPPORTED_CURRENCIES
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage.atomic import atomic_write
+from fxpower.storage.cache import (
+    CACHE_SCHEMA,
+    merge_tables,
+    parquet_layout,
+    read_cache_table,
+    upsert_cache_rows,
+    write_cache_stream,
+    write_cache_table,
+)
+from fxpower.storage.sqlite_cache import is_sqlite_path
+
+# Type: raw provider response for an EUR-based range, and its decoder to Arrow
+# (date32, string, float64 with rate = QUOTE per 1 EUR)
+PayloadFetchFn = Callable[[date, date], bytes]
+PayloadDecodeFn = Callable[[bytes], pa.Table]
+
+# Rough resident size of one cross-rate row while a chunk is in flight: the Arrow
+# columns (~26 B) plus the payload, decoded EUR table and numpy temporaries.
+_BYTES_PER_ROW = 96
+# threads holding one chunk each besides the downloads: decode, cross rates, write
+_STAGE_THREADS = 3
+
+
+@dataclass(frozen=True, slots=True)
+class BackfillConfig:
+    """Chunking and memory limits of a pipelined backfill.
+
+    Chunks of `chunk_days` calendar days flow through bounded queues (download
+    -> decode -> cross rates -> write); the queue depth is derived from
+    `memory_mb`, so peak memory depends on the budget, not on the history length.
+    """
+
+    chunk_days: int = 180
+    memory_mb: float = 256.0
+    download_workers: int = 2
+
+    def __post_init__(self) -> None:
+        if self.chunk_days < 1:
+            raise ValueError("chunk_days must be >= 1")
+        if self.download_workers < 1:
+            raise ValueError("download_workers must be >= 1")
+        if self.memory_mb <= 0:
+            raise ValueError("memory_mb must be > 0")
+        if self.queue_depth() < 1:
+            floor_mb = self.chunk_bytes() * (self.download_workers + _STAGE_THREADS + 3) / 2**20
+            raise ValueError(
+                f"memory_mb={self.memory_mb:g} cannot hold the pipeline with "
+                f"chunk_days={self.chunk_days} (needs >= {floor_mb:.1f} MB); "
+                "lower chunk_days or raise memory_mb"
+            )
+
+    def chunk_bytes(self) -> int:
+        """Estimated memory of one chunk in flight."""
+        n = len(SUPPORTED_CURRENCIES)
+        return self.chunk_days * n * (n - 1) * _BYTES_PER_ROW
+
+    def queue_depth(self) -> int:
+        """Chunks each of the three inter-stage queues may hold within the budget."""
+        in_flight = int(self.memory_mb * 2**20 // self.chunk_bytes())
+        return min(8, (in_flight - self.download_workers - _STAGE_THREADS) // 3)
+
+    def row_group_rows(self) -> int:
+        """Rows per Parquet row group when stitching, a quarter of the budget."""
+        return max(1024, int(self.memory_mb * 2**20 / 4 // _BYTES_PER_ROW))
+
+
+@dataclass(frozen=True, slots=True)
+class BackfillResult:
+    chunks: int  # chunks in the plan
+    resumed: int  # chunks already done by an earlier, interrupted run
+    rows: int  # cross-rate rows written by this run
+    cache_path: Path
+
+
+def backfill_chunks(start: date, end: date, chunk_days: int) -> list[tuple[date, date]]:
+    """Consecutive (start, end) ranges of at most `chunk_days` days covering start..end."""
+    if start > end:
+        raise ValueError("start must not be after end")
+    chunks = []
+    while start <= end:
+        last = min(start + timedelta(days=chunk_days - 1), end)
+        chunks.append((start, last))
+        start = last + timedelta(days=1)
+    return chunks
+
+
+def backfill_dir(cache_path: Path) -> Path:
+    """Sidecar directory with the checkpoint and finished chunks of a running backfill."""
+    return cache_path.with_name(f"{cache_path.stem}.backfill")
+
+
+def _chunk_id(chunk: tuple[date, date]) -> str:
+    return f"{chunk[0].isoformat()}..{chunk[1].isoformat()}"
+
+
+class _Checkpoint:
+    """Plan and finished chunks, rewritten atomically after every chunk.
+
+    For Parquet caches each finished chunk is also kept as a part file, stitched
+    into the cache once all chunks are done; SQLite caches take every chunk
+    directly, so the checkpoint only records which chunks are in.
+    """
+
+    def __init__(self, directory: Path, plan: dict[str, Any]) -> None:
+        self.directory = directory
+        self.path = directory / "checkpoint.json"
+        self.plan = plan
+        self.done: set[str] = set()
+
+    @classmethod
+    def open(cls, directory: Path, plan: dict[str, Any], restart: bool) -> _Checkpoint:
+        checkpoint = cls(directory, plan)
+        if restart:
+            shutil.rmtree(directory, ignore_errors=True)
+        if checkpoint.path.exists():
+            saved = json.loads(checkpoint.path.read_text())
+            if saved["plan"] != plan:
+                raise ValueError(
+                    f"An interrupted backfill with a different plan exists in {directory} "
+                    f"({saved['plan']}); rerun it with the same range and chunk size, "
+                    "or restart to discard it"
+                )
+            checkpoint.done = set(saved["done"])
+        directory.mkdir(parents=True, exist_ok=True)
+        checkpoint._save()
+        return checkpoint
+
+    def part_path(self, chunk: tuple[date, date]) -> Path:
+        return self.directory / f"part-{_chunk_id(chunk)}.parquet"
+
+    def mark_done(self, chunk: tuple[date, date]) -> None:
+        self.done.add(_chunk_id(chunk))
+        self._save()
+
+    def _save(self) -> None:
+        doc = json.dumps({"plan": self.plan, "done": sorted(self.done)}, indent=1)
+        atomic_write(self.path, lambda tmp: tmp.write_text(doc))
+
+
+class _Stopped(Exception):
+    pass
+
+
+_END = object()
+
+
+class _Channel:
+    """Bounded queue between two stages; a closed channel refuses further items."""
+
+    def __init__(self, depth: int) -> None:
+        self.items: queue.Queue = queue.Queue(depth)
+        self.closed = threading.Event()
+
+
+class _Pipeline:
+    """Stage threads connected by bounded channels.
+
+    A failing stage closes its inbox (stopping everything upstream) but ends its
+    outbox normally, so chunks already past it are still written; the consumer
+    re-raises the first error afterwards. Leaving the consumer early stops all
+    stages. Blocked puts and gets poll the flags, so no thread hangs.
+    """
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self.stop = threading.Event()
+        self.errors: list[BaseException] = []
+        self._threads: list[threading.Thread] = []
+
+    def _put(self, ch: _Channel, item: object) -> None:
+        while True:
+            if self.stop.is_set() or ch.closed.is_set():
+                raise _Stopped
+            try:
+                ch.items.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, ch: _Channel) -> object:
+        while True:
+            if self.stop.is_set():
+                raise _Stopped
+            try:
+                return ch.items.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _spawn(
+        self, name: str, body: Callable[[_Channel], None], inbox: _Channel | None
+    ) -> _Channel:
+        out = _Channel(self.depth)
+
+        def run() -> None:
+            try:
+                body(out)
+                self._put(out, _END)
+            except _Stopped:
+                pass
+            except BaseException as exc:
+                self.errors.append(exc)
+                try:
+                    self._put(out, _END)
+                except _Stopped:
+                    pass
+            finally:
+                if inbox is not None:
+                    inbox.closed.set()
+
+        # stage() records of worker threads land in the caller's profiler
+        ctx = contextvars.copy_context()
+        thread = threading.Thread(target=ctx.run, args=(run,), name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return out
+
+    def source(self, name: str, items: Iterator[object]) -> _Channel:
+        def body(out: _Channel) -> None:
+            for item in items:
+                self._put(out, item)
+
+        return self._spawn(name, body, None)
+
+    def map(self, name: str, fn: Callable[[Any], object], inbox: _Channel) -> _Channel:
+        def body(out: _Channel) -> None:
+            while (item := self._get(inbox)) is not _END:
+                self._put(out, fn(item))
+
+        return self._spawn(name, body, inbox)
+
+    def drain(self, inbox: _Channel) -> Iterator[Any]:
+        try:
+            while (item := self._get(inbox)) is not _END:
+                yield item
+        finally:
+            self.stop.set()
+            for thread in self._threads:
+                thread.join()
+        if self.errors:
+            raise self.errors[0]
+
+
+def _downloads(
+    chunks: list[tuple[date, date]], fetch: PayloadFetchFn, workers: int
+) -> Iterator[tuple[tuple[date, date], bytes]]:
+    """Payloads in chunk order, with up to `workers` requests in flight."""
+    ctx = contextvars.copy_context()
+    with ThreadPoolExecutor(workers, thread_name_prefix="backfill-download") as pool:
+        pending: deque[tuple[tuple[date, date], Future[bytes]]] = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(ctx.copy().run, fetch, *chunk)))
+            if len(pending) >= workers:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+
+def run_backfill(
+    cache_path: Path,
+    fetch_payload: PayloadFetchFn,
+    decode_payload: PayloadDecodeFn,
+    start: date,
+    end: date,
+    config: BackfillConfig | None = None,
+    validator: IngestValidator | None = None,
+    restart: bool = False,
+) -> BackfillResult:
+    """Fetch start..end chunk by chunk into the cache, overlapping network, CPU and disk.
+
+    Downloads, decoding, cross-rate generation and writes run concurrently on
+    bounded queues. Every finished chunk is checkpointed next to the cache
+    (see `backfill_dir`), so rerunning an interrupted backfill with the same
+    range and chunk size skips what is done. Parquet caches are rewritten once
+    at the end by streaming existing rows and chunk files row group by row
+    group; rows of the existing cache inside the range are kept unless a chunk
+    replaces them ("incoming wins").
+    """
+    config = config or BackfillConfig()
+    chunks = backfill_chunks(start, end, config.chunk_days)
+    plan = {"start": start.isoformat(), "end": end.isoformat(), "chunk_days": config.chunk_days}
+    checkpoint = _Checkpoint.open(backfill_dir(cache_path), plan, restart)
+    todo = [c for c in chunks if _chunk_id(c) not in checkpoint.done]
+    sqlite = is_sqlite_path(cache_path)
+    history = [CROSS_RATES_SCHEMA.empty_table()]  # previous chunk, for validation
+
+    def decode(item: tuple[tuple[date, date], bytes]) -> tuple[tuple[date, date], pa.Table]:
+        chunk, body = item
+        return chunk, decode_payload(body)
+
+    def cross(item: tuple[tuple[date, date], pa.Table]) -> tuple[tuple[date, date], pa.Table]:
+        chunk, eur = item
+        # the API may pad a range with the last published day before it; drop it
+        eur = eur.filter(pc.greater_equal(eur["date"], pa.scalar(chunk[0], pa.date32())))
+        if eur.num_rows == 0:
+            return chunk, CROSS_RATES_SCHEMA.empty_table()
+        table = cross_rates_table(eur)
+        if validator is not None:
+            table = validator.check(table, history[0], cache_path)
+            history[0] = table
+        return chunk, table
+
+    pipeline = _Pipeline(config.queue_depth())
+    payloads = pipeline.source(
+        "backfill-download", _downloads(todo, fetch_payload, config.download_workers)
+    )
+    tables = pipeline.map(
+        "backfill-cross", cross, pipeline.map("backfill-decode", decode, payloads)
+    )
+    rows = 0
+    # closing(): a failed write stops and joins the stage threads right away
+    with closing(pipeline.drain(tables)) as results:
+        for chunk, table in results:
+            with stage("backfill_write", rows_in=table.num_rows) as rec:
+                if sqlite:
+                    if table.num_rows:
+                        upsert_cache_rows(table.to_pandas(), cache_path)
+                else:
+                    part = checkpoint.part_path(chunk)
+                    atomic_write(part, lambda tmp, t=table: pq.write_table(t, tmp))
+                    rec.bytes_written = part.stat().st_size
+                checkpoint.mark_done(chunk)
+                rows += table.num_rows
+
+    if not sqlite:
+        _stitch(cache_path, chunks, checkpoint, config)
+    shutil.rmtree(checkpoint.directory, ignore_errors=True)
+    return BackfillResult(len(chunks), len(chunks) - len(todo), rows, cache_path)
+
+
+def _stitch(
+    cache_path: Path,
+    chunks: list[tuple[date, date]],
+    checkpoint: _Checkpoint,
+    config: BackfillConfig,
+) -> None:
+    """Rewrite the Parquet cache as existing rows before, chunks, existing rows after."""
+
+    def part(chunk: tuple[date, date]) -> pa.Table:
+        path = checkpoint.part_path(chunk)
+        if not path.exists():
+            return CACHE_SCHEMA.empty_table()
+        return pq.read_table(path).cast(CACHE_SCHEMA)
+
+    if parquet_layout(cache_path).sort not in (None, "date"):
+        # a pair-sorted file cannot be written in date-ordered pieces
+        merged = read_cache_table(cache_path)
+        for chunk in chunks:
+            merged = merge_tables(merged, part(chunk))
+        write_cache_table(merged, cache_path)
+        return
+
+    first, last = chunks[0][0], chunks[-1][1]
+
+    def existing(rate_filter: RateFilter) -> Iterator[pa.Table]:
+        for batch in iter_rate_batches(cache_path, rate_filter):
+            yield pa.Table.from_batches([batch])
+
+    def pieces() -> Iterator[pa.Table]:
+        yield from existing(RateFilter(end=first - timedelta(days=1)))
+        for chunk in chunks:
+            overlap = pa.Table.from_batches(
+                list(iter_rate_batches(cache_path, RateFilter(start=chunk[0], end=chunk[1]))),
+                schema=CACHE_SCHEMA,
+            )
+            yield merge_tables(overlap, part(chunk))
+        yield from existing(RateFilter(start=last + timedelta(days=1)))
+
+    write_cache_stream(pieces(), cache_path, config.row_group_rows())
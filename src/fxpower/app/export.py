@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import json
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import BinaryIO, Protocol
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from fxpower.analytics.ranker import SCORE_COLUMNS, ScoreWeights, rank_targets
+from fxpower.domain.models import Currency
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage import sqlite_cache
+from fxpower.storage.atomic import atomic_write, ensure_parent_dir
+from fxpower.storage.cache import CACHE_SCHEMA, REQUIRED_COLUMNS, read_rates
+from fxpower.storage.sqlite_cache import is_sqlite_path
+
+EXPORT_FORMATS: tuple[str, ...] = ("parquet", "arrow", "jsonl", "csv")
+
+_SUFFIX_FORMATS = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".arrows": "arrow",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+}
+
+# one row per (base, target); the metric columns are all float64
+SCORE_SCHEMA = pa.schema(
+    [("base", pa.string()), ("target", pa.string()), ("as_of", pa.date32())]
+    + [(c, pa.float64()) for c in SCORE_COLUMNS if c not in ("target", "as_of")]
+)
+
+
+def format_for_path(path: Path) -> str:
+    """Export format implied by the file suffix."""
+    fmt = _SUFFIX_FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(
+            f"Cannot infer the export format of '{path.name}'; pass one of "
+            f"{', '.join(EXPORT_FORMATS)}"
+        )
+    return fmt
+
+
+@dataclass(frozen=True, slots=True)
+class RateFilter:
+    """Which cache rows to export; empty `bases` / `pairs` mean all."""
+
+    bases: tuple[str, ...] = ()
+    pairs: tuple[tuple[str, str], ...] = ()
+    start: date | None = None
+    end: date | None = None
+
+    def __post_init__(self) -> None:
+        if self.start is not None and self.end is not None and self.start > self.end:
+            raise ValueError("start must not be after end")
+
+    def expression(self) -> ds.Expression | None:
+        """The filter as a dataset expression (pushed down to row-group statistics)."""
+        parts: list[ds.Expression] = []
+        if self.bases:
+            parts.append(ds.field("base").isin(list(self.bases)))
+        if self.pairs:
+            any_pair = None
+            for b, q in self.pairs:
+                one = (ds.field("base") == b) & (ds.field("quote") == q)
+                any_pair = one if any_pair is None else any_pair | one
+            parts.append(any_pair)
+        if self.start is not None:
+            parts.append(ds.field("date") >= pa.scalar(self.start, pa.date32()))
+        if self.end is not None:
+            parts.append(ds.field("date") <= pa.scalar(self.end, pa.date32()))
+        if not parts:
+            return None
+        expr = parts[0]
+        for p in parts[1:]:
+            expr = expr & p
+        return expr
+
+
+@dataclass(frozen=True, slots=True)
+class ExportResult:
+    rows: int
+    batches: int
+    fmt: str
+
+
+def iter_rate_batches(
+    path: Path, rate_filter: RateFilter | None = None, batch_rows: int = 65_536
+) -> Iterator[pa.RecordBatch]:
+    """Cache rows matching `rate_filter` as `CACHE_SCHEMA` batches of at most `batch_rows`.
+
+    Parquet is scanned row group by row group (filters skip row groups by their
+    statistics), so memory is bounded by the row-group size, which `fxpower
+    cache compact` sets; SQLite pages through a cursor. Rows come in storage
+    order.
+    """
+    if batch_rows < 1:
+        raise ValueError("batch_rows must be >= 1")
+    rate_filter = rate_filter or RateFilter()
+    if not path.exists():
+        return
+
+    if is_sqlite_path(path):
+        frames = sqlite_cache.iter_rates(
+            path,
+            bases=rate_filter.bases,
+            pairs=rate_filter.pairs,
+            start=rate_filter.start,
+            end=rate_filter.end,
+            batch_rows=batch_rows,
+        )
+        for df in frames:
+            df["date"] = pd.to_datetime(df["date"]).dt.date
+            yield pa.RecordBatch.from_pandas(df, schema=CACHE_SCHEMA, preserve_index=False)
+        return
+
+    dataset = ds.dataset(path, format="parquet")
+    for batch in dataset.to_batches(
+        columns=list(REQUIRED_COLUMNS),
+        filter=rate_filter.expression(),
+        batch_size=batch_rows,
+        # no read-ahead: memory stays at about one row group plus one batch
+        batch_readahead=0,
+        fragment_readahead=0,
+        fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=False),
+        use_threads=False,
+    ):
+        if batch.num_rows:
+            yield batch.cast(CACHE_SCHEMA)
+
+
+def iter_score_batches(
+    path: Path, bases: Iterable[Currency], weights: ScoreWeights | None = None
+) -> Iterator[pa.RecordBatch]:
+    """One `SCORE_SCHEMA` batch per base: `rank_targets` over that base's rows only."""
+    for base in bases:
+        scores = rank_targets(read_rates(path, base=base.value), base, weights=weights)
+        if scores.empty:
+            continue
+        scores.insert(0, "base", base.value)
+        yield pa.RecordBatch.from_pandas(scores, schema=SCORE_SCHEMA, preserve_index=False)
+
+
+class _BatchWriter(Protocol):
+    def write_batch(self, batch: pa.RecordBatch) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def _json_literals(col: pa.Array) -> pa.Array:
+    """JSON literal of every value as a string array (NaN, inf and nulls become null)."""
+    t = col.type
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        # escape each distinct string once
+        encoded = pc.dictionary_encode(col)
+        values = pa.array([json.dumps(v) for v in encoded.dictionary.to_pylist()], pa.string())
+        out = values.take(encoded.indices)
+    elif pa.types.is_date(t) or pa.types.is_timestamp(t):
+        out = pc.binary_join_element_wise('"', col.cast(pa.string()), '"', "")
+    elif pa.types.is_floating(t):
+        out = pc.if_else(pc.is_finite(col), col.cast(pa.string()), pa.scalar(None, pa.string()))
+    else:
+        out = col.cast(pa.string())
+    return pc.fill_null(out, "null")
+
+
+class _JsonLinesWriter:
+    """One JSON object per row, built column-wise with Arrow string kernels."""
+
+    def __init__(self, sink: BinaryIO) -> None:
+        self._sink = sink
+
+    def write_batch(self, batch: pa.RecordBatch) -> None:
+        parts: list[pa.Array | str] = []
+        for i, (name, col) in enumerate(zip(batch.schema.names, batch.columns, strict=True)):
+            parts.append(("{" if i == 0 else ", ") + json.dumps(name) + ": ")
+            parts.append(_json_literals(col))
+        parts.append("}")
+        lines = pc.binary_join_element_wise(*parts, "")
+        self._sink.write(("\n".join(lines.to_pylist()) + "\n").encode())
+
+    def close(self) -> None:
+        self._sink.flush()
+
+
+def _open_writer(fmt: str, sink: BinaryIO, schema: pa.Schema) -> _BatchWriter:
+    if fmt == "parquet":
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    if fmt == "arrow":
+        return pa.ipc.new_stream(sink, schema)
+    if fmt == "csv":
+        return pacsv.CSVWriter(sink, schema)
+    if fmt == "jsonl":
+        return _JsonLinesWriter(sink)
+    raise ValueError(f"Unknown export format '{fmt}'. Supported: {', '.join(EXPORT_FORMATS)}")
+
+
+def write_batches(
+    batches: Iterable[pa.RecordBatch], schema: pa.Schema, fmt: str, sink: BinaryIO
+) -> ExportResult:
+    """Stream `batches` into `sink` in `fmt` (Arrow IPC uses the streaming format)."""
+    with stage("export_write") as rec:
+        writer = _open_writer(fmt, sink, schema)
+        rows = n = 0
+        try:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+                n += 1
+        finally:
+            writer.close()
+        rec.rows_out = rows
+        return ExportResult(rows=rows, batches=n, fmt=fmt)
+
+
+def _export(out: Path | None, write: Callable[[BinaryIO], ExportResult]) -> ExportResult:
+    if out is None:
+        result = write(sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+        return result
+
+    # a failed export never leaves a truncated file behind
+    ensure_parent_dir(out)
+    results: list[ExportResult] = []
+
+    def to_file(tmp: Path) -> None:
+        with tmp.open("wb") as f:
+            results.append(write(f))
+
+    atomic_write(out, to_file)
+    return results[0]
+
+
+def export_rates(
+    cache_path: Path,
+    out: Path | None,
+    fmt: str,
+    rate_filter: RateFilter | None = None,
+    batch_rows: int = 65_536,
+) -> ExportResult:
+    """Write filtered cache rows to `out` (None: stdout) without loading the whole cache."""
+    batches = iter_rate_batches(cache_path, rate_filter, batch_rows)
+    return _export(out, lambda sink: write_batches(batches, CACHE_SCHEMA, fmt, sink))
+
+
+def export_scores(
+    cache_path: Path,
+    out: Path | None,
+    fmt: str,
+    bases: Iterable[Currency],
+    weights: ScoreWeights | None = None,
+) -> ExportResult:
+    """Write the score table of each base (one row per target) to `out` (None: stdout)."""
+    batches = iter_score_batches(cache_path, bases, weights)
+    return _export(out, lambda sink: write_batches(batches, SCORE_SCHEMA, fmt, sink))
@@ -6,9 +6,18 @@ from datetime import date, timedelta
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
-from fxpower.analytics.cross_rates import generate_cross_rates_from_eur_series
-from fxpower.storage.cache import merge_cache, read_cache, write_cache
+from fxpower.analytics.cross_rates import cross_rates_table, generate_cross_rates_from_eur_series
+from fxpower.app.validation import IngestValidator
+from fxpower.storage.cache import (
+    merge_into_cache,
+    merge_tables,
+    read_cache,
+    read_cache_table,
+    write_cache_table,
+)
 
 
 @dataclass(frozen=True, slots=True)
@@ -21,7 +30,7 @@ def _normalize_today(today: date | None) -> date:
     return today or date.today()
 
 
-def _max_cache_date(cache_df: pd.DataFrame) -> date | None:
+def max_cache_date(cache_df: pd.DataFrame) -> date | None:
     if cache_df.empty:
         return None
     # cache 'date' is stored as datetime.date already (validated), but be defensive
@@ -35,9 +44,13 @@ def compute_fetch_range(
     policy: FetchPolicy | None = None,
 ) -> tuple[date, date] | None:
     """Return (start, end) range to fetch, or None if nothing to fetch."""
-    policy = policy or FetchPolicy()
-    max_date = _max_cache_date(cache_df)
+    return _fetch_range_after(max_cache_date(cache_df), today, policy)
+
 
+def _fetch_range_after(
+    max_date: date | None, today: date, policy: FetchPolicy | None
+) -> tuple[date, date] | None:
+    policy = policy or FetchPolicy()
     if max_date is None:
         start = today - timedelta(days=policy.lookback_days)
     else:
@@ -56,27 +69,100 @@ def compute_fetch_range(
 # Type: fetch EUR-based time series (date, quote, rate where rate=QUOTE per 1 EUR)
 EurFetchFn = Callable[[date, date], pd.DataFrame]
 
+# Same, as an Arrow table (date32, string, float64)
+EurTableFetchFn = Callable[[date, date], pa.Table]
+
 
 def update_cache_from_eur_source(
     cache_path: Path,
     fetch_eur_series: EurFetchFn,
     today: date | None = None,
     policy: FetchPolicy | None = None,
+    validator: IngestValidator | None = None,
 ) -> pd.DataFrame:
     """Update local cache by fetching missing EUR-based rates and computing cross pairs.
 
+    With a `validator`, the new cross rates are checked (and, depending on its
+    policy, filtered or rejected) before they are merged.
     Returns updated cache dataframe.
     """
-    t = _normalize_today(today)
     existing = read_cache(cache_path)
+    merged, _ = apply_incremental_fetch(
+        existing,
+        cache_path=cache_path,
+        fetch_eur_series=fetch_eur_series,
+        today=today,
+        policy=policy,
+        validator=validator,
+    )
+    return merged
+
+
+def apply_incremental_fetch(
+    existing: pd.DataFrame,
+    cache_path: Path,
+    fetch_eur_series: EurFetchFn,
+    today: date | None = None,
+    policy: FetchPolicy | None = None,
+    validator: IngestValidator | None = None,
+) -> tuple[pd.DataFrame, int]:
+    """Fetch what is missing after an already-loaded cache, merge and write it.
+
+    Lets long-running callers keep the cache in memory between updates.
+    Returns (merged cache, number of rows added).
+    """
+    t = _normalize_today(today)
     fetch_range = compute_fetch_range(existing, today=t, policy=policy)
     if fetch_range is None:
-        return existing
+        return existing, 0
 
     start, end = fetch_range
     eur_series = fetch_eur_series(start, end)
+    if not eur_series.empty:
+        # the API may pad a range with the last published day before `start`; drop it
+        eur_series = eur_series[pd.to_datetime(eur_series["date"]).dt.date >= start]
+    if eur_series.empty:
+        return existing, 0
 
     incoming = generate_cross_rates_from_eur_series(eur_series)
-    merged = merge_cache(existing, incoming)
-    write_cache(merged, cache_path)
-    return merged
+    if validator is not None:
+        incoming = validator.check_frame(incoming, existing, cache_path)
+        if incoming.empty:
+            return existing, 0
+    merged = merge_into_cache(existing, incoming, cache_path)
+    return merged, len(merged) - len(existing)
+
+
+def update_cache_arrow(
+    cache_path: Path,
+    fetch_eur_table: EurTableFetchFn,
+    today: date | None = None,
+    policy: FetchPolicy | None = None,
+    validator: IngestValidator | None = None,
+) -> tuple[pa.Table, int]:
+    """`update_cache_from_eur_source` on Arrow tables end to end.
+
+    Decode, cross rates, merge and Parquet write never build a DataFrame.
+    Returns (updated cache table, number of rows added).
+    """
+    existing = read_cache_table(cache_path)
+    max_date = pc.max(existing["date"]).as_py() if existing.num_rows else None
+    fetch_range = _fetch_range_after(max_date, _normalize_today(today), policy)
+    if fetch_range is None:
+        return existing, 0
+
+    start, end = fetch_range
+    eur = fetch_eur_table(start, end)
+    # the API may pad a range with the last published day before `start`; drop it
+    eur = eur.filter(pc.greater_equal(eur["date"], pa.scalar(start, pa.date32())))
+    if eur.num_rows == 0:
+        return existing, 0
+
+    incoming = cross_rates_table(eur)
+    if validator is not None:
+        incoming = validator.check(incoming, existing, cache_path)
+        if incoming.num_rows == 0:
+            return existing, 0
+    merged = merge_tables(existing, incoming)
+    write_cache_table(merged, cache_path)
+    return merged, merged.num_rows - existing.num_rows
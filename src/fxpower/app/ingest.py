@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from fxpower.domain.models import Currency
+from fxpower.providers.intraday import IntradayConfig, resample_files
+from fxpower.storage.bars import bars_path, merge_bars, read_bars, write_bars
+from fxpower.storage.cache import merge_into_cache, read_cache
+
+
+@dataclass(frozen=True, slots=True)
+class IntradayIngestResult:
+    quotes: int  # intraday rows read
+    bars: int  # daily bars produced
+    cache_rows: int  # rows in the cache afterwards
+    bars_file: Path
+
+
+def bars_to_cache_rows(bars: pd.DataFrame, cache: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Cross rates for every day in `bars`, with that day's closes folded in.
+
+    The cache holds one triangularly consistent set of crosses per day, so a
+    close cannot replace its pair (and inverse) alone. Each day starts from the
+    cached EUR legs; closes then re-price currencies outward from EUR: a close
+    touching a priced currency prices the other one, and a close touching
+    neither keeps its quote's cached level and re-prices its base. A close that
+    would over-determine a currency already priced that day (a cycle of pairs)
+    stays out of the cache; the bars sidecar still has it. Returns every pair
+    among the currencies priced on each day.
+    """
+    cache = cache if cache is not None else pd.DataFrame(columns=["date", "base", "quote", "rate"])
+    cached_days = dict(iter(cache.groupby(pd.to_datetime(cache["date"]).dt.date)))
+    frames = []
+    for day, day_bars in bars.groupby("date", sort=True):
+        closes = list(zip(day_bars["base"], day_bars["quote"], day_bars["close"], strict=True))
+        cached = cached_days.get(pd.Timestamp(day).date())
+        levels = _price_day(closes, _eur_levels(cached) if cached is not None else {})
+        frames.append(_crosses(day, levels))
+    if not frames:
+        return pd.DataFrame(columns=["date", "base", "quote", "rate"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _eur_levels(rows: pd.DataFrame) -> dict[str, float]:
+    """X per 1 EUR for every currency with a EUR leg among one day's cache rows."""
+    eur = Currency.EUR.value
+    levels: dict[str, float] = {}
+    for b, q, rate in zip(rows["base"], rows["quote"], rows["rate"], strict=True):
+        if q == eur and b != eur:
+            levels.setdefault(str(b), float(rate))
+        elif b == eur and q != eur:
+            levels.setdefault(str(q), 1.0 / float(rate))
+    return levels
+
+
+def _price_day(
+    closes: list[tuple[str, str, float]], cached: dict[str, float]
+) -> dict[str, tuple[int, float]]:
+    """(group, X per 1 EUR) per currency; group 0 is anchored at EUR.
+
+    Closes that reach neither EUR nor a cached level form their own group in an
+    arbitrary unit, so they only yield crosses among themselves.
+    """
+    priced = {Currency.EUR.value: (0, 1.0)}
+    pending = sorted(closes)
+    groups = 0
+    while pending:
+        i = next((i for i, (b, q, _) in enumerate(pending) if b in priced or q in priced), None)
+        if i is None:
+            # nothing reaches a priced currency: anchor the first close on the cache
+            i, (b, q, _) = 0, pending[0]
+            if q in cached:
+                priced[q] = (0, cached[q])
+            elif b in cached:
+                priced[b] = (0, cached[b])
+            else:
+                groups += 1
+                priced[q] = (groups, 1.0)
+        b, q, close = pending.pop(i)
+        if b in priced and q in priced:
+            continue  # over-determined
+        if q in priced:
+            group, level = priced[q]
+            priced[b] = (group, close * level)  # BASE per EUR = BASE per QUOTE * QUOTE per EUR
+        else:
+            group, level = priced[b]
+            priced[q] = (group, level / close)
+    for code, level in cached.items():
+        priced.setdefault(code, (0, level))
+    return priced
+
+
+def _crosses(day: object, levels: dict[str, tuple[int, float]]) -> pd.DataFrame:
+    rows = [
+        (day, b, q, lb / lq)
+        for b, (gb, lb) in sorted(levels.items())
+        for q, (gq, lq) in sorted(levels.items())
+        if b != q and gb == gq
+    ]
+    return pd.DataFrame(rows, columns=["date", "base", "quote", "rate"])
+
+
+def ingest_intraday(
+    files: Iterable[Path],
+    cache_path: Path,
+    config: IntradayConfig | None = None,
+) -> IntradayIngestResult:
+    """Resample intraday quote files to daily bars and fold them into the cache.
+
+    Each day's closes re-derive that day's cross rates (`bars_to_cache_rows`),
+    merged through `merge_into_cache`, so "rate today" reflects the latest
+    quote and the day stays triangularly consistent. The full bars (OHLC, tick
+    count, realized volatility) go to a Parquet sidecar next to the cache,
+    merged with the same key and "incoming wins" rule.
+    """
+    config = config or IntradayConfig()
+    bars, quotes = resample_files(files, config)
+    if bars.empty:
+        return IntradayIngestResult(quotes, 0, len(read_cache(cache_path)), bars_path(cache_path))
+
+    cache = read_cache(cache_path)
+    merged = merge_into_cache(cache, bars_to_cache_rows(bars, cache), cache_path)
+    sidecar = bars_path(cache_path)
+    write_bars(merge_bars(read_bars(sidecar), bars), sidecar)
+    return IntradayIngestResult(quotes, len(bars), len(merged), sidecar)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Protocol
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from fxpower.app.fetch import EurFetchFn, FetchPolicy, apply_incremental_fetch, max_cache_date
+from fxpower.app.validation import IngestValidator
+from fxpower.storage.cache import read_cache
+
+
+class Clock(Protocol):
+    def now(self) -> datetime:
+        """Current time as a timezone-aware datetime."""
+        ...
+
+    def sleep(self, seconds: float) -> None: ...
+
+
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.now(UTC)
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+@dataclass(frozen=True, slots=True)
+class PublicationSchedule:
+    """When new reference rates are expected.
+
+    ECB reference rates are published around 16:00 CET on TARGET business days;
+    `grace_minutes` gives the upstream API time to pick them up.
+    """
+
+    tz: str = "Europe/Berlin"
+    publish_hour: int = 16
+    publish_minute: int = 0
+    grace_minutes: int = 15
+    weekdays: tuple[int, ...] = (0, 1, 2, 3, 4)  # Mon..Fri
+
+    def local_day(self, now: datetime) -> date:
+        return now.astimezone(ZoneInfo(self.tz)).date()
+
+    def window_for(self, day: date) -> datetime:
+        """First moment a fetch for `day` is expected to succeed."""
+        local = datetime(
+            day.year,
+            day.month,
+            day.day,
+            self.publish_hour,
+            self.publish_minute,
+            tzinfo=ZoneInfo(self.tz),
+        )
+        return local + timedelta(minutes=self.grace_minutes)
+
+    def next_window(self, now: datetime, after_day: date | None = None) -> tuple[date, datetime]:
+        """Return (publication day, window start) of the next expected publication.
+
+        With `after_day` (latest day already handled) this is the first publication
+        day after it, even if its window has already opened; without it, the first
+        window that has not started yet.
+        """
+        day = self.local_day(now) if after_day is None else after_day + timedelta(days=1)
+        while True:
+            if day.weekday() in self.weekdays:
+                window = self.window_for(day)
+                if after_day is not None or window >= now:
+                    return day, window
+            day += timedelta(days=1)
+
+
+@dataclass(frozen=True, slots=True)
+class WatchPolicy:
+    retry_initial_s: float = 5 * 60.0
+    retry_max_s: float = 60 * 60.0
+    backoff_factor: float = 2.0
+    give_up_after_s: float = 8 * 60 * 60.0  # e.g. TARGET holidays: no fixing at all
+
+
+@dataclass(frozen=True, slots=True)
+class WatchOutcome:
+    publication_day: date
+    attempts: int
+    rows_added: int
+    published: bool
+
+
+# Called with (updated cache, rows added) whenever new rows landed.
+UpdateCallback = Callable[[pd.DataFrame, int], None]
+# Called with a transient error that failed the startup catch-up.
+ErrorCallback = Callable[[Exception], None]
+
+
+class FetchWatcher:
+    """Resident incremental fetcher aligned with the publication schedule.
+
+    The cache stays in memory between windows, so each cycle only pays for the
+    incremental request, merge and write.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path,
+        fetch_eur_series: EurFetchFn,
+        clock: Clock | None = None,
+        schedule: PublicationSchedule | None = None,
+        watch_policy: WatchPolicy | None = None,
+        fetch_policy: FetchPolicy | None = None,
+        on_update: UpdateCallback | None = None,
+        transient_errors: tuple[type[Exception], ...] = (),
+        validator: IngestValidator | None = None,
+        on_error: ErrorCallback | None = None,
+    ) -> None:
+        self.cache_path = cache_path
+        self.fetch_eur_series = fetch_eur_series
+        self.clock = clock or SystemClock()
+        self.schedule = schedule or PublicationSchedule()
+        self.watch_policy = watch_policy or WatchPolicy()
+        self.fetch_policy = fetch_policy
+        self.on_update = on_update
+        # errors treated like "not yet published" while polling (e.g. network hiccups)
+        self.transient_errors = transient_errors
+        self.validator = validator
+        self.on_error = on_error
+        self.cache = read_cache(cache_path)
+        self._given_up: date | None = None
+
+    @property
+    def latest_day(self) -> date | None:
+        return max_cache_date(self.cache)
+
+    def _handled_through(self) -> date | None:
+        days = [d for d in (self.latest_day, self._given_up) if d is not None]
+        return max(days) if days else None
+
+    def _fetch(self) -> int:
+        today = self.schedule.local_day(self.clock.now())
+        self.cache, added = apply_incremental_fetch(
+            self.cache,
+            cache_path=self.cache_path,
+            fetch_eur_series=self.fetch_eur_series,
+            today=today,
+            policy=self.fetch_policy,
+            validator=self.validator,
+        )
+        if added > 0 and self.on_update is not None:
+            self.on_update(self.cache, added)
+        return added
+
+    def catch_up(self) -> int:
+        """One immediate incremental fetch (e.g. on startup). Returns rows added."""
+        return self._fetch()
+
+    def try_catch_up(self) -> int:
+        """`catch_up`, but a transient error goes to `on_error` instead of stopping the watch.
+
+        The next window polls again anyway, so a network hiccup at startup only
+        delays the catch-up. Returns rows added (0 on a transient error).
+        """
+        try:
+            return self.catch_up()
+        except self.transient_errors as exc:
+            if self.on_error is not None:
+                self.on_error(exc)
+            return 0
+
+    def wait_for_next_publication(self) -> WatchOutcome:
+        """Sleep until the next window, then poll with backoff until that day lands."""
+        now = self.clock.now()
+        day, window = self.schedule.next_window(now, after_day=self._handled_through())
+        delay = (window - now).total_seconds()
+        if delay > 0:
+            self.clock.sleep(delay)
+
+        policy = self.watch_policy
+        deadline = window + timedelta(seconds=policy.give_up_after_s)
+        retry_s = policy.retry_initial_s
+        attempts = 0
+        rows_added = 0
+        while True:
+            attempts += 1
+            try:
+                rows_added += self._fetch()
+            except self.transient_errors:
+                pass
+            latest = self.latest_day
+            if latest is not None and latest >= day:
+                return WatchOutcome(day, attempts, rows_added, published=True)
+
+            # not yet published: back off, but never past the give-up deadline
+            remaining = (deadline - self.clock.now()).total_seconds()
+            if remaining <= 0:
+                self._given_up = day
+                return WatchOutcome(day, attempts, rows_added, published=False)
+            self.clock.sleep(min(retry_s, remaining))
+            retry_s = min(retry_s * policy.backoff_factor, policy.retry_max_s)
+
+    def run(self, max_cycles: int | None = None) -> list[WatchOutcome]:
+        """Catch up, then follow the schedule. `max_cycles=None` runs forever."""
+        self.try_catch_up()
+        outcomes: list[WatchOutcome] = []
+        while max_cycles is None or len(outcomes) < max_cycles:
+            outcomes.append(self.wait_for_next_publication())
+        return outcomes
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+from dataclasses import dataclass
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+from fxpower.app.session import FxSession
+from fxpower.domain.models import Currency, parse_currency
+from fxpower.storage.cache import CacheSnapshot, cache_generation, read_snapshot
+from fxpower.storage.sqlite_cache import is_sqlite_path
+
+
+@dataclass(frozen=True, slots=True)
+class ServeConfig:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    poll_interval_s: float = 1.0  # how often the cache file is checked for changes
+
+
+# (mtime_ns, size, inode): cheap to stat, changes on every rewrite or rename
+FileSignature = tuple[int, int, int]
+
+
+def _signature(path: Path) -> FileSignature | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    if is_sqlite_path(path):
+        # WAL commits can leave the main file untouched; the generation always moves
+        return (cache_generation(path), st.st_size, st.st_ino)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class CacheState:
+    """One loaded cache plus lazily memoized per-base outputs.
+
+    A state never changes after construction apart from its memo; reloads build a
+    new state and swap it in, so a request always sees one consistent cache.
+    """
+
+    def __init__(
+        self, cache: pd.DataFrame, signature: FileSignature | None, generation: int = 0
+    ) -> None:
+        self.cache = cache
+        self.signature = signature
+        self.generation = generation
+        self.session = FxSession(cache, generation=generation)
+        self._bodies: dict[tuple[str, Currency], bytes] = {}
+
+    def scores(self, base: Currency) -> pd.DataFrame:
+        return self.session.scores(base)
+
+    def rankings(self, base: Currency) -> dict[str, pd.DataFrame]:
+        return self.session.rankings(base)
+
+    def report_html(self, base: Currency) -> str:
+        return self.session.report(base)
+
+    def body(self, kind: str, base: Currency) -> bytes:
+        """Encoded response body for `kind` in {scores, rankings, report}, memoized."""
+        key = (kind, base)
+        cached = self._bodies.get(key)
+        if cached is not None:
+            return cached
+
+        if kind == "scores":
+            payload: object = _records(self.scores(base))
+        elif kind == "rankings":
+            payload = {name: _records(df) for name, df in self.rankings(base).items()}
+        elif kind == "report":
+            body = self.report_html(base).encode("utf-8")
+            self._bodies[key] = body
+            return body
+        else:
+            raise ValueError(f"Unknown response kind: {kind}")
+
+        body = json.dumps(payload).encode("utf-8")
+        self._bodies[key] = body
+        return body
+
+
+class CacheHolder:
+    """Holds the current CacheState for a cache file and reloads it on change."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._state = _load_state(path, _signature(path))
+
+    @property
+    def state(self) -> CacheState:
+        return self._state
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the file signature changed. Returns True if a new state was swapped in.
+
+        Cache writes are atomic renames, so a read sees one whole generation; a failed
+        read still keeps the previous state and the next poll retries.
+        """
+        sig = _signature(self.path)
+        if sig == self._state.signature:
+            return False
+        try:
+            new_state = _load_state(self.path, sig)
+        except Exception:
+            return False
+        # single reference assignment: readers see either the old or the new state
+        self._state = new_state
+        return True
+
+
+def _load_state(path: Path, signature: FileSignature | None) -> CacheState:
+    snapshot: CacheSnapshot = read_snapshot(path)
+    return CacheState(snapshot.data, signature, snapshot.generation)
+
+
+def _json_value(v: object) -> object:
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if hasattr(v, "item"):  # numpy scalars
+        return _json_value(v.item())
+    return v
+
+
+def _records(df: pd.DataFrame) -> list[dict[str, object]]:
+    return [
+        {str(k): _json_value(v) for k, v in row.items()} for row in df.to_dict(orient="records")
+    ]
+
+
+def _make_handler(holder: CacheHolder) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: object) -> None:
+            pass  # keep stdout quiet under load
+
+        def _send(self, status: HTTPStatus, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: HTTPStatus, payload: object) -> None:
+            self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+        def do_GET(self) -> None:
+            parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+            state = holder.state
+
+            if parts == ["health"]:
+                self._send_json(
+                    HTTPStatus.OK,
+                    {"status": "ok", "rows": len(state.cache), "generation": state.generation},
+                )
+                return
+
+            if len(parts) != 2 or parts[0] not in ("scores", "rankings", "report"):
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {self.path}"})
+                return
+
+            try:
+                base = parse_currency(parts[1])
+            except ValueError as exc:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+                return
+
+            kind = parts[0]
+            content_type = "text/html; charset=utf-8" if kind == "report" else "application/json"
+            self._send(HTTPStatus.OK, state.body(kind, base), content_type)
+
+    return Handler
+
+
+def _watch(holder: CacheHolder, interval_s: float, stop: threading.Event) -> None:
+    while not stop.wait(interval_s):
+        holder.reload_if_changed()
+
+
+class FxServer:
+    """HTTP server over an in-memory cache, with a background file watcher."""
+
+    def __init__(self, cache_path: Path, config: ServeConfig | None = None) -> None:
+        self.config = config or ServeConfig()
+        self.holder = CacheHolder(cache_path)
+        self.httpd = ThreadingHTTPServer(
+            (self.config.host, self.config.port), _make_handler(self.holder)
+        )
+        self.httpd.daemon_threads = True
+        self._stop = threading.Event()
+        self._watcher = threading.Thread(
+            target=_watch,
+            args=(self.holder, self.config.poll_interval_s, self._stop),
+            daemon=True,
+        )
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self.httpd.server_address[:2]
+        return str(host), int(port)
+
+    def serve_forever(self) -> None:
+        self._watcher.start()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self._stop.set()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
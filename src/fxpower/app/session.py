@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TypeVar
+
+import pandas as pd
+
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import (
+    ScoreWeights,
+    build_rankings,
+    score_pair_series,
+    split_pair_series,
+)
+from fxpower.analytics.scenario import PairScenario, build_pair_scenario
+from fxpower.domain.models import Currency, parse_currency, targets_for_base
+from fxpower.reporting.report import render_report_html
+from fxpower.storage.cache import (
+    cache_generation,
+    merge_cache,
+    merge_into_cache,
+    read_snapshot,
+)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class MemoInfo:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+def _currency(c: Currency | str) -> Currency:
+    return c if isinstance(c, Currency) else parse_currency(c)
+
+
+class FxSession:
+    """A loaded cache plus memoized pair series, scores, rankings and reports.
+
+    Results live in a size-bounded LRU keyed on (cache generation, call, params);
+    `reload()` and `merge()` move the generation, so stale results are never
+    served. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        cache: pd.DataFrame,
+        cache_path: Path | None = None,
+        generation: int = 0,
+        maxsize: int = 128,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.cache_path = cache_path
+        self.maxsize = maxsize
+        self._cache = cache
+        self._generation = generation
+        self._lock = threading.RLock()
+        self._memo: OrderedDict[tuple[Hashable, ...], object] = OrderedDict()
+        self._building: dict[tuple[Hashable, ...], Future] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def open(cls, cache_path: Path, maxsize: int = 128) -> FxSession:
+        """Load a session from a cache file (Parquet or SQLite)."""
+        snapshot = read_snapshot(cache_path)
+        return cls(snapshot.data, cache_path, snapshot.generation, maxsize)
+
+    @property
+    def cache(self) -> pd.DataFrame:
+        return self._cache
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def _swap(self, cache: pd.DataFrame, generation: int) -> None:
+        with self._lock:
+            self._cache = cache
+            self._generation = generation
+            self._memo.clear()  # older generations can never be hit again
+
+    def reload(self) -> bool:
+        """Re-read the cache file if its generation moved. Returns True if it did."""
+        if self.cache_path is None:
+            return False
+        if cache_generation(self.cache_path) == self._generation:
+            return False
+        snapshot = read_snapshot(self.cache_path)
+        self._swap(snapshot.data, snapshot.generation)
+        return True
+
+    def merge(self, incoming: pd.DataFrame) -> int:
+        """Merge new rows (incoming wins), persisting them when the session has a file.
+
+        Returns the number of rows added.
+        """
+        with self._lock:
+            before = len(self._cache)
+            if self.cache_path is None:
+                merged = merge_cache(self._cache, incoming)
+                generation = self._generation + 1
+            else:
+                merged = merge_into_cache(self._cache, incoming, self.cache_path)
+                generation = cache_generation(self.cache_path)
+            self._swap(merged, generation)
+            return len(merged) - before
+
+    def _memoized(self, key: tuple[Hashable, ...], build: Callable[[], T]) -> T:
+        # The lock only guards lookups and inserts; builds run outside it, so a slow
+        # rebuild never blocks other keys. Threads asking for a key that is being
+        # built wait for that build instead of repeating it.
+        with self._lock:
+            generation = self._generation
+            full_key = (generation, *key)
+            if full_key in self._memo:
+                self._hits += 1
+                self._memo.move_to_end(full_key)
+                return self._memo[full_key]
+            pending = self._building.get(full_key)
+            if pending is None:
+                self._misses += 1
+                pending = self._building[full_key] = Future()
+                owner = True
+            else:
+                self._hits += 1
+                owner = False
+
+        if not owner:
+            return pending.result()
+        try:
+            value = build()
+        except BaseException as exc:
+            with self._lock:
+                self._building.pop(full_key, None)
+            pending.set_exception(exc)
+            raise
+        with self._lock:
+            self._building.pop(full_key, None)
+            # a reload during the build moved the generation: this key is unreachable
+            if self._generation == generation:
+                self._memo[full_key] = value
+                if len(self._memo) > self.maxsize:
+                    self._memo.popitem(last=False)
+        pending.set_result(value)
+        return value
+
+    def memo_info(self) -> MemoInfo:
+        with self._lock:
+            return MemoInfo(self._hits, self._misses, len(self._memo), self.maxsize)
+
+    def pair_series(self) -> dict[tuple[str, str], pd.Series]:
+        """All (base, quote) -> date-indexed rate series, split in one pass."""
+        return self._memoized(("pair_series",), lambda: split_pair_series(self._cache))
+
+    def series(self, base: Currency | str, quote: Currency | str) -> pd.Series:
+        """BASE per 1 QUOTE rates, date-indexed and sorted (empty if not cached)."""
+        key = (_currency(base).value, _currency(quote).value)
+        return self.pair_series().get(key, pd.Series(dtype="float64"))
+
+    def scores(
+        self,
+        base: Currency | str,
+        defaults: MetricDefaults | None = None,
+        weights: ScoreWeights | None = None,
+    ) -> pd.DataFrame:
+        """Same as `rank_targets(cache, base, defaults, weights)`, memoized."""
+        b = _currency(base)
+
+        def build() -> pd.DataFrame:
+            series = {t: self.series(b, t) for t in targets_for_base(b)}
+            return score_pair_series(series, defaults=defaults, weights=weights)
+
+        return self._memoized(("scores", b, defaults, weights), build)
+
+    def rankings(
+        self,
+        base: Currency | str,
+        defaults: MetricDefaults | None = None,
+        weights: ScoreWeights | None = None,
+    ) -> dict[str, pd.DataFrame]:
+        b = _currency(base)
+        return self._memoized(
+            ("rankings", b, defaults, weights),
+            lambda: build_rankings(self.scores(b, defaults, weights)),
+        )
+
+    def scenarios(
+        self,
+        base: Currency | str,
+        defaults: MetricDefaults | None = None,
+        weights: ScoreWeights | None = None,
+    ) -> dict[str, PairScenario]:
+        """Per-target what-if models (sorted history + cached moments), memoized."""
+        b = _currency(base)
+
+        def build() -> dict[str, PairScenario]:
+            out: dict[str, PairScenario] = {}
+            for t in targets_for_base(b):
+                s = self.series(b, t)
+                if not s.empty:
+                    out[t.value] = build_pair_scenario(t, s, defaults, weights)
+            return out
+
+        return self._memoized(("scenarios", b, defaults, weights), build)
+
+    def report(self, base: Currency | str) -> str:
+        """Report HTML for `base` (as written by `generate_report_html`)."""
+        b = _currency(base)
+        return self._memoized(
+            ("report", b), lambda: render_report_html(self.pair_series(), b, scores=self.scores(b))
+        )
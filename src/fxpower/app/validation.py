@@ -0,0 +1,404 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage.atomic import atomic_write, ensure_parent_dir
+from fxpower.storage.cache import CACHE_SCHEMA
+
+VALIDATION_ACTIONS: tuple[str, ...] = ("warn", "quarantine", "reject")
+CHECKS: tuple[str, ...] = ("invalid", "missing", "triangular", "stale", "spike")
+ISSUE_COLUMNS: tuple[str, ...] = ("date", "base", "quote", "rate", "check", "score")
+
+QUARANTINE_SCHEMA = pa.schema(
+    [*CACHE_SCHEMA, pa.field("check", pa.string()), pa.field("score", pa.float64())]
+)
+
+_MAD_TO_SIGMA = 1.4826  # MAD of a normal distribution is 0.6745 sigma
+_CHUNK_VALUES = 1 << 22  # bound on the rolling-window block materialized at once
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationPolicy:
+    """What counts as bad incoming data and what to do with it.
+
+    - triangular: |log(A/C) - log(A/B * B/C)| above `triangular_tol`, against
+      the median over all B (so one corrupt cell does not taint its neighbours)
+    - stale: the same rate `stale_repeats` observations in a row; pairs between
+      two `stale_exempt` codes (e.g. a currency board and its anchor) never are
+    - spike: a daily log return of a currency's consensus level more than
+      `spike_threshold` robust sigmas (1.4826 * rolling MAD over `spike_window`
+      returns) from the rolling median; flags every pair of that currency
+
+    `action`: "warn" keeps every row, "quarantine" drops flagged rows into a
+    sidecar file, "reject" raises `ValidationError` and writes nothing.
+    """
+
+    action: str = "warn"
+    triangular_tol: float = 1e-6
+    stale_repeats: int = 5
+    stale_exempt: tuple[str, ...] = ()
+    spike_window: int = 60
+    spike_threshold: float = 10.0
+    spike_min_history: int = 20
+    spike_floor: float = 1e-4  # lower bound of the robust sigma (log return)
+
+    def __post_init__(self) -> None:
+        if self.action not in VALIDATION_ACTIONS:
+            raise ValueError(
+                f"Unknown validation action '{self.action}'. "
+                f"Supported: {', '.join(VALIDATION_ACTIONS)}"
+            )
+        if self.triangular_tol <= 0:
+            raise ValueError("triangular_tol must be > 0")
+        if self.stale_repeats < 2:
+            raise ValueError("stale_repeats must be >= 2")
+        if self.spike_window < 2:
+            raise ValueError("spike_window must be >= 2")
+        if not 1 <= self.spike_min_history <= self.spike_window:
+            raise ValueError("spike_min_history must be in [1, spike_window]")
+        if self.spike_threshold <= 0 or self.spike_floor <= 0:
+            raise ValueError("spike_threshold and spike_floor must be > 0")
+
+    @property
+    def history_days(self) -> int:
+        """Cached days before the incoming ones that the checks look back on."""
+        return max(self.spike_window + 1, self.stale_repeats - 1)
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationReport:
+    rows: int  # incoming rows checked
+    issues: pd.DataFrame  # ISSUE_COLUMNS, one row per failed check
+    action: str
+    quarantined: int = 0  # rows moved to the quarantine file
+
+    @property
+    def ok(self) -> bool:
+        return self.issues.empty
+
+    def counts(self) -> dict[str, int]:
+        counts = self.issues["check"].value_counts()
+        return {c: int(counts[c]) for c in CHECKS if c in counts}
+
+    def summary(self) -> str:
+        if self.ok:
+            return f"{self.rows} rows passed validation"
+        by_check = ", ".join(f"{c}: {n}" for c, n in self.counts().items())
+        text = f"{len(self.issues)} issue(s) in {self.rows} incoming rows ({by_check})"
+        if self.quarantined:
+            text += f"; {self.quarantined} rows quarantined"
+        return text
+
+
+class ValidationError(ValueError):
+    """Incoming rates failed validation under the "reject" policy."""
+
+    def __init__(self, report: ValidationReport) -> None:
+        super().__init__(f"Incoming rates rejected: {report.summary()}")
+        self.report = report
+
+
+def quarantine_path(cache_path: Path) -> Path:
+    """Sidecar file holding quarantined rows next to the cache (any cache backend)."""
+    return cache_path.with_name(f"{cache_path.stem}.quarantine.parquet")
+
+
+def read_quarantine(path: Path) -> pa.Table:
+    if not path.exists():
+        return QUARANTINE_SCHEMA.empty_table()
+    return pq.read_table(path).cast(QUARANTINE_SCHEMA)
+
+
+def _append_quarantine(path: Path, rows: pa.Table) -> None:
+    table = pa.concat_tables([read_quarantine(path), rows.cast(QUARANTINE_SCHEMA)])
+    # the same cell can be re-fetched and flagged again: keep the latest entry
+    df = table.to_pandas().drop_duplicates(
+        subset=["date", "base", "quote", "check"], keep="last", ignore_index=True
+    )
+    out = pa.Table.from_pandas(df, schema=QUARANTINE_SCHEMA, preserve_index=False)
+    ensure_parent_dir(path)
+    atomic_write(path, lambda tmp: pq.write_table(out, tmp))
+
+
+def _nanmedian_last(a: np.ndarray) -> np.ndarray:
+    """Median over the last axis ignoring NaN (NaN where all are NaN).
+
+    Sort-based: `np.nanmedian` falls back to a Python loop over rows that
+    contain NaN.
+    """
+    s = np.sort(a, axis=-1)  # NaN sorts last
+    n = (~np.isnan(a)).sum(axis=-1)
+    last = a.shape[-1] - 1
+    lo = np.take_along_axis(s, np.clip((n - 1) // 2, 0, last)[..., None], axis=-1)[..., 0]
+    hi = np.take_along_axis(s, np.clip(n // 2, 0, last)[..., None], axis=-1)[..., 0]
+    return np.where(n > 0, (lo + hi) / 2.0, np.nan)
+
+
+@dataclass(frozen=True, slots=True)
+class _Cube:
+    days: np.ndarray  # datetime64[D], sorted
+    codes: tuple[str, ...]
+    logs: np.ndarray  # [day, base, quote] log rate; NaN where missing or invalid
+    day_idx: np.ndarray  # per input row
+    base_idx: np.ndarray
+    quote_idx: np.ndarray
+
+
+def _cube(table: pa.Table, codes: tuple[str, ...]) -> _Cube:
+    dates = table["date"].cast(pa.date32()).to_numpy()
+    days, day_idx = np.unique(dates, return_inverse=True)
+    value_set = pa.array(codes)
+    base_idx = pc.index_in(table["base"], value_set=value_set).to_numpy().astype(np.intp)
+    quote_idx = pc.index_in(table["quote"], value_set=value_set).to_numpy().astype(np.intp)
+    rates = table["rate"].cast(pa.float64()).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.where(np.isfinite(rates) & (rates > 0), np.log(rates), np.nan)
+    cube = np.full((len(days), len(codes), len(codes)), np.nan)
+    cube[day_idx, base_idx, quote_idx] = logs
+    return _Cube(days, codes, cube, day_idx, base_idx, quote_idx)
+
+
+def _levels(cube: _Cube) -> np.ndarray:
+    """Consensus log level of each code against the anchor (EUR if present): [day, code].
+
+    A code's level is the median over every third code C of
+    log(code/C) - log(anchor/C), so a single corrupt cell moves no level.
+    """
+    n = len(cube.codes)
+    logs = cube.logs.copy()
+    idx = np.arange(n)
+    logs[:, idx, idx] = 0.0
+    # a missing direction is implied by its inverse
+    logs = np.where(np.isnan(logs), -np.swapaxes(logs, 1, 2), logs)
+    anchor = cube.codes.index("EUR") if "EUR" in cube.codes else 0
+    return _nanmedian_last(logs - logs[:, anchor : anchor + 1, :])
+
+
+def _stale_runs(logs: np.ndarray) -> np.ndarray:
+    """Number of identical consecutive observations ending on each day, per cell."""
+    same = logs[1:] == logs[:-1]  # NaN never equals
+    count = np.cumsum(same, axis=0)
+    since_change = count - np.maximum.accumulate(np.where(same, 0, count), axis=0)
+    return np.concatenate([np.ones((1, *logs.shape[1:]), dtype=np.int64), since_change + 1])
+
+
+def _spike_scores(logs: np.ndarray, days: np.ndarray, policy: ValidationPolicy) -> np.ndarray:
+    """Robust z-score of the log return into each day index in `days`, per series.
+
+    NaN without enough history before the day.
+    """
+    flat = logs.reshape(len(logs), -1)
+    returns = np.diff(flat, axis=0)  # returns[j] is the move into day j + 1
+    out = np.full((len(days), flat.shape[1]), np.nan)
+    w = policy.spike_window
+    windows = np.lib.stride_tricks.sliding_window_view(returns, w, axis=0)  # [j, cell, w]
+    todo = np.flatnonzero(days - 1 >= w)
+    step = max(1, _CHUNK_VALUES // max(1, flat.shape[1] * w))
+    for start in range(0, len(todo), step):
+        k = todo[start : start + step]
+        j = days[k] - 1
+        win = windows[j - w]  # the w returns before return j
+        med = _nanmedian_last(win)
+        mad = _nanmedian_last(np.abs(win - med[..., None]))
+        scale = np.maximum(_MAD_TO_SIGMA * mad, policy.spike_floor)
+        z = np.abs(returns[j] - med) / scale
+        enough = (~np.isnan(win)).sum(axis=-1) >= policy.spike_min_history
+        out[k] = np.where(enough, z, np.nan)
+    return out.reshape(len(days), *logs.shape[1:])
+
+
+def validate_rates(
+    incoming: pa.Table, history: pa.Table | None = None, policy: ValidationPolicy | None = None
+) -> ValidationReport:
+    """Check incoming cache rows (cache schema) against each other and recent history.
+
+    `history` holds cached rows dated before the incoming ones (see
+    `ValidationPolicy.history_days`); the stale and spike checks need it, the
+    triangular and missing-currency checks only look at the incoming days.
+    Every check is vectorized over all days and pairs.
+    """
+    policy = policy or ValidationPolicy()
+    history = history if history is not None else CACHE_SCHEMA.empty_table()
+    with stage("validate", rows_in=incoming.num_rows) as rec:
+        issues = _issues(incoming.cast(CACHE_SCHEMA), history.cast(CACHE_SCHEMA), policy)
+        rec.rows_out = len(issues)
+        return ValidationReport(rows=incoming.num_rows, issues=issues, action=policy.action)
+
+
+def _codes(table: pa.Table) -> list[str]:
+    both = pa.chunked_array([*table["base"].chunks, *table["quote"].chunks], pa.string())
+    return pc.unique(both).to_pylist()
+
+
+def _issues(incoming: pa.Table, history: pa.Table, policy: ValidationPolicy) -> pd.DataFrame:
+    if incoming.num_rows == 0:
+        return pd.DataFrame(columns=list(ISSUE_COLUMNS))
+    codes = tuple(sorted(set(_codes(incoming)) | set(_codes(history))))
+    # stale runs and return windows need the recent history in front of the new days
+    cube = _cube(pa.concat_tables([history, incoming]), codes)
+    n_new = incoming.num_rows
+    day, b, q = cube.day_idx[-n_new:], cube.base_idx[-n_new:], cube.quote_idx[-n_new:]
+    first_new = int(day.min())
+    rates = incoming["rate"].to_numpy()
+    found: list[tuple[str, np.ndarray, np.ndarray]] = []  # (check, row mask, score per row)
+
+    found.append(("invalid", np.isnan(cube.logs[day, b, q]), rates))
+
+    levels = _levels(cube)
+    dev = np.abs(cube.logs[day, b, q] - (levels[day, b] - levels[day, q]))
+    found.append(("triangular", dev > policy.triangular_tol, dev))
+
+    runs = _stale_runs(cube.logs)[day, b, q]
+    exempt = np.isin(np.asarray(codes), policy.stale_exempt)
+    stale = (runs >= policy.stale_repeats) & ~(exempt[b] & exempt[q])
+    found.append(("stale", stale, runs.astype("float64")))
+
+    # a pair moves by the difference of its two legs: a spike in either flags it
+    z_level = _spike_scores(levels, np.arange(first_new, len(cube.days)), policy)
+    z = np.fmax(z_level[day - first_new, b], z_level[day - first_new, q])
+    found.append(("spike", z > policy.spike_threshold, z))
+
+    frames = []
+    code_arr = np.asarray(codes, dtype=object)
+    for check, mask, score in found:
+        if mask.any():
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "date": cube.days[day[mask]],
+                        "base": code_arr[b[mask]],
+                        "quote": code_arr[q[mask]],
+                        "rate": rates[mask],
+                        "check": check,
+                        "score": score[mask],
+                    }
+                )
+            )
+
+    # a code quoted somewhere (or in history) with no valid rate at all on a new day
+    valid = ~np.isnan(cube.logs[first_new:])
+    present = valid.any(axis=2) | valid.any(axis=1)  # [day, code]
+    day_has_rates = present.any(axis=1)
+    d, c = np.nonzero(~present & day_has_rates[:, None])
+    if len(d):
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": cube.days[first_new + d],
+                    "base": code_arr[c],
+                    "quote": "",
+                    "rate": np.nan,
+                    "check": "missing",
+                    "score": np.nan,
+                }
+            )
+        )
+
+    if not frames:
+        return pd.DataFrame(columns=list(ISSUE_COLUMNS))
+    issues = pd.concat(frames, ignore_index=True)
+    issues["date"] = pd.to_datetime(issues["date"]).dt.date
+    return issues.sort_values(by=["date", "base", "quote", "check"], ignore_index=True)
+
+
+def recent_history(existing: pa.Table, before: date, days: int) -> pa.Table:
+    """Cached rows of the last `days` distinct dates before `before`."""
+    if existing.num_rows == 0:
+        return CACHE_SCHEMA.empty_table()
+    dates = existing["date"].cast(pa.date32())
+    earlier = pc.less(dates, pa.scalar(before, pa.date32()))
+    # as days since the epoch: pa.scalar does not take numpy datetime64 values
+    distinct = np.unique(pc.filter(dates, earlier).cast(pa.int32()).to_numpy())
+    if len(distinct) == 0:
+        return CACHE_SCHEMA.empty_table()
+    cutoff = pa.scalar(int(distinct[-days:][0]), pa.int32()).cast(pa.date32())
+    keep = pc.and_(earlier, pc.greater_equal(dates, cutoff))
+    return existing.filter(keep).select(CACHE_SCHEMA.names).cast(CACHE_SCHEMA)
+
+
+class IngestValidator:
+    """Validation stage of an incremental fetch, applying one `ValidationPolicy`.
+
+    Keeps the report of every batch it checked in `reports`.
+    """
+
+    def __init__(self, policy: ValidationPolicy | None = None) -> None:
+        self.policy = policy or ValidationPolicy()
+        self.reports: list[ValidationReport] = []
+
+    def check(self, incoming: pa.Table, existing: pa.Table, cache_path: Path) -> pa.Table:
+        """Validate `incoming` before it is merged into `existing`; returns the rows to merge."""
+        if incoming.num_rows == 0:
+            return incoming
+        start = pc.min(incoming["date"]).as_py()
+        history = recent_history(existing, start, self.policy.history_days)
+        report = validate_rates(incoming, history, self.policy)
+
+        if report.ok or self.policy.action == "warn":
+            self.reports.append(report)
+            return incoming
+        if self.policy.action == "reject":
+            self.reports.append(report)
+            raise ValidationError(report)
+
+        flagged = report.issues[report.issues["check"] != "missing"]
+        bad = pd.DataFrame(
+            {
+                "date": flagged["date"],
+                "base": flagged["base"],
+                "quote": flagged["quote"],
+                "_bad": True,
+            }
+        ).drop_duplicates(subset=["date", "base", "quote"])
+        keys = incoming.select(["date", "base", "quote"]).to_pandas()
+        keys["date"] = pd.to_datetime(keys["date"]).dt.date
+        drop = keys.merge(bad, on=["date", "base", "quote"], how="left")["_bad"].notna()
+        if drop.any():
+            _append_quarantine(
+                quarantine_path(cache_path),
+                pa.Table.from_pandas(
+                    flagged.loc[:, list(ISSUE_COLUMNS)],
+                    schema=QUARANTINE_SCHEMA,
+                    preserve_index=False,
+                ),
+            )
+        self.reports.append(
+            ValidationReport(report.rows, report.issues, report.action, int(drop.sum()))
+        )
+        return incoming.filter(pa.array(~drop.to_numpy()))
+
+    def check_frame(
+        self, incoming: pd.DataFrame, existing: pd.DataFrame, cache_path: Path
+    ) -> pd.DataFrame:
+        """`check` for the DataFrame fetch path."""
+        if incoming.empty:
+            return incoming
+        start = pd.to_datetime(incoming["date"]).min()
+        # plenty of calendar days for `history_days` publication days
+        window = pd.Timedelta(days=2 * self.policy.history_days + 14)
+        dates = pd.to_datetime(existing["date"])
+        recent = existing[(dates >= start - window) & (dates < start)]
+        kept = self.check(_to_table(incoming), _to_table(recent), cache_path)
+        out = kept.to_pandas()
+        out["base"] = out["base"].astype(incoming["base"].dtype)
+        out["quote"] = out["quote"].astype(incoming["quote"].dtype)
+        return out
+
+
+def _to_table(df: pd.DataFrame) -> pa.Table:
+    if df.empty:
+        return CACHE_SCHEMA.empty_table()
+    out = df.loc[:, CACHE_SCHEMA.names].copy()
+    out["date"] = pd.to_datetime(out["date"]).dt.date
+    out["base"] = out["base"].astype(str)
+    out["quote"] = out["quote"].astype(str)
+    return pa.Table.from_pandas(out, schema=CACHE_SCHEMA, preserve_index=False)
@@ -1,20 +1,81 @@
 from __future__ import annotations
 
+import itertools
+import os
+import sys
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from datetime import date
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import typer
 
-from fxpower.app.fetch import FetchPolicy, update_cache_from_eur_source
-from fxpower.domain.models import Currency, parse_currency
-from fxpower.providers.frankfurter import FrankfurterConfig, fetch_eur_timeseries
-from fxpower.reporting.report import generate_report_html
-from fxpower.storage.cache import CachePaths, read_cache
+from fxpower.analytics.backtest import SIGNALS, BacktestConfig, run_backtest
+from fxpower.analytics.executor import BACKENDS, ExecutorConfig, ShardExecutor
+from fxpower.analytics.horizons import VALUE_HORIZONS_YEARS
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import ScoreWeights
+from fxpower.analytics.scan import SCAN_CRITERIA, ScanConfig, scan_columns, scan_universe
+from fxpower.analytics.strength import currency_strength
+from fxpower.analytics.sweep import SweepConfig, SweepGrid, run_sweep
+from fxpower.app.alerts import AlertFiring, Watchlist, evaluate_cache, evaluate_cache_file
+from fxpower.app.backfill import BackfillConfig, run_backfill
+from fxpower.app.export import (
+    EXPORT_FORMATS,
+    ExportResult,
+    RateFilter,
+    export_rates,
+    export_scores,
+    format_for_path,
+)
+from fxpower.app.fetch import FetchPolicy, update_cache_arrow, update_cache_from_eur_source
+from fxpower.app.ingest import ingest_intraday
+from fxpower.app.scheduler import FetchWatcher
+from fxpower.app.serve import FxServer, ServeConfig
+from fxpower.app.session import FxSession
+from fxpower.app.validation import (
+    IngestValidator,
+    ValidationError,
+    ValidationPolicy,
+    ValidationReport,
+)
+from fxpower.domain.models import SUPPORTED_CURRENCIES, Currency, parse_currency
+from fxpower.instrumentation.profiler import Profiler
+from fxpower.providers.frankfurter import (
+    FrankfurterConfig,
+    FrankfurterError,
+    decode_eur_table,
+    fetch_eur_payload,
+    fetch_eur_table,
+    fetch_eur_timeseries,
+)
+from fxpower.providers.http_cache import ResponseCacheConfig
+from fxpower.providers.intraday import IntradayConfig
+from fxpower.reporting.report import ReportPaths, generate_report_html
+from fxpower.storage.artifacts import ArtifactGraph, ArtifactStore
+from fxpower.storage.cache import (
+    DICTIONARY_MODES,
+    LAYOUT_SORTS,
+    PARQUET_CODECS,
+    CachePaths,
+    ParquetLayout,
+    read_cache,
+    read_rates,
+)
+from fxpower.storage.maintenance import CompactionConfig, cache_stats, compact_cache
+from fxpower.storage.outofcore import OutOfCoreConfig, read_pair_series
+from fxpower.storage.sqlite_cache import is_sqlite_path
 
 app = typer.Typer(
     add_completion=False,
     help="fxpower: FX opportunity ranking report (not a forecast).",
 )
+cache_app = typer.Typer(help="Inspect and maintain the rate cache.")
+app.add_typer(cache_app, name="cache")
+export_app = typer.Typer(help="Stream rates and scores to files or stdout for other tools.")
+app.add_typer(export_app, name="export")
 
 
 def _fetch_eur_series_fn(cfg: FrankfurterConfig):
@@ -29,33 +90,403 @@ def _fetch_eur_series_fn(cfg: FrankfurterConfig):
     return _fn
 
 
+def _fetch_eur_table_fn(cfg: FrankfurterConfig):
+    def _fn(start: date, end: date):
+        return fetch_eur_table(
+            start=start,
+            end=end,
+            symbols=["USD", "PLN", "GBP"],
+            cfg=cfg,
+        )
+
+    return _fn
+
+
+def _fetch_eur_payload_fn(cfg: FrankfurterConfig):
+    def _fn(start: date, end: date):
+        return fetch_eur_payload(
+            start=start,
+            end=end,
+            symbols=["USD", "PLN", "GBP"],
+            cfg=cfg,
+        )
+
+    return _fn
+
+
+def _parse_int_list(value: str) -> tuple[int, ...]:
+    try:
+        return tuple(int(v) for v in value.split(",") if v.strip())
+    except ValueError as exc:
+        raise typer.BadParameter(f"Expected comma-separated integers, got '{value}'") from exc
+
+
+def _parse_float_list(value: str) -> tuple[float, ...]:
+    try:
+        return tuple(float(v) for v in value.split(",") if v.strip())
+    except ValueError as exc:
+        raise typer.BadParameter(f"Expected comma-separated numbers, got '{value}'") from exc
+
+
+def _parse_weight_grid(
+    overall: str, value_percentile: str, trend_momentum: str
+) -> tuple[ScoreWeights, ...]:
+    triples: list[tuple[float, float, float]] = []
+    for item in overall.split(","):
+        parts = _parse_float_list(item.replace("/", ","))
+        if len(parts) != 3:
+            raise typer.BadParameter(f"Overall weights must be value/trend/risk, got '{item}'")
+        triples.append((parts[0], parts[1], parts[2]))
+
+    out: list[ScoreWeights] = []
+    for (v, t, r), vp, tm in itertools.product(
+        triples, _parse_float_list(value_percentile), _parse_float_list(trend_momentum)
+    ):
+        try:
+            out.append(
+                ScoreWeights(
+                    value_percentile=vp,
+                    trend_momentum=tm,
+                    overall_value=v,
+                    overall_trend=t,
+                    overall_risk=r,
+                )
+            )
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+    return tuple(out)
+
+
+@contextmanager
+def _profiling(
+    enabled: bool,
+    trace_file: Path | None,
+    cprofile_out: Path | None,
+) -> Iterator[None]:
+    if not (enabled or trace_file or cprofile_out):
+        yield
+        return
+
+    profiler = Profiler(cprofile=cprofile_out is not None)
+    with profiler.activate():
+        yield
+
+    if enabled:
+        typer.echo(profiler.format_table())
+    if trace_file is not None:
+        profiler.write_trace(trace_file)
+        typer.echo(f"Trace written: {trace_file}")
+    if cprofile_out is not None:
+        hottest = profiler.dump_hottest(cprofile_out)
+        if hottest is not None:
+            typer.echo(f"cProfile of hottest stage '{hottest}' written: {cprofile_out}")
+
+
+_PROFILE_HELP = "Print per-stage wall time and data volume."
+_TRACE_HELP = "Write per-stage records to a .json or .jsonl trace file."
+_CPROFILE_HELP = "Dump cProfile stats (pstats format) of the slowest stage to this path."
+_ALERTS_HELP = "Watchlist rules (.toml); checked for pairs that received new rows."
+_ALERT_SINK_HELP = "Append alert firings as JSON lines to this file ('-' or unset: stdout)."
+_ALERT_STATE_HELP = "Alert state file (default: next to the rules, <rules>.state.json)."
+_SCAN_BY_HELP = f"Ranking criterion: {', '.join(SCAN_CRITERIA)} (risk: lowest first)."
+_HTTP_CACHE_HELP = (
+    "Provider response cache in <cache dir>/http_cache: use (old ranges from disk, recent "
+    "ones revalidated), replay (disk only, no network), refresh (re-download) or off."
+)
+_MEMORY_MB_HELP = (
+    "Read the cache batch by batch into per-pair arrays within this many MB instead of "
+    "loading it as one table (for caches that do not fit in memory)."
+)
+# rate-chart points per line in out-of-core mode unless --chart-points says otherwise
+_OUT_OF_CORE_CHART_POINTS = 2_000
+
+
+def _out_of_core_config(memory_mb: float | None) -> OutOfCoreConfig | None:
+    if memory_mb is None:
+        return None
+    try:
+        return OutOfCoreConfig(memory_mb=memory_mb)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
 @app.command()
 def fetch(
     cache_path: Path | None = typer.Option(
         default=None,
-        help="Path to cache parquet file.",
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
     ),
     lookback_days: int = typer.Option(
         default=365 * 5,
         help="Approximate lookback window in days.",
     ),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+    trace_file: Path | None = typer.Option(None, help=_TRACE_HELP),
+    cprofile_out: Path | None = typer.Option(None, help=_CPROFILE_HELP),
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        help="Stay resident and fetch after each ECB publication window.",
+    ),
+    report_base: list[str] | None = typer.Option(
+        None,
+        "--report-base",
+        help="With --watch: regenerate the report for this base when new rows land (repeatable).",
+    ),
+    alerts: Path | None = typer.Option(None, help=_ALERTS_HELP),
+    alert_sink: str | None = typer.Option(None, help=_ALERT_SINK_HELP),
+    alert_state: Path | None = typer.Option(None, help=_ALERT_STATE_HELP),
+    on_invalid: str = typer.Option(
+        "warn",
+        help="What to do with rows failing validation (triangular consistency, stale "
+        "repeats, spikes, missing currencies): warn, quarantine (to <cache>.quarantine"
+        ".parquet) or reject the fetch.",
+    ),
+    http_cache: str = typer.Option("use", help=_HTTP_CACHE_HELP),
 ) -> None:
     """Fetch missing FX data and update local cache."""
     paths = CachePaths.default()
     path = cache_path or paths.cache_file
 
-    cfg = FrankfurterConfig()
+    cfg = FrankfurterConfig(cache=_response_cache_config(path, http_cache))
     policy = FetchPolicy(lookback_days=lookback_days)
+    watchlist = _alert_watchlist(alerts, alert_sink, alert_state) if alerts else None
+    try:
+        validator = IngestValidator(ValidationPolicy(action=on_invalid))
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    if watch:
+        bases = [parse_currency(b) for b in report_base or []]
+        _watch_fetch(path, cfg, policy, bases, watchlist, validator)
+        return
+
+    with _profiling(profile, trace_file, cprofile_out):
+        try:
+            if is_sqlite_path(path):
+                # SQLite upserts only the new rows; nothing to gain from the Arrow path
+                rows = len(
+                    update_cache_from_eur_source(
+                        cache_path=path,
+                        fetch_eur_series=_fetch_eur_series_fn(cfg),
+                        today=date.today(),
+                        policy=policy,
+                        validator=validator,
+                    )
+                )
+            else:
+                table, _ = update_cache_arrow(
+                    cache_path=path,
+                    fetch_eur_table=_fetch_eur_table_fn(cfg),
+                    today=date.today(),
+                    policy=policy,
+                    validator=validator,
+                )
+                rows = table.num_rows
+        except ValidationError as exc:
+            _echo_validation(validator.reports)
+            typer.echo(str(exc), err=True)
+            raise typer.Exit(1) from None
+
+        _echo_validation(validator.reports)
+
+        typer.echo(f"Cache updated: {path}")
+        typer.echo(f"Rows: {rows}")
+
+        if watchlist is not None:
+            _emit_alerts(watchlist, evaluate_cache_file(watchlist.engine, path))
+
+
+@app.command()
+def backfill(
+    start: str = typer.Option(..., help="First date to fetch (YYYY-MM-DD)."),
+    end: str | None = typer.Option(None, help="Last date to fetch (YYYY-MM-DD; default: today)."),
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    chunk_days: int = typer.Option(180, help="Calendar days per request and pipeline chunk."),
+    memory_mb: float = typer.Option(
+        256.0, help="Memory budget; bounds the chunks queued between stages."
+    ),
+    download_workers: int = typer.Option(2, help="Requests in flight at once."),
+    restart: bool = typer.Option(
+        False, "--restart", help="Discard the checkpoint of an interrupted backfill."
+    ),
+    http_cache: str = typer.Option("use", help=_HTTP_CACHE_HELP),
+    on_invalid: str = typer.Option(
+        "warn", help="Validation action per chunk: warn, quarantine or reject."
+    ),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+    trace_file: Path | None = typer.Option(None, help=_TRACE_HELP),
+) -> None:
+    """Fetch a long history in chunks, pipelining downloads, cross rates and writes.
+
+    Finished chunks are checkpointed next to the cache; rerun the same command
+    to resume an interrupted backfill.
+    """
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
 
-    updated = update_cache_from_eur_source(
+    cfg = FrankfurterConfig(cache=_response_cache_config(path, http_cache))
+    try:
+        first = date.fromisoformat(start)
+        last = date.fromisoformat(end) if end else date.today()
+        config = BackfillConfig(
+            chunk_days=chunk_days, memory_mb=memory_mb, download_workers=download_workers
+        )
+        validator = IngestValidator(ValidationPolicy(action=on_invalid))
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    with _profiling(profile, trace_file, None):
+        try:
+            result = run_backfill(
+                path,
+                _fetch_eur_payload_fn(cfg),
+                decode_eur_table,
+                first,
+                last,
+                config=config,
+                validator=validator,
+                restart=restart,
+            )
+        except (FrankfurterError, ValidationError) as exc:
+            _echo_validation(validator.reports)
+            typer.echo(str(exc), err=True)
+            typer.echo("Finished chunks are checkpointed; rerun to resume.", err=True)
+            raise typer.Exit(1) from None
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+
+        _echo_validation(validator.reports)
+        if result.resumed:
+            typer.echo(f"Resumed: {result.resumed} of {result.chunks} chunks already done")
+        typer.echo(f"Cache updated: {path}")
+        typer.echo(f"Chunks: {result.chunks}")
+        typer.echo(f"Rows fetched: {result.rows}")
+
+
+@app.command()
+def ingest(
+    files: list[Path] = typer.Argument(
+        ..., help="Intraday quote files (.csv, .csv.gz or .parquet), oldest first."
+    ),
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    base: str | None = typer.Option(None, help="Base currency, for files without base/quote."),
+    quote: str | None = typer.Option(None, help="Quote currency, for files without base/quote."),
+    tz: str = typer.Option("UTC", help="Time zone whose calendar days the bars cover."),
+    chunk_rows: int = typer.Option(1_000_000, help="Quotes read per chunk (bounds memory)."),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+    trace_file: Path | None = typer.Option(None, help=_TRACE_HELP),
+) -> None:
+    """Resample intraday quotes to daily bars and merge the daily closes into the cache."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    try:
+        config = IntradayConfig(
+            chunk_rows=chunk_rows,
+            tz=tz,
+            base=parse_currency(base).value if base else None,
+            quote=parse_currency(quote).value if quote else None,
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    with _profiling(profile, trace_file, None):
+        try:
+            result = ingest_intraday(files, path, config)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+
+    typer.echo(f"Quotes read: {result.quotes}")
+    typer.echo(f"Daily bars: {result.bars} (written to {result.bars_file})")
+    typer.echo(f"Cache updated: {path}")
+    typer.echo(f"Rows: {result.cache_rows}")
+
+
+def _alert_watchlist(rules: Path, sink: str | None, state: Path | None) -> Watchlist:
+    try:
+        return Watchlist.load(rules, None if sink in (None, "-") else Path(sink), state)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+
+def _emit_alerts(watchlist: Watchlist, firings: list[AlertFiring]) -> None:
+    n = watchlist.record(firings)
+    # on stdout the firings own the stream, so the summary goes to stderr
+    where = watchlist.sink if watchlist.sink is not None else "stdout"
+    typer.echo(f"Alerts fired: {n} (to {where})", err=watchlist.sink is None)
+
+
+def _response_cache_config(cache_path: Path, mode: str) -> ResponseCacheConfig | None:
+    try:
+        config = ResponseCacheConfig(directory=cache_path.parent / "http_cache", mode=mode)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    return None if mode == "off" else config
+
+
+def _echo_validation(reports: list[ValidationReport]) -> None:
+    for report in reports:
+        if report.ok:
+            continue
+        typer.echo(f"Validation: {report.summary()}", err=True)
+        typer.echo(
+            report.issues.head(20).to_string(index=False, float_format=lambda x: f"{x:.4g}"),
+            err=True,
+        )
+
+
+def _report_graph() -> ArtifactGraph:
+    return ArtifactGraph(ArtifactStore(ReportPaths().artifacts_dir))
+
+
+def _watch_fetch(
+    path: Path,
+    cfg: FrankfurterConfig,
+    policy: FetchPolicy,
+    report_bases: list[Currency],
+    watchlist: Watchlist | None = None,
+    validator: IngestValidator | None = None,
+) -> None:
+    def on_update(cache, added: int) -> None:
+        typer.echo(f"New rows: {added} (total {len(cache)})")
+        if watchlist is not None:
+            _emit_alerts(watchlist, evaluate_cache(watchlist.engine, cache))
+        for b in report_bases:
+            out_file = generate_report_html(cache, base=b, graph=_report_graph())
+            typer.echo(f"Report generated: {out_file}")
+
+    watcher = FetchWatcher(
         cache_path=path,
         fetch_eur_series=_fetch_eur_series_fn(cfg),
-        today=date.today(),
-        policy=policy,
+        fetch_policy=policy,
+        on_update=on_update,
+        # a rejected day is retried like an unpublished one: upstream may correct it
+        transient_errors=(FrankfurterError, ValidationError),
+        validator=validator,
+        on_error=lambda exc: typer.echo(
+            f"Catch-up failed, following the schedule: {exc}", err=True
+        ),
     )
-
-    typer.echo(f"Cache updated: {path}")
-    typer.echo(f"Rows: {len(updated)}")
+    reports = validator.reports if validator is not None else []
+    typer.echo(f"Watching {path} (latest day: {watcher.latest_day})")
+    try:
+        watcher.try_catch_up()
+        _echo_validation(reports)
+        while True:
+            seen = len(reports)
+            outcome = watcher.wait_for_next_publication()
+            _echo_validation(reports[seen:])
+            status = "published" if outcome.published else "not published, giving up"
+            typer.echo(f"{outcome.publication_day}: {status} after {outcome.attempts} attempt(s)")
+    except KeyboardInterrupt:
+        typer.echo("Stopping.")
 
 
 @app.command()
@@ -68,16 +499,519 @@ def report(
     ),
     cache_path: Path | None = typer.Option(
         default=None,
-        help="Path to cache parquet file.",
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    drawdown_weight: float = typer.Option(
+        0.0,
+        help="Share of the risk score taken from the 5y max drawdown (rest is volatility).",
+    ),
+    explain: bool = typer.Option(
+        False,
+        "--explain",
+        help="List which report artifacts were rebuilt or reused, and why.",
+    ),
+    executor: str = typer.Option(
+        "serial",
+        help=f"Backend for per-pair scoring: {', '.join(BACKENDS)}.",
+    ),
+    workers: int = typer.Option(1, help="Threads or worker processes for --executor."),
+    scan_top: int | None = typer.Option(
+        None, help="Add a section with the global top N pairs across all bases."
     ),
+    scan_by: str = typer.Option("overall", help=_SCAN_BY_HELP),
+    memory_mb: float | None = typer.Option(None, help=_MEMORY_MB_HELP),
+    chart_points: int | None = typer.Option(
+        None,
+        help=(
+            "Points per line of the rates chart; longer histories are downsampled "
+            f"(default: all, or {_OUT_OF_CORE_CHART_POINTS} with --memory-mb)."
+        ),
+    ),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+    trace_file: Path | None = typer.Option(None, help=_TRACE_HELP),
+    cprofile_out: Path | None = typer.Option(None, help=_CPROFILE_HELP),
 ) -> None:
-    """Generate a single-page HTML report for the chosen base currency."""
+    """Generate a single-page HTML report for the chosen base currency.
+
+    Fragments whose input pairs did not change since the last run are reused
+    from reports/.artifacts.
+    """
     base_cur: Currency = parse_currency(base)
+    try:
+        weights = ScoreWeights(risk_drawdown=drawdown_weight)
+        executor_cfg = ExecutorConfig(backend=executor, workers=workers)
+        scan = ScanConfig(top=scan_top, by=scan_by) if scan_top is not None else None
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    if chart_points is not None and chart_points < 4:
+        raise typer.BadParameter("chart_points must be >= 4")
+    out_of_core = _out_of_core_config(memory_mb)
+    if out_of_core is not None and chart_points is None:
+        chart_points = _OUT_OF_CORE_CHART_POINTS
+
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    with _profiling(profile, trace_file, cprofile_out), ShardExecutor(executor_cfg) as pool:
+        # the report only looks at the base's own pairs; the scan needs all of them
+        if out_of_core is None:
+            cache_df = read_rates(path, base=base_cur.value)
+            universe = read_cache(path) if scan is not None else None
+        else:
+            try:
+                bases = () if scan is not None else (base_cur.value,)
+                universe = read_pair_series(path, bases, out_of_core)
+            except ValueError as exc:
+                raise typer.BadParameter(str(exc)) from exc
+            cache_df = {k: s for k, s in universe.items() if k[0] == base_cur.value}
+            universe = universe if scan is not None else None
+        graph = _report_graph()
+        out_file = generate_report_html(
+            cache_df,
+            base=base_cur,
+            weights=weights,
+            graph=graph,
+            executor=pool,
+            scan=scan,
+            universe=universe,
+            chart_points=chart_points,
+        )
+
+        typer.echo(f"Report generated: {out_file}")
+        if explain:
+            typer.echo(graph.explain())
+
+
+@app.command()
+def scan(
+    top: int = typer.Option(20, "--top", "-k", help="Number of pairs to list."),
+    by: str = typer.Option("overall", help=_SCAN_BY_HELP),
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    drawdown_weight: float = typer.Option(
+        0.0,
+        help="Share of the risk score taken from the 5y max drawdown (rest is volatility).",
+    ),
+    executor: str = typer.Option(
+        "serial",
+        help=f"Backend for per-pair scoring: {', '.join(BACKENDS)}.",
+    ),
+    workers: int = typer.Option(1, help="Threads or worker processes for --executor."),
+    memory_mb: float | None = typer.Option(None, help=_MEMORY_MB_HELP),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+) -> None:
+    """List the best pairs across every base in the cache (e.g. cheapest vs history)."""
+    try:
+        config = ScanConfig(top=top, by=by)
+        weights = ScoreWeights(risk_drawdown=drawdown_weight)
+        executor_cfg = ExecutorConfig(backend=executor, workers=workers)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    out_of_core = _out_of_core_config(memory_mb)
 
     paths = CachePaths.default()
     path = cache_path or paths.cache_file
 
-    cache_df = read_cache(path)
-    out_file = generate_report_html(cache_df, base=base_cur)
+    with _profiling(profile, None, None), ShardExecutor(executor_cfg) as pool:
+        if out_of_core is None:
+            cache = read_cache(path)
+        else:
+            try:
+                cache = read_pair_series(path, config=out_of_core)
+            except ValueError as exc:
+                raise typer.BadParameter(str(exc)) from exc
+        result = scan_universe(cache, config, weights=weights, executor=pool)
+        if result.empty:
+            typer.echo(f"No data in {path}")
+            return
+        view = result.loc[:, scan_columns(config)]
+        typer.echo(view.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+
+@app.command()
+def alerts(
+    rules: Path = typer.Argument(..., help="Watchlist rules (.toml)."),
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    sink: str | None = typer.Option(None, help=_ALERT_SINK_HELP),
+    state: Path | None = typer.Option(None, help=_ALERT_STATE_HELP),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+) -> None:
+    """Check watchlist rules against the cache (only pairs with new rows since the last check)."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+    watchlist = _alert_watchlist(rules, sink, state)
+
+    with _profiling(profile, None, None):
+        _emit_alerts(watchlist, evaluate_cache_file(watchlist.engine, path))
+
+
+@app.command()
+def serve(
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    host: str = typer.Option("127.0.0.1", help="Interface to bind."),
+    port: int = typer.Option(8765, help="Port to listen on."),
+    poll_interval: float = typer.Option(
+        1.0,
+        help="Seconds between checks of the cache file for changes.",
+    ),
+) -> None:
+    """Serve scores, rankings (JSON) and reports (HTML) from an in-memory cache."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    server = FxServer(path, ServeConfig(host=host, port=port, poll_interval_s=poll_interval))
+    bound_host, bound_port = server.address
+    typer.echo(f"Serving {path} on http://{bound_host}:{bound_port}")
+    typer.echo("Endpoints: /health, /scores/<BASE>, /rankings/<BASE>, /report/<BASE>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        typer.echo("Stopping.")
+
+
+@app.command()
+def backtest(
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    signal: str = typer.Option(
+        "overall_score",
+        help=f"Score to evaluate ({', '.join(SIGNALS)}).",
+    ),
+    horizons: str = typer.Option("5,20,60", help="Forward return horizons in observations."),
+    value_window: int | None = typer.Option(
+        None,
+        help="Lookback (observations) for percentile/z-score; default: the last 5 years.",
+    ),
+    min_history: int = typer.Option(252, help="Observations required before scoring a day."),
+    top_fraction: float = typer.Option(0.10, help="Share of observations counted as 'top'."),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+) -> None:
+    """Check historically whether high-score days preceded favourable moves."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    try:
+        config = BacktestConfig(
+            horizons=_parse_int_list(horizons),
+            signal=signal,
+            value_window=value_window,
+            min_history=min_history,
+            top_fraction=top_fraction,
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    with _profiling(profile, None, None):
+        cache = read_cache(path)
+        if cache.empty:
+            typer.echo(f"No data in {path}")
+            return
+        try:
+            result = run_backtest(cache, config=config)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+
+        typer.echo(f"Signal: {signal}")
+        typer.echo(result.summary.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+        typer.echo("")
+        typer.echo("Mean forward return by score decile (1 = lowest score):")
+        typer.echo(result.deciles.to_string(float_format=lambda x: f"{x:.5f}"))
+
+
+@app.command()
+def strength(
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    mom_window: int = typer.Option(60, help="Momentum window (observations) used for ranking."),
+    sma_window: int = typer.Option(200, help="SMA window for the index-vs-SMA distance."),
+) -> None:
+    """Rank every currency by strength against all others (one pass over the cache)."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    defaults = MetricDefaults(mom_window=mom_window, sma_window=sma_window)
+    result = currency_strength(read_cache(path), defaults=defaults)
+    if result.table.empty:
+        typer.echo(f"No data in {path}")
+        return
+    typer.echo(result.table.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+
+@app.command()
+def scenario(
+    base: str = typer.Option(..., "--base", "-b", help="Base currency (PLN, USD, EUR, GBP)."),
+    target: str | None = typer.Option(None, "--target", "-t", help="Only this target."),
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    max_shift: float = typer.Option(5.0, help="Largest move of today's rate, in percent."),
+    steps: int = typer.Option(11, help="Number of evenly spaced moves from -max to +max."),
+) -> None:
+    """Show how scores would change if today's rate moved by +/- x%."""
+    base_cur = parse_currency(base)
+    if steps < 2:
+        raise typer.BadParameter("steps must be >= 2")
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    session = FxSession(read_rates(path, base=base_cur.value), cache_path=path)
+    models = session.scenarios(base_cur)
+    if target is not None:
+        code = parse_currency(target).value
+        models = {t: m for t, m in models.items() if t == code}
+    if not models:
+        typer.echo(f"No data for base={base_cur.value}")
+        return
+
+    shifts = np.linspace(-max_shift, max_shift, steps) / 100.0
+    table = pd.concat([m.evaluate_shifts(shifts) for m in models.values()], ignore_index=True)
+    columns = ["target", "shift", "rate", "percentile", "zscore", "value_score", "overall_score"]
+    typer.echo(table.loc[:, columns].to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+
+@app.command()
+def sweep(
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    vol_windows: str = typer.Option("60,90,120", help="Volatility windows to try."),
+    mom_windows: str = typer.Option("20,60,120", help="Momentum windows to try."),
+    sma_windows: str = typer.Option("100,200", help="SMA windows to try."),
+    overall_weights: str = typer.Option(
+        "0.55/0.25/0.20",
+        help="Comma-separated value/trend/risk weight triples to try.",
+    ),
+    value_percentile_weights: str = typer.Option(
+        "0.6", help="Percentile share of the value score to try (rest is z-score)."
+    ),
+    trend_momentum_weights: str = typer.Option(
+        "0.6", help="Momentum share of the trend score to try (rest is SMA distance)."
+    ),
+    signal: str = typer.Option("overall_score", help=f"Score to evaluate ({', '.join(SIGNALS)})."),
+    horizons: str = typer.Option("20", help="Forward return horizons; the first one sorts."),
+    workers: int = typer.Option(1, help="Worker processes (1 = in-process)."),
+    top: int = typer.Option(20, help="Show only the best N configurations."),
+    out: Path | None = typer.Option(None, help="Also write the full table to this CSV."),
+) -> None:
+    """Evaluate a grid of metric windows and score weights via the backtest."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    try:
+        grid = SweepGrid(
+            vol_windows=_parse_int_list(vol_windows),
+            mom_windows=_parse_int_list(mom_windows),
+            sma_windows=_parse_int_list(sma_windows),
+            weights=_parse_weight_grid(
+                overall_weights, value_percentile_weights, trend_momentum_weights
+            ),
+        )
+        config = SweepConfig(horizons=_parse_int_list(horizons), signal=signal, workers=workers)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    cache = read_cache(path)
+    if cache.empty:
+        typer.echo(f"No data in {path}")
+        return
+
+    typer.echo(f"Evaluating {grid.size} configurations with {workers} worker(s)...")
+    try:
+        table = run_sweep(cache, grid=grid, config=config)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    typer.echo(table.head(top).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    if out is not None:
+        table.to_csv(out, index=False)
+        typer.echo(f"Sweep table written: {out}")
+
+
+@cache_app.command("compact")
+def cache_compact(
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    keep_years: float | None = typer.Option(
+        None,
+        help=(
+            "Drop rows older than this many years before the latest date "
+            f"(metrics look back at most {max(VALUE_HORIZONS_YEARS)} years). Default: keep all."
+        ),
+    ),
+    codec: str = typer.Option("zstd", help=f"Parquet codec ({', '.join(PARQUET_CODECS)})."),
+    level: int | None = typer.Option(None, help="Compression level (gzip, brotli, zstd)."),
+    row_group_rows: int = typer.Option(65_536, help="Rows per Parquet row group."),
+    dictionary: str = typer.Option(
+        "strings",
+        help=f"Dictionary encoding ({', '.join(DICTIONARY_MODES)}); 'strings' tunes dates/rates.",
+    ),
+    sort: str = typer.Option("pair", help=f"Row order ({', '.join(LAYOUT_SORTS)})."),
+) -> None:
+    """Apply retention and rewrite the cache; report size and read latency before/after.
+
+    The layout is stored in the file, so later fetches keep it. SQLite caches
+    only apply retention and VACUUM.
+    """
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    try:
+        layout = ParquetLayout(
+            codec=codec,
+            level=level,
+            row_group_rows=row_group_rows,
+            dictionary=dictionary,
+            sort=sort,
+        )
+        result = compact_cache(path, CompactionConfig(keep_years=keep_years, layout=layout))
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    if result.cutoff is not None:
+        typer.echo(f"Dropped rows before {result.cutoff}")
+    typer.echo(f"Cache compacted: {path} (generation {result.generation})")
+    typer.echo(result.summary().to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+
+@cache_app.command("stats")
+def cache_stats_cmd(
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    row_groups: bool = typer.Option(False, "--row-groups", help="List every Parquet row group."),
+) -> None:
+    """Summarize rows per pair, date coverage and the on-disk layout."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+
+    try:
+        stats = cache_stats(path)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    width = max(len(k) for k in stats.summary)
+    for key, value in stats.summary.items():
+        typer.echo(f"{key:<{width}}  {value}")
+    typer.echo("")
+    typer.echo(stats.pairs.to_string(index=False))
+    if row_groups and not stats.row_groups.empty:
+        typer.echo("")
+        typer.echo(stats.row_groups.to_string(index=False))
+
+
+_OUT_HELP = "Output file; omit or '-' to write to stdout."
+_FORMAT_HELP = f"{', '.join(EXPORT_FORMATS)} (default: from --out suffix, jsonl on stdout)."
+
+
+def _export_target(out: str | None, fmt: str | None) -> tuple[Path | None, str]:
+    path = None if out in (None, "-") else Path(out)
+    try:
+        fmt = fmt or ("jsonl" if path is None else format_for_path(path))
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    if fmt not in EXPORT_FORMATS:
+        raise typer.BadParameter(f"Unknown format '{fmt}'. Supported: {', '.join(EXPORT_FORMATS)}")
+    return path, fmt
+
+
+def _run_export(out: Path | None, run: Callable[[], ExportResult]) -> None:
+    try:
+        result = run()
+    except BrokenPipeError:
+        # the reader (e.g. `head`) went away; stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise typer.Exit(0) from None
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    # on stdout the data owns the stream, so the summary goes to stderr
+    where = out if out is not None else "stdout"
+    typer.echo(f"Exported {result.rows} rows ({result.fmt}) to {where}", err=out is None)
+
+
+@export_app.command("rates")
+def export_rates_cmd(
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    out: str | None = typer.Option(None, "--out", "-o", help=_OUT_HELP),
+    fmt: str | None = typer.Option(None, "--format", help=_FORMAT_HELP),
+    base: list[str] | None = typer.Option(None, "--base", help="Only these bases (repeatable)."),
+    pair: list[str] | None = typer.Option(
+        None, "--pair", help="Only these BASE/QUOTE pairs (repeatable)."
+    ),
+    start: str | None = typer.Option(None, help="First date (YYYY-MM-DD)."),
+    end: str | None = typer.Option(None, help="Last date (YYYY-MM-DD)."),
+    batch_rows: int = typer.Option(65_536, help="Rows per streamed batch (bounds memory)."),
+) -> None:
+    """Stream cache rates, filtered by base, pair and date, in batches."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+    out_path, export_fmt = _export_target(out, fmt)
+
+    pairs = []
+    for p in pair or []:
+        b, sep, q = p.upper().partition("/")
+        if not sep or not b or not q:
+            raise typer.BadParameter(f"Pairs must look like BASE/QUOTE, got '{p}'")
+        pairs.append((b, q))
+    try:
+        rate_filter = RateFilter(
+            bases=tuple(b.upper() for b in base or []),
+            pairs=tuple(pairs),
+            start=date.fromisoformat(start) if start else None,
+            end=date.fromisoformat(end) if end else None,
+        )
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    _run_export(
+        out_path,
+        lambda: export_rates(path, out_path, export_fmt, rate_filter, batch_rows=batch_rows),
+    )
+
+
+@export_app.command("scores")
+def export_scores_cmd(
+    cache_path: Path | None = typer.Option(
+        default=None,
+        help="Path to cache file (.parquet; .sqlite or .db for SQLite).",
+    ),
+    out: str | None = typer.Option(None, "--out", "-o", help=_OUT_HELP),
+    fmt: str | None = typer.Option(None, "--format", help=_FORMAT_HELP),
+    base: list[str] | None = typer.Option(
+        None, "--base", help="Bases to score (repeatable; default: all supported)."
+    ),
+    drawdown_weight: float = typer.Option(
+        0.0,
+        help="Share of the risk score taken from the 5y max drawdown (rest is volatility).",
+    ),
+) -> None:
+    """Write per-base score tables (one row per base and target)."""
+    paths = CachePaths.default()
+    path = cache_path or paths.cache_file
+    out_path, export_fmt = _export_target(out, fmt)
+    bases = [parse_currency(b) for b in base] if base else list(SUPPORTED_CURRENCIES)
+    try:
+        weights = ScoreWeights(risk_drawdown=drawdown_weight)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
 
-    typer.echo(f"Report generated: {out_file}")
+    _run_export(out_path, lambda: export_scores(path, out_path, export_fmt, bases, weights))
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+@dataclass(slots=True)
+class StageRecord:
+    """Measurements for one execution of a pipeline stage.
+
+    Volume fields are optional: a stage only fills in what it can observe cheaply.
+    """
+
+    name: str
+    rows_in: int | None = None
+    rows_out: int | None = None
+    bytes_read: int | None = None
+    bytes_written: int | None = None
+    start_s: float = 0.0  # relative to profiler creation
+    wall_s: float = 0.0
+    depth: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class StageSummary:
+    name: str
+    calls: int
+    wall_s: float
+    rows_in: int | None
+    rows_out: int | None
+    bytes_read: int | None
+    bytes_written: int | None
+
+
+def _sum_optional(values: list[int | None]) -> int | None:
+    present = [v for v in values if v is not None]
+    return sum(present) if present else None
+
+
+class Profiler:
+    """Collects stage records while active.
+
+    With `cprofile=True`, every top-level stage also runs under a per-stage
+    cProfile.Profile so the hottest one can be dumped afterwards.
+
+    Stages may run on several threads (e.g. a pipelined backfill); nesting
+    depth is tracked per thread, and only main-thread stages are cProfiled.
+    """
+
+    def __init__(self, cprofile: bool = False) -> None:
+        self.records: list[StageRecord] = []
+        self._t0 = time.perf_counter()
+        self._local = threading.local()
+        self._cprofile = cprofile
+        self._profiles: dict[str, cProfile.Profile] = {}
+
+    @contextmanager
+    def activate(self) -> Iterator[Profiler]:
+        token = _ACTIVE.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE.reset(token)
+
+    @contextmanager
+    def _measure(self, rec: StageRecord) -> Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        rec.depth = depth
+        prof: cProfile.Profile | None = None
+        # cProfile cannot nest, so only top-level stages are profiled
+        main = threading.current_thread() is threading.main_thread()
+        if self._cprofile and depth == 0 and main:
+            prof = self._profiles.setdefault(rec.name, cProfile.Profile())
+
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof is not None:
+                prof.disable()
+            end = time.perf_counter()
+            self._local.depth = depth
+            rec.start_s = start - self._t0
+            rec.wall_s = end - start
+            self.records.append(rec)
+
+    def summary(self) -> list[StageSummary]:
+        """Aggregate records by stage name, in order of first completion."""
+        grouped: dict[str, list[StageRecord]] = {}
+        for rec in self.records:
+            grouped.setdefault(rec.name, []).append(rec)
+
+        return [
+            StageSummary(
+                name=name,
+                calls=len(recs),
+                wall_s=sum(r.wall_s for r in recs),
+                rows_in=_sum_optional([r.rows_in for r in recs]),
+                rows_out=_sum_optional([r.rows_out for r in recs]),
+                bytes_read=_sum_optional([r.bytes_read for r in recs]),
+                bytes_written=_sum_optional([r.bytes_written for r in recs]),
+            )
+            for name, recs in grouped.items()
+        ]
+
+    def hottest_stage(self) -> str | None:
+        top_level = [s for s in self.summary() if s.name in self._top_level_names()]
+        if not top_level:
+            return None
+        return max(top_level, key=lambda s: s.wall_s).name
+
+    def _top_level_names(self) -> set[str]:
+        return {r.name for r in self.records if r.depth == 0}
+
+    def format_table(self) -> str:
+        """Human-readable per-stage table."""
+        header = (
+            f"{'stage':<18} {'calls':>5} {'wall_ms':>10} {'rows_in':>10} {'rows_out':>10} "
+            f"{'bytes_in':>12} {'bytes_out':>12}"
+        )
+        lines = [header, "-" * len(header)]
+
+        def fmt(v: int | None, width: int) -> str:
+            return f"{'—' if v is None else v:>{width}}"
+
+        for s in self.summary():
+            lines.append(
+                f"{s.name:<18} {s.calls:>5} {s.wall_s * 1000.0:>10.1f} "
+                f"{fmt(s.rows_in, 10)} {fmt(s.rows_out, 10)} "
+                f"{fmt(s.bytes_read, 12)} {fmt(s.bytes_written, 12)}"
+            )
+        return "\n".join(lines)
+
+    def write_trace(self, path: Path) -> None:
+        """Write records to `path`.
+
+        `.jsonl` files get one record per line; anything else gets a single JSON
+        document with both the raw records and the per-stage summary.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".jsonl":
+            lines = [json.dumps(asdict(r)) for r in self.records]
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            return
+
+        doc = {
+            "stages": [asdict(r) for r in self.records],
+            "summary": [asdict(s) for s in self.summary()],
+        }
+        path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+
+    def dump_hottest(self, path: Path) -> str | None:
+        """Dump cProfile stats of the slowest top-level stage. Returns its name."""
+        name = self.hottest_stage()
+        if name is None or name not in self._profiles:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._profiles[name].dump_stats(str(path))
+        return name
+
+
+_ACTIVE: ContextVar[Profiler | None] = ContextVar("fxpower_profiler", default=None)
+
+
+@contextmanager
+def stage(
+    name: str,
+    rows_in: int | None = None,
+    bytes_read: int | None = None,
+) -> Iterator[StageRecord]:
+    """Time a pipeline stage if a profiler is active; otherwise a near no-op.
+
+    The yielded record can be updated in the block (e.g. `rec.rows_out = len(df)`).
+    """
+    rec = StageRecord(name=name, rows_in=rows_in, bytes_read=bytes_read)
+    prof = _ACTIVE.get()
+    if prof is None:
+        yield rec
+        return
+
+    with prof._measure(rec):
+        yield rec
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import json
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 
 import pandas as pd
+import pyarrow as pa
 import requests
 
+from fxpower.instrumentation.profiler import stage
+from fxpower.providers.http_cache import ResponseCache, ResponseCacheConfig, ResponseCacheMiss
+
 
 @dataclass(frozen=True, slots=True)
 class FrankfurterConfig:
     base_url: str = "https://api.frankfurter.dev/v1"
     timeout_s: float = 10.0
+    cache: ResponseCacheConfig | None = None  # None: every request goes to the network
 
 
 class FrankfurterError(RuntimeError):
@@ -38,18 +44,111 @@ def fetch_eur_timeseries(
     if not symbols_list:
         raise ValueError("symbols must not be empty")
 
+    body = _get_eur_payload(start, end, symbols_list, cfg)
+    with stage("json_decode", bytes_read=len(body)) as rec:
+        df = _eur_payload_to_df(json.loads(body))
+        rec.rows_out = len(df)
+        return df
+
+
+def fetch_eur_table(
+    start: date,
+    end: date,
+    symbols: Iterable[str],
+    cfg: FrankfurterConfig | None = None,
+) -> pa.Table:
+    """Like `fetch_eur_timeseries`, but returns an Arrow table (date32, string, float64).
+
+    The JSON payload is decoded straight into Arrow columns; no DataFrame is built.
+    """
+    return decode_eur_table(fetch_eur_payload(start, end, symbols, cfg))
+
+
+def fetch_eur_payload(
+    start: date,
+    end: date,
+    symbols: Iterable[str],
+    cfg: FrankfurterConfig | None = None,
+) -> bytes:
+    """Raw JSON body of the EUR time series request (network or response cache only).
+
+    Lets pipelines download and decode in separate stages; see `decode_eur_table`.
+    """
+    cfg = cfg or FrankfurterConfig()
+    symbols_list = sorted({s.strip().upper() for s in symbols if s.strip()})
+    if not symbols_list:
+        raise ValueError("symbols must not be empty")
+    return _get_eur_payload(start, end, symbols_list, cfg)
+
+
+def decode_eur_table(body: bytes) -> pa.Table:
+    """Arrow table (date32, string, float64) of a body returned by `fetch_eur_payload`."""
+    with stage("json_decode", bytes_read=len(body)) as rec:
+        table = _eur_payload_to_table(json.loads(body))
+        rec.rows_out = table.num_rows
+        return table
+
+
+def _get_eur_payload(
+    start: date, end: date, symbols_list: list[str], cfg: FrankfurterConfig
+) -> bytes:
     url = f"{cfg.base_url}/{_date_str(start)}..{_date_str(end)}"
     params = {"base": "EUR", "symbols": ",".join(symbols_list)}
+    return _get_payload(url, params, end, cfg)
 
+
+def _get_payload(url: str, params: Mapping[str, str], end: date, cfg: FrankfurterConfig) -> bytes:
+    """Body of a successful GET, through the response cache when one is configured.
+
+    Published ECB days never change, so a range that ended long enough ago is
+    immutable and served from disk; recent ranges are revalidated.
+    """
+    if cfg.cache is None or cfg.cache.mode == "off":
+        return _http_get(url, params, cfg, {}).content
+
+    immutable = end <= date.today() - timedelta(days=cfg.cache.immutable_after_days)
     try:
-        resp = requests.get(url, params=params, timeout=cfg.timeout_s)
-    except requests.RequestException as exc:
-        raise FrankfurterError(f"Network error calling Frankfurter: {exc}") from exc
+        return ResponseCache(cfg.cache).get(
+            url,
+            params,
+            immutable,
+            lambda headers: _http_get(url, params, cfg, headers),
+            validate=_check_json,
+        )
+    except ResponseCacheMiss as exc:
+        raise FrankfurterError(f"{exc} (response cache is in replay mode)") from exc
+
+
+def _check_json(body: bytes) -> None:
+    try:
+        json.loads(body)
+    except ValueError as exc:
+        raise FrankfurterError(f"Invalid response payload: {exc}") from exc
+
+
+def _http_get(
+    url: str, params: Mapping[str, str], cfg: FrankfurterConfig, headers: Mapping[str, str]
+) -> requests.Response:
+    with stage("http_fetch") as rec:
+        try:
+            resp = requests.get(url, params=params, headers=dict(headers), timeout=cfg.timeout_s)
+        except requests.RequestException as exc:
+            raise FrankfurterError(f"Network error calling Frankfurter: {exc}") from exc
 
-    if resp.status_code != 200:
-        raise FrankfurterError(f"Frankfurter returned HTTP {resp.status_code}: {resp.text}")
+        # 304 only answers a conditional request for a body we already hold
+        if resp.status_code != 200 and not (resp.status_code == 304 and headers):
+            raise FrankfurterError(f"Frankfurter returned HTTP {resp.status_code}: {resp.text}")
+        rec.bytes_read = len(resp.content)
 
-    payload = resp.json()
+    return resp
+
+
+EUR_TABLE_SCHEMA = pa.schema(
+    [("date", pa.date32()), ("quote", pa.string()), ("rate", pa.float64())]
+)
+
+
+def _eur_payload_to_table(payload: dict) -> pa.Table:
     if payload.get("base") != "EUR":
         raise FrankfurterError(f"Unexpected base in response: {payload.get('base')}")
 
@@ -57,26 +156,44 @@ def fetch_eur_timeseries(
     if not isinstance(rates, dict):
         raise FrankfurterError("Invalid response payload: missing/invalid 'rates'")
 
-    rows: list[dict[str, object]] = []
+    # one pass over the payload straight into column buffers
+    days: list[str] = []
+    quotes: list[str] = []
+    values: list[object] = []
     for day_str, day_rates in rates.items():
         if not isinstance(day_rates, dict):
             continue
-        for quote, rate in day_rates.items():
-            rows.append({"date": day_str, "quote": quote, "rate": rate})
+        days.extend([day_str] * len(day_rates))
+        quotes.extend(day_rates.keys())
+        values.extend(day_rates.values())
 
-    df = pd.DataFrame(rows)
-    if df.empty:
+    try:
+        table = pa.table(
+            [
+                pa.array(days, pa.string()).cast(pa.date32()),
+                pa.array(quotes, pa.string()),
+                pa.array(values).cast(pa.float64()),
+            ],
+            schema=EUR_TABLE_SCHEMA,
+        )
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as exc:
+        raise FrankfurterError(f"Invalid response payload: {exc}") from exc
+    return table.sort_by([("date", "ascending"), ("quote", "ascending")])
+
+
+def _eur_table_to_df(table: pa.Table) -> pd.DataFrame:
+    if table.num_rows == 0:
         # still return stable schema
         return pd.DataFrame(columns=["date", "quote", "rate"])
-
-    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df = table.to_pandas()
     df["quote"] = df["quote"].astype("string")
-    df["rate"] = pd.to_numeric(df["rate"], errors="raise").astype("float64")
-
-    df = df.sort_values(by=["date", "quote"], kind="mergesort").reset_index(drop=True)
     return df
 
 
+def _eur_payload_to_df(payload: dict) -> pd.DataFrame:
+    return _eur_table_to_df(_eur_payload_to_table(payload))
+
+
 def fetch_timeseries(
     start: date,
     end: date,
@@ -98,15 +215,7 @@ def fetch_timeseries(
     url = f"{cfg.base_url}/{_date_str(start)}..{_date_str(end)}"
     params = {"base": base_norm, "symbols": ",".join(symbols_list)}
 
-    try:
-        resp = requests.get(url, params=params, timeout=cfg.timeout_s)
-    except requests.RequestException as exc:
-        raise FrankfurterError(f"Network error calling Frankfurter: {exc}") from exc
-
-    if resp.status_code != 200:
-        raise FrankfurterError(f"Frankfurter returned HTTP {resp.status_code}: {resp.text}")
-
-    payload = resp.json()
+    payload = json.loads(_get_payload(url, params, end, cfg))
     if payload.get("base") != base_norm:
         raise FrankfurterError(f"Unexpected base in response: {payload.get('base')}")
 
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+import requests
+
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage.atomic import atomic_write, ensure_parent_dir
+
+CACHE_MODES: tuple[str, ...] = ("use", "replay", "refresh", "off")
+
+# Performs the request with the given extra headers (conditional ones on revalidation)
+FetchResponseFn = Callable[[Mapping[str, str]], requests.Response]
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseCacheConfig:
+    """On-disk cache of provider responses.
+
+    Modes:
+    - use: immutable responses (e.g. ranges that ended `immutable_after_days`
+      ago) come from disk; others are revalidated with a conditional request
+    - replay: everything comes from disk, a miss is an error (no network)
+    - refresh: always download and overwrite the stored response
+    - off: no cache
+    """
+
+    directory: Path
+    mode: str = "use"
+    immutable_after_days: int = 7
+    compress_level: int = 6
+
+    def __post_init__(self) -> None:
+        if self.mode not in CACHE_MODES:
+            raise ValueError(
+                f"Unknown response cache mode '{self.mode}'. Supported: {', '.join(CACHE_MODES)}"
+            )
+        if self.immutable_after_days < 0:
+            raise ValueError("immutable_after_days must be >= 0")
+        if not 1 <= self.compress_level <= 9:
+            raise ValueError("compress_level must be in [1, 9]")
+
+
+class ResponseCacheMiss(LookupError):
+    """A replay-mode request has no stored response."""
+
+
+def normalized_url(url: str, params: Mapping[str, str]) -> str:
+    """URL with lower-case scheme and host, no trailing slash and sorted query params."""
+    parts = urlsplit(url)
+    query = sorted([*_query_pairs(parts.query), *((k, str(v)) for k, v in params.items())])
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query, safe=",."), "")
+    )
+
+
+def _query_pairs(query: str) -> list[tuple[str, str]]:
+    pairs = []
+    for part in query.split("&"):
+        if part:
+            k, _, v = part.partition("=")
+            pairs.append((k, v))
+    return pairs
+
+
+def cache_key(url: str, params: Mapping[str, str]) -> str:
+    return hashlib.sha256(normalized_url(url, params).encode()).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    body: bytes
+    meta: dict[str, object]  # url, etag, last_modified, fetched_at, validated_at
+
+
+class ResponseCache:
+    """Stores response bodies gzip-compressed under `<directory>/<key[:2]>/<key>.gz`.
+
+    A small JSON file next to each body keeps the URL and the validators
+    (ETag, Last-Modified) used for conditional requests.
+    """
+
+    def __init__(self, config: ResponseCacheConfig) -> None:
+        self.config = config
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        folder = self.config.directory / key[:2]
+        return folder / f"{key}.gz", folder / f"{key}.json"
+
+    def load(self, key: str) -> CachedResponse | None:
+        body_path, meta_path = self._paths(key)
+        if not body_path.exists() or not meta_path.exists():
+            return None
+        with stage("http_cache_read") as rec:
+            raw = body_path.read_bytes()
+            rec.bytes_read = len(raw)
+            try:
+                return CachedResponse(gzip.decompress(raw), json.loads(meta_path.read_text()))
+            except (OSError, EOFError, ValueError):
+                return None  # a damaged entry is a miss
+
+    def store(self, key: str, url: str, resp: requests.Response) -> None:
+        body_path, meta_path = self._paths(key)
+        ensure_parent_dir(body_path)
+        now = datetime.now(UTC).isoformat()
+        meta = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "validated_at": now,
+        }
+        with stage("http_cache_write") as rec:
+            packed = gzip.compress(resp.content, compresslevel=self.config.compress_level)
+            rec.bytes_written = len(packed)
+            # body first: an entry only counts once its metadata exists
+            atomic_write(body_path, lambda tmp: tmp.write_bytes(packed))
+            atomic_write(meta_path, lambda tmp: tmp.write_text(json.dumps(meta, indent=1)))
+
+    def _touch(self, key: str, entry: CachedResponse) -> None:
+        _, meta_path = self._paths(key)
+        meta = entry.meta | {"validated_at": datetime.now(UTC).isoformat()}
+        atomic_write(meta_path, lambda tmp: tmp.write_text(json.dumps(meta, indent=1)))
+
+    def get(
+        self,
+        url: str,
+        params: Mapping[str, str],
+        immutable: bool,
+        fetch: FetchResponseFn,
+        validate: Callable[[bytes], None] | None = None,
+    ) -> bytes:
+        """Response body for `url` + `params`, from disk when the mode and entry allow.
+
+        `fetch` must return the response of a 200 or, for a conditional
+        request, a 304. `validate` raises on a body that must not be stored
+        (it only runs on downloaded bodies).
+        """
+        key = cache_key(url, params)
+        mode = self.config.mode
+        entry = None if mode == "refresh" else self.load(key)
+
+        if mode == "replay":
+            if entry is None:
+                raise ResponseCacheMiss(f"No stored response for {normalized_url(url, params)}")
+            return entry.body
+        if entry is not None and immutable:
+            return entry.body
+
+        headers: dict[str, str] = {}
+        if entry is not None:
+            if entry.meta.get("etag"):
+                headers["If-None-Match"] = str(entry.meta["etag"])
+            if entry.meta.get("last_modified"):
+                headers["If-Modified-Since"] = str(entry.meta["last_modified"])
+        resp = fetch(headers)
+        if resp.status_code == 304 and entry is not None:
+            self._touch(key, entry)
+            return entry.body
+        if validate is not None:
+            validate(resp.content)
+        self.store(key, normalized_url(url, params), resp)
+        return resp.content
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from fxpower.domain.models import parse_currency
+from fxpower.instrumentation.profiler import stage
+
+BAR_COLUMNS: tuple[str, ...] = (
+    "date",
+    "base",
+    "quote",
+    "open",
+    "high",
+    "low",
+    "close",
+    "ticks",
+    "realized_vol",
+)
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+@dataclass(frozen=True, slots=True)
+class IntradayConfig:
+    """How to read intraday quote files.
+
+    Files need a `timestamp` column and either `rate` or `bid` + `ask` (mid is
+    used); `base`/`quote` columns are optional when `base` and `quote` are set
+    here. Rates follow the cache convention: BASE per 1 QUOTE.
+    """
+
+    chunk_rows: int = 1_000_000
+    tz: str = "UTC"  # calendar that decides which day a quote belongs to
+    base: str | None = None
+    quote: str | None = None
+    annualization_factor: int = 252
+
+    def __post_init__(self) -> None:
+        if self.chunk_rows < 1:
+            raise ValueError("chunk_rows must be >= 1")
+        if (self.base is None) != (self.quote is None):
+            raise ValueError("base and quote must be given together")
+
+
+def iter_quote_batches(path: Path, chunk_rows: int) -> Iterator[pa.RecordBatch]:
+    """Stream a .parquet or .csv(.gz) file as record batches of about `chunk_rows` rows."""
+    if path.suffix == ".parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+        return
+
+    # CSV blocks are sized in bytes; ~64 bytes per quote line
+    read = pacsv.ReadOptions(block_size=max(1 << 20, chunk_rows * 64))
+    convert = pacsv.ConvertOptions(column_types={"base": pa.string(), "quote": pa.string()})
+    with pacsv.open_csv(path, read_options=read, convert_options=convert) as reader:
+        yield from reader
+
+
+def _factorize_codes(values: pd.Series) -> tuple[np.ndarray, list[str]]:
+    """Integer codes of currency strings; case and padding are normalized on the uniques only."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    names, remap = np.unique([str(u).strip().upper() for u in uniques], return_inverse=True)
+    return remap[codes], [str(n) for n in names]
+
+
+@dataclass(slots=True)
+class _PendingBar:
+    """The latest (still open) day of one pair, carried across chunks."""
+
+    day: int
+    open: float
+    high: float
+    low: float
+    close: float
+    ticks: int
+    rv: float
+    last_ts: int
+
+
+class DailyBarResampler:
+    """Streaming resampler from intraday quotes to daily OHLC bars.
+
+    Each chunk is reduced with one sort and `reduceat` passes; only the last
+    day of every pair is carried over, so memory is bounded by the chunk size
+    plus the finished bars. Realized volatility is the annualized square root of
+    the day's summed squared log returns between consecutive quotes. Quotes of a
+    pair may be unordered within a chunk but must not go back in time across
+    chunks.
+    """
+
+    def __init__(self, config: IntradayConfig | None = None) -> None:
+        self.config = config or IntradayConfig()
+        self.rows_in = 0
+        self._done: list[pd.DataFrame] = []
+        self._pending: dict[tuple[str, str], _PendingBar] = {}
+
+    def add(self, batch: pa.RecordBatch | pa.Table | pd.DataFrame) -> None:
+        df = batch if isinstance(batch, pd.DataFrame) else batch.to_pandas()
+        if df.empty:
+            return
+        self.rows_in += len(df)
+        ts, day, code, pairs, price = self._normalize(df)
+        if len(ts) == 0:
+            return
+
+        order = np.lexsort((ts, code))
+        ts, day, code, price = ts[order], day[order], code[order], price[order]
+
+        new_group = (code[1:] != code[:-1]) | (day[1:] != day[:-1])
+        starts = np.concatenate(([0], np.flatnonzero(new_group) + 1))
+        ends = np.append(starts[1:], len(ts))
+
+        log_p = np.log(price)
+        r2 = np.concatenate(([0.0], np.where(new_group, 0.0, np.diff(log_p) ** 2)))
+        g = {
+            "code": code[starts],
+            "day": day[starts],
+            "open": price[starts],
+            "high": np.maximum.reduceat(price, starts),
+            "low": np.minimum.reduceat(price, starts),
+            "close": price[ends - 1],
+            "ticks": ends - starts,
+            "rv": np.add.reduceat(r2, starts),
+            "first_ts": ts[starts],
+            "last_ts": ts[ends - 1],
+        }
+
+        pair_starts = np.flatnonzero(np.diff(g["code"], prepend=-1) != 0)
+        pair_ends = np.append(pair_starts[1:], len(g["code"]))
+        for i0, i1 in zip(pair_starts, pair_ends, strict=True):
+            pair = pairs[int(g["code"][i0])]
+            self._carry_in(pair, g, int(i0))
+            last = int(i1) - 1
+            if i1 - i0 > 1:
+                self._done.append(self._frame(pair, {k: v[i0:last] for k, v in g.items()}))
+            self._pending[pair] = _PendingBar(
+                day=int(g["day"][last]),
+                open=float(g["open"][last]),
+                high=float(g["high"][last]),
+                low=float(g["low"][last]),
+                close=float(g["close"][last]),
+                ticks=int(g["ticks"][last]),
+                rv=float(g["rv"][last]),
+                last_ts=int(g["last_ts"][last]),
+            )
+
+    def bars(self) -> pd.DataFrame:
+        """All bars so far (the latest day of each pair included), sorted like the cache."""
+        pending = [self._pending_frame(pair, p) for pair, p in self._pending.items()]
+        frames = self._done + pending
+        if not frames:
+            return pd.DataFrame(columns=list(BAR_COLUMNS))
+        out = pd.concat(frames, ignore_index=True)
+        out = out.sort_values(by=["date", "base", "quote"], kind="mergesort")
+        return out.reset_index(drop=True)
+
+    def _normalize(
+        self, df: pd.DataFrame
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[tuple[str, str]], np.ndarray]:
+        cfg = self.config
+        if "timestamp" not in df.columns:
+            raise ValueError("Intraday quotes need a 'timestamp' column")
+        if "rate" in df.columns:
+            price = pd.to_numeric(df["rate"], errors="coerce").to_numpy(dtype="float64")
+        elif {"bid", "ask"} <= set(df.columns):
+            bid = pd.to_numeric(df["bid"], errors="coerce").to_numpy(dtype="float64")
+            ask = pd.to_numeric(df["ask"], errors="coerce").to_numpy(dtype="float64")
+            price = (bid + ask) / 2.0
+        else:
+            raise ValueError("Intraday quotes need a 'rate' column or 'bid' and 'ask' columns")
+
+        stamps = pd.to_datetime(df["timestamp"], utc=True, cache=False)
+        ts = stamps.to_numpy(dtype="datetime64[ns]").view("int64")
+        local = stamps.dt.tz_convert(cfg.tz).dt.tz_localize(None)
+        day = local.to_numpy(dtype="datetime64[ns]").view("int64") // _NS_PER_DAY
+
+        if {"base", "quote"} <= set(df.columns):
+            base_code, base_names = _factorize_codes(df["base"])
+            quote_code, quote_names = _factorize_codes(df["quote"])
+            code, combos = pd.factorize(base_code * len(quote_names) + quote_code)
+            pairs = [
+                (base_names[c // len(quote_names)], quote_names[c % len(quote_names)])
+                for c in combos
+            ]
+        elif cfg.base is not None and cfg.quote is not None:
+            code = np.zeros(len(df), dtype="int64")
+            pairs = [(cfg.base.upper(), cfg.quote.upper())]
+        else:
+            raise ValueError("Intraday quotes without base/quote columns need base and quote set")
+        for b, q in pairs:
+            # only supported codes may reach the cache; raises for anything else
+            if parse_currency(b) == parse_currency(q):
+                raise ValueError(f"Intraday quotes for {b}/{q}: base and quote must differ")
+
+        keep = np.isfinite(price) & (price > 0.0) & ~stamps.isna().to_numpy()
+        if not keep.all():
+            ts, day, code, price = ts[keep], day[keep], code[keep], price[keep]
+        return ts, day, code, pairs, price
+
+    def _carry_in(self, pair: tuple[str, str], g: dict[str, np.ndarray], i: int) -> None:
+        """Fold the pending bar of `pair` into the chunk's first group (or retire it)."""
+        p = self._pending.pop(pair, None)
+        if p is None:
+            return
+        if g["first_ts"][i] < p.last_ts:
+            raise ValueError(f"Quotes for {pair[0]}/{pair[1]} go back in time across chunks")
+        if g["day"][i] != p.day:
+            self._done.append(self._pending_frame(pair, p))
+            return
+        g["rv"][i] += p.rv + float(np.log(g["open"][i] / p.close)) ** 2
+        g["open"][i] = p.open
+        g["high"][i] = max(g["high"][i], p.high)
+        g["low"][i] = min(g["low"][i], p.low)
+        g["ticks"][i] += p.ticks
+
+    def _pending_frame(self, pair: tuple[str, str], p: _PendingBar) -> pd.DataFrame:
+        fields = ("day", "open", "high", "low", "close", "ticks", "rv")
+        return self._frame(pair, {f: np.array([getattr(p, f)]) for f in fields})
+
+    def _frame(self, pair: tuple[str, str], g: dict[str, np.ndarray]) -> pd.DataFrame:
+        ticks = np.asarray(g["ticks"], dtype="int64")
+        vol = np.sqrt(np.asarray(g["rv"]) * self.config.annualization_factor)
+        return pd.DataFrame(
+            {
+                "date": pd.to_datetime(np.asarray(g["day"]), unit="D").date,
+                "base": pair[0],
+                "quote": pair[1],
+                "open": g["open"],
+                "high": g["high"],
+                "low": g["low"],
+                "close": g["close"],
+                "ticks": ticks,
+                "realized_vol": np.where(ticks > 1, vol, np.nan),
+            }
+        )
+
+
+def resample_files(
+    paths: Iterable[Path], config: IntradayConfig | None = None
+) -> tuple[pd.DataFrame, int]:
+    """Daily OHLC + realized-vol bars from intraday quote files, read chunk by chunk.
+
+    Returns (bars, number of quotes read).
+    """
+    resampler = DailyBarResampler(config)
+    paths = list(paths)
+    with stage("intraday_resample") as rec:
+        rec.bytes_read = sum(p.stat().st_size for p in paths)
+        for path in paths:
+            for batch in iter_quote_batches(path, resampler.config.chunk_rows):
+                resampler.add(batch)
+        bars = resampler.bars()
+        rec.rows_in = resampler.rows_in
+        rec.rows_out = len(bars)
+        return bars, resampler.rows_in
@@ -1,15 +1,41 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
-from datetime import date
+from functools import lru_cache
+from hashlib import sha256
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-from fxpower.analytics.ranker import build_rankings, rank_targets
+from fxpower.analytics.backtest import pair_series_panel
+from fxpower.analytics.correlation import (
+    RollingCorrelation,
+    panel_log_returns,
+    returns_correlation,
+)
+from fxpower.analytics.executor import ShardExecutor
+from fxpower.analytics.horizons import VALUE_HORIZONS_YEARS
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import (
+    DEFAULT_WEIGHTS,
+    CacheInput,
+    ScoreWeights,
+    as_pair_series,
+    build_rankings,
+    cache_rows,
+)
+from fxpower.analytics.scan import ScanConfig, scan_columns, score_pairs, top_pairs
+from fxpower.analytics.scenario import sensitivity_table
+from fxpower.analytics.strength import panel_strength
 from fxpower.domain.models import Currency, targets_for_base
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage.artifacts import ArtifactGraph, frame_version, series_version
+
+_STRENGTH_CHART_DAYS = 252
 
 
 @dataclass(frozen=True, slots=True)
@@ -19,6 +45,10 @@ class ReportPaths:
     def report_file(self, base: Currency) -> Path:
         return self.reports_dir / f"fxpower_{base.value}.html"
 
+    @property
+    def artifacts_dir(self) -> Path:
+        return self.reports_dir / ".artifacts"
+
 
 def _env() -> Environment:
     template_dir = Path(__file__).parent
@@ -28,6 +58,12 @@ def _env() -> Environment:
     )
 
 
+@lru_cache(maxsize=1)
+def _template_version() -> str:
+    """Digest of the report template, so an edited template re-renders cached HTML."""
+    return sha256((Path(__file__).parent / "template.html").read_bytes()).hexdigest()[:16]
+
+
 def _df_to_html_table(df: pd.DataFrame, columns: list[str]) -> str:
     view = df.loc[:, columns].copy()
     # round float-ish columns for readability
@@ -54,18 +90,39 @@ def _chart_overall_bar(scores: pd.DataFrame) -> str:
     return fig.to_html(full_html=False, include_plotlyjs="cdn")
 
 
-def _chart_rates(cache: pd.DataFrame, base: Currency, targets: list[Currency]) -> str:
+def _downsample(s: pd.Series, points: int | None) -> pd.Series:
+    """At most `points` observations of `s` (None: all of them), in date order.
+
+    Keeps the first and the last, and the low and the high of equal-width buckets.
+    """
+    if points is None or len(s) <= points:
+        return s
+    n = len(s)
+    buckets = (points - 2) // 2
+    bucket = np.searchsorted(np.linspace(0, n, buckets + 1)[1:-1], np.arange(n), side="right")
+    order = np.lexsort((s.to_numpy("float64"), bucket))
+    starts = np.flatnonzero(np.r_[True, np.diff(bucket[order]) != 0])
+    ends = np.r_[starts[1:], n] - 1
+    keep = np.unique(np.r_[0, order[starts], order[ends], n - 1])
+    return s.iloc[keep]
+
+
+def _chart_rates(
+    pairs: Mapping[tuple[str, str], pd.Series],
+    base: Currency,
+    targets: list[Currency],
+    points: int | None = None,
+) -> str:
     fig = go.Figure()
     for t in targets:
-        df = cache[(cache["base"] == base.value) & (cache["quote"] == t.value)].copy()
-        if df.empty:
+        s = pairs.get((base.value, t.value))
+        if s is None or s.empty:
             continue
-        df["date"] = pd.to_datetime(df["date"])
-        df = df.sort_values(by="date", kind="mergesort")
+        s = _downsample(s, points)
         fig.add_trace(
             go.Scatter(
-                x=df["date"],
-                y=df["rate"].astype(float),
+                x=pd.Series(pd.to_datetime(s.index)),
+                y=pd.Series(s.to_numpy("float64")),
                 mode="lines",
                 name=f"{base.value}/{t.value}",
             )
@@ -80,33 +137,117 @@ def _chart_rates(cache: pd.DataFrame, base: Currency, targets: list[Currency]) -
     return fig.to_html(full_html=False, include_plotlyjs="cdn")
 
 
+def _chart_correlation(corr: RollingCorrelation) -> str:
+    if not corr.dates or corr.at().isna().all().all():
+        return '<div class="muted">Not enough history for correlations.</div>'
+    matrix = corr.at()
+    fig = go.Figure(
+        go.Heatmap(
+            z=matrix.to_numpy(),
+            x=list(matrix.columns),
+            y=list(matrix.index),
+            zmin=-1.0,
+            zmax=1.0,
+            colorscale="RdBu",
+            reversescale=True,
+            text=[[f"{v:.2f}" for v in row] for row in matrix.to_numpy()],
+            texttemplate="%{text}",
+        )
+    )
+    fig.update_layout(
+        height=360,
+        margin=dict(l=20, r=20, t=30, b=30),
+        title=f"Correlation of daily log returns, last {corr.window} days (as of {corr.dates[-1]})",
+    )
+    return fig.to_html(full_html=False, include_plotlyjs="cdn")
+
+
+def _chart_strength(index: pd.DataFrame, days: int = _STRENGTH_CHART_DAYS) -> str:
+    fig = go.Figure()
+    recent = index.tail(days)
+    for code in recent.columns:
+        fig.add_trace(
+            go.Scatter(
+                x=pd.to_datetime(pd.Index(recent.index)),
+                y=(recent[code] / recent[code].iloc[0] * 100.0).tolist(),
+                mode="lines",
+                name=str(code),
+            )
+        )
+    fig.update_layout(
+        height=380,
+        margin=dict(l=20, r=20, t=30, b=30),
+        title="Strength vs all other currencies (rebased to 100, last year)",
+        legend=dict(orientation="h"),
+    )
+    return fig.to_html(full_html=False, include_plotlyjs="cdn")
+
+
+def _chart_sensitivity(table: pd.DataFrame, base: Currency) -> str:
+    fig = go.Figure()
+    for target, g in table.groupby("target", sort=True):
+        x = (g["shift"] * 100.0).tolist()
+        fig.add_trace(
+            go.Scatter(x=x, y=g["overall_score"].tolist(), mode="lines", name=f"{target} overall")
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=x,
+                y=g["value_score"].tolist(),
+                mode="lines",
+                line=dict(dash="dot"),
+                name=f"{target} value",
+            )
+        )
+    fig.update_layout(
+        height=380,
+        margin=dict(l=20, r=20, t=30, b=30),
+        title=f"Scores if today's {base.value} rate moved by x%",
+        xaxis_title="Move of today's rate (%)",
+        legend=dict(orientation="h"),
+    )
+    return fig.to_html(full_html=False, include_plotlyjs="cdn")
+
+
 def generate_report_html(
-    cache: pd.DataFrame,
+    cache: CacheInput,
     base: Currency,
     paths: ReportPaths | None = None,
+    weights: ScoreWeights | None = None,
+    graph: ArtifactGraph | None = None,
+    executor: ShardExecutor | None = None,
+    scan: ScanConfig | None = None,
+    universe: CacheInput | None = None,
+    chart_points: int | None = None,
 ) -> Path:
     paths = paths or ReportPaths()
     paths.reports_dir.mkdir(parents=True, exist_ok=True)
 
-    scores = rank_targets(cache, base=base)
-    if scores.empty:
-        out_file = paths.report_file(base)
-        out_file.write_text(f"No data for base={base.value}\n", encoding="utf-8")
-        return out_file
+    html = render_report_html(
+        cache,
+        base=base,
+        weights=weights,
+        graph=graph,
+        executor=executor,
+        scan=scan,
+        universe=universe,
+        chart_points=chart_points,
+    )
+
+    out_file = paths.report_file(base)
+    out_file.write_text(html, encoding="utf-8")
+    return out_file
 
-    rankings = build_rankings(scores)
 
-    as_of: date = scores["as_of"].max()
+def _score_tables(scores: pd.DataFrame) -> dict[str, object]:
+    """KPIs, ranking tables and explain rows: everything derived from the scores alone."""
+    rankings = build_rankings(scores)
 
     overall = rankings["overall"]
     value = rankings["value"]
     trend = rankings["trend"]
     risk = rankings["risk"]
 
-    kpi_best_overall = overall.iloc[0]["target"]
-    kpi_best_value = value.iloc[0]["target"]
-    kpi_lowest_risk = risk.iloc[0]["target"]
-
     explain = []
     for _, row in overall.iterrows():
         explain.append(
@@ -121,36 +262,263 @@ def generate_report_html(
                 if pd.notna(row["sma_200_diff"])
                 else "—",
                 "vol_90d": f"{float(row['vol_90d']):.3f}" if pd.notna(row["vol_90d"]) else "—",
+                "dd_max_5y": f"{float(row['dd_max_5y']):.3f}"
+                if pd.notna(row["dd_max_5y"])
+                else "—",
             }
         )
 
-    overall_table = _df_to_html_table(
-        overall, ["target", "overall_score", "value_score", "trend_score", "risk_score"]
-    )
-    value_table = _df_to_html_table(value, ["target", "value_score", "percentile_5y", "zscore_5y"])
-    trend_table = _df_to_html_table(trend, ["target", "trend_score", "mom_60d", "sma_200_diff"])
-    risk_table = _df_to_html_table(risk, ["target", "risk_score", "vol_90d"])
-
-    chart_overall_bar = _chart_overall_bar(overall)
-    chart_rates = _chart_rates(cache, base=base, targets=list(targets_for_base(base)))
-
-    env = _env()
-    tpl = env.get_template("template.html")
-    html = tpl.render(
-        base=base.value,
-        as_of=str(as_of),
-        kpi_best_overall=kpi_best_overall,
-        kpi_best_value=kpi_best_value,
-        kpi_lowest_risk=kpi_lowest_risk,
-        overall_table=overall_table,
-        value_table=value_table,
-        trend_table=trend_table,
-        risk_table=risk_table,
-        chart_overall_bar=chart_overall_bar,
-        chart_rates=chart_rates,
-        explain=explain,
-    )
+    return {
+        "as_of": str(scores["as_of"].max()),
+        "kpi_best_overall": overall.iloc[0]["target"],
+        "kpi_best_value": value.iloc[0]["target"],
+        "kpi_lowest_risk": risk.iloc[0]["target"],
+        "overall_table": _df_to_html_table(
+            overall, ["target", "overall_score", "value_score", "trend_score", "risk_score"]
+        ),
+        "value_table": _df_to_html_table(
+            value,
+            ["target", "value_score"]
+            + [f"percentile_{y}y" for y in VALUE_HORIZONS_YEARS]
+            + [f"zscore_{y}y" for y in VALUE_HORIZONS_YEARS],
+        ),
+        "trend_table": _df_to_html_table(
+            trend, ["target", "trend_score", "mom_60d", "sma_200_diff"]
+        ),
+        "risk_table": _df_to_html_table(
+            risk,
+            [
+                "target",
+                "risk_score",
+                "vol_90d",
+                "dd_current",
+                "dd_max_1y",
+                "dd_max_5y",
+                "days_since_peak",
+                "recovery_median_days",
+            ],
+        ),
+        "explain": explain,
+    }
 
-    out_file = paths.report_file(base)
-    out_file.write_text(html, encoding="utf-8")
-    return out_file
+
+def _base_correlation(pairs: Mapping[tuple[str, str], pd.Series], base: str) -> RollingCorrelation:
+    own = pair_series_panel({(pb, pq): s for (pb, pq), s in pairs.items() if pb == base})
+    window = MetricDefaults().vol_window
+    # the heatmap shows the latest window only; older returns would just grow the cubes
+    return returns_correlation(panel_log_returns(own, base).iloc[-window:], base, window)
+
+
+def _strength_fragments(pairs: Mapping[tuple[str, str], pd.Series]) -> dict[str, str]:
+    defaults = MetricDefaults()
+    # the table and the chart look back at most a year; the day x code x code cube
+    # of a long history would dwarf everything else in the report
+    days = max(defaults.mom_window, defaults.sma_window, _STRENGTH_CHART_DAYS) + 1
+    strength = panel_strength(pair_series_panel(pairs).iloc[-days:], defaults)
+    return {
+        "strength_table": _df_to_html_table(
+            strength.table,
+            ["rank", "currency", "strength_mom", "strength_1y", "strength_sma_diff"],
+        ),
+        "chart_strength": _chart_strength(strength.index),
+    }
+
+
+def render_report_html(
+    cache: CacheInput,
+    base: Currency,
+    scores: pd.DataFrame | None = None,
+    weights: ScoreWeights | None = None,
+    graph: ArtifactGraph | None = None,
+    executor: ShardExecutor | None = None,
+    scan: ScanConfig | None = None,
+    universe: CacheInput | None = None,
+    chart_points: int | None = None,
+) -> str:
+    """Render the report for `base` to an HTML string without touching disk.
+
+    `scores` may pass precomputed `rank_targets(cache, base)` output. Every
+    fragment is built through `graph`: with an artifact store attached, only
+    fragments whose input pairs (or parameters) changed are recomputed; the
+    stale per-pair metrics are scored together on `executor`.
+
+    With `scan`, a section lists the global top pairs of every base in
+    `universe` (default: `cache`); their metrics share the per-pair artifacts,
+    so reports for other bases reuse them.
+
+    `cache` and `universe` may also be per-pair series (e.g. from
+    `read_pair_series`), so a large cache never has to be loaded as one frame;
+    `chart_points` caps the points per line of the rates chart.
+    """
+    graph = graph or ArtifactGraph()
+    b = base.value
+    params = repr((MetricDefaults(), weights or DEFAULT_WEIGHTS))
+    rows = cache_rows(cache)
+
+    with stage("artifact_versions", rows_in=rows):
+        pairs = as_pair_series(cache)
+        for (pb, pq), s in pairs.items():
+            graph.source(f"pair:{pb}/{pq}", series_version(s))
+    series = {t: pairs[(b, t.value)] for t in targets_for_base(base) if (b, t.value) in pairs}
+    base_pairs = [f"pair:{b}/{t.value}" for t in series]
+
+    if scores is None:
+        with stage("ranking", rows_in=rows) as rec:
+            metrics = _pair_metrics(
+                graph, {(b, t.value): s for t, s in series.items()}, params, weights, executor
+            )
+            scores = graph.build(f"scores:{b}", metrics, lambda: _concat_rows(metrics.values()))
+            rec.rows_out = len(scores)
+    else:
+        graph.source(f"scores:{b}", frame_version(scores))
+    if scores.empty:
+        return f"No data for base={b}\n"
+
+    scores_key = [f"scores:{b}"]
+    tables = graph.build(f"tables:{b}", scores_key, lambda: _score_tables(scores))
+
+    with stage("chart_build", rows_in=rows):
+        chart_overall_bar = graph.build(
+            f"chart_overall:{b}",
+            scores_key,
+            lambda: _chart_overall_bar(build_rankings(scores)["overall"]),
+        )
+        chart_rates = graph.build(
+            f"chart_rates:{b}",
+            base_pairs,
+            lambda: _chart_rates(pairs, base, list(targets_for_base(base)), chart_points),
+            "" if chart_points is None else f"points={chart_points}",
+        )
+
+    with stage("sensitivity", rows_in=rows):
+        chart_sensitivity = graph.build(
+            f"chart_sensitivity:{b}",
+            base_pairs,
+            lambda: _chart_sensitivity(sensitivity_table(series, weights=weights), base),
+            params,
+        )
+
+    with stage("correlation", rows_in=rows):
+        chart_correlation = graph.build(
+            f"chart_correlation:{b}",
+            base_pairs,
+            lambda: _chart_correlation(_base_correlation(pairs, b)),
+        )
+
+    with stage("strength", rows_in=rows):
+        # strength triangulates through every pair in the cache
+        strength = graph.build(
+            f"strength:{b}",
+            [f"pair:{pb}/{pq}" for pb, pq in pairs],
+            lambda: _strength_fragments(pairs),
+        )
+
+    fragments = [f"{k}:{b}" for k in ("tables", "chart_overall", "chart_rates")]
+    fragments += [f"{k}:{b}" for k in ("chart_sensitivity", "chart_correlation", "strength")]
+
+    scan_table = ""
+    if scan is not None:
+        with stage("scan", rows_in=cache_rows(universe) if universe is not None else rows):
+            scan_table = _scan_fragment(graph, universe, pairs, scan, params, weights, executor)
+        fragments.append(f"scan:{scan.by}:{scan.top}")
+
+    def render() -> str:
+        with stage("template_render") as rec:
+            env = _env()
+            tpl = env.get_template("template.html")
+            html = tpl.render(
+                base=b,
+                **tables,
+                chart_overall_bar=chart_overall_bar,
+                chart_rates=chart_rates,
+                chart_correlation=chart_correlation,
+                chart_sensitivity=chart_sensitivity,
+                scan=scan,
+                scan_table=scan_table,
+                **strength,
+            )
+            rec.bytes_written = len(html.encode("utf-8"))
+            return html
+
+    html = graph.build(f"html:{b}", fragments, render, f"template={_template_version()}")
+    graph.save()
+    return html
+
+
+def _pair_metrics(
+    graph: ArtifactGraph,
+    series: Mapping[tuple[str, str], pd.Series],
+    params: str,
+    weights: ScoreWeights | None,
+    executor: ShardExecutor | None,
+) -> dict[str, pd.DataFrame]:
+    """One `metrics:BASE/QUOTE` artifact (a `score_pair_series` row) per pair.
+
+    Pairs whose artifact is stale are scored together in one batch.
+    """
+    stale = {
+        (pb, pq): s
+        for (pb, pq), s in series.items()
+        if not graph.is_current(f"metrics:{pb}/{pq}", [f"pair:{pb}/{pq}"], params)
+    }
+    fresh = score_pairs(stale, weights=weights, executor=executor)
+    rows = {}
+    if not fresh.empty:
+        pairs = zip(fresh["base"], fresh["target"], strict=True)
+        rows = {
+            pair: fresh.iloc[[i]].drop(columns="base").reset_index(drop=True)
+            for i, pair in enumerate(pairs)
+        }
+
+    def score_one(pair: tuple[str, str], s: pd.Series) -> pd.DataFrame:
+        # stale rows were scored above; this covers a lost payload
+        if pair in rows:
+            return rows[pair]
+        return score_pairs({pair: s}, weights=weights).drop(columns="base", errors="ignore")
+
+    return {
+        f"metrics:{pb}/{pq}": graph.build(
+            f"metrics:{pb}/{pq}",
+            [f"pair:{pb}/{pq}"],
+            lambda pair=(pb, pq), s=s: score_one(pair, s),
+            params,
+        )
+        for (pb, pq), s in series.items()
+    }
+
+
+def _scan_fragment(
+    graph: ArtifactGraph,
+    universe: CacheInput | None,
+    pairs: Mapping[tuple[str, str], pd.Series],
+    scan: ScanConfig,
+    params: str,
+    weights: ScoreWeights | None,
+    executor: ShardExecutor | None,
+) -> str:
+    """HTML table of the global top pairs across every base in `universe`."""
+    if universe is not None:
+        pairs = as_pair_series(universe)
+        for (pb, pq), s in pairs.items():
+            graph.source(f"pair:{pb}/{pq}", series_version(s))
+    metrics = _pair_metrics(graph, pairs, params, weights, executor)
+
+    def build() -> str:
+        rows = []
+        for key, row in metrics.items():
+            if not row.empty:
+                pb = key.removeprefix("metrics:").split("/", 1)[0]
+                rows.append(row.assign(base=pb))
+        if not rows:
+            return '<div class="muted">No pairs to scan.</div>'
+        top = top_pairs(pd.concat(rows, ignore_index=True), scan)
+        return _df_to_html_table(top, scan_columns(scan))
+
+    return graph.build(f"scan:{scan.by}:{scan.top}", metrics, build)
+
+
+def _concat_rows(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TypeVar, cast
+
+import numpy as np
+import pandas as pd
+
+from fxpower import __version__
+from fxpower.storage.atomic import atomic_write, ensure_parent_dir
+
+T = TypeVar("T")
+
+MANIFEST_NAME = "manifest.json"
+# Bump when a payload's shape or the code computing it changes without a release:
+# it is mixed into every artifact version, so older payloads stop matching.
+ARTIFACT_FORMAT = 1
+_CODE_VERSION = f"fxpower={__version__};format={ARTIFACT_FORMAT}"
+
+
+def _digest(*parts: bytes | str) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p if isinstance(p, bytes) else p.encode())
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def series_version(series: pd.Series) -> str:
+    """Content version of a date-indexed rate series (dates and values)."""
+    dates = pd.to_datetime(pd.Index(series.index)).to_numpy(dtype="datetime64[ns]")
+    return _digest(dates.tobytes(), np.ascontiguousarray(series.to_numpy("float64")).tobytes())
+
+
+def frame_version(df: pd.DataFrame) -> str:
+    """Content version of a dataframe (values, index and column names)."""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return _digest(hashed.tobytes(), repr(list(df.columns)))
+
+
+@dataclass(frozen=True, slots=True)
+class BuildEvent:
+    key: str
+    rebuilt: bool
+    reason: str  # why it was rebuilt, or "up to date"
+
+
+class ArtifactStore:
+    """Derived artifacts on disk plus a manifest of the input versions each was built from.
+
+    Payloads are pickled under `objects/<version>.pkl`; the manifest maps an
+    artifact key to its version and `{input key: input version}`. Unreadable or
+    missing payloads simply count as absent.
+
+    Several processes may share one store (e.g. two `fxpower report` runs):
+    `save` merges this store's entries into the manifest on disk and only
+    deletes payloads this store replaced, never another run's.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._manifest_path = root / MANIFEST_NAME
+        self.manifest: dict[str, dict] = self._read_manifest()
+        self._written: set[str] = set()
+        self._replaced: set[str] = set()
+
+    def _read_manifest(self) -> dict[str, dict]:
+        try:
+            return json.loads(self._manifest_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _object(self, version: str) -> Path:
+        return self.root / "objects" / f"{version}.pkl"
+
+    def load(self, key: str, version: str) -> tuple[bool, object]:
+        entry = self.manifest.get(key)
+        if entry is None or entry["version"] != version:
+            return False, None
+        try:
+            with self._object(version).open("rb") as f:
+                return True, pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return False, None
+
+    def put(self, key: str, version: str, inputs: dict[str, str], payload: object) -> None:
+        path = self._object(version)
+        ensure_parent_dir(path)
+        atomic_write(path, lambda tmp: tmp.write_bytes(pickle.dumps(payload)))
+        old = self.manifest.get(key)
+        if old is not None and old["version"] != version:
+            self._replaced.add(old["version"])
+        self.manifest[key] = {"version": version, "inputs": inputs}
+        self._written.add(key)
+
+    def save(self) -> None:
+        """Persist this store's entries and drop the payloads they replaced.
+
+        Entries written by other runs since this store was opened are kept, and
+        a replaced payload survives while any entry still refers to it.
+        """
+        if not self._written:
+            return
+        manifest = self._read_manifest()
+        manifest.update({key: self.manifest[key] for key in self._written})
+        self.manifest = manifest
+        ensure_parent_dir(self._manifest_path)
+        text = json.dumps(manifest, indent=1, sort_keys=True)
+        atomic_write(self._manifest_path, lambda tmp: tmp.write_text(text))
+        live = {e["version"] for e in manifest.values()}
+        for version in self._replaced - live:
+            self._object(version).unlink(missing_ok=True)
+        self._written.clear()
+        self._replaced.clear()
+
+
+class ArtifactGraph:
+    """Rebuild derived artifacts only when the versions of their inputs change.
+
+    Sources (e.g. one pair's rate series) get a content version; every derived
+    artifact's version is a digest of the code version, its key, its parameters
+    and its inputs' versions, so a change propagates downstream without hashing
+    outputs, and an upgrade invalidates every payload built by older code.
+    Without a store every artifact is built, but the events still explain why.
+    """
+
+    def __init__(self, store: ArtifactStore | None = None) -> None:
+        self.store = store
+        self.versions: dict[str, str] = {}
+        self.events: list[BuildEvent] = []
+
+    def source(self, key: str, version: str) -> None:
+        self.versions[key] = version
+
+    def _version(self, key: str, inputs: Iterable[str], params: str) -> tuple[str, dict[str, str]]:
+        deps = {d: self.versions[d] for d in sorted(set(inputs))}
+        if params:
+            deps["params"] = _digest(params)
+        deps["code"] = _digest(_CODE_VERSION)
+        return _digest(key, *(f"{k}={v}" for k, v in deps.items())), deps
+
+    def is_current(self, key: str, inputs: Iterable[str], params: str = "") -> bool:
+        """Whether `build` would reuse the stored artifact (lets callers batch the rest)."""
+        if self.store is None:
+            return False
+        entry = self.store.manifest.get(key)
+        return entry is not None and entry["version"] == self._version(key, inputs, params)[0]
+
+    def build(
+        self,
+        key: str,
+        inputs: Iterable[str],
+        fn: Callable[[], T],
+        params: str = "",
+    ) -> T:
+        version, deps = self._version(key, inputs, params)
+        self.versions[key] = version
+
+        if self.store is not None:
+            found, payload = self.store.load(key, version)
+            if found:
+                self.events.append(BuildEvent(key, False, "up to date"))
+                return cast(T, payload)
+
+        payload = fn()
+        self.events.append(BuildEvent(key, True, self._reason(key, deps)))
+        if self.store is not None:
+            self.store.put(key, version, deps, payload)
+        return payload
+
+    def _reason(self, key: str, deps: dict[str, str]) -> str:
+        entry = self.store.manifest.get(key) if self.store is not None else None
+        if entry is None:
+            return "new" if self.store is not None else "no artifact store"
+        old = entry["inputs"]
+        changed = sorted(k for k in deps if old.get(k) != deps[k])
+        removed = sorted(k for k in old if k not in deps)
+        parts = []
+        if changed:
+            parts.append("changed: " + ", ".join(changed))
+        if removed:
+            parts.append("removed: " + ", ".join(removed))
+        return "; ".join(parts) or "payload missing"
+
+    def save(self) -> None:
+        if self.store is not None:
+            self.store.save()
+
+    def explain(self) -> str:
+        """One line per artifact: rebuilt or reused, and why."""
+        width = max((len(e.key) for e in self.events), default=0)
+        rebuilt = sum(e.rebuilt for e in self.events)
+        lines = [f"Artifacts: {rebuilt} rebuilt, {len(self.events) - rebuilt} up to date"]
+        for e in self.events:
+            mark = "rebuilt" if e.rebuilt else "reused "
+            lines.append(f"  {mark}  {e.key:<{width}}  {e.reason}")
+        return "\n".join(lines)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+# mkstemp creates 0600 files; new files get the mode open() would give them instead.
+# Read once at import: os.umask can only be queried by setting it, which races threads.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def ensure_parent_dir(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+
+def atomic_write(path: Path, write: Callable[[Path], None]) -> None:
+    """Replace `path` with what `write` puts in a temp file next to it.
+
+    The temp file is fsynced and renamed over `path`, so readers see either the
+    old file or the complete new one, never a partial write. The result keeps
+    the mode of the file it replaces (new files: 0666 minus the umask).
+    """
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        write(tmp)
+        os.chmod(tmp, mode)
+        with tmp.open("rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
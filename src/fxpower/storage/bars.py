@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage.atomic import atomic_write, ensure_parent_dir
+
+BARS_SCHEMA = pa.schema(
+    [
+        ("date", pa.date32()),
+        ("base", pa.string()),
+        ("quote", pa.string()),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("ticks", pa.int64()),
+        ("realized_vol", pa.float64()),
+    ]
+)
+
+_KEYS = ["date", "base", "quote"]
+
+
+def bars_path(cache_path: Path) -> Path:
+    """Sidecar file holding daily intraday bars next to the cache (any cache backend)."""
+    return cache_path.with_name(f"{cache_path.stem}.bars.parquet")
+
+
+def read_bars(path: Path) -> pd.DataFrame:
+    """Daily bars (`BARS_SCHEMA` columns); empty if the file does not exist."""
+    if not path.exists():
+        return BARS_SCHEMA.empty_table().to_pandas()
+    with stage("bars_read") as rec:
+        rec.bytes_read = path.stat().st_size
+        table = pq.read_table(path).cast(BARS_SCHEMA)
+        rec.rows_out = table.num_rows
+        return table.to_pandas()
+
+
+def merge_bars(existing: pd.DataFrame, incoming: pd.DataFrame) -> pd.DataFrame:
+    """Same contract as `merge_cache`: dedupe on (date, base, quote), incoming wins, sorted."""
+    frames = [df.loc[:, BARS_SCHEMA.names] for df in (existing, incoming) if not df.empty]
+    if not frames:
+        return BARS_SCHEMA.empty_table().to_pandas()
+    combined = pd.concat(frames, ignore_index=True)
+    combined["date"] = pd.to_datetime(combined["date"]).dt.date
+    combined = combined.drop_duplicates(subset=_KEYS, keep="last")
+    return combined.sort_values(by=_KEYS, kind="mergesort").reset_index(drop=True)
+
+
+def write_bars(df: pd.DataFrame, path: Path) -> None:
+    with stage("bars_write", rows_in=len(df)) as rec:
+        ensure_parent_dir(path)
+        table = pa.Table.from_pandas(df.loc[:, BARS_SCHEMA.names], preserve_index=False)
+        table = table.cast(BARS_SCHEMA)
+        atomic_write(path, lambda tmp: pq.write_table(table, tmp))
+        rec.bytes_written = path.stat().st_size
@@ -1,9 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from datetime import date
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage import sqlite_cache
+from fxpower.storage.atomic import atomic_write, ensure_parent_dir
+from fxpower.storage.sqlite_cache import is_sqlite_path
 
 REQUIRED_COLUMNS: tuple[str, ...] = ("date", "base", "quote", "rate")
 
@@ -17,10 +28,6 @@ class CachePaths:
         return CachePaths(cache_file=Path("data") / "cache.parquet")
 
 
-def _ensure_parent_dir(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-
 def _validate_cache_df(df: pd.DataFrame) -> pd.DataFrame:
     missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
     if missing:
@@ -42,23 +49,201 @@ def _validate_cache_df(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
+GENERATION_KEY = b"fxpower.generation"
+LAYOUT_KEY = b"fxpower.layout"
+
+PARQUET_CODECS: tuple[str, ...] = ("none", "snappy", "gzip", "brotli", "lz4", "zstd")
+_LEVELED_CODECS = frozenset({"gzip", "brotli", "zstd"})
+
+# "all": pyarrow's default, every column dictionary-encoded. "strings": only base
+# and quote; dates are delta-encoded and rates byte-stream-split, which compress
+# far better once rows are sorted by pair. "none": as "strings" without dictionaries.
+DICTIONARY_MODES: tuple[str, ...] = ("all", "strings", "none")
+_TUNED_ENCODINGS = {"date": "DELTA_BINARY_PACKED", "rate": "BYTE_STREAM_SPLIT"}
+
+# row orders a Parquet cache can be written in
+LAYOUT_SORTS: dict[str, list[tuple[str, str]]] = {
+    "date": [("date", "ascending"), ("base", "ascending"), ("quote", "ascending")],
+    # one base's rows are contiguous, so base filters skip most row groups
+    "pair": [("base", "ascending"), ("quote", "ascending"), ("date", "ascending")],
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ParquetLayout:
+    """On-disk layout of the Parquet cache.
+
+    Stored in the file metadata, so every later write (fetch, ingest) keeps the
+    layout chosen by `fxpower cache compact`. The defaults are pyarrow's.
+    """
+
+    codec: str = "snappy"
+    level: int | None = None
+    row_group_rows: int | None = None  # None => pyarrow's default (1Mi rows)
+    dictionary: str = "all"  # a DICTIONARY_MODES value
+    sort: str | None = None  # a LAYOUT_SORTS key; None keeps the incoming row order
+
+    def __post_init__(self) -> None:
+        if self.codec not in PARQUET_CODECS:
+            raise ValueError(
+                f"Unknown codec '{self.codec}'. Supported: {', '.join(PARQUET_CODECS)}"
+            )
+        if self.level is not None and self.codec not in _LEVELED_CODECS:
+            raise ValueError(f"Codec '{self.codec}' has no compression level")
+        if self.dictionary not in DICTIONARY_MODES:
+            raise ValueError(
+                f"Unknown dictionary mode '{self.dictionary}'. "
+                f"Supported: {', '.join(DICTIONARY_MODES)}"
+            )
+        if self.row_group_rows is not None and self.row_group_rows < 1:
+            raise ValueError("row_group_rows must be >= 1")
+        if self.sort is not None and self.sort not in LAYOUT_SORTS:
+            raise ValueError(f"Unknown sort '{self.sort}'. Supported: {', '.join(LAYOUT_SORTS)}")
+
+    def write_options(self) -> dict[str, object]:
+        """Keyword arguments for `pq.write_table`."""
+        opts: dict[str, object] = {
+            "compression": self.codec,
+            "compression_level": self.level,
+            "row_group_size": self.row_group_rows,
+        }
+        if self.dictionary == "all":
+            return opts | {"use_dictionary": True}
+        strings = ["base", "quote"] if self.dictionary == "strings" else False
+        return opts | {"use_dictionary": strings, "column_encoding": _TUNED_ENCODINGS}
+
+    def to_json(self) -> bytes:
+        return json.dumps(asdict(self), sort_keys=True).encode()
+
+    @staticmethod
+    def from_metadata(metadata: dict[bytes, bytes] | None) -> ParquetLayout:
+        raw = (metadata or {}).get(LAYOUT_KEY)
+        if raw is None:
+            return ParquetLayout()
+        try:
+            return ParquetLayout(**json.loads(raw))
+        except (TypeError, ValueError):
+            return ParquetLayout()  # written by a newer version; fall back to defaults
+
+
+@dataclass(frozen=True, slots=True)
+class CacheSnapshot:
+    """A consistent view of the cache file as of one generation."""
+
+    path: Path
+    generation: int  # 0 when the file does not exist (or predates generations)
+    data: pd.DataFrame
+
+
+def _generation_from_metadata(metadata: dict[bytes, bytes] | None) -> int:
+    raw = (metadata or {}).get(GENERATION_KEY)
+    return int(raw) if raw is not None else 0
+
+
+def cache_generation(path: Path) -> int:
+    """Generation of the cache file currently at `path` (reads the footer only)."""
+    if is_sqlite_path(path):
+        return sqlite_cache.sqlite_generation(path)
+    try:
+        return _generation_from_metadata(pq.read_schema(path).metadata)
+    except FileNotFoundError:
+        return 0
+
+
+def parquet_layout(path: Path) -> ParquetLayout:
+    """Layout the Parquet cache at `path` was written with (defaults if missing)."""
+    try:
+        return ParquetLayout.from_metadata(pq.read_schema(path).metadata)
+    except FileNotFoundError:
+        return ParquetLayout()
+
+
+def read_snapshot(path: Path) -> CacheSnapshot:
+    """Read the cache as one pinned snapshot.
+
+    The file is opened once and both data and generation come from that handle.
+    Writers replace the file by atomic rename, so a concurrent write can never
+    produce a torn or mixed read: the open handle keeps the old version alive.
+    SQLite caches read inside one transaction instead.
+    """
+    if is_sqlite_path(path):
+        return _read_sqlite_snapshot(path)
+
+    with stage("cache_read") as rec:
+        try:
+            f = path.open("rb")
+        except FileNotFoundError:
+            rec.rows_out = 0
+            return CacheSnapshot(path, 0, pd.DataFrame(columns=list(REQUIRED_COLUMNS)))
+
+        with f:
+            rec.bytes_read = os.fstat(f.fileno()).st_size
+            table = pq.read_table(f)
+
+        df = _validate_cache_df(table.to_pandas())
+        rec.rows_out = len(df)
+        return CacheSnapshot(path, _generation_from_metadata(table.schema.metadata), df)
+
+
+def _read_sqlite_snapshot(path: Path, **filters: object) -> CacheSnapshot:
+    with stage("cache_read") as rec:
+        if not path.exists():
+            rec.rows_out = 0
+            return CacheSnapshot(path, 0, pd.DataFrame(columns=list(REQUIRED_COLUMNS)))
+        rec.bytes_read = path.stat().st_size
+        generation, df = sqlite_cache.read_rates(path, **filters)
+        df = _validate_cache_df(df)
+        rec.rows_out = len(df)
+        return CacheSnapshot(path, generation, df)
+
+
 def read_cache(path: Path) -> pd.DataFrame:
     """Read cache parquet into a normalized dataframe.
 
     Returns empty dataframe with required columns if the file doesn't exist.
     """
-    if not path.exists():
-        return pd.DataFrame(columns=list(REQUIRED_COLUMNS))
+    return read_snapshot(path).data
+
+
+def write_cache(df: pd.DataFrame, path: Path) -> int:
+    """Write dataframe to cache parquet after validation/normalization.
+
+    The file is written to a temporary sibling and atomically renamed over `path`,
+    stamped with the next generation number. Assumes a single writer at a time.
+    Returns the new generation.
+    """
+    if is_sqlite_path(path):
+        with stage("sqlite_write", rows_in=len(df)) as rec:
+            ensure_parent_dir(path)
+            generation = sqlite_cache.replace_rates(_validate_cache_df(df), path)
+            rec.bytes_written = path.stat().st_size
+            return generation
 
-    df = pd.read_parquet(path)
-    return _validate_cache_df(df)
+    with stage("parquet_write", rows_in=len(df)) as rec:
+        ensure_parent_dir(path)
+        normalized = _validate_cache_df(df)
+        generation = cache_generation(path) + 1
 
+        table = pa.Table.from_pandas(normalized, preserve_index=False)
+        _write_parquet(table, path, generation)
+        rec.bytes_written = path.stat().st_size
+        return generation
 
-def write_cache(df: pd.DataFrame, path: Path) -> None:
-    """Write dataframe to cache parquet after validation/normalization."""
-    _ensure_parent_dir(path)
-    normalized = _validate_cache_df(df)
-    normalized.to_parquet(path, index=False)
+
+def _write_parquet(
+    table: pa.Table, path: Path, generation: int, layout: ParquetLayout | None = None
+) -> None:
+    layout = layout or parquet_layout(path)
+    if layout.sort is not None:
+        table = table.sort_by(LAYOUT_SORTS[layout.sort])
+    metadata = {
+        **(table.schema.metadata or {}),
+        GENERATION_KEY: str(generation).encode(),
+        LAYOUT_KEY: layout.to_json(),
+    }
+    table = table.replace_schema_metadata(metadata)
+    options = layout.write_options()
+    atomic_write(path, lambda tmp: pq.write_table(table, tmp, **options))
 
 
 def merge_cache(existing: pd.DataFrame, incoming: pd.DataFrame) -> pd.DataFrame:
@@ -68,6 +253,13 @@ def merge_cache(existing: pd.DataFrame, incoming: pd.DataFrame) -> pd.DataFrame:
     - Incoming wins on conflicts
     - Sort by date, base, quote (stable)
     """
+    with stage("merge", rows_in=len(existing) + len(incoming)) as rec:
+        merged = _merge_frames(existing, incoming)
+        rec.rows_out = len(merged)
+        return merged
+
+
+def _merge_frames(existing: pd.DataFrame, incoming: pd.DataFrame) -> pd.DataFrame:
     left = (
         _validate_cache_df(existing)
         if not existing.empty
@@ -91,3 +283,188 @@ def merge_cache(existing: pd.DataFrame, incoming: pd.DataFrame) -> pd.DataFrame:
         drop=True
     )
     return combined
+
+
+CACHE_SCHEMA = pa.schema(
+    [
+        ("date", pa.date32()),
+        ("base", pa.string()),
+        ("quote", pa.string()),
+        ("rate", pa.float64()),
+    ]
+)
+
+_SORT_KEYS = LAYOUT_SORTS["date"]
+
+
+def read_cache_table(path: Path) -> pa.Table:
+    """Read the cache as an Arrow table with `CACHE_SCHEMA` (empty if missing)."""
+    if is_sqlite_path(path):
+        return pa.Table.from_pandas(read_cache(path), schema=CACHE_SCHEMA, preserve_index=False)
+
+    with stage("cache_read") as rec:
+        if not path.exists():
+            rec.rows_out = 0
+            return CACHE_SCHEMA.empty_table()
+        rec.bytes_read = path.stat().st_size
+        table = pq.read_table(path, columns=list(REQUIRED_COLUMNS))
+        table = table.replace_schema_metadata(None).cast(CACHE_SCHEMA)
+        rec.rows_out = table.num_rows
+        return table
+
+
+def merge_tables(existing: pa.Table, incoming: pa.Table) -> pa.Table:
+    """Arrow counterpart of `merge_cache`: dedupe on (date, base, quote), incoming wins."""
+    with stage("merge", rows_in=existing.num_rows + incoming.num_rows) as rec:
+        keys = ["date", "base", "quote"]
+        existing = existing.select(list(REQUIRED_COLUMNS)).cast(CACHE_SCHEMA)
+        incoming = incoming.select(list(REQUIRED_COLUMNS)).cast(CACHE_SCHEMA)
+        if existing.num_rows and incoming.num_rows:
+            kept = existing.join(incoming.select(keys), keys=keys, join_type="left anti")
+        else:
+            kept = existing
+        merged = pa.concat_tables([kept, incoming])
+        merged = merged.sort_by(_SORT_KEYS).combine_chunks()
+        rec.rows_out = merged.num_rows
+        return merged
+
+
+def write_cache_table(table: pa.Table, path: Path, layout: ParquetLayout | None = None) -> int:
+    """Write an Arrow table with `CACHE_SCHEMA` columns; same contract as `write_cache`.
+
+    `layout` replaces the layout of the existing file (Parquet only).
+    """
+    if is_sqlite_path(path):
+        return write_cache(table.to_pandas(), path)
+
+    with stage("parquet_write", rows_in=table.num_rows) as rec:
+        ensure_parent_dir(path)
+        table = table.select(list(REQUIRED_COLUMNS)).cast(CACHE_SCHEMA)
+        generation = cache_generation(path) + 1
+        _write_parquet(table, path, generation, layout)
+        rec.bytes_written = path.stat().st_size
+        return generation
+
+
+def merge_into_cache(existing: pd.DataFrame, incoming: pd.DataFrame, path: Path) -> pd.DataFrame:
+    """Merge `incoming` into an already-loaded cache and persist the result.
+
+    Parquet caches are rewritten; SQLite caches upsert only the incoming rows.
+    Returns the merged cache.
+    """
+    merged = merge_cache(existing, incoming)
+    if not is_sqlite_path(path):
+        write_cache(merged, path)
+        return merged
+
+    upsert_cache_rows(incoming, path)
+    return merged
+
+
+def upsert_cache_rows(incoming: pd.DataFrame, path: Path) -> int:
+    """Insert or replace `incoming` rows in a SQLite cache without reading it.
+
+    Returns the number of rows written.
+    """
+    with stage("sqlite_upsert", rows_in=len(incoming)) as rec:
+        ensure_parent_dir(path)
+        rows = _validate_cache_df(incoming).drop_duplicates(
+            subset=["date", "base", "quote"], keep="last"
+        )
+        _, rec.rows_out = sqlite_cache.upsert_rates(rows, path)
+        return rec.rows_out
+
+
+def write_cache_stream(tables: Iterable[pa.Table], path: Path, row_group_rows: int) -> int:
+    """Write `CACHE_SCHEMA` tables to the Parquet cache one row group at a time.
+
+    Tables must already come in the order of the file's layout; they are
+    buffered to at most `row_group_rows` rows (or the layout's own row-group
+    size, if smaller), so memory stays at about one row group. Same atomic
+    rename and generation contract as `write_cache`. Returns the new generation.
+    """
+    layout = parquet_layout(path)
+    if layout.row_group_rows is not None:
+        row_group_rows = min(row_group_rows, layout.row_group_rows)
+    if row_group_rows < 1:
+        raise ValueError("row_group_rows must be >= 1")
+
+    with stage("parquet_write") as rec:
+        ensure_parent_dir(path)
+        generation = cache_generation(path) + 1
+        schema = CACHE_SCHEMA.with_metadata(
+            {GENERATION_KEY: str(generation).encode(), LAYOUT_KEY: layout.to_json()}
+        )
+        options = layout.write_options()
+        options.pop("row_group_size")
+        rows = 0
+
+        def write(tmp: Path) -> None:
+            nonlocal rows
+            pending: list[pa.Table] = []
+            buffered = 0
+            with pq.ParquetWriter(tmp, schema, **options) as writer:
+                for table in tables:
+                    table = table.select(list(REQUIRED_COLUMNS)).cast(CACHE_SCHEMA)
+                    pending.append(table)
+                    buffered += table.num_rows
+                    while buffered >= row_group_rows:
+                        group = pa.concat_tables(pending)
+                        writer.write_table(group.slice(0, row_group_rows))
+                        pending = [group.slice(row_group_rows)]
+                        buffered -= row_group_rows
+                        rows += row_group_rows
+                if buffered:
+                    writer.write_table(pa.concat_tables(pending))
+                    rows += buffered
+
+        atomic_write(path, write)
+        rec.rows_out = rows
+        rec.bytes_written = path.stat().st_size
+        return generation
+
+
+def read_rates(
+    path: Path,
+    base: str,
+    quote: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> pd.DataFrame:
+    """Rows for one base (optionally one pair and a date range), without a full load.
+
+    SQLite answers from the (base, quote, date) key; Parquet pushes the filters
+    down to row-group statistics.
+    """
+    if is_sqlite_path(path):
+        return _read_sqlite_snapshot(path, base=base, quote=quote, start=start, end=end).data
+
+    with stage("cache_read") as rec:
+        if not path.exists():
+            rec.rows_out = 0
+            return pd.DataFrame(columns=list(REQUIRED_COLUMNS))
+        rec.bytes_read = path.stat().st_size
+        filters: list[tuple[str, str, object]] = [("base", "==", base)]
+        if quote is not None:
+            filters.append(("quote", "==", quote))
+        if start is not None:
+            filters.append(("date", ">=", start))
+        if end is not None:
+            filters.append(("date", "<=", end))
+        df = _validate_cache_df(pq.read_table(path, filters=filters).to_pandas())
+        rec.rows_out = len(df)
+        return df
+
+
+def latest_rates(path: Path, base: str | None = None) -> pd.DataFrame:
+    """Most recent (date, base, quote, rate) row of every pair, optionally of one base."""
+    if is_sqlite_path(path):
+        if not path.exists():
+            return pd.DataFrame(columns=list(REQUIRED_COLUMNS))
+        return _validate_cache_df(sqlite_cache.latest_rates(path, base=base))
+
+    df = read_cache(path) if base is None else read_rates(path, base=base)
+    if df.empty:
+        return df
+    df = df.sort_values(by=["base", "quote", "date"], kind="mergesort")
+    return df.drop_duplicates(subset=["base", "quote"], keep="last").reset_index(drop=True)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage import sqlite_cache
+from fxpower.storage.cache import (
+    ParquetLayout,
+    cache_generation,
+    parquet_layout,
+    read_cache,
+    read_cache_table,
+    read_rates,
+    write_cache_table,
+)
+from fxpower.storage.sqlite_cache import is_sqlite_path
+
+PAIR_COLUMNS: tuple[str, ...] = ("base", "quote", "rows", "first", "last")
+ROW_GROUP_COLUMNS: tuple[str, ...] = (
+    "row_group",
+    "rows",
+    "compressed_bytes",
+    "uncompressed_bytes",
+    "date_min",
+    "date_max",
+    "base_min",
+    "base_max",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactionConfig:
+    """Retention and target layout for `compact_cache`.
+
+    `keep_years=None` keeps all history; otherwise rows older than that many
+    years before the latest cache date are dropped. The default layout sorts
+    by pair so that base filters (`read_rates`) prune row groups, and encodes
+    dates and rates for that order.
+    """
+
+    keep_years: float | None = None
+    layout: ParquetLayout = field(
+        default_factory=lambda: ParquetLayout(
+            codec="zstd", row_group_rows=65_536, dictionary="strings", sort="pair"
+        )
+    )
+    read_repeats: int = 3
+
+    def __post_init__(self) -> None:
+        if self.keep_years is not None and self.keep_years <= 0:
+            raise ValueError("keep_years must be > 0")
+        if self.read_repeats < 1:
+            raise ValueError("read_repeats must be >= 1")
+
+
+@dataclass(frozen=True, slots=True)
+class CacheMeasurement:
+    rows: int
+    file_bytes: int
+    full_read_s: float  # median wall time of reading the whole cache
+    base_read_s: float  # median wall time of `read_rates` for one base
+
+
+@dataclass(frozen=True, slots=True)
+class CompactionResult:
+    before: CacheMeasurement
+    after: CacheMeasurement
+    cutoff: date | None  # rows dated before this were dropped
+    generation: int
+
+    def summary(self) -> pd.DataFrame:
+        """Before/after table: rows, MB on disk and read latencies in ms."""
+        rows = []
+        for label, m in (("before", self.before), ("after", self.after)):
+            rows.append(
+                {
+                    "": label,
+                    "rows": m.rows,
+                    "file_mb": m.file_bytes / 1e6,
+                    "full_read_ms": m.full_read_s * 1e3,
+                    "base_read_ms": m.base_read_s * 1e3,
+                }
+            )
+        return pd.DataFrame(rows)
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    path: Path
+    summary: dict[str, object]  # format, size, generation, row count, layout
+    pairs: pd.DataFrame  # PAIR_COLUMNS
+    row_groups: pd.DataFrame  # ROW_GROUP_COLUMNS (empty for SQLite)
+
+
+def _median_time(fn: Callable[[], object], repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def measure_cache(path: Path, repeats: int = 3) -> CacheMeasurement:
+    """Rows, size on disk and read latencies of the cache at `path`."""
+    table = read_cache_table(path)
+    bases = pc.unique(table["base"]).to_pylist()
+    base = min(bases) if bases else "PLN"
+    return CacheMeasurement(
+        rows=table.num_rows,
+        file_bytes=path.stat().st_size if path.exists() else 0,
+        full_read_s=_median_time(lambda: read_cache(path), repeats),
+        base_read_s=_median_time(lambda: read_rates(path, base=base), repeats),
+    )
+
+
+def retention_cutoff(latest: date, keep_years: float) -> date:
+    return (pd.Timestamp(latest) - pd.Timedelta(days=round(keep_years * 365.25))).date()
+
+
+def compact_cache(path: Path, config: CompactionConfig | None = None) -> CompactionResult:
+    """Apply the retention policy and rewrite the cache in the configured layout.
+
+    Parquet caches are re-sorted and rewritten (atomically, bumping the
+    generation) with the configured codec, level, row-group size and dictionary
+    encoding. SQLite caches delete the expired rows and VACUUM; the Parquet
+    layout options do not apply to them.
+    """
+    config = config or CompactionConfig()
+    if not path.exists():
+        raise ValueError(f"No cache at {path}")
+    before = measure_cache(path, config.read_repeats)
+
+    with stage("cache_compact", rows_in=before.rows) as rec:
+        table = read_cache_table(path)
+        cutoff = None
+        if config.keep_years is not None and table.num_rows:
+            latest = pc.max(table["date"]).as_py()
+            cutoff = retention_cutoff(latest, config.keep_years)
+
+        if is_sqlite_path(path):
+            generation, deleted = sqlite_cache.compact(path, cutoff)
+            rec.rows_out = table.num_rows - deleted
+        else:
+            if cutoff is not None:
+                table = table.filter(pc.greater_equal(table["date"], pa.scalar(cutoff)))
+            generation = write_cache_table(table, path, layout=config.layout)
+            rec.rows_out = table.num_rows
+        rec.bytes_written = path.stat().st_size
+
+    after = measure_cache(path, config.read_repeats)
+    return CompactionResult(before=before, after=after, cutoff=cutoff, generation=generation)
+
+
+def _pair_coverage(table: pa.Table) -> pd.DataFrame:
+    grouped = table.group_by(["base", "quote"]).aggregate(
+        [("date", "count"), ("date", "min"), ("date", "max")]
+    )
+    df = grouped.to_pandas().rename(
+        columns={"date_count": "rows", "date_min": "first", "date_max": "last"}
+    )
+    df = df.sort_values(by=["base", "quote"], kind="mergesort").reset_index(drop=True)
+    return df.loc[:, list(PAIR_COLUMNS)]
+
+
+def _row_groups(meta: pq.FileMetaData) -> pd.DataFrame:
+    names = meta.schema.names
+    rows = []
+    for i in range(meta.num_row_groups):
+        rg = meta.row_group(i)
+        cols = {names[j]: rg.column(j) for j in range(rg.num_columns)}
+        date_stats = cols["date"].statistics
+        base_stats = cols["base"].statistics
+        rows.append(
+            {
+                "row_group": i,
+                "rows": rg.num_rows,
+                "compressed_bytes": sum(c.total_compressed_size for c in cols.values()),
+                "uncompressed_bytes": rg.total_byte_size,
+                "date_min": date_stats.min if date_stats and date_stats.has_min_max else None,
+                "date_max": date_stats.max if date_stats and date_stats.has_min_max else None,
+                "base_min": base_stats.min if base_stats and base_stats.has_min_max else None,
+                "base_max": base_stats.max if base_stats and base_stats.has_min_max else None,
+            }
+        )
+    return pd.DataFrame(rows, columns=list(ROW_GROUP_COLUMNS))
+
+
+def cache_stats(path: Path) -> CacheStats:
+    """Rows per pair, date coverage and on-disk layout of the cache at `path`."""
+    if not path.exists():
+        raise ValueError(f"No cache at {path}")
+    summary: dict[str, object] = {
+        "path": str(path),
+        "file_bytes": path.stat().st_size,
+        "generation": cache_generation(path),
+    }
+
+    if is_sqlite_path(path):
+        pairs = sqlite_cache.pair_coverage(path)
+        pairs["first"] = pd.to_datetime(pairs["first"]).dt.date
+        pairs["last"] = pd.to_datetime(pairs["last"]).dt.date
+        summary |= {"format": "sqlite", "rows": int(pairs["rows"].sum())}
+        summary |= sqlite_cache.file_layout(path)
+        return CacheStats(path, summary, pairs, pd.DataFrame(columns=list(ROW_GROUP_COLUMNS)))
+
+    meta = pq.ParquetFile(path).metadata
+    pairs = _pair_coverage(read_cache_table(path))
+    row_groups = _row_groups(meta)
+    layout = parquet_layout(path)
+    encodings: set[str] = set()
+    codecs: set[str] = set()
+    for i in range(meta.num_row_groups):
+        for j in range(meta.num_columns):
+            col = meta.row_group(i).column(j)
+            codecs.add(col.compression.lower())
+            encodings.update(e.lower() for e in col.encodings)
+    summary |= {
+        "format": "parquet",
+        "rows": meta.num_rows,
+        "row_groups": meta.num_row_groups,
+        "codecs": ", ".join(sorted(codecs)) or "-",
+        "compression_level": layout.level if layout.level is not None else "default",
+        "encodings": ", ".join(sorted(encodings)) or "-",
+        "sort": layout.sort or "as written",
+        "created_by": meta.created_by,
+    }
+    return CacheStats(path, summary, pairs, row_groups)
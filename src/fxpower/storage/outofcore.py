@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from fxpower.instrumentation.profiler import stage
+from fxpower.storage import sqlite_cache
+from fxpower.storage.cache import REQUIRED_COLUMNS
+from fxpower.storage.sqlite_cache import is_sqlite_path
+
+# per cache row: int32 day + float64 rate while collecting, then the float64 series
+# (chunks are freed pair by pair, but the allocator rarely hands them back in time)
+_PAIR_ROW_BYTES = 24
+# one scanned row: decoded columns plus the numpy copies made while grouping it
+_BATCH_ROW_BYTES = 128
+# Parquet pages are streamed through a buffer this size instead of whole column chunks
+_READ_BUFFER_BYTES = 1 << 18
+
+
+@dataclass(frozen=True, slots=True)
+class OutOfCoreConfig:
+    """Memory ceiling for reading the cache as per-pair arrays (`read_pair_series`).
+
+    The budget covers the collected arrays plus one scanned batch; scoring and
+    charts work on the arrays and add little on top.
+    """
+
+    memory_mb: float = 256.0
+
+    def __post_init__(self) -> None:
+        if self.memory_mb <= 0:
+            raise ValueError("memory_mb must be > 0")
+        if self.batch_rows() < 256:
+            raise ValueError(f"memory_mb={self.memory_mb:g} is too small to scan the cache")
+
+    def budget_bytes(self) -> int:
+        return int(self.memory_mb * 2**20)
+
+    def batch_rows(self) -> int:
+        """Rows per scanned batch: a sixteenth of the budget, at most 1M rows."""
+        return min(self.budget_bytes() // 16 // _BATCH_ROW_BYTES, 1 << 20)
+
+
+class _PairCollector:
+    """Per-pair (day, rate) chunks, grouped batch by batch, under a byte budget."""
+
+    def __init__(self, budget_bytes: int, memory_mb: float) -> None:
+        self._chunks: dict[tuple[str, str], list[tuple[np.ndarray, np.ndarray]]] = {}
+        self._budget = budget_bytes
+        self._memory_mb = memory_mb
+        self.rows = 0
+
+    def add(
+        self,
+        days: np.ndarray,
+        base_idx: np.ndarray,
+        base_names: list[str],
+        quote_idx: np.ndarray,
+        quote_names: list[str],
+        rates: np.ndarray,
+    ) -> None:
+        keys = base_idx.astype("int64") * len(quote_names) + quote_idx
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+        for lo, hi in zip(starts, ends, strict=True):
+            b, q = divmod(int(keys[lo]), len(quote_names))
+            rows = order[lo:hi]
+            pair = (base_names[b], quote_names[q])
+            self._chunks.setdefault(pair, []).append((days[rows], rates[rows]))
+        self.rows += len(keys)
+        if self.rows * _PAIR_ROW_BYTES > self._budget:
+            raise ValueError(
+                f"The cache holds more than {self.rows:,} matching rows, which do not fit "
+                f"in {self._memory_mb:g} MB as per-pair arrays; raise the memory budget"
+            )
+
+    def series(self) -> dict[tuple[str, str], pd.Series]:
+        """Date-indexed series per pair, as `split_pair_series` returns them.
+
+        Pairs that cover the same days share one index object, so a cross-rate
+        cache costs about 8 bytes per row plus one index.
+        """
+        indexes: dict[bytes, pd.Index] = {}
+        out: dict[tuple[str, str], pd.Series] = {}
+        for pair in sorted(self._chunks):
+            parts = self._chunks.pop(pair)
+            days = np.concatenate([d for d, _ in parts])
+            rates = np.concatenate([r for _, r in parts])
+            del parts
+            if len(days) > 1 and (np.diff(days) < 0).any():
+                order = np.argsort(days, kind="stable")
+                days, rates = days[order], rates[order]
+            digest = hashlib.blake2b(days.tobytes(), digest_size=16).digest()
+            index = indexes.get(digest)
+            if index is None:
+                index = pd.Index(days.astype("datetime64[D]").astype(object))
+                indexes[digest] = index
+            out[pair] = pd.Series(rates, index=index, name=f"{pair[0]}/{pair[1]}")
+        return out
+
+
+def _row_groups_for(meta: pq.FileMetaData, bases: frozenset[str]) -> list[int]:
+    """Row groups whose `base` statistics may contain one of `bases` (all if empty)."""
+    groups = list(range(meta.num_row_groups))
+    if not bases:
+        return groups
+    col = meta.schema.names.index("base")
+    keep = []
+    for i in groups:
+        stats = meta.row_group(i).column(col).statistics
+        if stats is None or not stats.has_min_max:
+            keep.append(i)
+        elif any(stats.min <= b <= stats.max for b in bases):
+            keep.append(i)
+    return keep
+
+
+def _dictionary(arr: pa.Array) -> tuple[np.ndarray, list[str]]:
+    if not pa.types.is_dictionary(arr.type):
+        arr = pc.dictionary_encode(arr)
+    return arr.indices.to_numpy(zero_copy_only=False), arr.dictionary.to_pylist()
+
+
+def _parquet_batches(
+    path: Path, bases: frozenset[str], batch_rows: int
+) -> Iterator[tuple[np.ndarray, ...]]:
+    # buffered, without pre-buffering: memory does not grow with the row-group size
+    f = pq.ParquetFile(
+        path,
+        pre_buffer=False,
+        buffer_size=_READ_BUFFER_BYTES,
+        read_dictionary=["base", "quote"],
+    )
+    batches = f.iter_batches(
+        batch_size=batch_rows,
+        row_groups=_row_groups_for(f.metadata, bases),
+        columns=list(REQUIRED_COLUMNS),
+        use_threads=False,
+    )
+    for batch in batches:
+        base_idx, base_names = _dictionary(batch.column("base"))
+        quote_idx, quote_names = _dictionary(batch.column("quote"))
+        days = batch.column("date").cast(pa.date32()).cast(pa.int32())
+        rates = batch.column("rate").cast(pa.float64())
+        yield (
+            days.to_numpy(zero_copy_only=False),
+            base_idx,
+            base_names,
+            quote_idx,
+            quote_names,
+            rates.to_numpy(zero_copy_only=False),
+        )
+
+
+def _sqlite_batches(
+    path: Path, bases: frozenset[str], batch_rows: int
+) -> Iterator[tuple[np.ndarray, ...]]:
+    for df in sqlite_cache.iter_rates(path, bases=tuple(sorted(bases)), batch_rows=batch_rows):
+        base_idx, base_names = pd.factorize(df["base"].astype(str))
+        quote_idx, quote_names = pd.factorize(df["quote"].astype(str))
+        days = pd.to_datetime(df["date"]).to_numpy("datetime64[D]").astype("int32")
+        rates = pd.to_numeric(df["rate"], errors="raise").to_numpy("float64")
+        yield days, base_idx, list(base_names), quote_idx, list(quote_names), rates
+
+
+def read_pair_series(
+    path: Path,
+    bases: Iterable[str] = (),
+    config: OutOfCoreConfig | None = None,
+) -> dict[tuple[str, str], pd.Series]:
+    """`split_pair_series(read_cache(path))` without loading the long cache frame.
+
+    The cache is scanned in bounded batches (Parquet row groups without a
+    matching base are skipped by their statistics; SQLite pages through a
+    cursor) and only per-pair day and rate arrays are kept. Raises ValueError
+    when those arrays would exceed `config.memory_mb`. Empty `bases` means all.
+    """
+    config = config or OutOfCoreConfig()
+    wanted = frozenset(bases)
+    with stage("cache_read") as rec:
+        if not path.exists():
+            rec.rows_out = 0
+            return {}
+        rec.bytes_read = os.stat(path).st_size
+        scan = _sqlite_batches if is_sqlite_path(path) else _parquet_batches
+        collector = _PairCollector(config.budget_bytes(), config.memory_mb)
+        for days, base_idx, base_names, quote_idx, quote_names, rates in scan(
+            path, wanted, config.batch_rows()
+        ):
+            if wanted:
+                keep = np.isin(np.asarray(base_names, dtype=object), list(wanted))[base_idx]
+                if not keep.all():
+                    days, base_idx, quote_idx, rates = (
+                        a[keep] for a in (days, base_idx, quote_idx, rates)
+                    )
+            if len(days):
+                collector.add(days, base_idx, base_names, quote_idx, quote_names, rates)
+        rec.rows_out = collector.rows
+        return collector.series()
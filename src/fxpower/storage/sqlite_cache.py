@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+# cache paths with these suffixes use SQLite instead of Parquet (see storage.cache)
+SQLITE_SUFFIXES: frozenset[str] = frozenset({".sqlite", ".sqlite3", ".db"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rates (
+    base TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    date TEXT NOT NULL,  -- ISO yyyy-mm-dd, sorts chronologically
+    rate REAL NOT NULL,
+    PRIMARY KEY (base, quote, date)
+) WITHOUT ROWID
+"""
+
+_UPSERT = """
+INSERT INTO rates (base, quote, date, rate) SELECT base, quote, date, rate FROM incoming WHERE true
+ON CONFLICT (base, quote, date) DO UPDATE SET rate = excluded.rate
+"""
+
+
+def is_sqlite_path(path: Path) -> bool:
+    return path.suffix.lower() in SQLITE_SUFFIXES
+
+
+@contextmanager
+def _connect(path: Path) -> Iterator[sqlite3.Connection]:
+    # autocommit mode: transactions are explicit BEGIN/COMMIT below. WAL lets readers
+    # keep a consistent snapshot while a writer commits.
+    with closing(sqlite3.connect(path, isolation_level=None, timeout=30.0)) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        yield conn
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection, mode: str = "DEFERRED") -> Iterator[None]:
+    conn.execute(f"BEGIN {mode}")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _generation(conn: sqlite3.Connection) -> int:
+    # PRAGMA user_version plays the role of the Parquet generation metadata
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def _bump_generation(conn: sqlite3.Connection) -> int:
+    generation = _generation(conn) + 1
+    conn.execute(f"PRAGMA user_version = {generation}")
+    return generation
+
+
+def _rows(df: pd.DataFrame) -> Iterator[tuple[str, str, str, float]]:
+    """(base, quote, iso date, rate) tuples from a validated cache frame."""
+    dates = [d.isoformat() for d in df["date"]]
+    return zip(
+        df["base"].astype(str),
+        df["quote"].astype(str),
+        dates,
+        df["rate"].astype("float64").tolist(),
+        strict=True,
+    )
+
+
+def sqlite_generation(path: Path) -> int:
+    if not path.exists():
+        return 0
+    with _connect(path) as conn:
+        return _generation(conn)
+
+
+def read_rates(
+    path: Path,
+    base: str | None = None,
+    quote: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> tuple[int, pd.DataFrame]:
+    """Return (generation, rows) matching the optional filters, from one read snapshot.
+
+    Filters on base (and quote, and a date range) are answered from the primary
+    key, so a pair scan reads only that pair's rows. Rows come back in key order,
+    which needs no sort step.
+    """
+    clauses: list[str] = []
+    params: list[object] = []
+    for column, op, value in (
+        ("base", "=", base),
+        ("quote", "=", quote),
+        ("date", ">=", start.isoformat() if start else None),
+        ("date", "<=", end.isoformat() if end else None),
+    ):
+        if value is not None:
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"SELECT date, base, quote, rate FROM rates {where} ORDER BY base, quote, date"
+
+    with _connect(path) as conn, _transaction(conn):
+        generation = _generation(conn)
+        df = pd.read_sql_query(sql, conn, params=params)
+    return generation, df
+
+
+def iter_rates(
+    path: Path,
+    bases: tuple[str, ...] = (),
+    pairs: tuple[tuple[str, str], ...] = (),
+    start: date | None = None,
+    end: date | None = None,
+    batch_rows: int = 65_536,
+) -> Iterator[pd.DataFrame]:
+    """Matching rows in key order, `batch_rows` at a time, from one read snapshot.
+
+    Empty `bases` / `pairs` mean no filter on them.
+    """
+    clauses: list[str] = []
+    params: list[object] = []
+    if bases:
+        clauses.append(f"base IN ({', '.join('?' * len(bases))})")
+        params.extend(bases)
+    if pairs:
+        clauses.append("(" + " OR ".join("(base = ? AND quote = ?)" for _ in pairs) + ")")
+        params.extend(code for pair in pairs for code in pair)
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        clauses.append("date <= ?")
+        params.append(end.isoformat())
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"SELECT date, base, quote, rate FROM rates {where} ORDER BY base, quote, date"
+
+    with _connect(path) as conn, _transaction(conn):
+        cur = conn.execute(sql, params)
+        while rows := cur.fetchmany(batch_rows):
+            yield pd.DataFrame(rows, columns=["date", "base", "quote", "rate"])
+
+
+def latest_rates(path: Path, base: str | None = None) -> pd.DataFrame:
+    """Most recent row of every pair (of one base if given); one key seek per pair."""
+    # SQLite returns the bare `rate` column from the row holding MAX(date)
+    where = "WHERE base = ?" if base is not None else ""
+    sql = f"SELECT MAX(date) AS date, base, quote, rate FROM rates {where} GROUP BY base, quote"
+    with _connect(path) as conn, _transaction(conn):
+        return pd.read_sql_query(sql, conn, params=() if base is None else (base,))
+
+
+def replace_rates(df: pd.DataFrame, path: Path) -> int:
+    """Replace the whole table with `df` (validated) in one transaction. Returns generation."""
+    with _connect(path) as conn, _transaction(conn, "IMMEDIATE"):
+        conn.execute("DELETE FROM rates")
+        conn.executemany(
+            "INSERT INTO rates (base, quote, date, rate) VALUES (?, ?, ?, ?)", _rows(df)
+        )
+        return _bump_generation(conn)
+
+
+def upsert_rates(df: pd.DataFrame, path: Path) -> tuple[int, int]:
+    """Insert or overwrite `df` rows (validated, unique keys); incoming wins.
+
+    Only the incoming rows are touched. Returns (generation, rows added).
+    """
+    with _connect(path) as conn, _transaction(conn, "IMMEDIATE"):
+        conn.execute("CREATE TEMP TABLE incoming (base TEXT, quote TEXT, date TEXT, rate REAL)")
+        conn.executemany("INSERT INTO incoming VALUES (?, ?, ?, ?)", _rows(df))
+        (added,) = conn.execute(
+            "SELECT COUNT(*) FROM incoming i WHERE NOT EXISTS (SELECT 1 FROM rates r"
+            " WHERE r.base = i.base AND r.quote = i.quote AND r.date = i.date)"
+        ).fetchone()
+        conn.execute(_UPSERT)
+        conn.execute("DROP TABLE incoming")
+        return _bump_generation(conn), int(added)
+
+
+def pair_coverage(path: Path) -> pd.DataFrame:
+    """Rows and first/last date of every pair (answered from the primary key)."""
+    sql = (
+        "SELECT base, quote, COUNT(*) AS rows, MIN(date) AS first, MAX(date) AS last"
+        " FROM rates GROUP BY base, quote ORDER BY base, quote"
+    )
+    with _connect(path) as conn:
+        return pd.read_sql_query(sql, conn)
+
+
+def file_layout(path: Path) -> dict[str, int]:
+    """Page size and page counts (free pages are reclaimed by `compact`)."""
+    with _connect(path) as conn:
+        return {
+            name: int(conn.execute(f"PRAGMA {name}").fetchone()[0])
+            for name in ("page_size", "page_count", "freelist_count")
+        }
+
+
+def compact(path: Path, cutoff: date | None = None) -> tuple[int, int]:
+    """Delete rows dated before `cutoff`, then VACUUM. Returns (generation, rows deleted)."""
+    with _connect(path) as conn:
+        with _transaction(conn, "IMMEDIATE"):
+            deleted = 0
+            if cutoff is not None:
+                cur = conn.execute("DELETE FROM rates WHERE date < ?", (cutoff.isoformat(),))
+                deleted = cur.rowcount
+            generation = _bump_generation(conn)
+        conn.execute("VACUUM")  # cannot run inside a transaction
+        return generation, int(deleted)
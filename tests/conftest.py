@@ -0,0 +1,84 @@
+"""Synthetic rate caches shared by the test modules."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Iterable, Mapping
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from fxpower.analytics.cross_rates import generate_cross_rates_from_eur_series
+
+
+def cyclical_cache(n: int = 600, period: int = 120) -> pd.DataFrame:
+    """EUR-based rates oscillating with different phases: cheap days precede rises."""
+    start = date(2024, 1, 1)
+    rows = []
+    levels = {"USD": 1.1, "PLN": 4.4, "GBP": 0.88}
+    phases = {"USD": 0.0, "PLN": 2.1, "GBP": 4.2}
+    rng = np.random.default_rng(3)
+    for i in range(n):
+        d = (start + timedelta(days=i)).isoformat()
+        for quote, level in levels.items():
+            wave = 0.05 * math.sin(2 * math.pi * i / period + phases[quote])
+            rate = level * math.exp(wave + rng.normal(0.0, 0.001))
+            rows.append({"date": d, "quote": quote, "rate": rate})
+    return generate_cross_rates_from_eur_series(pd.DataFrame(rows))
+
+
+def walk_cache(
+    pairs: Iterable[tuple[str, str]],
+    n_days: int,
+    seed: int,
+    *,
+    start: date = date(2024, 1, 1),
+    sigma: float = 0.004,
+    level: float = 1.0,
+) -> pd.DataFrame:
+    """Long cache with an independent random walk per pair, starting at `level + k`."""
+    rng = np.random.default_rng(seed)
+    days = [start + timedelta(days=i) for i in range(n_days)]
+    frames = []
+    for k, (base, quote) in enumerate(pairs):
+        rates = (level + k) * np.exp(np.cumsum(rng.normal(0.0, sigma, n_days)))
+        frames.append(pd.DataFrame({"date": days, "base": base, "quote": quote, "rate": rates}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def cross_cache(
+    codes: tuple[str, ...],
+    n_days: int,
+    seed: int,
+    *,
+    start: date = date(2024, 1, 1),
+    sigma: float = 0.005,
+    drift: Mapping[str, float] | None = None,
+) -> pd.DataFrame:
+    """Consistent cross rates of all directed `codes` pairs from random per-EUR levels.
+
+    Positive `drift` means the currency weakens against EUR; EUR itself stays at 1.
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, sigma, (n_days, len(codes)))
+    steps += np.array([(drift or {}).get(c, 0.0) for c in codes])
+    levels = np.exp(np.cumsum(steps, axis=0))
+    if "EUR" in codes:
+        levels[:, codes.index("EUR")] = 1.0
+    days = [start + timedelta(days=i) for i in range(n_days)]
+    frames = []
+    for i, base in enumerate(codes):
+        for j, quote in enumerate(codes):
+            if i != j:
+                rate = levels[:, i] / levels[:, j]  # BASE per 1 QUOTE
+                frames.append(
+                    pd.DataFrame({"date": days, "base": base, "quote": quote, "rate": rate})
+                )
+    return pd.concat(frames, ignore_index=True)
+
+
+def strip_ids(html: str) -> str:
+    """Drop the random plotly div ids so two renders of one report compare equal."""
+    return re.sub(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "", html)
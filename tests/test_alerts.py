@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from conftest import walk_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.ranker import rank_targets, split_pair_series
+from fxpower.app.alerts import (
+    ALERT_METRICS,
+    AlertEngine,
+    AlertRule,
+    AlertState,
+    Watchlist,
+    evaluate_cache,
+    load_rules,
+)
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+from fxpower.storage.cache import write_cache
+
+PAIRS = (("PLN", "USD"), ("PLN", "EUR"), ("USD", "PLN"))
+NOW = datetime(2025, 1, 1, 18, 0, tzinfo=UTC)
+
+RULES_TOML = """
+[[rule]]
+name = "pln-usd-cheap"
+metric = "percentile_1y"
+pair = "pln/usd"
+threshold = 0.5
+hysteresis = 0.1
+
+[[rule]]
+metric = "rate_today"
+base = "PLN"
+direction = "above"
+threshold = 0.0
+"""
+
+
+def _cache(n_days: int = 400) -> pd.DataFrame:
+    return walk_cache(PAIRS, n_days, seed=3)
+
+
+def _scores(value: float, day: int) -> pd.DataFrame:
+    row = dict.fromkeys(ALERT_METRICS, 0.0) | {"percentile_5y": value}
+    row["as_of"] = date(2025, 1, day)
+    return pd.DataFrame([row], index=pd.MultiIndex.from_tuples([("PLN", "USD")]))
+
+
+def test_load_rules(tmp_path: Path) -> None:
+    path = tmp_path / "rules.toml"
+    path.write_text(RULES_TOML)
+
+    rules = load_rules(path)
+
+    assert rules[0] == AlertRule(
+        name="pln-usd-cheap",
+        metric="percentile_1y",
+        base="PLN",
+        quote="USD",
+        threshold=0.5,
+        hysteresis=0.1,
+    )
+    assert rules[1].quote is None
+    assert rules[1].name == "PLN/* rate_today above 0"
+
+    path.write_text('[[rule]]\nmetric = "overall_score"\nthreshold = 1\n')
+    with pytest.raises(ValueError, match="exactly one of 'pair' or 'base'"):
+        load_rules(path)
+    path.write_text(RULES_TOML + RULES_TOML)
+    with pytest.raises(ValueError, match="Duplicate alert rule names"):
+        load_rules(path)
+    with pytest.raises(ValueError, match="Unknown metric"):
+        AlertRule(name="x", metric="price", base="PLN", threshold=1.0)
+
+
+def test_hysteresis_fires_once_until_rearmed() -> None:
+    rule = AlertRule(
+        name="cheap",
+        metric="percentile_5y",
+        base="PLN",
+        quote="USD",
+        threshold=0.1,
+        hysteresis=0.05,
+    )
+    engine = AlertEngine([rule])
+
+    fired = [
+        len(engine.check(_scores(v, i + 1), NOW))
+        for i, v in enumerate([0.2, 0.08, 0.05, 0.12, 0.09, 0.16, 0.07])
+    ]
+
+    # 0.12 is above the threshold but within the hysteresis band: not re-armed yet
+    assert fired == [0, 1, 0, 0, 0, 0, 1]
+    assert engine.state.fired == {"cheap|PLN/USD"}
+
+
+def test_evaluates_only_pairs_with_new_rows() -> None:
+    cache = _cache()
+    rule = AlertRule(name="any", metric="rate_today", base="PLN", threshold=0.0, direction="above")
+    engine = AlertEngine([rule])
+
+    first = evaluate_cache(engine, cache, NOW)
+
+    expected = rank_targets(cache, Currency.PLN)
+    assert {(f.base, f.quote) for f in first} == {("PLN", "USD"), ("PLN", "EUR")}
+    by_quote = {f.quote: f.value for f in first}
+    assert by_quote["USD"] == float(expected.set_index("target").loc["USD", "rate_today"])
+    assert all(f.as_of == date(2025, 2, 3) for f in first)
+
+    assert engine.changed_pairs(split_pair_series(cache)) == []
+    new_day = pd.DataFrame([{"date": date(2025, 2, 4), "base": "PLN", "quote": "EUR", "rate": 2.0}])
+    series = split_pair_series(pd.concat([cache, new_day], ignore_index=True))
+    assert engine.changed_pairs(series) == [("PLN", "EUR")]
+
+
+def test_state_round_trip(tmp_path: Path) -> None:
+    rules = tmp_path / "rules.toml"
+    rules.write_text(RULES_TOML)
+    sink = tmp_path / "alerts.jsonl"
+    watchlist = Watchlist.load(rules, sink)
+
+    n = watchlist.record(evaluate_cache(watchlist.engine, _cache(), NOW))
+
+    assert n == 2  # rate_today > 0 for both PLN pairs
+    lines = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert {line["pair"] for line in lines} == {"PLN/USD", "PLN/EUR"}
+    assert lines[0]["fired_at"] == NOW.isoformat()
+    state = AlertState.load(tmp_path / "rules.state.json")
+    assert state == watchlist.engine.state
+    assert state.watermarks["PLN/USD"][0] == "2025-02-03"
+
+
+def test_alerts_cli(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(), path)
+    rules = tmp_path / "rules.toml"
+    rules.write_text(RULES_TOML)
+    sink = tmp_path / "alerts.jsonl"
+    args = ["alerts", str(rules), "--cache-path", str(path), "--sink", str(sink)]
+
+    first = CliRunner().invoke(app, args)
+    second = CliRunner().invoke(app, args)
+
+    assert first.exit_code == 0, first.output
+    assert "Alerts fired: 2" in first.output
+    assert "Alerts fired: 0" in second.output
+    assert len(sink.read_text().splitlines()) == 2
+
+    rules.write_text('[[rule]]\nmetric = "nope"\npair = "PLN/USD"\nthreshold = 1\n')
+    bad = CliRunner().invoke(app, args)
+    assert bad.exit_code != 0
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from fxpower.analytics.cross_rates import cross_rates_table, generate_cross_rates_from_eur_series
+from fxpower.app.fetch import update_cache_arrow, update_cache_from_eur_source
+from fxpower.providers.frankfurter import _eur_payload_to_df, _eur_payload_to_table
+from fxpower.storage.cache import (
+    cache_generation,
+    merge_cache,
+    merge_tables,
+    read_cache,
+    write_cache,
+)
+
+PAYLOAD = {
+    "base": "EUR",
+    "rates": {
+        "2026-02-06": {"USD": 1.08, "PLN": 4.31, "GBP": 0.85},
+        "2026-02-05": {"USD": 1.07, "PLN": 4.30, "GBP": 0.86},
+        "2026-02-09": {"USD": 1.09, "PLN": 4.32, "GBP": 0.84},
+    },
+}
+
+
+def _fetch_from_payload(start: date, end: date) -> dict:
+    rates = {d: r for d, r in PAYLOAD["rates"].items() if start <= date.fromisoformat(d) <= end}
+    return {"base": "EUR", "rates": rates}
+
+
+def test_payload_table_matches_dataframe_decoder() -> None:
+    table = _eur_payload_to_table(PAYLOAD)
+    assert table.schema.types == [pa.date32(), pa.string(), pa.float64()]
+    pd.testing.assert_frame_equal(table.to_pandas(), _eur_payload_to_df(PAYLOAD), check_dtype=False)
+    assert table["date"][0].as_py() == date(2026, 2, 5)
+
+
+def test_cross_rates_table_matches_pandas_path() -> None:
+    eur = _eur_payload_to_table(PAYLOAD)
+    expected = generate_cross_rates_from_eur_series(_eur_payload_to_df(PAYLOAD))
+    got = cross_rates_table(eur).to_pandas()
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_merge_tables_incoming_wins_like_merge_cache() -> None:
+    existing = pd.DataFrame(
+        [
+            {"date": date(2026, 2, 5), "base": "PLN", "quote": "USD", "rate": 4.0},
+            {"date": date(2026, 2, 6), "base": "PLN", "quote": "USD", "rate": 4.1},
+        ]
+    )
+    incoming = pd.DataFrame(
+        [
+            {"date": date(2026, 2, 6), "base": "PLN", "quote": "USD", "rate": 4.2},
+            {"date": date(2026, 2, 9), "base": "PLN", "quote": "USD", "rate": 4.3},
+        ]
+    )
+    got = merge_tables(pa.Table.from_pandas(existing), pa.Table.from_pandas(incoming))
+    expected = merge_cache(existing, incoming)
+    pd.testing.assert_frame_equal(got.to_pandas(), expected, check_dtype=False)
+
+
+def test_update_cache_arrow_matches_pandas_pipeline(tmp_path: Path) -> None:
+    seed = pd.DataFrame([{"date": "2026-02-05", "base": "PLN", "quote": "USD", "rate": 9.9}])
+    arrow_file = tmp_path / "arrow.parquet"
+    pandas_file = tmp_path / "pandas.parquet"
+    write_cache(seed, arrow_file)
+    write_cache(seed, pandas_file)
+
+    table, added = update_cache_arrow(
+        arrow_file,
+        lambda s, e: _eur_payload_to_table(_fetch_from_payload(s, e)),
+        today=date(2026, 2, 9),
+    )
+    expected = update_cache_from_eur_source(
+        pandas_file,
+        lambda s, e: _eur_payload_to_df(_fetch_from_payload(s, e)),
+        today=date(2026, 2, 9),
+    )
+
+    assert added == table.num_rows - 1
+    assert cache_generation(arrow_file) == 2
+    pd.testing.assert_frame_equal(read_cache(arrow_file), read_cache(pandas_file))
+    pd.testing.assert_frame_equal(read_cache(arrow_file), expected)
+
+    # up to date: nothing fetched, nothing written
+    _, added = update_cache_arrow(arrow_file, lambda s, e: pa.table({}), today=date(2026, 2, 9))
+    assert added == 0
+    assert cache_generation(arrow_file) == 2
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from conftest import walk_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.ranker import rank_targets
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+from fxpower.reporting import report
+from fxpower.reporting.report import render_report_html
+from fxpower.storage import artifacts
+from fxpower.storage.artifacts import ArtifactGraph, ArtifactStore
+from fxpower.storage.cache import write_cache
+
+TARGETS = ("USD", "EUR", "GBP")
+
+
+def _cache(n_days: int = 400) -> pd.DataFrame:
+    return walk_cache([("PLN", q) for q in TARGETS], n_days, seed=4, level=3.5)
+
+
+def _strip_ids(html: str) -> str:
+    """Plotly gives every chart div a random id."""
+    return re.sub(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "id", html)
+
+
+def _events(graph: ArtifactGraph) -> dict[str, tuple[bool, str]]:
+    return {e.key: (e.rebuilt, e.reason) for e in graph.events}
+
+
+def test_graph_rebuilds_only_downstream_of_changed_sources(tmp_path: Path) -> None:
+    calls: list[str] = []
+
+    def run(a: str, b: str, params: str = "") -> ArtifactGraph:
+        graph = ArtifactGraph(ArtifactStore(tmp_path))
+        graph.source("a", a)
+        graph.source("b", b)
+        graph.build("x", ["a"], lambda: calls.append("x") or "x", params)
+        graph.build("y", ["b"], lambda: calls.append("y") or "y")
+        graph.build("z", ["x", "y"], lambda: calls.append("z") or "z")
+        graph.save()
+        return graph
+
+    assert _events(run("1", "1"))["z"] == (True, "new")
+    assert all(not rebuilt for rebuilt, _ in _events(run("1", "1")).values())
+    assert calls == ["x", "y", "z"]
+
+    events = _events(run("2", "1"))
+    assert events["x"] == (True, "changed: a")
+    assert events["y"] == (False, "up to date")
+    assert events["z"] == (True, "changed: x")
+    assert calls == ["x", "y", "z", "x", "z"]
+
+    assert _events(run("2", "1", params="other"))["x"] == (True, "changed: params")
+
+
+def test_missing_payload_is_rebuilt(tmp_path: Path) -> None:
+    graph = ArtifactGraph(ArtifactStore(tmp_path))
+    graph.source("a", "1")
+    graph.build("x", ["a"], lambda: 1)
+    graph.save()
+    for obj in (tmp_path / "objects").glob("*.pkl"):
+        obj.write_bytes(b"garbage")
+
+    graph = ArtifactGraph(ArtifactStore(tmp_path))
+    graph.source("a", "1")
+    assert graph.build("x", ["a"], lambda: 2) == 2
+    assert _events(graph)["x"] == (True, "payload missing")
+
+
+def test_concurrent_stores_keep_each_others_payloads(tmp_path: Path) -> None:
+    first = ArtifactGraph(ArtifactStore(tmp_path))
+    second = ArtifactGraph(ArtifactStore(tmp_path))
+    for graph, key in ((first, "x"), (second, "y")):
+        graph.source("a", "1")
+        graph.build(key, ["a"], lambda key=key: key)
+    first.save()
+    second.save()
+
+    reread = ArtifactGraph(ArtifactStore(tmp_path))
+    reread.source("a", "1")
+    assert reread.build("x", ["a"], lambda: "rebuilt") == "x"
+    assert reread.build("y", ["a"], lambda: "rebuilt") == "y"
+
+    reread.source("a", "2")
+    reread.build("x", ["a"], lambda: "x2")
+    reread.save()
+    # the replaced payload of x is gone, y's is untouched
+    assert len(list((tmp_path / "objects").glob("*.pkl"))) == 2
+
+
+def test_code_and_template_versions_invalidate_artifacts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = _cache(300)
+    store = tmp_path / "artifacts"
+    render_report_html(cache, Currency.PLN, graph=ArtifactGraph(ArtifactStore(store)))
+
+    monkeypatch.setattr(report, "_template_version", lambda: "edited")
+    graph = ArtifactGraph(ArtifactStore(store))
+    render_report_html(cache, Currency.PLN, graph=graph)
+    assert _events(graph)["html:PLN"] == (True, "changed: params")
+    assert _events(graph)["metrics:PLN/USD"] == (False, "up to date")
+
+    monkeypatch.setattr(artifacts, "_CODE_VERSION", "fxpower=next")
+    graph = ArtifactGraph(ArtifactStore(store))
+    render_report_html(cache, Currency.PLN, graph=graph)
+    events = _events(graph)
+    assert all(rebuilt and "code" in reason for rebuilt, reason in events.values())
+    assert events["metrics:PLN/USD"] == (True, "changed: code")
+
+
+def test_incremental_report_matches_full_render(tmp_path: Path) -> None:
+    cache = _cache()
+    store = tmp_path / "artifacts"
+    render_report_html(cache, Currency.PLN, graph=ArtifactGraph(ArtifactStore(store)))
+
+    edited = cache.copy()
+    last = (edited["quote"] == "USD") & (edited["date"] == edited["date"].max())
+    edited.loc[last, "rate"] *= 1.02
+    graph = ArtifactGraph(ArtifactStore(store))
+    html = render_report_html(edited, Currency.PLN, graph=graph)
+
+    assert _strip_ids(html) == _strip_ids(render_report_html(edited, Currency.PLN))
+    events = _events(graph)
+    assert events["metrics:PLN/USD"] == (True, "changed: pair:PLN/USD")
+    assert events["metrics:PLN/EUR"] == (False, "up to date")
+    assert events["html:PLN"][0]
+
+    # per-pair metrics reassemble to exactly what rank_targets computes
+    pd.testing.assert_frame_equal(
+        ArtifactStore(store).load("scores:PLN", graph.versions["scores:PLN"])[1],
+        rank_targets(edited, Currency.PLN),
+    )
+
+
+def test_report_explain_cli(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    write_cache(_cache(300), tmp_path / "cache.parquet")
+    args = ["report", "--base", "PLN", "--cache-path", "cache.parquet", "--explain"]
+
+    first = CliRunner().invoke(app, args)
+    assert first.exit_code == 0, first.output
+    assert "Artifacts: 11 rebuilt, 0 up to date" in first.output
+
+    second = CliRunner().invoke(app, args)
+    assert "Artifacts: 0 rebuilt, 11 up to date" in second.output
+    assert (tmp_path / "reports" / ".artifacts" / "manifest.json").exists()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import responses
+from typer.testing import CliRunner
+
+from fxpower.analytics.cross_rates import cross_rates_table
+from fxpower.app.backfill import (
+    BackfillConfig,
+    backfill_chunks,
+    backfill_dir,
+    run_backfill,
+)
+from fxpower.cli import app
+from fxpower.providers.frankfurter import decode_eur_table
+from fxpower.storage.cache import read_cache, read_cache_table, write_cache_table
+
+START = date(2023, 1, 1)
+END = date(2023, 12, 31)
+DAYS = [d.date() for d in pd.bdate_range(START, END)]
+LEVELS = np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.004, (len(DAYS), 3)), axis=0))
+
+
+class _Source:
+    """Synthetic Frankfurter: JSON bodies for any range, optionally failing once."""
+
+    def __init__(self, fail_on: date | None = None) -> None:
+        self.calls: list[tuple[date, date]] = []
+        self.fail_on = fail_on
+
+    def __call__(self, start: date, end: date) -> bytes:
+        self.calls.append((start, end))
+        if self.fail_on is not None and start <= self.fail_on <= end:
+            self.fail_on = None
+            raise ConnectionError("network down")
+        rates = {
+            d.isoformat(): {"USD": 1.1 * r[0], "PLN": 4.3 * r[1], "GBP": 0.85 * r[2]}
+            for d, r in zip(DAYS, LEVELS, strict=True)
+            if start <= d <= end
+        }
+        return json.dumps({"base": "EUR", "rates": rates}).encode()
+
+
+def _expected(start: date = START, end: date = END) -> pa.Table:
+    return cross_rates_table(decode_eur_table(_Source()(start, end)))
+
+
+def test_chunks_cover_the_range() -> None:
+    chunks = backfill_chunks(date(2024, 1, 1), date(2024, 3, 1), 30)
+
+    assert chunks[0] == (date(2024, 1, 1), date(2024, 1, 30))
+    assert chunks[-1] == (date(2024, 3, 1), date(2024, 3, 1))
+    assert all(b[0] - a[1] == timedelta(days=1) for a, b in zip(chunks, chunks[1:], strict=False))
+    with pytest.raises(ValueError, match="start must not be after end"):
+        backfill_chunks(date(2024, 2, 1), date(2024, 1, 1), 30)
+
+
+def test_backfill_matches_single_fetch(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    source = _Source()
+
+    result = run_backfill(
+        cache_file, source, decode_eur_table, START, END, BackfillConfig(chunk_days=30)
+    )
+
+    assert result.chunks == len(source.calls) == 13
+    assert result.rows == len(DAYS) * 12
+    assert read_cache_table(cache_file).equals(_expected())
+    assert not backfill_dir(cache_file).exists()
+
+
+def test_existing_rows_are_kept_around_and_inside_the_range(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    before = _expected(START, date(2023, 3, 31))
+    before = pa.concat_tables([before, _expected(date(2023, 11, 1), END)])
+    # a currency pair row the backfill does not produce survives as well
+    extra = pa.table(
+        {"date": [date(2023, 6, 1)], "base": ["CHF"], "quote": ["PLN"], "rate": [4.5]},
+        schema=before.schema,
+    )
+    write_cache_table(pa.concat_tables([before, extra]).sort_by("date"), cache_file)
+
+    run_backfill(
+        cache_file,
+        _Source(),
+        decode_eur_table,
+        date(2023, 2, 1),
+        date(2023, 11, 30),
+        BackfillConfig(chunk_days=60, memory_mb=1),
+    )
+
+    df = read_cache(cache_file)
+    assert df["date"].min() == DAYS[0]
+    assert df["date"].max() == DAYS[-1]
+    assert not df.duplicated(subset=["date", "base", "quote"]).any()
+    assert ((df["base"] == "CHF") & (df["date"] == date(2023, 6, 1))).sum() == 1
+    assert df["date"].is_monotonic_increasing
+    assert pq.ParquetFile(cache_file).num_row_groups > 1  # 1 MB budget => small row groups
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".sqlite"])
+def test_interrupted_backfill_resumes(tmp_path: Path, suffix: str) -> None:
+    cache_file = tmp_path / f"cache{suffix}"
+    config = BackfillConfig(chunk_days=30, download_workers=1)
+    failing = _Source(fail_on=date(2023, 7, 15))
+
+    with pytest.raises(ConnectionError):
+        run_backfill(cache_file, failing, decode_eur_table, START, END, config)
+
+    done = json.loads((backfill_dir(cache_file) / "checkpoint.json").read_text())["done"]
+    assert len(done) == 6  # the chunks before the failing one
+    resumed = _Source()
+    result = run_backfill(cache_file, resumed, decode_eur_table, START, END, config)
+
+    assert result.resumed == len(done)
+    assert len(resumed.calls) == 13 - len(done)
+    keys = ["date", "base", "quote"]
+    expected = _expected().to_pandas()
+    expected["date"] = pd.to_datetime(expected["date"]).dt.date
+    pd.testing.assert_frame_equal(
+        read_cache(cache_file).sort_values(keys, ignore_index=True),
+        expected,
+        check_dtype=False,
+    )
+
+
+def test_changed_plan_needs_restart(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    with pytest.raises(ConnectionError):
+        run_backfill(
+            cache_file, _Source(fail_on=END), decode_eur_table, START, END, BackfillConfig()
+        )
+
+    with pytest.raises(ValueError, match="different plan"):
+        run_backfill(cache_file, _Source(), decode_eur_table, START, END, BackfillConfig(90))
+    result = run_backfill(
+        cache_file, _Source(), decode_eur_table, START, END, BackfillConfig(90), restart=True
+    )
+    assert result.resumed == 0
+
+
+def test_config_limits() -> None:
+    assert BackfillConfig(memory_mb=1024).queue_depth() == 8
+    with pytest.raises(ValueError, match="cannot hold the pipeline"):
+        BackfillConfig(chunk_days=3650, memory_mb=1)
+
+
+@responses.activate
+def test_backfill_cli(tmp_path: Path) -> None:
+    source = _Source()
+
+    def reply(request):
+        first, last = re.search(r"/([\d-]+)\.\.([\d-]+)", request.url).groups()
+        return 200, {}, source(date.fromisoformat(first), date.fromisoformat(last))
+
+    responses.add_callback(responses.GET, re.compile(r"https://api\.frankfurter\.dev/.*"), reply)
+    cache_file = tmp_path / "cache.parquet"
+    args = ["backfill", "--start", "2023-01-01", "--end", "2023-12-31", "--chunk-days", "120"]
+
+    result = CliRunner().invoke(app, [*args, "--cache-path", str(cache_file)])
+
+    assert result.exit_code == 0, result.output
+    assert "Chunks: 4" in result.output
+    assert read_cache_table(cache_file).equals(_expected())
+    assert (tmp_path / "http_cache").is_dir()
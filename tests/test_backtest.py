@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from conftest import cyclical_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.backtest import (
+    BacktestConfig,
+    pair_panel,
+    run_backtest,
+    score_panel,
+)
+from fxpower.analytics.ranker import rank_targets
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+
+
+@pytest.mark.parametrize("n", [300, 8 * 365])  # the second one exceeds the 5y value window
+def test_last_row_of_score_panel_matches_rank_targets(n: int) -> None:
+    cache = cyclical_cache(n=n)
+    panel = pair_panel(cache)
+    scores = score_panel(panel)
+    expected = rank_targets(cache, base=Currency.PLN).set_index("target")
+
+    last = {name: frame.iloc[-1]["PLN"] for name, frame in scores.items()}
+    for col, ref in [
+        ("percentile", "percentile_5y"),
+        ("zscore", "zscore_5y"),
+        ("mom", "mom_60d"),
+        ("sma_diff", "sma_200_diff"),
+        ("vol", "vol_90d"),
+        ("overall_score", "overall_score"),
+    ]:
+        got = last[col].reindex(expected.index).to_numpy()
+        assert np.allclose(got, expected[ref].to_numpy(), equal_nan=True), col
+
+
+def test_value_signal_is_informative_on_mean_reverting_rates() -> None:
+    cache = cyclical_cache()
+    result = run_backtest(
+        cache,
+        config=BacktestConfig(
+            horizons=(30,), signal="value_score", value_window=120, min_history=120
+        ),
+    )
+
+    row = result.summary.iloc[0]
+    assert row["n_obs"] > 0
+    assert row["rank_ic"] > 0.3
+    assert row["hit_rate_top"] > row["hit_rate_all"]
+    # cheapest decile should outperform the most expensive one
+    assert result.deciles.loc[10, 30] > result.deciles.loc[1, 30]
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"signal": "magic"}, "Unknown signal"),
+        ({"horizons": (5, -20)}, "horizons"),
+        ({"horizons": (0,)}, "horizons"),
+        ({"horizons": ()}, "horizons"),
+        ({"top_fraction": 0.0}, "top_fraction"),
+        ({"top_fraction": 1.5}, "top_fraction"),
+        ({"min_history": 0}, "min_history"),
+        ({"value_window": 0}, "value_window"),
+    ],
+)
+def test_invalid_config_is_rejected(kwargs: dict, match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        BacktestConfig(**kwargs)
+
+
+def test_cli_reports_an_empty_cache(tmp_path: Path) -> None:
+    result = CliRunner().invoke(
+        app, ["backtest", "--cache-path", str(tmp_path / "missing.parquet")]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == f"No data in {tmp_path / 'missing.parquet'}"
+
+    bad = CliRunner().invoke(app, ["backtest", "--horizons", "5,-20"])
+    assert bad.exit_code != 0
+    assert "horizons must be" in bad.output
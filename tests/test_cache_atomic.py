@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import stat
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from fxpower.storage import atomic
+from fxpower.storage.cache import cache_generation, read_snapshot, write_cache
+
+GENERATIONS = 40
+
+
+def _generation_frame(gen: int) -> pd.DataFrame:
+    # every row carries the generation as its rate; row count also depends on it
+    dates = pd.date_range("2020-01-01", periods=500 + 37 * gen, freq="D").date
+    return pd.DataFrame({"date": dates, "base": "PLN", "quote": "USD", "rate": float(gen)})
+
+
+def _writer(path: str) -> None:
+    for gen in range(2, GENERATIONS + 1):
+        write_cache(_generation_frame(gen), Path(path))
+
+
+def _reader(path: str, stop: mp.synchronize.Event, errors: mp.Queue) -> None:
+    seen = 0
+    while not stop.is_set() or seen == 0:
+        try:
+            snap = read_snapshot(Path(path))
+        except Exception as exc:  # a torn file would fail to parse
+            errors.put(f"read failed: {exc!r}")
+            return
+        gen = snap.generation
+        expected = _generation_frame(gen)
+        if len(snap.data) != len(expected) or set(snap.data["rate"]) != {float(gen)}:
+            errors.put(f"inconsistent snapshot at generation {gen}")
+            return
+        seen += 1
+
+
+def test_write_cache_bumps_generation(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    assert cache_generation(cache_file) == 0
+
+    assert write_cache(_generation_frame(1), cache_file) == 1
+    assert write_cache(_generation_frame(2), cache_file) == 2
+
+    snap = read_snapshot(cache_file)
+    assert snap.generation == 2
+    assert len(snap.data) == len(_generation_frame(2))
+    assert list(tmp_path.iterdir()) == [cache_file]  # no temp files left behind
+
+
+def test_failed_write_keeps_previous_file(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    write_cache(_generation_frame(1), cache_file)
+
+    bad = _generation_frame(2).drop(columns=["rate"])
+    with pytest.raises(ValueError):
+        write_cache(bad, cache_file)
+
+    snap = read_snapshot(cache_file)
+    assert snap.generation == 1
+    assert list(tmp_path.iterdir()) == [cache_file]
+
+
+def test_concurrent_readers_never_see_torn_cache(tmp_path: Path) -> None:
+    if "fork" not in mp.get_all_start_methods():
+        pytest.skip("needs fork start method")
+    ctx = mp.get_context("fork")
+    cache_file = tmp_path / "cache.parquet"
+    write_cache(_generation_frame(1), cache_file)
+
+    stop = ctx.Event()
+    errors = ctx.Queue()
+    readers = [ctx.Process(target=_reader, args=(str(cache_file), stop, errors)) for _ in range(3)]
+    writer = ctx.Process(target=_writer, args=(str(cache_file),))
+
+    for p in readers:
+        p.start()
+    writer.start()
+    writer.join(timeout=60)
+    stop.set()
+    for p in readers:
+        p.join(timeout=60)
+
+    assert writer.exitcode == 0
+    assert all(p.exitcode == 0 for p in readers)
+    assert errors.empty(), errors.get()
+    assert cache_generation(cache_file) == GENERATIONS
+
+
+def test_writes_keep_the_file_mode(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "cache.parquet"
+    monkeypatch.setattr(atomic, "_UMASK", 0o022)
+
+    write_cache(_generation_frame(1), path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644  # not mkstemp's 0600
+
+    path.chmod(0o640)
+    write_cache(_generation_frame(2), path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from conftest import walk_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.ranker import rank_targets
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+from fxpower.storage.cache import (
+    ParquetLayout,
+    merge_cache,
+    parquet_layout,
+    read_cache,
+    write_cache,
+)
+from fxpower.storage.maintenance import CompactionConfig, cache_stats, compact_cache
+
+PAIRS = (("PLN", "USD"), ("PLN", "EUR"), ("USD", "PLN"), ("EUR", "PLN"))
+
+
+def _cache(n_days: int = 800) -> pd.DataFrame:
+    cache = walk_cache(PAIRS, n_days, seed=5, start=date(2022, 1, 1))
+    return cache.sort_values(by=["date", "base", "quote"], ignore_index=True)
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(by=["date", "base", "quote"], ignore_index=True)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".sqlite"])
+def test_compact_applies_retention_without_changing_kept_rows(tmp_path: Path, suffix: str) -> None:
+    path = tmp_path / f"cache{suffix}"
+    cache = _cache()
+    write_cache(cache, path)
+
+    result = compact_cache(path, CompactionConfig(keep_years=1.0, read_repeats=1))
+
+    assert result.cutoff == date(2024, 3, 10) - timedelta(days=365)  # latest date - 1y
+    kept = cache[cache["date"] >= result.cutoff]
+    pd.testing.assert_frame_equal(_sorted(read_cache(path)), _sorted(kept), check_dtype=False)
+    assert result.before.rows == len(cache)
+    assert result.after.rows == len(kept)
+    assert result.after.file_bytes < result.before.file_bytes
+    assert result.generation == 2
+
+
+def test_compact_layout_is_kept_by_later_writes(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    cache = _cache()
+    write_cache(cache, path)
+    expected = rank_targets(cache, Currency.PLN)
+
+    layout = ParquetLayout(
+        codec="zstd", level=5, row_group_rows=500, dictionary="strings", sort="pair"
+    )
+    compact_cache(path, CompactionConfig(layout=layout, read_repeats=1))
+
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_row_groups == -(-len(cache) // 500)
+    assert meta.row_group(0).column(3).compression == "ZSTD"
+    # pair order: each row group holds a single base here
+    first_group = pq.ParquetFile(path).read_row_group(0)
+    assert set(first_group["base"].to_pylist()) == {"EUR"}
+    pd.testing.assert_frame_equal(rank_targets(read_cache(path), Currency.PLN), expected)
+
+    # a later fetch merges and rewrites; the layout survives
+    write_cache(merge_cache(read_cache(path), cache.tail(4)), path)
+    assert parquet_layout(path) == layout
+
+
+def test_cache_stats(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(100), path)
+
+    stats = cache_stats(path)
+
+    assert stats.summary["rows"] == 400
+    assert stats.summary["row_groups"] == len(stats.row_groups) == 1
+    assert list(stats.pairs["rows"]) == [100] * 4
+    assert stats.pairs["first"].min() == date(2022, 1, 1)
+    assert stats.row_groups.loc[0, "date_max"] == date(2022, 4, 10)
+
+
+def test_invalid_layout() -> None:
+    with pytest.raises(ValueError, match="no compression level"):
+        ParquetLayout(codec="snappy", level=3)
+    with pytest.raises(ValueError, match="Unknown sort"):
+        ParquetLayout(sort="random")
+    with pytest.raises(ValueError, match="keep_years"):
+        CompactionConfig(keep_years=0)
+
+
+def test_cache_cli(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(), path)
+
+    compact = CliRunner().invoke(
+        app, ["cache", "compact", "--cache-path", str(path), "--keep-years", "1"]
+    )
+    assert compact.exit_code == 0, compact.output
+    assert "full_read_ms" in compact.output
+
+    stats = CliRunner().invoke(app, ["cache", "stats", "--cache-path", str(path), "--row-groups"])
+    assert stats.exit_code == 0, stats.output
+    assert "sort" in stats.output and "pair" in stats.output
+
+    bad = CliRunner().invoke(app, ["cache", "compact", "--cache-path", str(path), "--codec", "x"])
+    assert bad.exit_code != 0
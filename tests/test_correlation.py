@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fxpower.analytics.correlation import base_log_returns, rolling_correlation, rolling_moments
+from fxpower.domain.models import Currency
+from fxpower.reporting.report import render_report_html
+
+
+def _random_cache(n_days: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    codes = ["PLN", "USD", "EUR", "GBP"]
+    levels = np.exp(np.cumsum(rng.normal(0, 0.005, size=(n_days, 4)), axis=0))
+    rows = []
+    for i in range(n_days):
+        d = date(2024, 1, 1) + timedelta(days=i)
+        for b, base in enumerate(codes):
+            for q, quote in enumerate(codes):
+                if b != q:
+                    rows.append(
+                        {
+                            "date": d,
+                            "base": base,
+                            "quote": quote,
+                            "rate": levels[i, b] / levels[i, q],
+                        }
+                    )
+    return pd.DataFrame(rows)
+
+
+def test_rolling_moments_match_pandas() -> None:
+    returns = base_log_returns(_random_cache(200), "PLN")
+    rc = rolling_correlation(_random_cache(200), "PLN", window=30)
+
+    assert rc.targets == ("EUR", "GBP", "USD")
+    expected_corr = returns.rolling(30).corr()
+    expected_cov = returns.rolling(30).cov(ddof=0)
+    for t in (29, 100, len(returns) - 1):
+        day = returns.index[t]
+        np.testing.assert_allclose(rc.corr[t], expected_corr.loc[day].to_numpy(), atol=1e-10)
+        np.testing.assert_allclose(rc.cov[t], expected_cov.loc[day].to_numpy(), atol=1e-14)
+    assert np.isnan(rc.corr[28]).all()
+
+
+def test_missing_returns_use_pairwise_complete_windows() -> None:
+    returns = base_log_returns(_random_cache(150), "PLN")
+    returns.iloc[40:45, 0] = np.nan
+    _, corr = rolling_moments(returns.to_numpy(), 20)
+    expected = returns.rolling(20).corr()
+
+    for t in (50, 60, 100):
+        np.testing.assert_allclose(
+            corr[t], expected.loc[returns.index[t]].to_numpy(), atol=1e-10, equal_nan=True
+        )
+    # window containing the gap: pairs with column 0 are undefined, others are not
+    assert np.isnan(corr[50, 0, 1]) and not np.isnan(corr[50, 1, 2])
+
+
+def test_short_history_and_bad_window() -> None:
+    rc = rolling_correlation(_random_cache(10), "PLN", window=90)
+    assert np.isnan(rc.corr).all()
+    assert rolling_correlation(_random_cache(10), "CHF").dates == ()
+    with pytest.raises(ValueError):
+        rolling_moments(np.zeros((10, 2)), 1)
+
+
+def test_report_has_correlation_heatmap() -> None:
+    html = render_report_html(_random_cache(150), Currency.PLN)
+    assert "Diversification" in html
+    assert "Correlation of daily log returns" in html
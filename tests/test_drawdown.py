@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import walk_cache
+
+from fxpower.analytics.backtest import pair_panel, score_panel
+from fxpower.analytics.drawdown import DRAWDOWN_COLUMNS, drawdown_table
+from fxpower.analytics.ranker import ScoreWeights, rank_targets, split_pair_series
+from fxpower.analytics.scenario import build_pair_scenario
+from fxpower.domain.models import Currency
+from fxpower.reporting.report import render_report_html
+
+TARGETS = ("USD", "EUR", "GBP")
+
+
+def _cache(n_days: int = 1500) -> pd.DataFrame:
+    pairs = [("PLN", q) for q in TARGETS]
+    return walk_cache(pairs, n_days, seed=11, start=date(2021, 1, 4), sigma=0.006, level=3.5)
+
+
+def _brute(s: pd.Series) -> dict[str, float]:
+    """Loop-based reference: running peak, drawdowns and recovery episodes."""
+    dates = pd.to_datetime(pd.Index(s.index))
+    x = s.to_numpy()
+    out: dict[str, float] = {}
+    for years in (1, 3, 5, 10):
+        w = x[dates > dates[-1] - pd.DateOffset(years=years)]
+        out[f"dd_max_{years}y"] = min(v / max(w[: i + 1]) - 1.0 for i, v in enumerate(w))
+
+    peak, peak_day, below, recoveries = -np.inf, dates[0], False, []
+    for d, v in zip(dates, x, strict=True):
+        if v >= peak:
+            if below:
+                recoveries.append((d - peak_day).days)
+            peak, peak_day, below = v, d, False
+        else:
+            below = True
+    out["dd_current"] = x[-1] / peak - 1.0
+    out["days_since_peak"] = float((dates[-1] - peak_day).days)
+    out["recovery_median_days"] = float(np.median(recoveries)) if recoveries else float("nan")
+    return out
+
+
+def test_matches_loop_reference() -> None:
+    pairs = split_pair_series(_cache())
+    series = {Currency(q): pairs[("PLN", q)] for q in TARGETS}
+    # one pair starts later and has a gap: the panel must not leak other pairs' dates
+    series[Currency.GBP] = series[Currency.GBP].iloc[200:].drop(series[Currency.GBP].index[400:405])
+
+    table = drawdown_table(series)
+    assert list(table.columns) == list(DRAWDOWN_COLUMNS)
+    for t, s in series.items():
+        expected = _brute(s)
+        for col in DRAWDOWN_COLUMNS:
+            assert table.loc[t.value, col] == pytest.approx(expected[col], abs=1e-12), (t, col)
+
+
+def test_pair_row_does_not_depend_on_the_batch() -> None:
+    days = [date(2024, 1, d) for d in (1, 2, 3, 10)]
+    a = pd.Series([1.0, 2.0, 2.0, 1.8], index=days)
+    b = pd.Series([1.0, 1.1, 0.9, 1.2], index=[date(2024, 1, d) for d in (1, 4, 5, 9)])
+
+    alone = drawdown_table({"USD": a}).loc["USD"]
+    batched = drawdown_table({"USD": a, "EUR": b}).loc["USD"]
+
+    assert alone["days_since_peak"] == 7.0
+    pd.testing.assert_series_equal(batched, alone)
+    for t, s in (("USD", a), ("EUR", b)):
+        row = drawdown_table({"USD": a, "EUR": b}).loc[t]
+        for col, value in _brute(s).items():
+            assert row[col] == pytest.approx(value, abs=1e-12, nan_ok=True), (t, col)
+
+
+def test_monotonic_series_has_no_drawdown() -> None:
+    idx = [date(2024, 1, 1) + timedelta(days=i) for i in range(50)]
+    table = drawdown_table({"USD": pd.Series(np.linspace(1.0, 2.0, 50), index=idx)})
+    row = table.loc["USD"]
+    assert row["dd_current"] == 0.0
+    assert row["dd_max_5y"] == 0.0
+    assert row["days_since_peak"] == 0.0
+    assert np.isnan(row["recovery_median_days"])
+
+
+def test_drawdown_weight_folds_into_risk_score() -> None:
+    cache = _cache()
+    plain = rank_targets(cache, Currency.PLN).set_index("target")
+    blended = rank_targets(cache, Currency.PLN, weights=ScoreWeights(risk_drawdown=0.5))
+    blended = blended.set_index("target").loc[plain.index]
+
+    vol_part = np.clip((plain["vol_90d"] - 0.05) / 0.20, 0.0, 1.0)
+    dd_part = np.clip(-plain["dd_max_5y"] / 0.30, 0.0, 1.0)
+    np.testing.assert_allclose(plain["risk_score"], vol_part, atol=1e-12)
+    np.testing.assert_allclose(blended["risk_score"], 0.5 * vol_part + 0.5 * dd_part, atol=1e-12)
+
+
+def test_scenario_tracks_drawdown_and_backtest_rejects_it() -> None:
+    cache = _cache()
+    weights = ScoreWeights(risk_drawdown=0.4)
+    series = split_pair_series(cache)[("PLN", "USD")]
+    row = build_pair_scenario("USD", series, weights=weights).evaluate_shifts([0.0]).iloc[0]
+    ranked = rank_targets(cache, Currency.PLN, weights=weights).set_index("target").loc["USD"]
+    assert row["dd_max_5y"] == pytest.approx(ranked["dd_max_5y"], abs=1e-12)
+    assert row["risk_score"] == pytest.approx(ranked["risk_score"], abs=1e-12)
+
+    with pytest.raises(ValueError):
+        score_panel(pair_panel(cache), weights=weights)
+    with pytest.raises(ValueError):
+        ScoreWeights(risk_drawdown=1.5)
+
+
+def test_report_risk_table_shows_drawdowns() -> None:
+    html = render_report_html(_cache(400), Currency.PLN)
+    assert "dd_max_5y" in html
+    assert "recovery_median_days" in html
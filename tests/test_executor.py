@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import walk_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.executor import (
+    _ATTACHED,
+    ExecutorConfig,
+    ShardExecutor,
+    SharedArrays,
+    attach,
+    shard_bounds,
+)
+from fxpower.analytics.ranker import rank_targets, score_pair_series, split_pair_series
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+from fxpower.reporting.report import _pair_metrics
+from fxpower.storage.artifacts import ArtifactGraph, ArtifactStore, series_version
+from fxpower.storage.cache import write_cache
+
+
+def _cache(n_days: int = 500) -> pd.DataFrame:
+    pairs = [("PLN", q) for q in ("USD", "EUR", "GBP")]
+    cache = walk_cache(pairs, n_days, seed=11, start=date(2023, 1, 2), sigma=0.005, level=3.5)
+    # GBP starts later, so the pairs have different lengths
+    late = (cache["quote"] == "GBP") & (cache["date"] < date(2023, 1, 2) + timedelta(days=120))
+    return cache[~late].reset_index(drop=True)
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+@pytest.mark.parametrize("backend", ["serial", "threads", "processes"])
+def test_rank_targets_identical_on_every_backend(backend: str) -> None:
+    cache = _cache()
+    expected = rank_targets(cache, Currency.PLN)
+    with ShardExecutor(ExecutorConfig(backend=backend, workers=2)) as executor:
+        got = rank_targets(cache, Currency.PLN, executor=executor)
+        assert executor.map(_square, range(10)) == [x * x for x in range(10)]
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_rows_do_not_depend_on_which_pairs_are_scored_together() -> None:
+    pairs = split_pair_series(_cache())
+    series = {Currency(q): s for (_, q), s in pairs.items()}
+    together = score_pair_series(series)
+    alone = pd.concat([score_pair_series({t: s}) for t, s in series.items()], ignore_index=True)
+    pd.testing.assert_frame_equal(together, alone)
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_shared_arrays_round_trip(shared: bool) -> None:
+    arrays = {
+        "dates": np.arange("2024-01-01", "2024-01-11", dtype="datetime64[D]").astype(
+            "datetime64[ns]"
+        ),
+        "rates": np.linspace(1.0, 2.0, 7),
+    }
+    with SharedArrays(arrays, shared=shared) as handle:
+        views = attach(handle)
+        for name, a in arrays.items():
+            np.testing.assert_array_equal(views[name], a)
+        if shared:
+            assert not views["rates"].flags.writeable
+
+
+def test_shard_bounds() -> None:
+    assert shard_bounds([3, 0, 2]) == [(0, 3), (3, 3), (3, 5)]
+
+
+def test_invalid_config() -> None:
+    with pytest.raises(ValueError, match="Unknown backend"):
+        ExecutorConfig(backend="gpu")
+    with pytest.raises(ValueError, match="workers"):
+        ExecutorConfig(backend="threads", workers=0)
+
+
+def test_report_cli_executor(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    write_cache(_cache(300), tmp_path / "cache.parquet")
+    base = ["report", "--base", "PLN", "--cache-path", "cache.parquet"]
+
+    ok = CliRunner().invoke(app, [*base, "--executor", "threads", "--workers", "2"])
+    assert ok.exit_code == 0, ok.output
+    assert (tmp_path / "reports" / "fxpower_PLN.html").exists()
+
+    bad = CliRunner().invoke(app, [*base, "--executor", "gpu"])
+    assert bad.exit_code != 0
+
+
+def test_processes_with_nothing_to_score() -> None:
+    empty = pd.Series([], dtype="float64", index=pd.Index([], dtype=object))
+    with ShardExecutor(ExecutorConfig(backend="processes", workers=2)) as executor:
+        assert score_pair_series({}, executor=executor).empty
+        assert score_pair_series({Currency.USD: empty}, executor=executor).empty
+
+
+def test_attach_closes_mappings_of_earlier_blocks() -> None:
+    with SharedArrays({"rates": np.arange(4.0)}, shared=True) as first:
+        attach(first)
+        old_shm, _ = _ATTACHED[first.shm_name]
+    with SharedArrays({"rates": np.arange(3.0)}, shared=True) as second:
+        np.testing.assert_array_equal(attach(second)["rates"], np.arange(3.0))
+    assert set(_ATTACHED) == {second.shm_name}
+    assert old_shm.buf is None  # closed, not just dropped
+
+
+def test_warm_report_rerun_with_processes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    write_cache(_cache(300), tmp_path / "cache.parquet")
+    args = ["report", "--base", "PLN", "--cache-path", "cache.parquet"]
+    args += ["--executor", "processes", "--workers", "2"]
+
+    for _ in range(2):  # the second run has no stale pairs to score
+        result = CliRunner().invoke(app, args)
+        assert result.exit_code == 0, result.output
+
+
+def test_report_rows_keep_their_targets_when_a_stale_series_is_empty(tmp_path: Path) -> None:
+    series = {("PLN", q): s for (_, q), s in split_pair_series(_cache()).items()}
+    # sorts first, so a row-by-position mapping would shift every label
+    series[("PLN", "CHF")] = pd.Series([], dtype="float64", index=pd.Index([], dtype=object))
+    series = dict(sorted(series.items()))
+    graph = ArtifactGraph(ArtifactStore(tmp_path))
+    for (b, q), s in series.items():
+        graph.source(f"pair:{b}/{q}", series_version(s))
+
+    metrics = _pair_metrics(graph, series, "", None, None)
+
+    assert metrics["metrics:PLN/CHF"].empty
+    for key, row in metrics.items():
+        if not row.empty:
+            assert key == f"metrics:PLN/{row['target'].iloc[0]}"
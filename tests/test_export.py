@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import io
+import json
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import pytest
+from conftest import walk_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.ranker import rank_targets
+from fxpower.app.export import (
+    RateFilter,
+    export_rates,
+    export_scores,
+    format_for_path,
+    iter_rate_batches,
+)
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+from fxpower.storage.cache import read_cache, write_cache
+
+PAIRS = (("PLN", "USD"), ("PLN", "EUR"), ("PLN", "GBP"), ("USD", "PLN"))
+
+
+def _cache(n_days: int = 300) -> pd.DataFrame:
+    return walk_cache(PAIRS, n_days, seed=8)
+
+
+def _read(path: Path, fmt: str) -> pd.DataFrame:
+    if fmt == "parquet":
+        df = pq.read_table(path).to_pandas()
+    elif fmt == "arrow":
+        df = pa.ipc.open_stream(path.read_bytes()).read_all().to_pandas()
+    elif fmt == "csv":
+        df = pacsv.read_csv(path).to_pandas()
+    else:
+        df = pd.DataFrame([json.loads(line) for line in path.read_text().splitlines()])
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    return df.sort_values(by=["date", "base", "quote"], ignore_index=True)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".sqlite"])
+def test_rate_batches_are_filtered_and_bounded(tmp_path: Path, suffix: str) -> None:
+    path = tmp_path / f"cache{suffix}"
+    cache = _cache()
+    write_cache(cache, path)
+    rate_filter = RateFilter(
+        bases=("PLN",), pairs=(("PLN", "USD"), ("PLN", "GBP")), start=date(2024, 3, 1)
+    )
+
+    batches = list(iter_rate_batches(path, rate_filter, batch_rows=50))
+
+    assert all(b.num_rows <= 50 for b in batches)
+    got = pa.Table.from_batches(batches).to_pandas()
+    expected = cache[
+        (cache["base"] == "PLN")
+        & cache["quote"].isin(["USD", "GBP"])
+        & (cache["date"] >= date(2024, 3, 1))
+    ]
+    assert len(got) == len(expected)
+    assert set(got["quote"]) == {"USD", "GBP"}
+    assert got["date"].min() == date(2024, 3, 1)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow", "csv", "jsonl"])
+def test_export_rates_round_trips(tmp_path: Path, fmt: str) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(), path)
+    out = tmp_path / f"rates.{fmt}"
+
+    result = export_rates(path, out, fmt, batch_rows=100)
+
+    expected = read_cache(path).sort_values(by=["date", "base", "quote"], ignore_index=True)
+    got = _read(out, fmt)
+    assert result.rows == len(expected)
+    assert result.batches == -(-len(expected) // 100)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+
+def test_export_scores_match_rank_targets(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    cache = _cache(150)
+    write_cache(cache, path)
+    out = tmp_path / "scores.jsonl"
+
+    result = export_scores(path, out, "jsonl", [Currency.PLN, Currency.EUR])
+
+    assert result.rows == 3  # EUR has no pairs in this cache
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    expected = rank_targets(cache, Currency.PLN)
+    assert [r["target"] for r in rows] == list(expected["target"])
+    assert {r["base"] for r in rows} == {"PLN"}
+    assert rows[0]["rate_today"] == float(expected["rate_today"].iloc[0])
+    # 150 days are too few for the 200-day SMA: NaN is written as null
+    assert all(r["sma_200_diff"] is None for r in rows)
+
+
+def test_format_for_path() -> None:
+    assert format_for_path(Path("x.ndjson")) == "jsonl"
+    with pytest.raises(ValueError, match="Cannot infer"):
+        format_for_path(Path("x.txt"))
+
+
+def test_export_cli_streams_to_stdout(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(), path)
+
+    res = CliRunner().invoke(
+        app,
+        ["export", "rates", "--cache-path", str(path), "--pair", "pln/usd", "--format", "arrow"],
+    )
+
+    assert res.exit_code == 0
+    table = pa.ipc.open_stream(io.BytesIO(res.stdout_bytes)).read_all()
+    assert table.num_rows == 300
+    assert set(table["quote"].to_pylist()) == {"USD"}
+
+    bad = CliRunner().invoke(app, ["export", "rates", "--cache-path", str(path), "--pair", "PLN"])
+    assert bad.exit_code != 0
+
+
+def test_export_cli_scores_to_file(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(), path)
+    out = tmp_path / "scores.csv"
+
+    res = CliRunner().invoke(
+        app, ["export", "scores", "--cache-path", str(path), "--base", "PLN", "-o", str(out)]
+    )
+
+    assert res.exit_code == 0, res.output
+    assert "Exported 3 rows (csv)" in res.output
+    assert pacsv.read_csv(out).num_rows == 3
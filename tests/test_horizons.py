@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fxpower.analytics.horizons import value_by_horizon
+from fxpower.analytics.metrics import percentile_rank, zscore
+
+
+def _daily_series(n: int, seed: int = 11) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    start = date(2014, 1, 1)
+    values = 4.0 * np.exp(np.cumsum(rng.normal(0.0, 0.004, size=n)))
+    return pd.Series(values, index=[start + timedelta(days=i) for i in range(n)])
+
+
+def test_value_by_horizon_matches_bruteforce_on_trailing_windows() -> None:
+    s = _daily_series(365 * 12)
+    as_of = s.index[-1]
+    for value in (float(s.iloc[-1]), 3.5, 5.0):
+        got = value_by_horizon(s, value)
+        for years, hv in got.items():
+            start = as_of.replace(year=as_of.year - years)
+            window = s[[d > start for d in s.index]]
+            assert hv.n_obs == len(window)
+            assert hv.percentile == pytest.approx(percentile_rank(window, value))
+            assert hv.zscore == pytest.approx(zscore(window, value), rel=1e-9, abs=1e-9)
+
+
+def test_short_history_uses_what_is_available() -> None:
+    s = _daily_series(200)
+    got = value_by_horizon(s, float(s.iloc[-1]), horizons=(1, 5))
+    assert got[1].n_obs == got[5].n_obs == 200
+    assert got[1].percentile == got[5].percentile
+
+
+def test_constant_window_has_zero_zscore() -> None:
+    s = pd.Series([2.0] * 50, index=[date(2026, 1, 1) + timedelta(days=i) for i in range(50)])
+    got = value_by_horizon(s, 2.0, horizons=(1,))
+    assert got[1].zscore == 0.0
+    assert got[1].percentile == 1.0
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+import responses
+from responses import matchers
+
+from fxpower.providers.frankfurter import FrankfurterConfig, FrankfurterError, fetch_eur_table
+from fxpower.providers.http_cache import ResponseCacheConfig, cache_key, normalized_url
+
+BASE_URL = "https://api.frankfurter.dev/v1"
+OLD = (date(2024, 1, 1), date(2024, 1, 2))
+RECENT = (date.today() - timedelta(days=1), date.today())
+
+
+def _payload(start: date, end: date) -> dict:
+    return {
+        "base": "EUR",
+        "rates": {start.isoformat(): {"USD": 1.1}, end.isoformat(): {"USD": 1.2}},
+    }
+
+
+def _url(start: date, end: date) -> str:
+    return f"{BASE_URL}/{start.isoformat()}..{end.isoformat()}"
+
+
+def _cfg(tmp_path: Path, mode: str = "use") -> FrankfurterConfig:
+    return FrankfurterConfig(
+        base_url=BASE_URL, cache=ResponseCacheConfig(directory=tmp_path, mode=mode)
+    )
+
+
+def _fetch(cfg: FrankfurterConfig, dates: tuple[date, date]) -> list[float]:
+    return fetch_eur_table(*dates, ["USD"], cfg=cfg)["rate"].to_pylist()
+
+
+def test_key_ignores_param_order_and_host_case() -> None:
+    a = normalized_url("HTTPS://API.Example.com/v1/x/", {"symbols": "USD,PLN", "base": "EUR"})
+    b = normalized_url("https://api.example.com/v1/x?base=EUR", {"symbols": "USD,PLN"})
+
+    assert a == b == "https://api.example.com/v1/x?base=EUR&symbols=USD,PLN"
+    assert cache_key("https://api.example.com/v1/x", {"base": "EUR"}) != cache_key(
+        "https://api.example.com/v1/x", {"base": "USD"}
+    )
+
+
+@responses.activate
+def test_immutable_range_is_downloaded_once(tmp_path: Path) -> None:
+    responses.add(responses.GET, _url(*OLD), json=_payload(*OLD))
+    cfg = _cfg(tmp_path)
+
+    first = _fetch(cfg, OLD)
+    second = _fetch(cfg, OLD)
+
+    assert first == second == [1.1, 1.2]
+    assert len(responses.calls) == 1
+    assert len(list(tmp_path.glob("*/*.gz"))) == 1
+
+
+@responses.activate
+def test_recent_range_is_revalidated(tmp_path: Path) -> None:
+    url = _url(*RECENT)
+    responses.add(responses.GET, url, json=_payload(*RECENT), headers={"ETag": '"v1"'})
+    cfg = _cfg(tmp_path)
+    _fetch(cfg, RECENT)
+
+    responses.replace(
+        responses.GET,
+        url,
+        status=304,
+        match=[matchers.header_matcher({"If-None-Match": '"v1"'})],
+    )
+    again = _fetch(cfg, RECENT)
+
+    assert again == [1.1, 1.2]
+    assert len(responses.calls) == 2
+
+    # refresh skips the stored copy and downloads unconditionally
+    responses.replace(responses.GET, url, json={"base": "EUR", "rates": {}})
+    assert _fetch(_cfg(tmp_path, "refresh"), RECENT) == []
+    assert "If-None-Match" not in responses.calls[-1].request.headers
+
+
+@responses.activate
+def test_replay_serves_from_disk_only(tmp_path: Path) -> None:
+    responses.add(responses.GET, _url(*RECENT), json=_payload(*RECENT))
+    _fetch(_cfg(tmp_path), RECENT)
+    replay = _cfg(tmp_path, "replay")
+
+    assert _fetch(replay, RECENT) == [1.1, 1.2]
+    assert len(responses.calls) == 1
+    with pytest.raises(FrankfurterError, match="replay mode"):
+        _fetch(replay, OLD)
+
+
+@responses.activate
+def test_invalid_body_is_not_stored(tmp_path: Path) -> None:
+    responses.add(responses.GET, _url(*OLD), body="<html>maintenance</html>")
+
+    with pytest.raises(FrankfurterError, match="Invalid response payload"):
+        _fetch(_cfg(tmp_path), OLD)
+
+    assert not list(tmp_path.glob("*/*.gz"))
+    with pytest.raises(ValueError, match="Unknown response cache mode"):
+        ResponseCacheConfig(directory=tmp_path, mode="offline")
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from fxpower.app.ingest import bars_to_cache_rows, ingest_intraday
+from fxpower.cli import app
+from fxpower.providers.intraday import (
+    BAR_COLUMNS,
+    DailyBarResampler,
+    IntradayConfig,
+    resample_files,
+)
+from fxpower.storage.bars import bars_path, read_bars
+from fxpower.storage.cache import read_cache, write_cache
+
+
+def _quotes(n: int = 20_000, days: int = 6, seed: int = 2) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    seconds = np.sort(rng.integers(0, 86_400 * days, n))
+    pair = rng.integers(0, 2, n)
+    rate = np.where(pair == 0, 4.0, 4.3) * np.exp(np.cumsum(rng.normal(0.0, 1e-4, n)))
+    return pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2025-03-03", tz="UTC") + pd.to_timedelta(seconds, "s"),
+            "base": "PLN",
+            "quote": np.where(pair == 0, "USD", "EUR"),
+            "rate": rate,
+        }
+    )
+
+
+def _reference(quotes: pd.DataFrame, tz: str = "UTC") -> pd.DataFrame:
+    """Per-group loop: OHLC, tick count and sqrt(252 * sum of squared log returns)."""
+    q = quotes.assign(date=quotes["timestamp"].dt.tz_convert(tz).dt.date)
+    rows = []
+    for (d, b, c), g in q.groupby(["date", "base", "quote"]):
+        p = g.sort_values("timestamp", kind="mergesort")["rate"].to_numpy()
+        rv = float((np.diff(np.log(p)) ** 2).sum())
+        vol = np.sqrt(252 * rv) if len(p) > 1 else np.nan
+        rows.append((d, b, c, p[0], p.max(), p.min(), p[-1], len(p), vol))
+    return pd.DataFrame(rows, columns=list(BAR_COLUMNS))
+
+
+@pytest.mark.parametrize("chunk", [20_000, 997, 50])
+def test_bars_do_not_depend_on_chunking(chunk: int) -> None:
+    quotes = _quotes()
+    resampler = DailyBarResampler(IntradayConfig(chunk_rows=chunk, tz="Europe/Warsaw"))
+    for i in range(0, len(quotes), chunk):
+        resampler.add(quotes.iloc[i : i + chunk])
+
+    assert resampler.rows_in == len(quotes)
+    pd.testing.assert_frame_equal(
+        resampler.bars(), _reference(quotes, "Europe/Warsaw"), check_dtype=False, rtol=1e-12
+    )
+
+
+def test_files_without_pair_columns_use_mid(tmp_path: Path) -> None:
+    quotes = _quotes(2_000)
+    quotes = quotes[quotes["quote"] == "USD"]
+    spread = 0.0004
+    pd.DataFrame(
+        {
+            "timestamp": quotes["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "bid": quotes["rate"] - spread,
+            "ask": quotes["rate"] + spread,
+        }
+    ).to_csv(tmp_path / "usd.csv", index=False)
+
+    bars, n = resample_files(
+        [tmp_path / "usd.csv"], IntradayConfig(chunk_rows=300, base="PLN", quote="USD")
+    )
+    assert n == len(quotes)
+    pd.testing.assert_frame_equal(bars, _reference(quotes), check_dtype=False, rtol=1e-9)
+
+
+def test_going_back_in_time_across_chunks_is_rejected() -> None:
+    quotes = _quotes(1_000)
+    resampler = DailyBarResampler()
+    resampler.add(quotes.iloc[500:])
+    with pytest.raises(ValueError, match="back in time"):
+        resampler.add(quotes.iloc[:500])
+
+
+def test_ingest_merges_closes_and_writes_bars(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    fixings = pd.DataFrame(
+        {
+            "date": [date(2025, 3, 3), date(2025, 3, 3), date(2025, 3, 2)],
+            "base": ["PLN", "USD", "PLN"],
+            "quote": ["USD", "PLN", "USD"],
+            "rate": [3.9, 1 / 3.9, 3.95],
+        }
+    )
+    write_cache(fixings, cache_file)
+    quotes = _quotes()
+    quotes.to_parquet(tmp_path / "ticks.parquet", index=False)
+
+    result = ingest_intraday(
+        [tmp_path / "ticks.parquet"], cache_file, IntradayConfig(chunk_rows=4_096)
+    )
+    expected = _reference(quotes)
+    assert result.quotes == len(quotes)
+    assert result.bars == len(expected)
+    assert result.bars_file == bars_path(cache_file)
+
+    cache = read_cache(cache_file).set_index(["date", "base", "quote"])["rate"]
+    close = expected.set_index(["date", "base", "quote"])["close"]
+    day = date(2025, 3, 3)
+    assert cache[(day, "PLN", "USD")] == pytest.approx(close[(day, "PLN", "USD")], rel=1e-12)
+    assert cache[(day, "PLN", "EUR")] == pytest.approx(close[(day, "PLN", "EUR")], rel=1e-12)
+    # the USD/EUR cross is re-derived from both closes
+    assert cache[(day, "USD", "EUR")] == pytest.approx(
+        close[(day, "PLN", "EUR")] / close[(day, "PLN", "USD")]
+    )
+    assert cache[(date(2025, 3, 2), "PLN", "USD")] == 3.95  # untouched fixing
+    assert len(cache) == 1 + 6 * expected["date"].nunique()  # PLN, USD, EUR crosses per day
+
+    # re-ingesting the same day is idempotent
+    ingest_intraday([tmp_path / "ticks.parquet"], cache_file)
+    pd.testing.assert_frame_equal(
+        read_bars(result.bars_file), expected, check_dtype=False, rtol=1e-12
+    )
+
+
+def test_ingest_cli(tmp_path: Path) -> None:
+    quotes = _quotes(3_000)
+    quotes.to_csv(tmp_path / "ticks.csv", index=False)
+    cache_file = tmp_path / "cache.parquet"
+
+    result = CliRunner().invoke(
+        app,
+        ["ingest", str(tmp_path / "ticks.csv"), "--cache-path", str(cache_file)],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Quotes read: 3000" in result.output
+    assert len(read_cache(cache_file)) == 6 * _reference(quotes)["date"].nunique()
+
+    quotes.assign(quote="XYZ").to_csv(tmp_path / "bad.csv", index=False)
+    bad = CliRunner().invoke(
+        app, ["ingest", str(tmp_path / "bad.csv"), "--cache-path", str(cache_file)]
+    )
+    assert bad.exit_code != 0
+    assert "Unsupported currency 'XYZ'" in bad.output
+
+
+def test_closes_re_derive_a_consistent_day() -> None:
+    day = date(2025, 3, 3)
+    # X per 1 EUR; the cache holds every cross of these levels
+    levels = {"EUR": 1.0, "GBP": 0.83, "PLN": 4.2, "USD": 1.08}
+    cache = pd.DataFrame(
+        [(day, b, q, levels[b] / levels[q]) for b in levels for q in levels if b != q],
+        columns=["date", "base", "quote", "rate"],
+    )
+    bars = pd.DataFrame({"date": [day], "base": ["PLN"], "quote": ["USD"], "close": [4.0]})
+
+    rows = bars_to_cache_rows(bars, cache).set_index(["base", "quote"])["rate"]
+
+    assert len(rows) == 12
+    assert rows[("PLN", "USD")] == pytest.approx(4.0)
+    # the quote keeps its EUR level, the base is re-priced
+    assert rows[("USD", "EUR")] == pytest.approx(1.08)
+    assert rows[("PLN", "EUR")] == pytest.approx(4.0 * 1.08)
+    for a in levels:
+        for b in levels:
+            for c in levels:
+                if len({a, b, c}) == 3:
+                    assert rows[(a, b)] * rows[(b, c)] == pytest.approx(rows[(a, c)])
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import re
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from conftest import cross_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.backtest import pair_panel, pair_series_panel
+from fxpower.analytics.correlation import base_log_returns, panel_log_returns
+from fxpower.analytics.ranker import split_pair_series
+from fxpower.analytics.scan import ScanConfig
+from fxpower.analytics.strength import currency_strength, panel_strength
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+from fxpower.reporting.report import _downsample, render_report_html
+from fxpower.storage.cache import ParquetLayout, read_cache, write_cache
+from fxpower.storage.maintenance import CompactionConfig, compact_cache
+from fxpower.storage.outofcore import OutOfCoreConfig, _row_groups_for, read_pair_series
+
+CODES = ("EUR", "GBP", "PLN", "USD")
+
+
+def _cache(n_days: int = 400) -> pd.DataFrame:
+    """Cross rates of CODES in shuffled row order; PLN/USD misses its first 20 days."""
+    df = cross_cache(CODES, n_days, seed=3)
+    df = df[~((df["base"] == "PLN") & (df["quote"] == "USD") & (df["date"] < date(2024, 1, 21)))]
+    return df.sample(frac=1.0, random_state=3).reset_index(drop=True)
+
+
+def _strip_ids(html: str) -> str:
+    return re.sub(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "", html)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".sqlite"])
+@pytest.mark.parametrize("bases", [(), ("PLN", "EUR")])
+def test_pair_series_match_a_full_load(tmp_path: Path, suffix: str, bases: tuple) -> None:
+    path = tmp_path / f"cache{suffix}"
+    write_cache(_cache(), path)
+    expected = split_pair_series(read_cache(path))
+    if bases:
+        expected = {pair: s for pair, s in expected.items() if pair[0] in bases}
+
+    # 1 MB => batches of a few hundred rows, so every pair spans many batches
+    got = read_pair_series(path, bases, OutOfCoreConfig(memory_mb=1))
+
+    assert list(got) == list(expected)
+    for pair, s in expected.items():
+        pd.testing.assert_series_equal(got[pair], s)
+    # pairs covering the same days share one index
+    assert len({id(s.index) for s in got.values()}) == 2
+
+
+def test_budget_and_row_group_pruning(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(2_000), path)  # ~24k rows, more than 0.5 MB as per-pair arrays
+
+    with pytest.raises(ValueError, match="do not fit in 0.5 MB"):
+        read_pair_series(path, config=OutOfCoreConfig(memory_mb=0.5))
+    with pytest.raises(ValueError, match="too small"):
+        OutOfCoreConfig(memory_mb=0.01)
+    assert read_pair_series(tmp_path / "missing.parquet") == {}
+
+    layout = ParquetLayout(row_group_rows=2_000, sort="pair")
+    compact_cache(path, CompactionConfig(layout=layout))
+    meta = pq.read_metadata(path)
+    assert len(_row_groups_for(meta, frozenset({"PLN"}))) < meta.num_row_groups / 2
+    assert set(read_pair_series(path, ["PLN"])) == {("PLN", "EUR"), ("PLN", "GBP"), ("PLN", "USD")}
+
+
+def test_panel_functions_match_the_long_frame() -> None:
+    cache = _cache()
+    panel = pair_series_panel(split_pair_series(cache))
+
+    pd.testing.assert_frame_equal(panel, pair_panel(cache))
+    pd.testing.assert_frame_equal(panel_log_returns(panel, "PLN"), base_log_returns(cache, "PLN"))
+    pd.testing.assert_frame_equal(panel_strength(panel).table, currency_strength(cache).table)
+
+
+def test_report_from_pair_series_equals_the_frame_report(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(), path)
+    cache = read_cache(path)
+    scan = ScanConfig(top=4)
+    pairs = read_pair_series(path, config=OutOfCoreConfig(memory_mb=1))
+    pln = {pair: s for pair, s in pairs.items() if pair[0] == "PLN"}
+
+    in_memory = render_report_html(
+        cache[cache["base"] == "PLN"], Currency.PLN, scan=scan, universe=cache
+    )
+    out_of_core = render_report_html(pln, Currency.PLN, scan=scan, universe=pairs)
+
+    assert _strip_ids(out_of_core) == _strip_ids(in_memory)
+
+
+def test_downsample_keeps_ends_and_extremes() -> None:
+    rng = np.random.default_rng(0)
+    s = pd.Series(np.cumsum(rng.normal(size=5_000)), index=range(5_000))
+
+    out = _downsample(s, 100)
+
+    assert len(out) <= 100
+    assert out.index.is_monotonic_increasing
+    assert out.index[0] == 0 and out.index[-1] == 4_999
+    assert out.max() == s.max() and out.min() == s.min()
+    assert _downsample(s, None) is s
+
+
+def test_report_and_scan_cli_out_of_core(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(2_000), path)
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    args = ["report", "--base", "PLN", "--cache-path", str(path), "--scan-top", "3"]
+
+    result = runner.invoke(app, [*args, "--memory-mb", "8", "--chart-points", "50"])
+    assert result.exit_code == 0, result.output
+    assert "Global top 3" in (tmp_path / "reports" / "fxpower_PLN.html").read_text()
+
+    too_small = runner.invoke(app, [*args, "--memory-mb", "0.5"])
+    assert too_small.exit_code != 0
+    assert "memory budget" in too_small.output
+
+    scan = runner.invoke(app, ["scan", "--top", "2", "--cache-path", str(path), "--memory-mb", "8"])
+    assert scan.exit_code == 0, scan.output
+    assert len(scan.output.strip().splitlines()) == 3
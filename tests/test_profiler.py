@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import pstats
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from fxpower.cli import app
+from fxpower.instrumentation.profiler import Profiler, stage
+from fxpower.storage.cache import read_cache, write_cache
+
+
+def _seed_cache(path: Path, n: int = 30) -> None:
+    start = date(2026, 1, 1)
+    rows = []
+    for i in range(n):
+        for quote, rate in (("USD", 4.0), ("EUR", 4.3), ("GBP", 5.1)):
+            rows.append(
+                {
+                    "date": (start + timedelta(days=i)).isoformat(),
+                    "base": "PLN",
+                    "quote": quote,
+                    "rate": rate + 0.01 * i,
+                }
+            )
+    write_cache(pd.DataFrame(rows), path)
+
+
+def test_stage_is_noop_without_active_profiler() -> None:
+    with stage("anything", rows_in=3) as rec:
+        rec.rows_out = 1
+    assert rec.wall_s == 0.0
+
+
+def test_profiler_records_cache_stages(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    profiler = Profiler()
+    with profiler.activate():
+        _seed_cache(cache_file)
+        df = read_cache(cache_file)
+
+    summary = {s.name: s for s in profiler.summary()}
+    assert summary["parquet_write"].rows_in == len(df)
+    assert summary["parquet_write"].bytes_written == cache_file.stat().st_size
+    assert summary["cache_read"].rows_out == len(df)
+    assert summary["cache_read"].bytes_read == cache_file.stat().st_size
+
+
+def test_nested_stages_track_depth_and_aggregate_calls() -> None:
+    profiler = Profiler()
+    with profiler.activate():
+        for _ in range(2):
+            with stage("outer"):
+                with stage("inner", rows_in=5):
+                    pass
+
+    depths = {(r.name, r.depth) for r in profiler.records}
+    assert depths == {("outer", 0), ("inner", 1)}
+    inner = next(s for s in profiler.summary() if s.name == "inner")
+    assert inner.calls == 2
+    assert inner.rows_in == 10
+    assert profiler.hottest_stage() == "outer"
+
+
+def test_depth_is_tracked_per_thread() -> None:
+    profiler = Profiler()
+    entered, release = threading.Event(), threading.Event()
+
+    def worker() -> None:
+        with stage("worker"):
+            entered.set()
+            release.wait()
+
+    with profiler.activate():
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(worker,))
+        thread.start()
+        entered.wait()
+        # the worker's open stage does not make this one nested
+        with stage("main"):
+            pass
+        release.set()
+        thread.join()
+
+    assert {(r.name, r.depth) for r in profiler.records} == {("main", 0), ("worker", 0)}
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".json"])
+def test_write_trace_formats(tmp_path: Path, suffix: str) -> None:
+    profiler = Profiler()
+    with profiler.activate():
+        with stage("a", rows_in=1):
+            pass
+
+    out = tmp_path / f"trace{suffix}"
+    profiler.write_trace(out)
+    text = out.read_text(encoding="utf-8")
+    if suffix == ".jsonl":
+        rec = json.loads(text.splitlines()[0])
+        assert rec["name"] == "a"
+    else:
+        doc = json.loads(text)
+        assert doc["summary"][0]["calls"] == 1
+
+
+def test_report_cli_profile_outputs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    cache_file = tmp_path / "cache.parquet"
+    _seed_cache(cache_file)
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "report",
+            "--base",
+            "PLN",
+            "--cache-path",
+            str(cache_file),
+            "--profile",
+            "--trace-file",
+            "trace.jsonl",
+            "--cprofile-out",
+            "hot.prof",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    for name in ("cache_read", "ranking", "chart_build", "template_render"):
+        assert name in result.stdout
+
+    names = {json.loads(line)["name"] for line in Path("trace.jsonl").read_text().splitlines()}
+    assert {"cache_read", "ranking", "chart_build", "template_render"} <= names
+    pstats.Stats("hot.prof")  # loads without error
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import cross_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.ranker import rank_targets, split_pair_series
+from fxpower.analytics.scan import ScanConfig, scan_universe, score_pairs, top_pairs
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+from fxpower.reporting.report import render_report_html
+from fxpower.storage.artifacts import ArtifactGraph, ArtifactStore
+from fxpower.storage.cache import write_cache
+
+CODES = ("EUR", "GBP", "PLN", "USD")
+
+
+def _cache(n_days: int = 420) -> pd.DataFrame:
+    return cross_cache(CODES, n_days, seed=5)
+
+
+def _full_sort(scores: pd.DataFrame, column: str, descending: bool, k: int) -> pd.DataFrame:
+    ranked = scores.dropna(subset=[column]).sort_values(
+        by=[column, "base", "target"], ascending=[not descending, True, True], kind="mergesort"
+    )
+    return ranked.head(k).reset_index(drop=True)
+
+
+@pytest.mark.parametrize(
+    ("by", "column", "descending"),
+    [("value", "value_score", True), ("risk", "risk_score", False)],
+)
+def test_top_pairs_equals_a_full_sort(by: str, column: str, descending: bool) -> None:
+    rng = np.random.default_rng(0)
+    n = 900
+    scores = pd.DataFrame(
+        {
+            "base": rng.choice(list(CODES), n),
+            "target": [f"T{i:03d}" for i in range(n)],
+            # coarse values: many ties around the cut
+            column: np.round(rng.random(n), 2),
+        }
+    )
+    scores.loc[rng.choice(n, 30, replace=False), column] = np.nan
+
+    top = top_pairs(scores, ScanConfig(top=25, by=by))
+
+    assert list(top["rank"]) == list(range(1, 26))
+    pd.testing.assert_frame_equal(
+        top.drop(columns="rank"), _full_sort(scores, column, descending, 25)
+    )
+    assert len(top_pairs(scores, ScanConfig(top=5000, by=by))) == n - 30
+
+
+def test_score_pairs_matches_rank_targets() -> None:
+    cache = _cache()
+
+    series = {key: s for key, s in split_pair_series(cache).items() if key[0] == "PLN"}
+
+    scores = score_pairs(series).drop(columns="base")
+
+    expected = rank_targets(cache, Currency.PLN).sort_values("target", ignore_index=True)
+    pd.testing.assert_frame_equal(scores.sort_values("target", ignore_index=True), expected)
+
+
+def test_scan_universe_covers_every_base() -> None:
+    top = scan_universe(_cache(), ScanConfig(top=12, by="value"))
+
+    assert len(top) == 12  # all 4 * 3 pairs
+    assert set(top["base"]) == set(CODES)
+    assert top["value_score"].is_monotonic_decreasing
+    with pytest.raises(ValueError, match="Unknown scan criterion"):
+        ScanConfig(by="cheapest")
+
+
+def test_report_scan_section_reuses_pair_metrics(tmp_path: Path) -> None:
+    cache = _cache()
+    store = tmp_path / "artifacts"
+    pln = cache[cache["base"] == "PLN"]
+
+    html = render_report_html(
+        pln,
+        Currency.PLN,
+        graph=ArtifactGraph(ArtifactStore(store)),
+        scan=ScanConfig(top=5),
+        universe=cache,
+    )
+    graph = ArtifactGraph(ArtifactStore(store))
+    render_report_html(cache[cache["base"] == "USD"], Currency.USD, graph=graph)
+
+    assert "Global top 5 by overall" in html
+    metrics = {e.key: e.rebuilt for e in graph.events if e.key.startswith("metrics:")}
+    assert set(metrics) == {"metrics:USD/EUR", "metrics:USD/GBP", "metrics:USD/PLN"}
+    assert not any(metrics.values())  # scored once for the scan, reused by the USD report
+
+
+def test_scan_cli(tmp_path: Path) -> None:
+    path = tmp_path / "cache.parquet"
+    write_cache(_cache(), path)
+
+    result = CliRunner().invoke(
+        app, ["scan", "--top", "3", "--by", "trend", "--cache-path", str(path)]
+    )
+
+    assert result.exit_code == 0, result.output
+    lines = result.output.strip().splitlines()
+    assert lines[0].split()[:5] == ["rank", "base", "target", "as_of", "trend_score"]
+    assert len(lines) == 4
+    bad = CliRunner().invoke(app, ["scan", "--by", "cheap", "--cache-path", str(path)])
+    assert bad.exit_code != 0
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import walk_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.ranker import rank_targets, split_pair_series
+from fxpower.analytics.scenario import build_pair_scenario, sensitivity_table
+from fxpower.cli import app
+from fxpower.domain.models import Currency
+from fxpower.reporting.report import render_report_html
+from fxpower.storage.cache import write_cache
+
+TARGETS = ("USD", "EUR", "GBP")
+
+
+def _cache(n_days: int = 700) -> pd.DataFrame:
+    return walk_cache(
+        [("PLN", q) for q in TARGETS], n_days, seed=3, start=date(2023, 1, 2), level=3.5
+    )
+
+
+def _series(cache: pd.DataFrame) -> dict[Currency, pd.Series]:
+    pairs = split_pair_series(cache)
+    return {Currency(q): pairs[("PLN", q)] for q in TARGETS}
+
+
+def test_zero_shift_matches_rank_targets() -> None:
+    cache = _cache()
+    table = sensitivity_table(_series(cache), shifts=[0.0]).set_index("target")
+    ranked = rank_targets(cache, Currency.PLN).set_index("target")
+
+    ranked = ranked.loc[table.index]
+    pairs = {
+        "percentile": "percentile_5y",
+        "zscore": "zscore_5y",
+        "sma_diff": "sma_200_diff",
+        "vol": "vol_90d",
+        "value_score": "value_score",
+        "trend_score": "trend_score",
+        "risk_score": "risk_score",
+        "overall_score": "overall_score",
+    }
+    for ours, theirs in pairs.items():
+        np.testing.assert_allclose(table[ours], ranked[theirs], atol=1e-12)
+
+
+def test_shift_matches_rerun_on_edited_cache() -> None:
+    cache = _cache()
+    scenario = build_pair_scenario(Currency.USD, _series(cache)[Currency.USD])
+    row = scenario.evaluate_shifts([0.03]).iloc[0]
+
+    edited = cache.copy()
+    last = (edited["quote"] == "USD") & (edited["date"] == edited["date"].max())
+    edited.loc[last, "rate"] *= 1.03
+    ranked = rank_targets(edited, Currency.PLN).set_index("target").loc["USD"]
+
+    assert row["percentile"] == pytest.approx(ranked["percentile_5y"], abs=1e-12)
+    assert row["zscore"] == pytest.approx(ranked["zscore_5y"], abs=1e-10)
+    assert row["sma_diff"] == pytest.approx(ranked["sma_200_diff"], abs=1e-12)
+    assert row["value_score"] == pytest.approx(ranked["value_score"], abs=1e-10)
+    assert row["overall_score"] == pytest.approx(ranked["overall_score"], abs=1e-10)
+
+
+def test_percentile_and_value_score_are_monotonic() -> None:
+    scenario = build_pair_scenario("EUR", _series(_cache())[Currency.EUR])
+    table = scenario.evaluate_shifts(np.linspace(-0.2, 0.2, 81))
+
+    assert table["percentile"].is_monotonic_increasing
+    assert table["value_score"].is_monotonic_decreasing
+    assert table["percentile"].iloc[0] == pytest.approx(1 / (len(scenario.sorted_others) + 1))
+    assert table["percentile"].iloc[-1] == 1.0
+
+
+def test_empty_history_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        build_pair_scenario("USD", pd.Series([], dtype="float64"))
+
+
+def test_scenario_cli(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    write_cache(_cache(300), cache_file)
+
+    result = CliRunner().invoke(
+        app,
+        ["scenario", "--base", "PLN", "--target", "USD", "--cache-path", str(cache_file)],
+    )
+    assert result.exit_code == 0, result.output
+    lines = result.output.strip().splitlines()
+    assert lines[0].split()[:2] == ["target", "shift"]
+    assert len(lines) == 1 + 11
+    assert {line.split()[0] for line in lines[1:]} == {"USD"}
+
+
+def test_report_has_sensitivity_chart() -> None:
+    html = render_report_html(_cache(300), Currency.PLN)
+    assert "What if the rate moves?" in html
+    assert "Move of today" in html
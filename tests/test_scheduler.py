@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from fxpower.app.scheduler import FetchWatcher, PublicationSchedule, WatchPolicy
+from fxpower.storage.cache import read_cache, write_cache
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+class FakeClock:
+    def __init__(self, start: datetime) -> None:
+        self.current = start
+        self.sleeps: list[float] = []
+
+    def now(self) -> datetime:
+        return self.current
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.current += timedelta(seconds=seconds)
+
+
+class StandInProvider:
+    """Publishes each weekday at `publish_at` Berlin time, except `holidays`."""
+
+    def __init__(self, clock: FakeClock, publish_at: tuple[int, int], holidays=()) -> None:
+        self.clock = clock
+        self.publish_at = publish_at
+        self.holidays = set(holidays)
+        self.calls: list[tuple[date, date]] = []
+
+    def __call__(self, start: date, end: date) -> pd.DataFrame:
+        self.calls.append((start, end))
+        now = self.clock.now().astimezone(BERLIN)
+        rows = []
+        d = start
+        while d <= end:
+            published_at = datetime(d.year, d.month, d.day, *self.publish_at, tzinfo=BERLIN)
+            if d.weekday() < 5 and d not in self.holidays and now >= published_at:
+                for quote, rate in (("USD", 1.1), ("PLN", 4.4), ("GBP", 0.88)):
+                    rows.append({"date": d.isoformat(), "quote": quote, "rate": rate})
+            d += timedelta(days=1)
+        return pd.DataFrame(rows, columns=["date", "quote", "rate"])
+
+
+def _seed(path: Path, last_day: str) -> None:
+    write_cache(
+        pd.DataFrame([{"date": last_day, "base": "PLN", "quote": "USD", "rate": 4.0}]), path
+    )
+
+
+def test_next_window_skips_weekend_after_friday() -> None:
+    schedule = PublicationSchedule()
+    now = datetime(2026, 2, 6, 18, 0, tzinfo=BERLIN)  # Friday evening
+    day, window = schedule.next_window(now, after_day=date(2026, 2, 6))
+    assert day == date(2026, 2, 9)
+    assert window == datetime(2026, 2, 9, 16, 15, tzinfo=BERLIN)
+
+
+def test_watch_sleeps_until_window_backs_off_and_triggers_once(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    _seed(cache_file, "2026-02-06")
+
+    clock = FakeClock(datetime(2026, 2, 9, 9, 0, tzinfo=UTC))  # Monday 10:00 Berlin
+    provider = StandInProvider(clock, publish_at=(16, 22))
+    updates: list[int] = []
+
+    watcher = FetchWatcher(
+        cache_path=cache_file,
+        fetch_eur_series=provider,
+        clock=clock,
+        watch_policy=WatchPolicy(retry_initial_s=300.0),
+        on_update=lambda cache, added: updates.append(added),
+    )
+    assert watcher.catch_up() == 0  # Monday not published yet
+    outcome = watcher.wait_for_next_publication()
+
+    assert outcome.publication_day == date(2026, 2, 9)
+    assert outcome.published
+    assert outcome.attempts == 3  # 16:15 miss, 16:20 miss, 16:30 hit
+    assert clock.sleeps[1:] == [300.0, 600.0]
+    assert updates == [12]
+    # every request is incremental from the day after the cached maximum
+    assert {start for start, _ in provider.calls} == {date(2026, 2, 7)}
+    assert len(read_cache(cache_file)) == 1 + 12
+
+
+def test_watch_gives_up_on_holiday_and_moves_on(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    _seed(cache_file, "2026-02-06")
+
+    clock = FakeClock(datetime(2026, 2, 9, 9, 0, tzinfo=UTC))
+    provider = StandInProvider(clock, publish_at=(16, 0), holidays={date(2026, 2, 9)})
+    updates: list[int] = []
+
+    watcher = FetchWatcher(
+        cache_path=cache_file,
+        fetch_eur_series=provider,
+        clock=clock,
+        watch_policy=WatchPolicy(retry_initial_s=600.0, give_up_after_s=3600.0),
+        on_update=lambda cache, added: updates.append(added),
+    )
+    first, second = watcher.run(max_cycles=2)
+
+    assert first.publication_day == date(2026, 2, 9)
+    assert not first.published
+    assert second.publication_day == date(2026, 2, 10)
+    assert second.published
+    assert updates == [12]
+
+
+def test_transient_error_at_startup_does_not_stop_the_watch(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    _seed(cache_file, "2026-02-06")
+
+    clock = FakeClock(datetime(2026, 2, 9, 9, 0, tzinfo=UTC))
+    provider = StandInProvider(clock, publish_at=(16, 0))
+    failures = iter([ConnectionError("network down")])
+
+    def flaky(start: date, end: date) -> pd.DataFrame:
+        for exc in failures:
+            raise exc
+        return provider(start, end)
+
+    errors: list[Exception] = []
+    watcher = FetchWatcher(
+        cache_path=cache_file,
+        fetch_eur_series=flaky,
+        clock=clock,
+        transient_errors=(ConnectionError,),
+        on_error=errors.append,
+    )
+    (outcome,) = watcher.run(max_cycles=1)
+
+    assert [str(e) for e in errors] == ["network down"]
+    assert outcome.publication_day == date(2026, 2, 9)
+    assert outcome.published
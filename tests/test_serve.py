@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from fxpower.app.serve import FxServer, ServeConfig
+from fxpower.storage.cache import write_cache
+
+
+def _mk_cache(n: int, usd_last: float) -> pd.DataFrame:
+    start = date(2026, 1, 1)
+    rows = []
+    for i in range(n):
+        d = (start + timedelta(days=i)).isoformat()
+        rows.append({"date": d, "base": "PLN", "quote": "USD", "rate": 4.0})
+        rows.append({"date": d, "base": "PLN", "quote": "EUR", "rate": 4.3})
+        rows.append({"date": d, "base": "PLN", "quote": "GBP", "rate": 5.1})
+    df = pd.DataFrame(rows)
+    df.loc[len(df) - 3, "rate"] = usd_last
+    return df
+
+
+@pytest.fixture()
+def server(tmp_path: Path) -> Iterator[FxServer]:
+    cache_file = tmp_path / "cache.parquet"
+    write_cache(_mk_cache(260, usd_last=3.5), cache_file)
+
+    srv = FxServer(cache_file, ServeConfig(port=0, poll_interval_s=60.0))
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    thread.join(timeout=5)
+
+
+def _get(srv: FxServer, path: str) -> tuple[int, bytes]:
+    host, port = srv.address
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=5) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def test_serves_scores_rankings_and_report(server: FxServer) -> None:
+    status, body = _get(server, "/scores/pln")
+    assert status == 200
+    scores = json.loads(body)
+    assert {r["target"] for r in scores} == {"USD", "EUR", "GBP"}
+    assert scores[0]["as_of"] == "2026-09-17"
+
+    status, body = _get(server, "/rankings/PLN")
+    assert status == 200
+    assert json.loads(body)["value"][0]["target"] == "USD"
+
+    status, body = _get(server, "/report/PLN")
+    assert status == 200
+    assert b"fxpower report" in body
+
+
+def test_rejects_unknown_paths_and_currencies(server: FxServer) -> None:
+    assert _get(server, "/nope")[0] == 404
+    assert _get(server, "/scores/XYZ")[0] == 400
+
+
+def test_reload_swaps_state_when_cache_file_changes(server: FxServer) -> None:
+    holder = server.holder
+    old_state = holder.state
+    assert holder.reload_if_changed() is False
+
+    write_cache(_mk_cache(270, usd_last=6.0), holder.path)
+    assert holder.reload_if_changed() is True
+    assert holder.state is not old_state
+
+    status, body = _get(server, "/rankings/PLN")
+    assert status == 200
+    assert json.loads(body)["value"][-1]["target"] == "USD"
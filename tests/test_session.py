@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from conftest import strip_ids
+
+from fxpower.analytics import ranker
+from fxpower.analytics.ranker import ScoreWeights, rank_targets
+from fxpower.app.session import FxSession
+from fxpower.domain.models import Currency
+from fxpower.reporting.report import render_report_html
+from fxpower.storage.cache import write_cache
+
+
+def _mk_cache(n: int, start: date = date(2025, 1, 1)) -> pd.DataFrame:
+    rows = []
+    for i in range(n):
+        d = start + timedelta(days=i)
+        rows.append({"date": d, "base": "PLN", "quote": "USD", "rate": 4.0 + 0.001 * (i % 17)})
+        rows.append({"date": d, "base": "PLN", "quote": "EUR", "rate": 4.3 - 0.001 * (i % 11)})
+        rows.append({"date": d, "base": "PLN", "quote": "GBP", "rate": 5.1 + 0.002 * (i % 7)})
+    return pd.DataFrame(rows)
+
+
+def test_scores_match_rank_targets_and_are_memoized() -> None:
+    cache = _mk_cache(300)
+    session = FxSession(cache)
+
+    first = session.scores("pln")
+    pd.testing.assert_frame_equal(first, rank_targets(cache, base=Currency.PLN))
+    assert session.scores(Currency.PLN) is first
+    assert session.rankings("PLN")["overall"].iloc[0]["target"] in {"USD", "EUR", "GBP"}
+
+    other = session.scores(
+        "PLN", weights=ScoreWeights(overall_value=1.0, overall_trend=0.0, overall_risk=0.0)
+    )
+    assert other is not first
+
+    info = session.memo_info()
+    assert info.hits >= 1
+    assert info.size <= info.maxsize
+
+
+def test_report_reuses_the_memoized_pair_series(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = _mk_cache(300)
+    expected = render_report_html(cache, Currency.PLN)
+    session = FxSession(cache)
+    session.pair_series()
+
+    def no_split(frame: pd.DataFrame) -> dict:
+        raise AssertionError("report split the cache again")
+
+    monkeypatch.setattr(ranker, "split_pair_series", no_split)
+    assert strip_ids(session.report("PLN")) == strip_ids(expected)
+
+
+def test_series_is_sorted_and_empty_for_missing_pair() -> None:
+    session = FxSession(_mk_cache(30).iloc[::-1])
+    s = session.series("PLN", "USD")
+    assert s.index.is_monotonic_increasing
+    assert len(s) == 30
+    assert session.series("USD", "PLN").empty
+
+
+def test_lru_is_size_bounded() -> None:
+    session = FxSession(_mk_cache(30), maxsize=2)
+    for base in ("PLN", "USD", "EUR"):
+        session.scores(base)
+    assert session.memo_info().size == 2
+
+
+def test_merge_and_reload_invalidate(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    write_cache(_mk_cache(300), cache_file)
+    session = FxSession.open(cache_file)
+    assert session.generation == 1
+    before = session.scores("PLN")
+
+    incoming = _mk_cache(1, start=date(2025, 10, 28))
+    assert session.merge(incoming) == 3
+    assert session.generation == 2
+    after = session.scores("PLN")
+    assert after["as_of"].max() == date(2025, 10, 28)
+    assert before["as_of"].max() < after["as_of"].max()
+
+    # another process rewrites the file
+    write_cache(_mk_cache(310), cache_file)
+    assert session.reload()
+    assert session.generation == 3
+    assert not session.reload()
+    assert len(session.series("PLN", "USD")) == 310
+
+
+def test_rejects_non_positive_maxsize() -> None:
+    with pytest.raises(ValueError):
+        FxSession(_mk_cache(1), maxsize=0)
+
+
+def test_slow_build_does_not_block_other_keys() -> None:
+    session = FxSession(_mk_cache(30))
+    session.pair_series()  # warm: a hit on another key
+    started, release = threading.Event(), threading.Event()
+    builds: list[int] = []
+
+    def slow() -> int:
+        builds.append(1)
+        started.set()
+        assert release.wait(5)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(session._memoized, ("slow",), slow)
+        assert started.wait(5)
+        second = pool.submit(session._memoized, ("slow",), slow)  # waits for the build
+        # the lock is free while `slow` runs
+        assert pool.submit(session.pair_series).result(timeout=5) is session.pair_series()
+        release.set()
+        assert first.result(timeout=5) == second.result(timeout=5) == 42
+    assert builds == [1]
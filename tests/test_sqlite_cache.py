@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from fxpower.app.fetch import update_cache_from_eur_source
+from fxpower.storage.cache import (
+    cache_generation,
+    latest_rates,
+    merge_into_cache,
+    read_cache,
+    read_rates,
+    read_snapshot,
+    write_cache,
+)
+
+
+def _cache() -> pd.DataFrame:
+    rows = []
+    for d, usd, eur in (("2026-02-05", 4.00, 4.30), ("2026-02-06", 4.02, 4.31)):
+        rows += [
+            {"date": d, "base": "PLN", "quote": "USD", "rate": usd},
+            {"date": d, "base": "PLN", "quote": "EUR", "rate": eur},
+            {"date": d, "base": "USD", "quote": "PLN", "rate": 1.0 / usd},
+        ]
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(params=["cache.parquet", "cache.sqlite"])
+def cache_file(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    return tmp_path / request.param
+
+
+def test_roundtrip_and_generation(cache_file: Path) -> None:
+    assert read_cache(cache_file).empty
+    assert write_cache(_cache(), cache_file) == 1
+
+    loaded = read_cache(cache_file)
+    assert list(loaded.columns) == ["date", "base", "quote", "rate"]
+    assert len(loaded) == 6
+    assert isinstance(loaded.loc[0, "date"], date)
+    assert cache_generation(cache_file) == 1
+
+
+def test_merge_into_cache_upserts_incoming_wins(cache_file: Path) -> None:
+    write_cache(_cache(), cache_file)
+    existing = read_cache(cache_file)
+    incoming = pd.DataFrame(
+        [
+            {"date": "2026-02-06", "base": "PLN", "quote": "USD", "rate": 4.05},  # overwrite
+            {"date": "2026-02-09", "base": "PLN", "quote": "USD", "rate": 4.06},  # new
+        ]
+    )
+
+    merged = merge_into_cache(existing, incoming, cache_file)
+    snap = read_snapshot(cache_file)
+
+    assert snap.generation == 2
+    assert len(merged) == len(snap.data) == 7
+    key = ["base", "quote", "date"]
+    pd.testing.assert_frame_equal(
+        snap.data.sort_values(key).reset_index(drop=True),
+        merged.sort_values(key).reset_index(drop=True),
+        check_dtype=False,
+    )
+    usd = snap.data[(snap.data["quote"] == "USD") & (snap.data["base"] == "PLN")]
+    assert usd["rate"].tolist() == [4.00, 4.05, 4.06]
+
+
+def test_pair_and_range_queries(cache_file: Path) -> None:
+    write_cache(_cache(), cache_file)
+
+    pln = read_rates(cache_file, base="PLN")
+    assert set(pln["base"]) == {"PLN"}
+    assert len(pln) == 4
+
+    pair = read_rates(cache_file, base="PLN", quote="USD", start=date(2026, 2, 6))
+    assert pair["date"].tolist() == [date(2026, 2, 6)]
+    assert pair["rate"].tolist() == [4.02]
+
+    latest = latest_rates(cache_file)
+    assert len(latest) == 3
+    assert set(latest["date"]) == {date(2026, 2, 6)}
+
+    pln_latest = latest_rates(cache_file, base="PLN")
+    assert sorted(pln_latest["quote"]) == ["EUR", "USD"]
+    assert sorted(pln_latest["rate"]) == [4.02, 4.31]
+
+
+def test_fetch_pipeline_on_sqlite(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.db"
+
+    def fake_fetch(start: date, end: date) -> pd.DataFrame:
+        days = pd.bdate_range(start, end).date
+        return pd.DataFrame(
+            [
+                {"date": d, "quote": q, "rate": r}
+                for d in days
+                for q, r in (("PLN", 4.3), ("USD", 1.08), ("GBP", 0.85))
+            ]
+        )
+
+    first = update_cache_from_eur_source(cache_file, fake_fetch, today=date(2026, 2, 6))
+    second = update_cache_from_eur_source(cache_file, fake_fetch, today=date(2026, 2, 9))
+
+    assert len(second) > len(first)
+    assert cache_generation(cache_file) == 2
+    assert len(read_cache(cache_file)) == len(second)
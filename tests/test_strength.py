@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from conftest import cross_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.strength import currency_strength, rate_cube, strength_returns
+from fxpower.cli import app
+from fxpower.storage.cache import write_cache
+
+CODES = ("EUR", "GBP", "PLN", "USD")
+
+
+def _cache(n_days: int, drift: dict[str, float]) -> pd.DataFrame:
+    """Positive drift = the currency weakens vs EUR."""
+    return cross_cache(CODES, n_days, seed=5, sigma=0.002, drift=drift)
+
+
+def test_strength_returns_average_all_other_currencies() -> None:
+    cache = _cache(30, {})
+    cube = rate_cube(cache)
+    r = strength_returns(cube)
+
+    c = cube.codes.index("USD")
+    others = [b for b in range(len(CODES)) if b != c]
+    brute = np.mean([np.diff(np.log(cube.rates[:, b, c])) for b in others], axis=0)
+    np.testing.assert_allclose(r[:, c], brute, atol=1e-14)
+
+
+def test_strengthening_currency_ranks_first() -> None:
+    # GBP needs fewer units per EUR every day => strengthens against everything
+    result = currency_strength(_cache(300, {"GBP": -0.002, "PLN": 0.001}))
+    table = result.table
+
+    assert table.iloc[0]["currency"] == "GBP"
+    assert table.iloc[-1]["currency"] == "PLN"
+    assert table["rank"].tolist() == [1, 2, 3, 4]
+    assert table.iloc[0]["strength_mom"] > 0 > table.iloc[-1]["strength_mom"]
+    assert result.index.iloc[0].tolist() == [100.0] * 4
+
+
+def test_single_base_cache_is_completed_by_triangulation() -> None:
+    cache = _cache(250, {"USD": 0.001})
+    full = currency_strength(cache)
+    pln_only = currency_strength(cache[cache["base"] == "PLN"])
+    pd.testing.assert_frame_equal(full.table, pln_only.table, atol=1e-10)
+
+
+def test_short_history_leaves_windows_nan() -> None:
+    table = currency_strength(_cache(20, {}), defaults=MetricDefaults()).table
+    assert table["strength_mom"].isna().all()
+    assert table["strength_sma_diff"].isna().all()
+
+
+def test_strength_cli(tmp_path: Path) -> None:
+    cache_file = tmp_path / "cache.parquet"
+    write_cache(_cache(100, {"USD": -0.003}), cache_file)
+
+    result = CliRunner().invoke(
+        app, ["strength", "--cache-path", str(cache_file), "--mom-window", "20"]
+    )
+    assert result.exit_code == 0, result.output
+    lines = result.output.strip().splitlines()
+    assert lines[0].split()[:2] == ["currency", "as_of"]
+    assert lines[1].split()[0] == "USD"
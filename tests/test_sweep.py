@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from conftest import cyclical_cache
+from typer.testing import CliRunner
+
+from fxpower.analytics.backtest import BacktestConfig, run_backtest
+from fxpower.analytics.metrics import MetricDefaults
+from fxpower.analytics.ranker import ScoreWeights
+from fxpower.analytics.sweep import SweepConfig, SweepGrid, run_sweep
+from fxpower.cli import app
+
+
+def test_score_weights_must_sum_to_one() -> None:
+    with pytest.raises(ValueError):
+        ScoreWeights(overall_value=0.5, overall_trend=0.5, overall_risk=0.5)
+
+
+def test_sweep_row_matches_standalone_backtest() -> None:
+    cache = cyclical_cache(n=500)
+    alt = ScoreWeights(overall_value=0.7, overall_trend=0.2, overall_risk=0.1)
+    grid = SweepGrid(
+        vol_windows=(30,),
+        mom_windows=(10, 30),
+        sma_windows=(50,),
+        weights=(ScoreWeights(), alt),
+    )
+    config = SweepConfig(horizons=(20,), min_history=100)
+
+    table = run_sweep(cache, grid=grid, config=config)
+    assert len(table) == grid.size == 4
+    assert table["rank_ic_20"].is_monotonic_decreasing
+
+    row = table[(table["mom_window"] == 30) & (table["overall_value"] == 0.7)].iloc[0]
+    expected = run_backtest(
+        cache,
+        config=BacktestConfig(horizons=(20,), min_history=100),
+        defaults=MetricDefaults(vol_window=30, mom_window=30, sma_window=50),
+        weights=alt,
+    ).summary.iloc[0]
+    assert row["rank_ic_20"] == pytest.approx(expected["rank_ic"])
+    assert row["hit_rate_top_20"] == pytest.approx(expected["hit_rate_top"])
+    assert -1.0 <= row["rank_stability"] <= 1.0
+
+
+def test_process_pool_matches_serial() -> None:
+    cache = cyclical_cache(n=400)
+    grid = SweepGrid(vol_windows=(20, 40), mom_windows=(20,), sma_windows=(50,))
+
+    serial = run_sweep(cache, grid=grid, config=SweepConfig(min_history=100, workers=1))
+    pooled = run_sweep(cache, grid=grid, config=SweepConfig(min_history=100, workers=2))
+    pd.testing.assert_frame_equal(serial, pooled)
+
+
+@pytest.mark.parametrize(
+    ("cls", "kwargs", "match"),
+    [
+        (SweepGrid, {"vol_windows": ()}, "vol_windows"),
+        (SweepGrid, {"mom_windows": (20, 0)}, "mom_windows"),
+        (SweepGrid, {"sma_windows": (-100,)}, "sma_windows"),
+        (SweepGrid, {"weights": ()}, "weights"),
+        (SweepConfig, {"horizons": ()}, "horizons"),
+        (SweepConfig, {"horizons": (20, 0)}, "horizons"),
+        (SweepConfig, {"signal": "magic"}, "Unknown signal"),
+        (SweepConfig, {"workers": 0}, "workers"),
+        (SweepConfig, {"top_fraction": 0.0}, "top_fraction"),
+    ],
+)
+def test_invalid_grid_and_config_are_rejected(cls: type, kwargs: dict, match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        cls(**kwargs)
+
+
+def test_cli_reports_an_empty_cache(tmp_path: Path) -> None:
+    result = CliRunner().invoke(app, ["sweep", "--cache-path", str(tmp_path / "missing.parquet")])
+
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == f"No data in {tmp_path / 'missing.parquet'}"
+
+    bad = CliRunner().invoke(app, ["sweep", "--vol-windows", "60,0"])
+    assert bad.exit_code != 0
+    assert "vol_windows must be" in bad.output
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from fxpower.analytics.cross_rates import cross_rates_table
+from fxpower.app.fetch import FetchPolicy, update_cache_arrow, update_cache_from_eur_source
+from fxpower.app.validation import (
+    IngestValidator,
+    ValidationError,
+    ValidationPolicy,
+    _nanmedian_last,
+    quarantine_path,
+    read_quarantine,
+    validate_rates,
+)
+from fxpower.storage.cache import read_cache, read_cache_table, write_cache_table
+
+QUOTES = ("PLN", "USD", "GBP")
+DAYS = pd.bdate_range("2025-06-02", periods=120).date
+TODAY = date(2025, 11, 14)  # the day after the last of DAYS
+
+
+def _eur(seed: int = 4) -> pd.DataFrame:
+    """Long EUR-based series (date, quote, rate=QUOTE per 1 EUR) over DAYS."""
+    rng = np.random.default_rng(seed)
+    levels = np.exp(np.cumsum(rng.normal(0.0, 0.004, (len(DAYS), len(QUOTES))), axis=0))
+    levels *= np.array([4.3, 1.1, 0.85])
+    wide = pd.DataFrame(levels, index=DAYS, columns=list(QUOTES))
+    long = wide.stack().reset_index()
+    long.columns = ["date", "quote", "rate"]
+    return long
+
+
+def _table(eur: pd.DataFrame) -> pa.Table:
+    return pa.table(
+        {
+            "date": pa.array(eur["date"], pa.date32()),
+            "quote": pa.array(eur["quote"], pa.string()),
+            "rate": pa.array(eur["rate"], pa.float64()),
+        }
+    )
+
+
+def _split(eur: pd.DataFrame, new_days: int = 3) -> tuple[pa.Table, pa.Table]:
+    """(history, incoming) cross rates: the last `new_days` days are incoming."""
+    cross = cross_rates_table(_table(eur))
+    first_new = pa.scalar(DAYS[-new_days], pa.date32())
+    history = cross.filter(pa.compute.less(cross["date"], first_new))
+    incoming = cross.filter(pa.compute.greater_equal(cross["date"], first_new))
+    return history, incoming
+
+
+def _set_rate(table: pa.Table, day: date, base: str, quote: str, factor: float) -> pa.Table:
+    df = table.to_pandas()
+    hit = (df["date"] == day) & (df["base"] == base) & (df["quote"] == quote)
+    df.loc[hit, "rate"] *= factor
+    return pa.Table.from_pandas(df, schema=table.schema, preserve_index=False)
+
+
+def test_clean_data_passes() -> None:
+    history, incoming = _split(_eur())
+
+    report = validate_rates(incoming, history)
+
+    assert report.ok
+    assert report.rows == incoming.num_rows == 3 * 12
+
+
+def test_corrupt_cell_is_flagged_alone() -> None:
+    history, incoming = _split(_eur())
+    incoming = _set_rate(incoming, DAYS[-1], "PLN", "USD", 1.2)
+
+    issues = validate_rates(incoming, history).issues
+
+    # the median over all triangles pins the bad cell (its inverse is still
+    # consistent) and no currency level moved, so nothing spikes
+    assert list(issues["check"]) == ["triangular"]
+    assert (issues.loc[0, "base"], issues.loc[0, "quote"]) == ("PLN", "USD")
+    assert issues.loc[0, "date"] == DAYS[-1]
+    assert issues.loc[0, "score"] == pytest.approx(np.log(1.2))
+
+
+def test_stale_repeats_and_missing_currency() -> None:
+    eur = _eur()
+    # upstream repeats the GBP fixing for the last 5 days
+    gbp = eur["quote"] == "GBP"
+    frozen = eur.loc[gbp & (eur["date"] == DAYS[-5]), "rate"].iloc[0]
+    eur.loc[gbp & (eur["date"] >= DAYS[-5]), "rate"] = frozen
+    history, incoming = _split(eur)
+
+    issues = validate_rates(incoming, history).issues
+
+    stale = issues[issues["check"] == "stale"]
+    assert set(stale["date"]) == {DAYS[-1]}  # 5 identical observations only on the last day
+    assert ((stale["base"] == "GBP") | (stale["quote"] == "GBP")).all()
+    exempt = ValidationPolicy(stale_exempt=("EUR", "GBP"))
+    assert len(validate_rates(incoming, history, exempt).issues) == len(stale) - 2
+
+    # USD is absent on the last day
+    df = incoming.to_pandas()
+    gone = (df["date"] == DAYS[-1]) & ((df["base"] == "USD") | (df["quote"] == "USD"))
+    without_usd = pa.Table.from_pandas(df[~gone], schema=incoming.schema, preserve_index=False)
+    missing = validate_rates(without_usd, history).issues
+    missing = missing[missing["check"] == "missing"]
+    assert list(zip(missing["date"], missing["base"], strict=True)) == [(DAYS[-1], "USD")]
+
+
+def test_nanmedian_matches_numpy() -> None:
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=(50, 7))
+    a[rng.random(a.shape) < 0.3] = np.nan
+    a[0] = np.nan
+    with np.errstate(all="ignore"), pytest.warns(RuntimeWarning):
+        expected = np.nanmedian(a, axis=-1)
+    np.testing.assert_allclose(_nanmedian_last(a), expected)
+
+
+def _seed_and_fetch(eur: pd.DataFrame, tmp_path: Path, suffix: str = ".parquet") -> Path:
+    cache_file = tmp_path / f"cache{suffix}"
+    history = eur[eur["date"] < DAYS[-2]]
+    write_cache_table(cross_rates_table(_table(history)), cache_file)
+    return cache_file
+
+
+def _corrupt_last_day(eur: pd.DataFrame) -> pd.DataFrame:
+    eur = eur.copy()
+    eur.loc[(eur["quote"] == "PLN") & (eur["date"] == DAYS[-1]), "rate"] *= 1.5
+    return eur
+
+
+def test_quarantine_drops_flagged_rows(tmp_path: Path) -> None:
+    eur = _corrupt_last_day(_eur())
+    cache_file = _seed_and_fetch(eur, tmp_path)
+    before = read_cache_table(cache_file).num_rows
+    validator = IngestValidator(ValidationPolicy(action="quarantine"))
+
+    table, added = update_cache_arrow(
+        cache_file,
+        lambda start, end: _table(eur[eur["date"] >= start]),
+        today=TODAY,
+        policy=FetchPolicy(),
+        validator=validator,
+    )
+
+    quarantined = read_quarantine(quarantine_path(cache_file)).to_pandas()
+    report = validator.reports[-1]
+    # a PLN spike: every pair with PLN on one side jumps
+    assert set(quarantined["check"]) == {"spike"}
+    assert ((quarantined["base"] == "PLN") | (quarantined["quote"] == "PLN")).all()
+    assert report.quarantined == 6
+    assert added == 2 * 12 - 6 == table.num_rows - before
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".sqlite"])
+def test_reject_writes_nothing(tmp_path: Path, suffix: str) -> None:
+    eur = _corrupt_last_day(_eur())
+    cache_file = _seed_and_fetch(eur, tmp_path, suffix)
+    before = read_cache(cache_file)
+
+    with pytest.raises(ValidationError, match="spike: 6"):
+        update_cache_from_eur_source(
+            cache_file,
+            lambda start, end: eur[eur["date"] >= start],
+            today=TODAY,
+            validator=IngestValidator(ValidationPolicy(action="reject")),
+        )
+
+    pd.testing.assert_frame_equal(read_cache(cache_file), before)
+
+
+def test_invalid_policy() -> None:
+    with pytest.raises(ValueError, match="Unknown validation action"):
+        ValidationPolicy(action="ignore")
+    with pytest.raises(ValueError, match="spike_min_history"):
+        ValidationPolicy(spike_window=10, spike_min_history=20)